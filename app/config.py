@@ -17,6 +17,90 @@ class Settings:
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "./uploads")
     DATA_DIR: str = os.getenv("DATA_DIR", "./data")
     MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", 524288000))  # 500MB default
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "json")  # json|sqlite
+    # Read cache of the JSON backend: parsed data file, summaries and response
+    # bodies, bounded by entries and by the size of their JSON (0 disables)
+    STORAGE_CACHE_ENTRIES: int = int(os.getenv("STORAGE_CACHE_ENTRIES", 64))
+    STORAGE_CACHE_MB: float = float(os.getenv("STORAGE_CACHE_MB", 256))
+    # Extra wait of the JSON backend before a commit, for more saves to join it
+    # (saves arriving while a commit is being written always join the next one)
+    STORAGE_COMMIT_WINDOW_MS: float = float(os.getenv("STORAGE_COMMIT_WINDOW_MS", 0))
+    # Bitrate of the Opus rendition served by /media?rendition=opus
+    MEDIA_OPUS_BITRATE_KBPS: int = int(os.getenv("MEDIA_OPUS_BITRATE_KBPS", 32))
+    # Keep the raw ASR segments and speaker turns (DATA_DIR/artifacts) to re-merge
+    ARTIFACTS_ENABLED: bool = os.getenv("ARTIFACTS_ENABLED", "true").lower() == "true"
+    DOWNLOAD_TIMEOUT_SECONDS: float = float(os.getenv("DOWNLOAD_TIMEOUT_SECONDS", 30))
+    # Resume attempts after a dropped connection while downloading from a URL
+    DOWNLOAD_RETRIES: int = int(os.getenv("DOWNLOAD_RETRIES", 3))
+
+    # Model Configuration
+    WHISPER_MODEL: str = os.getenv("WHISPER_MODEL", "turbo")
+    WHISPER_MODELS: List[str] = os.getenv("WHISPER_MODELS", "turbo").split(",")
+    # Inference engine: torch (reference), torch-int8 (quantized CPU) or
+    # faster-whisper (CTranslate2, requires the faster-whisper package)
+    ASR_BACKEND: str = os.getenv("ASR_BACKEND", "torch")
+    ASR_COMPUTE_TYPE: str = os.getenv("ASR_COMPUTE_TYPE", "int8")  # faster-whisper only
+    DIARIZATION_MODEL: str = os.getenv(
+        "DIARIZATION_MODEL", "pyannote/speaker-diarization-community-1"
+    )
+    MODEL_MEMORY_BUDGET_MB: int = int(os.getenv("MODEL_MEMORY_BUDGET_MB", 6144))
+    PRELOAD_MODELS: bool = os.getenv("PRELOAD_MODELS", "false").lower() == "true"
+
+    # Pipeline Configuration
+    PIPELINE_MODE: str = os.getenv("PIPELINE_MODE", "parallel")  # parallel|sequential
+    # 0 gives each stage all CPU cores in sequential mode and splits them
+    # between the two stages (and the chunk workers) in parallel mode, where
+    # torch's process-wide thread count makes the split best effort; ASR's
+    # value is also the CPU threads of every faster-whisper model
+    ASR_TORCH_THREADS: int = int(os.getenv("ASR_TORCH_THREADS", 0))
+    DIARIZATION_TORCH_THREADS: int = int(os.getenv("DIARIZATION_TORCH_THREADS", 0))
+    # Decoded audio above this size is memory-mapped (~17 min at 16 kHz float32)
+    AUDIO_MMAP_THRESHOLD_MB: int = int(os.getenv("AUDIO_MMAP_THRESHOLD_MB", 64))
+    # Recordings longer than this are transcribed in windows (0 disables)
+    ASR_CHUNK_SECONDS: int = int(os.getenv("ASR_CHUNK_SECONDS", 0))
+    ASR_CHUNK_OVERLAP_SECONDS: float = float(os.getenv("ASR_CHUNK_OVERLAP_SECONDS", 1.0))
+    ASR_CHUNK_WORKERS: int = int(os.getenv("ASR_CHUNK_WORKERS", 2))
+    ASR_CHUNK_EXECUTOR: str = os.getenv("ASR_CHUNK_EXECUTOR", "process")  # process|thread
+    # Only speech found by a voice activity detection pre-pass is transcribed
+    # and diarized; pauses of VAD_MIN_SILENCE_SECONDS or more are skipped
+    VAD_ENABLED: bool = os.getenv("VAD_ENABLED", "false").lower() == "true"
+    VAD_MIN_SILENCE_SECONDS: float = float(os.getenv("VAD_MIN_SILENCE_SECONDS", 1.0))
+    VAD_PADDING_SECONDS: float = float(os.getenv("VAD_PADDING_SECONDS", 0.2))
+    # Short clips (up to 30 s) transcribed concurrently are decoded together in
+    # batches of up to ASR_BATCH_SIZE (1 disables), waiting at most
+    # ASR_BATCH_MAX_WAIT_MS for a batch to fill. Clips only come from running
+    # jobs, so batches are capped at JOB_WORKERS (thread executor only)
+    ASR_BATCH_SIZE: int = int(os.getenv("ASR_BATCH_SIZE", 1))
+    ASR_BATCH_MAX_WAIT_MS: float = float(os.getenv("ASR_BATCH_MAX_WAIT_MS", 50))
+    # Split segments spanning several speakers into per-speaker pieces
+    SPEAKER_SPLIT_SEGMENTS: bool = os.getenv("SPEAKER_SPLIT_SEGMENTS", "false").lower() == "true"
+    SPEAKER_MIN_SPLIT_SECONDS: float = float(os.getenv("SPEAKER_MIN_SPLIT_SECONDS", 1.0))
+
+    # Job Queue Configuration
+    JOB_EXECUTOR: str = os.getenv("JOB_EXECUTOR", "thread")  # thread|process|inline
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", 2))
+    JOB_QUEUE_DEPTH: int = int(os.getenv("JOB_QUEUE_DEPTH", 16))
+    JOB_RETRY_AFTER_SECONDS: int = int(os.getenv("JOB_RETRY_AFTER_SECONDS", 30))
+    # The web process never imports torch/Whisper/pyannote; requires
+    # JOB_EXECUTOR=process, live transcription is unavailable
+    API_ONLY: bool = os.getenv("API_ONLY", "false").lower() == "true"
+    # Finished results kept for re-uploads of identical files (0 disables)
+    RESULT_CACHE_SIZE: int = int(os.getenv("RESULT_CACHE_SIZE", 256))
+    # Idle progress streams send a keep-alive and re-check the stored status
+    EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", 15))
+
+    # Live (WebSocket) Transcription Configuration
+    LIVE_MAX_SESSIONS: int = int(os.getenv("LIVE_MAX_SESSIONS", 4))
+    LIVE_MAX_SECONDS: int = int(os.getenv("LIVE_MAX_SECONDS", 4 * 3600))
+    # Audio re-transcribed per pass at most, new audio between passes, and how
+    # long before the end of the buffer a segment must end to be final
+    LIVE_WINDOW_SECONDS: float = float(os.getenv("LIVE_WINDOW_SECONDS", 15))
+    LIVE_STEP_SECONDS: float = float(os.getenv("LIVE_STEP_SECONDS", 1.0))
+    LIVE_FINALIZE_SECONDS: float = float(os.getenv("LIVE_FINALIZE_SECONDS", 2.0))
+    # Recent audio re-diarized every interval to label live speakers
+    LIVE_DIARIZATION: bool = os.getenv("LIVE_DIARIZATION", "true").lower() == "true"
+    LIVE_DIARIZATION_WINDOW_SECONDS: float = float(os.getenv("LIVE_DIARIZATION_WINDOW_SECONDS", 30))
+    LIVE_DIARIZATION_INTERVAL_SECONDS: float = float(os.getenv("LIVE_DIARIZATION_INTERVAL_SECONDS", 10))
 
     # CORS Configuration
     CORS_ORIGINS: List[str] = os.getenv(
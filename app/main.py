@@ -1,12 +1,46 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from routers import transcriptions
 from config import settings
+from services import engine
+from services.asr_batching import asr_batcher
+from services.job_queue import job_executor
+from services.live_transcription import live_sessions
+from services.metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS, metrics
+from services.model_registry import model_registry
+from services.progress import progress_broker
+from services.result_cache import result_cache
+from services.transcription_service import preload_models, shutdown_chunk_pool
+from services.url_service import url_service
+from storage.data_storage import storage
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.API_ONLY:
+        if settings.JOB_EXECUTOR != "process":
+            raise RuntimeError("API_ONLY requires JOB_EXECUTOR=process")
+        # Jobs load the models in the worker processes
+        engine.disable()
+    elif settings.PRELOAD_MODELS:
+        await asyncio.to_thread(preload_models)
+    yield
+    job_executor.shutdown()
+    asr_batcher.shutdown()
+    shutdown_chunk_pool()
+    await url_service.aclose()
+
 
 app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
     version=settings.API_VERSION,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -15,11 +49,50 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link"],
     max_age=3600,
 )
+
+
+def _route_template(request: Request) -> str:
+    """The matched route path with its parameters, e.g. `/api/x/{id}`."""
+    route = request.scope.get("route")
+    if route is None:
+        # Unmatched paths share one label so scanners cannot blow up the series
+        return "unmatched"
+    path_format = getattr(route, "path_format", None) or getattr(route, "path", "")
+    # Routes of included routers only know their own part of the path, and
+    # mounted apps keep theirs in root_path
+    prefix = ROUTE_PREFIXES.get(id(route), "")
+    return request.scope.get("root_path", "") + prefix + path_format
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Observe request latencies per route template (not per concrete path)."""
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=_route_template(request),
+            status=str(status_code),
+        )
+
+
+TRANSCRIPTIONS_PREFIX = "/api/transcriptions"
 app.include_router(
-    transcriptions.router, prefix="/api/transcriptions", tags=["transcriptions"]
+    transcriptions.router, prefix=TRANSCRIPTIONS_PREFIX, tags=["transcriptions"]
 )
+# Prefix of every included route, by route object, for the latency labels
+ROUTE_PREFIXES = {
+    id(route): TRANSCRIPTIONS_PREFIX for route in transcriptions.router.routes
+}
 
 
 @app.get("/")
@@ -33,4 +106,47 @@ async def root():
 
 @app.get("/api/health")
 async def health():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "models": model_registry.stats(),
+        "jobs": job_executor.stats(),
+        "cache": result_cache.stats(),
+        "events": progress_broker.stats(),
+        "live": live_sessions.stats(),
+        "batching": asr_batcher.stats(),
+        "storage": storage.stats(),
+        "engine": {"api_only": not engine.is_available(), "loaded": engine.is_loaded()},
+    }
+
+
+def _job_queue_depth():
+    stats = job_executor.stats()
+    return {("running",): stats["running"], ("queued",): stats["queued"]}
+
+
+metrics.gauge(
+    "job_queue_depth",
+    "Transcription jobs in the executor by state.",
+    ("state",),
+    callback=_job_queue_depth,
+)
+metrics.gauge(
+    "models_loaded",
+    "Models currently kept in the model registry.",
+    callback=lambda: {(): len(model_registry.stats()["loaded"])},
+)
+metrics.gauge(
+    "models_resident_bytes",
+    "Estimated resident size of the loaded models.",
+    callback=lambda: {(): model_registry.resident_bytes},
+)
+metrics.gauge(
+    "live_sessions_active",
+    "Live transcription sessions currently open.",
+    callback=lambda: {(): live_sessions.stats()["sessions"]},
+)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,349 @@
+"""Transcript segments, one at a time and as a columnar table."""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from pydantic import BaseModel, Field
+from pydantic_core import core_schema
+
+
+class TranscriptionSegment(BaseModel):
+    """A single segment of transcribed text with timestamps."""
+
+    id: str
+    start_time: float = Field(ge=0, description="Start time in seconds")
+    end_time: float = Field(ge=0, description="End time in seconds")
+    speaker: Optional[str] = Field(default="")
+    overlap_seconds: Optional[float] = Field(default=0.0)
+    simultaneous_speech: bool = Field(
+        default=False, description="Several speakers talk at once in this segment"
+    )
+    text: str
+
+
+# (id, start_time, end_time, speaker, overlap_seconds, simultaneous_speech, text)
+SegmentRow = Tuple[str, float, float, Optional[str], Optional[float], bool, str]
+
+
+class SegmentTable(Sequence[TranscriptionSegment]):
+    """
+    Immutable segments of a transcript, stored column by column.
+
+    Times are float32 arrays (kept to the pipeline's 10 ms resolution),
+    speakers are codes into a table of distinct labels and the texts are
+    one string with the end offset of every segment. Ids of the usual
+    `seg-<position>` form are not stored at all. Indexing and iterating
+    build `TranscriptionSegment` models on demand, so a transcript only
+    becomes models where it leaves the application.
+    """
+
+    __slots__ = (
+        "_starts",
+        "_ends",
+        "_speaker_codes",
+        "_speakers",
+        "_overlaps",
+        "_simultaneous",
+        "_text",
+        "_text_ends",
+        "_ids",
+    )
+
+    def __init__(
+        self,
+        starts: Sequence[float] = (),
+        ends: Sequence[float] = (),
+        texts: Sequence[str] = (),
+        speakers: Optional[Sequence[Optional[str]]] = None,
+        overlaps: Optional[Sequence[Optional[float]]] = None,
+        simultaneous: Optional[Sequence[bool]] = None,
+        ids: Optional[Sequence[str]] = None,
+    ):
+        count = len(texts)
+        self._starts = np.asarray(starts, dtype=np.float32).reshape(count)
+        self._ends = np.asarray(ends, dtype=np.float32).reshape(count)
+        if speakers is None:
+            speakers = [""] * count
+        self._speakers: List[Optional[str]] = list(dict.fromkeys(speakers))
+        codes = {speaker: code for code, speaker in enumerate(self._speakers)}
+        self._speaker_codes = np.array(
+            [codes[speaker] for speaker in speakers], dtype=np.int32
+        ).reshape(count)
+        self._overlaps = (
+            np.zeros(count)
+            if overlaps is None
+            else np.array(
+                [np.nan if o is None else o for o in overlaps], dtype=np.float64
+            ).reshape(count)
+        )
+        self._simultaneous = (
+            np.zeros(count, dtype=bool)
+            if simultaneous is None
+            else np.asarray(simultaneous, dtype=bool).reshape(count)
+        )
+        self._text = "".join(texts)
+        self._text_ends = np.cumsum([len(text) for text in texts], dtype=np.int64)
+        self._ids = _stored_ids(ids)
+
+        if count and (self._starts.min() < 0 or self._ends.min() < 0):
+            raise ValueError("Segment times must not be negative")
+
+    @classmethod
+    def from_segments(
+        cls, segments: Union["SegmentTable", Sequence[TranscriptionSegment]]
+    ) -> "SegmentTable":
+        """Table of segment models (tables are returned as they are)."""
+        if isinstance(segments, SegmentTable):
+            return segments
+        return cls(
+            starts=[segment.start_time for segment in segments],
+            ends=[segment.end_time for segment in segments],
+            texts=[segment.text for segment in segments],
+            speakers=[segment.speaker for segment in segments],
+            overlaps=[segment.overlap_seconds for segment in segments],
+            simultaneous=[segment.simultaneous_speech for segment in segments],
+            ids=[segment.id for segment in segments],
+        )
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> "SegmentTable":
+        """Table of segment dicts as produced by `to_records`."""
+        try:
+            return cls(
+                starts=[record["start_time"] for record in records],
+                ends=[record["end_time"] for record in records],
+                texts=[record["text"] for record in records],
+                speakers=[record.get("speaker", "") for record in records],
+                overlaps=[record.get("overlap_seconds", 0.0) for record in records],
+                simultaneous=[
+                    record.get("simultaneous_speech", False) for record in records
+                ],
+                ids=[record["id"] for record in records],
+            )
+        except KeyError as e:
+            raise ValueError(f"Segment field missing: {e}") from e
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[SegmentRow]) -> "SegmentTable":
+        """Table of `SegmentRow` tuples (e.g. database rows)."""
+        ids, starts, ends, speakers, overlaps, simultaneous, texts = (
+            zip(*rows) if rows else ((),) * 7
+        )
+        return cls(starts, ends, texts, speakers, overlaps, simultaneous, ids)
+
+    def with_speakers(
+        self,
+        speaker_codes: np.ndarray,
+        speakers: Sequence[Optional[str]],
+        overlaps: np.ndarray,
+        simultaneous: np.ndarray,
+    ) -> "SegmentTable":
+        """
+        Copy with new speaker columns, sharing times, texts and ids.
+
+        `speaker_codes` index `speakers`, one code per segment.
+        """
+        table = SegmentTable.__new__(SegmentTable)
+        table._starts, table._ends = self._starts, self._ends
+        table._text, table._text_ends = self._text, self._text_ends
+        table._ids = self._ids
+        table._speakers = list(speakers)
+        table._speaker_codes = np.asarray(speaker_codes, dtype=np.int32)
+        table._overlaps = np.asarray(overlaps, dtype=np.float64)
+        table._simultaneous = np.asarray(simultaneous, dtype=bool)
+        return table
+
+    @property
+    def start_times(self) -> np.ndarray:
+        """Start times in seconds, as float64."""
+        return _seconds(self._starts)
+
+    @property
+    def end_times(self) -> np.ndarray:
+        """End times in seconds, as float64."""
+        return _seconds(self._ends)
+
+    @property
+    def texts(self) -> List[str]:
+        text = self._text
+        return [
+            text[start:end]
+            for start, end in zip(
+                self._text_starts().tolist(), self._text_ends.tolist()
+            )
+        ]
+
+    @property
+    def speakers(self) -> List[Optional[str]]:
+        labels = self._speakers
+        return [labels[code] for code in self._speaker_codes.tolist()]
+
+    @property
+    def ids(self) -> List[str]:
+        if self._ids is None:
+            return [f"seg-{index}" for index in range(len(self))]
+        return list(self._ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the table."""
+        arrays = (
+            self._starts,
+            self._ends,
+            self._speaker_codes,
+            self._overlaps,
+            self._simultaneous,
+            self._text_ends,
+        )
+        text_bytes = len(self._text.encode("utf-8"))
+        label_bytes = sum(len(label or "") for label in self._speakers)
+        id_bytes = sum(len(i) for i in self._ids) if self._ids is not None else 0
+        return (
+            sum(array.nbytes for array in arrays) + text_bytes + label_bytes + id_bytes
+        )
+
+    def rows(self) -> List[SegmentRow]:
+        """One `SegmentRow` per segment, without building models."""
+        return list(
+            zip(
+                self.ids,
+                self.start_times.tolist(),
+                self.end_times.tolist(),
+                self.speakers,
+                _optional_floats(self._overlaps),
+                self._simultaneous.tolist(),
+                self.texts,
+            )
+        )
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Segment dicts, as `TranscriptionSegment.model_dump` returns them."""
+        return [
+            {
+                "id": segment_id,
+                "start_time": start_time,
+                "end_time": end_time,
+                "speaker": speaker,
+                "overlap_seconds": overlap_seconds,
+                "simultaneous_speech": simultaneous_speech,
+                "text": text,
+            }
+            for (
+                segment_id,
+                start_time,
+                end_time,
+                speaker,
+                overlap_seconds,
+                simultaneous_speech,
+                text,
+            ) in self.rows()
+        ]
+
+    def to_segments(self) -> List[TranscriptionSegment]:
+        return [TranscriptionSegment(**record) for record in self.to_records()]
+
+    def __len__(self) -> int:
+        return len(self._text_ends)
+
+    def __iter__(self) -> Iterator[TranscriptionSegment]:
+        return iter(self.to_segments())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._take(range(len(self))[index])
+        position = range(len(self))[index]
+        text_start = int(self._text_ends[position - 1]) if position else 0
+        overlap = float(self._overlaps[position])
+        return TranscriptionSegment(
+            id=self._ids[position] if self._ids is not None else f"seg-{position}",
+            start_time=float(_seconds(self._starts[position])),
+            end_time=float(_seconds(self._ends[position])),
+            speaker=self._speakers[self._speaker_codes[position]],
+            overlap_seconds=None if np.isnan(overlap) else overlap,
+            simultaneous_speech=bool(self._simultaneous[position]),
+            text=self._text[text_start : self._text_ends[position]],
+        )
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, SegmentTable):
+            return self.rows() == other.rows()
+        if isinstance(other, (list, tuple)):
+            return self.to_segments() == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"SegmentTable({len(self)} segments, {len(self._speakers)} speakers)"
+
+    def _take(self, positions: Sequence[int]) -> "SegmentTable":
+        positions = list(positions)
+        texts, ids, speakers = self.texts, self.ids, self.speakers
+        overlaps = _optional_floats(self._overlaps[positions])
+        return SegmentTable(
+            starts=self._starts[positions],
+            ends=self._ends[positions],
+            texts=[texts[p] for p in positions],
+            speakers=[speakers[p] for p in positions],
+            overlaps=overlaps,
+            simultaneous=self._simultaneous[positions],
+            ids=[ids[p] for p in positions],
+        )
+
+    def _text_starts(self) -> np.ndarray:
+        return np.concatenate(([0], self._text_ends[:-1])).astype(np.int64)
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source, handler):
+        # Validated from lists of segments (models or dicts), serialized back
+        # to such lists, so the API and the stored JSON keep their format
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(_serialize),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema, handler):
+        return handler(
+            core_schema.list_schema(TranscriptionSegment.__pydantic_core_schema__)
+        )
+
+    @classmethod
+    def _validate(cls, value) -> "SegmentTable":
+        if isinstance(value, SegmentTable):
+            return value
+        if not isinstance(value, (list, tuple)):
+            raise ValueError("Segments must be a list")
+        if all(isinstance(segment, TranscriptionSegment) for segment in value):
+            return cls.from_segments(value)
+        return cls.from_records(
+            [
+                s.model_dump() if isinstance(s, TranscriptionSegment) else s
+                for s in value
+            ]
+        )
+
+
+def _seconds(times: np.ndarray) -> np.ndarray:
+    """float32 times back to the 10 ms values they were stored from."""
+    return np.round(np.asarray(times, dtype=np.float64), 2)
+
+
+def _optional_floats(values: np.ndarray) -> List[Optional[float]]:
+    """Floats with NaN (a missing value) as None."""
+    return [None if value != value else value for value in values.tolist()]
+
+
+def _stored_ids(ids: Optional[Sequence[str]]) -> Optional[List[str]]:
+    """Ids worth storing, None when they are all `seg-<position>`."""
+    if ids is None:
+        return None
+    ids = list(ids)
+    if all(i == f"seg-{position}" for position, i in enumerate(ids)):
+        return None
+    return ids
+
+
+def _serialize(value) -> List[Dict[str, Any]]:
+    # Lists of models get in through `model_copy(update=...)`
+    return SegmentTable._validate(value).to_records()
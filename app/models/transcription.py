@@ -1,10 +1,13 @@
 """Pydantic models for transcription data."""
 
+from datetime import datetime, timezone
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
+from models.segments import SegmentTable, TranscriptionSegment
+
 
 class SpeakerTurn(BaseModel):
     """Represents a speaker turn with start/end times and speaker label."""
@@ -23,17 +26,6 @@ class TranscriptionStatus(str, Enum):
     FAILED = "failed"
 
 
-class TranscriptionSegment(BaseModel):
-    """A single segment of transcribed text with timestamps."""
-
-    id: str
-    start_time: float = Field(ge=0, description="Start time in seconds")
-    end_time: float = Field(ge=0, description="End time in seconds")
-    speaker: Optional[str] = Field(default="")
-    overlap_seconds: Optional[float] = Field(default=0.0)
-    text: str
-
-
 class Transcription(BaseModel):
     """Complete transcription data."""
 
@@ -43,7 +35,53 @@ class Transcription(BaseModel):
     file_type: str
     duration: Optional[float] = None
     language: Optional[str] = "en"
-    segments: List[TranscriptionSegment] = []
+    segments: SegmentTable = Field(default_factory=SegmentTable)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    stage_timings: Dict[str, float] = Field(
+        default_factory=dict, description="Wall time per pipeline stage in seconds"
+    )
+
+    def to_item(self) -> "TranscriptionItem":
+        """Summary of this transcription without its segments."""
+        return TranscriptionItem(
+            id=self.id,
+            status=self.status,
+            file_name=self.file_name,
+            duration=self.duration,
+            language=self.language,
+            created_at=self.created_at,
+        )
+
+
+class TranscriptionEventType(str, Enum):
+    """Kinds of live progress events of a transcription."""
+
+    STATUS = "status"
+    STAGE = "stage"
+    PROGRESS = "progress"
+    SEGMENT = "segment"
+    PARTIAL = "partial"
+
+
+class TranscriptionEvent(BaseModel):
+    """Progress event pushed to clients while a transcription is processed."""
+
+    type: TranscriptionEventType
+    transcription_id: str
+    status: Optional[TranscriptionStatus] = None
+    stage: Optional[str] = Field(
+        default=None, description="Pipeline stage: decode, asr, diarization or merge"
+    )
+    progress: Optional[float] = Field(
+        default=None, ge=0, le=100, description="Overall progress in percent"
+    )
+    segment: Optional[TranscriptionSegment] = Field(
+        default=None,
+        description=(
+            "Segment emitted by ASR. Live sessions send provisional text as "
+            "`partial` events and re-send a final segment when its speaker changes"
+        ),
+    )
 
 
 class TranscriptionItem(BaseModel):
@@ -53,6 +91,60 @@ class TranscriptionItem(BaseModel):
     status: TranscriptionStatus
     file_name: str
     duration: Optional[float] = None
+    language: Optional[str] = None
+    created_at: Optional[datetime] = None
 
 
 Transcriptions = List[TranscriptionItem]
+
+
+class SortField(str, Enum):
+    """Fields transcription listings can be sorted by."""
+
+    CREATED_AT = "created_at"
+    FILE_NAME = "file_name"
+    DURATION = "duration"
+
+
+class SortOrder(str, Enum):
+    """Sort direction of transcription listings."""
+
+    ASC = "asc"
+    DESC = "desc"
+
+
+class MediaRendition(str, Enum):
+    """Versions of an uploaded file served for playback."""
+
+    ORIGINAL = "original"
+    OPUS = "opus"
+
+
+class TranscriptionQuery(BaseModel):
+    """Filtering, sorting and cursor pagination of transcription listings."""
+
+    status: Optional[TranscriptionStatus] = None
+    language: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    sort_by: SortField = SortField.CREATED_AT
+    order: SortOrder = SortOrder.DESC
+    cursor: Optional[str] = Field(
+        default=None, description="Opaque cursor returned by the previous page"
+    )
+    limit: int = Field(default=100, ge=1, le=1000)
+
+
+class RemergeRequest(BaseModel):
+    """Speaker assignment parameters for re-merging stored pipeline results."""
+
+    min_overlap_seconds: float = Field(
+        default=0.10, ge=0, description="Shortest overlap accepted as a speaker match"
+    )
+    unknown_speaker_label: str = Field(
+        default="UNKNOWN", description="Speaker of segments without a match"
+    )
+    split_segments: Optional[bool] = Field(
+        default=None,
+        description="Split segments at speaker changes (server default if unset)",
+    )
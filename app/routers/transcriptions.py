@@ -1,92 +1,705 @@
 """API router for transcription endpoints."""
 
-from typing import Optional
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import Future
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from functools import partial
+from typing import AsyncIterator, Iterator, Optional
 import uuid
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    UploadFile,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.datastructures import Headers
 
-from models.transcription import Transcription, TranscriptionItem, Transcriptions
+from config import settings
+
+from models.transcription import (
+    MediaRendition,
+    RemergeRequest,
+    SortField,
+    SortOrder,
+    Transcription,
+    TranscriptionEvent,
+    TranscriptionEventType,
+    TranscriptionQuery,
+    Transcriptions,
+    TranscriptionStatus,
+)
 from models.upload import UrlUploadRequest
-from services.transcription_service import process_transcription
+from services.audio_service import SAMPLE_RATE, transcode_opus
+from services.job_queue import job_executor
+from services.live_transcription import LiveEncoding, live_sessions
+from services.progress import JobProgress, is_terminal, progress_broker
+from services.result_cache import CachedResult, result_cache
+from services.transcription_service import (
+    process_transcription,
+    remerge_transcription,
+)
 from services.file_service import file_service
 from services.url_service import url_service
 
+from storage.artifact_storage import artifact_storage
 from storage.data_storage import storage
 from storage.file_storage import file_storage
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def _run_transcription_job(
+    transcription: Transcription, file_path: str, source_url: Optional[str] = None
+) -> Transcription:
+    """Drive a queued transcription through PROCESSING to COMPLETED/FAILED."""
+    storage.save(
+        transcription.model_copy(update={"status": TranscriptionStatus.PROCESSING})
+    )
+    progress = JobProgress(transcription.id)
+    progress.status(TranscriptionStatus.PROCESSING)
+
+    try:
+        result = process_transcription(
+            file_path=file_path,
+            file_name=transcription.file_name,
+            file_type=transcription.file_type,
+            duration=transcription.duration,
+            language=transcription.language,
+            source_url=source_url,
+            transcription_id=transcription.id,
+            progress=progress,
+        )
+    except Exception as e:
+        logger.exception("Transcription %s failed: %s", transcription.id, e)
+        result = transcription.model_copy(update={"status": TranscriptionStatus.FAILED})
+
+    result.created_at = transcription.created_at
+    storage.save(result)
+    progress_broker.finish(transcription.id, result.status)
+    return result
+
+
+def _share_artifacts(source_id: Optional[str], target_id: str):
+    """Let a transcription served from the cache be re-merged like its source."""
+    if source_id is None or source_id == target_id:
+        return
+    try:
+        artifact_storage.copy(source_id, target_id)
+    except OSError as e:
+        # The transcription itself does not depend on its artifacts
+        logger.warning("Copying artifacts of %s failed: %s", source_id, e)
+
+
+def _follow_transcription_job(transcription: Transcription, future: Future):
+    """Complete a coalesced duplicate with the result of the job it waited on."""
+    try:
+        result = future.result()
+    except BaseException as e:
+        logger.warning("Transcription %s failed: %s", transcription.id, e)
+        result = None
+
+    if result is not None and result.status == TranscriptionStatus.COMPLETED:
+        cached = CachedResult.from_transcription(result)
+        _share_artifacts(cached.source_id, transcription.id)
+        result = cached.apply(transcription)
+    else:
+        result = transcription.model_copy(update={"status": TranscriptionStatus.FAILED})
+    storage.save(result)
+    progress_broker.finish(transcription.id, result.status)
+
+
+def _enqueue_transcription(
+    transcription: Transcription,
+    file_path: str,
+    source_url: Optional[str] = None,
+    content_hash: Optional[str] = None,
+) -> Transcription:
+    """
+    Store a PENDING transcription and hand it over to the job executor.
+
+    With a `content_hash`, files already transcribed with the same settings
+    complete immediately from the result cache, and duplicates of a file
+    still being processed wait for that job instead of starting a new one.
+    """
+    cache_key = None
+    if content_hash is not None and result_cache.enabled:
+        cache_key = result_cache.make_key(content_hash, transcription.language)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            _share_artifacts(cached.source_id, transcription.id)
+            result = cached.apply(transcription)
+            storage.save(result)
+            return result
+
+        inflight = result_cache.join(cache_key)
+        if inflight is not None:
+            storage.save(transcription)
+            inflight.add_done_callback(
+                partial(_follow_transcription_job, transcription)
+            )
+            return transcription
+
+    storage.save(transcription)
+    try:
+        future = job_executor.submit(
+            transcription.id,
+            _run_transcription_job,
+            transcription,
+            file_path,
+            source_url,
+        )
+    except HTTPException:
+        # The queue filled up between the capacity check and the submit.
+        storage.save(
+            transcription.model_copy(update={"status": TranscriptionStatus.FAILED})
+        )
+        raise
+
+    if cache_key is not None:
+        result_cache.track(cache_key, future)
+    return transcription
+
+
 @router.post("/upload", response_model=Transcription)
 async def upload_file(
     file: UploadFile = File(...),
     language: Optional[str] = Form("en"),
 ):
-    """Upload and transcribe an audio/video file."""
+    """Upload an audio/video file and queue it for transcription."""
     file_service.validate_file(file)
-    file_path = file_storage.save_file(str(uuid.uuid4()), file.filename, file.file)
-    duration = file_service.get_file_duration(file_path)
+    job_executor.ensure_capacity()
+
+    # Hashing, copying and saving block, so they run off the event loop
+    content_hash = await asyncio.to_thread(file_service.compute_sha256, file.file)
+    transcription_id = str(uuid.uuid4())
+    file_path = await asyncio.to_thread(
+        file_storage.save_file, transcription_id, file.filename, file.file
+    )
 
-    transcription = process_transcription(
-        file_path=file_path,
+    # Duration is derived by the job once the audio has been decoded
+    transcription = Transcription(
+        id=transcription_id,
+        status=TranscriptionStatus.PENDING,
         file_name=file.filename,
         file_type=file.content_type,
-        duration=duration,
         language=language,
     )
 
-    storage.save(transcription)
+    return await asyncio.to_thread(
+        _enqueue_transcription, transcription, file_path, content_hash=content_hash
+    )
 
-    return transcription
+
+@router.post("/upload-stream", response_model=Transcription)
+async def upload_stream(
+    request: Request,
+    filename: str = Query(..., min_length=1),
+    language: Optional[str] = Query("en"),
+):
+    """
+    Upload a file sent as the raw request body and queue it for transcription.
+
+    Unlike multipart uploads, the body is never spooled to a temporary file:
+    chunks go straight to the upload directory while being hashed, and the
+    file type is sniffed from its first bytes instead of the Content-Type.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length is not None:
+        try:
+            content_length = int(content_length)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid Content-Length header",
+            )
+    if content_length is not None and content_length > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds the maximum size of {settings.MAX_FILE_SIZE} bytes",
+        )
+    job_executor.ensure_capacity()
+
+    transcription_id = str(uuid.uuid4())
+    stored = await file_storage.save_stream(
+        transcription_id,
+        filename,
+        request.stream(),
+        settings.MAX_FILE_SIZE,
+        validate_head=file_service.validate_head,
+    )
+
+    transcription = Transcription(
+        id=transcription_id,
+        status=TranscriptionStatus.PENDING,
+        file_name=filename,
+        file_type=stored.content_type,
+        language=language,
+    )
+
+    return await asyncio.to_thread(
+        _enqueue_transcription,
+        transcription,
+        stored.file_path,
+        content_hash=stored.sha256,
+    )
 
 
 @router.post("/upload-url", response_model=Transcription)
 async def upload_from_url(
     request: UrlUploadRequest,
 ):
-    """Upload and transcribe from a URL."""
+    """Download a file from a URL and queue it for transcription."""
+    job_executor.ensure_capacity()
+
+    transcription_id = str(uuid.uuid4())
     try:
         file_path, content_type = await url_service.download_from_url(
-            request.url, file_storage.upload_dir
+            request.url, file_storage.upload_dir, file_id=transcription_id
         )
-        duration = file_service.get_file_duration(file_path)
 
-        transcription = process_transcription(
-            file_path=file_path,
+        transcription = Transcription(
+            id=transcription_id,
+            status=TranscriptionStatus.PENDING,
             file_name=request.url.split("/")[-1],
             file_type=content_type,
-            duration=duration,
             language=request.language,
-            source_url=request.url,
         )
 
-        storage.save(transcription)
-        print("Transcription completed and saved:", transcription.id)
-
-        return transcription
+        return await asyncio.to_thread(
+            _enqueue_transcription, transcription, file_path, request.url
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@router.get("", response_model=Transcriptions)
-async def list_transcriptions():
-    """List all transcriptions with summary information."""
-    transcriptions = storage.list_all()
-    return [
-        TranscriptionItem(
-            id=t.id, status=t.status, file_name=t.file_name, duration=t.duration
+def _transcription_query(
+    status_filter: Optional[TranscriptionStatus] = Query(None, alias="status"),
+    language: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    sort_by: SortField = SortField.CREATED_AT,
+    order: SortOrder = SortOrder.DESC,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+) -> TranscriptionQuery:
+    """Listing query parameters shared by the paginated and export endpoints."""
+    return TranscriptionQuery(
+        status=status_filter,
+        language=language,
+        created_after=created_after,
+        created_before=created_before,
+        sort_by=sort_by,
+        order=order,
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+def _is_stop_message(text: str) -> bool:
+    try:
+        message = json.loads(text)
+    except ValueError:
+        return False
+    return isinstance(message, dict) and message.get("type") == "stop"
+
+
+@router.websocket("/live")
+async def live_transcription(
+    websocket: WebSocket,
+    language: Optional[str] = Query("en"),
+    encoding: LiveEncoding = Query(LiveEncoding.PCM_S16LE),
+    sample_rate: int = Query(SAMPLE_RATE, ge=8000, le=48000),
+    model: Optional[str] = None,
+):
+    """
+    Transcribe live audio sent as binary WebSocket messages.
+
+    Messages carry mono PCM at `sample_rate` or an Opus WebM/Ogg stream.
+    The server answers with JSON events: the `processing` status (with the
+    transcription id), `partial` (provisional) and `segment` (final)
+    segments and, once the client sends `{"type": "stop"}` or disconnects,
+    the final status. A final segment is sent again when its speaker
+    changes. The transcription is then stored like an uploaded one.
+    """
+    await websocket.accept()
+    try:
+        session = await asyncio.to_thread(
+            live_sessions.start,
+            language=language,
+            encoding=encoding,
+            sample_rate=sample_rate,
+            model_name=model,
         )
-        for t in transcriptions
-    ]
+    except HTTPException as e:
+        code = (
+            status.WS_1013_TRY_AGAIN_LATER
+            if e.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+            else status.WS_1008_POLICY_VIOLATION
+        )
+        await websocket.close(code=code, reason=str(e.detail))
+        return
+
+    connected = True
+
+    async def _send(events):
+        nonlocal connected
+        for event in events:
+            if connected:
+                try:
+                    await websocket.send_text(event.model_dump_json())
+                except (WebSocketDisconnect, RuntimeError):
+                    connected = False
+
+    audio_ready = asyncio.Event()
+    stopping = False
+    failed = False
+
+    async def _process():
+        # Passes run on a worker thread; audio arriving meanwhile is queued
+        # and all of it goes into the next pass
+        nonlocal failed
+        while not stopping:
+            await audio_ready.wait()
+            audio_ready.clear()
+            if not stopping and session.due():
+                try:
+                    events = await asyncio.to_thread(session.process)
+                except Exception as e:
+                    logger.exception("Live transcription %s failed: %s", session.id, e)
+                    failed = True
+                    return
+                await _send(events)
+
+    await _send([session.status_event()])
+    processor = asyncio.create_task(_process())
+    try:
+        while not session.exhausted:
+            receive = asyncio.ensure_future(websocket.receive())
+            await asyncio.wait(
+                {receive, processor}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not receive.done():
+                # The processor only returns early when a pass failed
+                receive.cancel()
+                break
+            message = receive.result()
+            if message["type"] == "websocket.disconnect":
+                connected = False
+                break
+            if message.get("bytes"):
+                # Decoding (ffmpeg pipes, resampling) and recording block
+                try:
+                    await asyncio.to_thread(session.add, message["bytes"])
+                except Exception as e:
+                    logger.exception("Live transcription %s failed: %s", session.id, e)
+                    failed = True
+                    break
+                audio_ready.set()
+            elif message.get("text") and _is_stop_message(message["text"]):
+                break
+    except WebSocketDisconnect:
+        connected = False
+    finally:
+        stopping = True
+        audio_ready.set()
+        await processor
+        await _send(await asyncio.to_thread(live_sessions.end, session, failed))
+
+    if connected:
+        if failed:
+            await websocket.close(
+                code=status.WS_1011_INTERNAL_ERROR, reason="Live transcription failed"
+            )
+        else:
+            await websocket.close()
+
+
+@router.get("", response_model=Transcriptions)
+async def list_transcriptions(
+    request: Request,
+    response: Response,
+    query: TranscriptionQuery = Depends(_transcription_query),
+):
+    """
+    List transcriptions with summary information.
+
+    Supports filtering, sorting and cursor pagination; the cursor of the next
+    page is returned in the `X-Next-Cursor` and `Link` headers.
+    """
+    try:
+        items, next_cursor = storage.list_summaries(query)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return items
+
+
+@router.get("/export")
+async def export_transcriptions(
+    query: TranscriptionQuery = Depends(_transcription_query),
+):
+    """Stream all matching transcription summaries as NDJSON."""
+
+    def _lines() -> Iterator[str]:
+        for item in storage.iter_summaries(query):
+            yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
 
 
 @router.get("/{transcription_id}", response_model=Transcription)
 async def get_transcription(transcription_id: str):
-    """Get a transcription by ID."""
+    """
+    Get a transcription by ID.
+
+    The stored transcription is sent as pre-encoded JSON, skipping response
+    model validation and serialization.
+    """
+    body = storage.get_json(transcription_id)
+    if body is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Transcription not found"
+        )
+    return Response(content=body, media_type="application/json")
+
+
+def _get_transcription_or_404(transcription_id: str) -> Transcription:
     transcription = storage.get(transcription_id)
     if not transcription:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Transcription not found"
         )
     return transcription
+
+
+# Uploads never change once stored, renditions only when rebuilt (new ETag)
+MEDIA_CACHE_CONTROL = "private, max-age=86400"
+
+
+def _is_not_modified(request_headers: Headers, response_headers: Headers) -> bool:
+    """Whether the client's cached copy (If-None-Match/If-Modified-Since) is current."""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        etag = response_headers["etag"]
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return parsedate_to_datetime(
+                response_headers["last-modified"]
+            ) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+@router.get("/{transcription_id}/media")
+@router.head("/{transcription_id}/media", include_in_schema=False)
+async def get_media(
+    transcription_id: str,
+    request: Request,
+    rendition: MediaRendition = Query(MediaRendition.ORIGINAL),
+):
+    """
+    Serve the uploaded media for playback next to the transcript.
+
+    Supports Range requests (seeking without downloading the whole file)
+    and conditional requests (ETag/Last-Modified). `rendition=opus` serves
+    a low-bitrate Opus copy, transcoded on first request and cached.
+    """
+    transcription = _get_transcription_or_404(transcription_id)
+    file_path = await asyncio.to_thread(
+        file_storage.find_file, transcription.id, transcription.file_name
+    )
+    if file_path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Media file not found"
+        )
+
+    media_type, filename = transcription.file_type, transcription.file_name
+    if rendition == MediaRendition.OPUS:
+        transcode = partial(
+            transcode_opus, bitrate_kbps=settings.MEDIA_OPUS_BITRATE_KBPS
+        )
+        try:
+            file_path = await asyncio.to_thread(
+                file_storage.get_rendition,
+                transcription.id,
+                file_path,
+                "webm",
+                transcode,
+            )
+        except RuntimeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+            )
+        media_type = "audio/webm"
+        filename = f"{os.path.splitext(filename)[0]}.webm"
+
+    # Served with sendfile-like path responses where the server supports them
+    response = FileResponse(
+        file_path,
+        media_type=media_type,
+        filename=filename,
+        stat_result=await asyncio.to_thread(os.stat, file_path),
+        content_disposition_type="inline",
+        headers={"Cache-Control": MEDIA_CACHE_CONTROL},
+    )
+    if _is_not_modified(request.headers, response.headers):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={
+                name: response.headers[name]
+                for name in ("etag", "last-modified", "cache-control")
+            },
+        )
+    return response
+
+
+@router.post("/{transcription_id}/remerge", response_model=Transcription)
+async def remerge(transcription_id: str, request: Optional[RemergeRequest] = None):
+    """
+    Re-assign speakers with new parameters, without re-running the models.
+
+    Uses the ASR segments and speaker turns stored when the transcription
+    was processed; also recovers transcriptions whose merge failed.
+    """
+    transcription = _get_transcription_or_404(transcription_id)
+    if not is_terminal(transcription.status):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Transcription is still being processed",
+        )
+    artifacts = await asyncio.to_thread(artifact_storage.get, transcription_id)
+    if artifacts is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No stored ASR and diarization results for this transcription",
+        )
+
+    result = await asyncio.to_thread(
+        remerge_transcription, transcription, artifacts, request or RemergeRequest()
+    )
+    await asyncio.to_thread(storage.save, result)
+    return result
+
+
+def _status_event(transcription: Transcription) -> TranscriptionEvent:
+    return TranscriptionEvent(
+        type=TranscriptionEventType.STATUS,
+        transcription_id=transcription.id,
+        status=transcription.status,
+        progress=(
+            100.0 if transcription.status == TranscriptionStatus.COMPLETED else None
+        ),
+    )
+
+
+async def _transcription_events(
+    transcription_id: str,
+) -> AsyncIterator[Optional[TranscriptionEvent]]:
+    """
+    Live events of a transcription, from its current status to its final one.
+
+    Yields None after `EVENTS_HEARTBEAT_SECONDS` without events, once the
+    stored status has been re-checked (jobs running in worker processes
+    only report their final status through storage).
+    """
+    subscription = progress_broker.subscribe(transcription_id)
+    try:
+        transcription = storage.get(transcription_id)
+        if transcription is None:
+            return
+        yield _status_event(transcription)
+        if is_terminal(transcription.status):
+            return
+
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), settings.EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                transcription = storage.get(transcription_id)
+                if transcription is None or is_terminal(transcription.status):
+                    if transcription is not None:
+                        yield _status_event(transcription)
+                    return
+                yield None
+                continue
+
+            yield event
+            if event.type == TranscriptionEventType.STATUS and is_terminal(
+                event.status
+            ):
+                return
+    finally:
+        progress_broker.unsubscribe(subscription)
+
+
+@router.get("/{transcription_id}/events")
+async def transcription_events(transcription_id: str):
+    """
+    Stream progress of a transcription as server-sent events.
+
+    Events carry stage transitions, overall progress in percent and the
+    segments emitted by ASR (before speaker assignment). The stream ends
+    with the final status; the complete result is then available from
+    `GET /{transcription_id}`.
+    """
+    _get_transcription_or_404(transcription_id)
+
+    async def _messages() -> AsyncIterator[str]:
+        async for event in _transcription_events(transcription_id):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {event.type.value}\ndata: {event.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        _messages(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{transcription_id}/ws")
+async def transcription_events_ws(websocket: WebSocket, transcription_id: str):
+    """The progress events of `GET /{transcription_id}/events` over a WebSocket."""
+    await websocket.accept()
+    if storage.get(transcription_id) is None:
+        await websocket.close(
+            code=status.WS_1008_POLICY_VIOLATION, reason="Transcription not found"
+        )
+        return
+
+    try:
+        async for event in _transcription_events(transcription_id):
+            if event is not None:
+                await websocket.send_text(event.model_dump_json())
+    except WebSocketDisconnect:
+        return
+    await websocket.close()
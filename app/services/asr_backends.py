@@ -0,0 +1,137 @@
+"""Interchangeable Whisper inference engines (runtime and precision)."""
+
+import importlib.util
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from config import settings
+from services.engine import torch, whisper
+
+
+class ASRBackend(ABC):
+    """
+    Loads Whisper models for one inference engine.
+
+    Loaded models expose Whisper's `transcribe(audio, **options)` returning
+    `{"segments": [{"start", "end", "text"}, ...]}`, so callers do not
+    depend on the engine.
+    """
+
+    name: str
+
+    def is_available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def load(self, model_name: str) -> Any:
+        """Load `model_name` (a Whisper size such as "tiny" or "turbo")."""
+
+
+class TorchBackend(ASRBackend):
+    """The reference openai-whisper implementation in float32/float16."""
+
+    name = "torch"
+
+    def load(self, model_name: str) -> Any:
+        return whisper.load_model(model_name)
+
+
+class QuantizedWhisper:
+    """A Whisper model whose linear layers run with int8 weights on the CPU."""
+
+    def __init__(self, model: "whisper.Whisper"):
+        self.model = model
+
+    def transcribe(self, audio, **options) -> dict:
+        # Quantized kernels only exist for float32 activations
+        options["fp16"] = False
+        return self.model.transcribe(audio, **options)
+
+
+def quantize_whisper(model: "whisper.Whisper") -> QuantizedWhisper:
+    """
+    Dynamically quantize the linear layers of a Whisper model to int8.
+
+    Whisper's own `Linear` only adds a dtype cast (a no-op in float32) and
+    is not recognized by torch's quantization, so the layers are turned back
+    into plain `nn.Linear` first. Attention projections and MLPs make up
+    most of the compute; convolutions and embeddings stay in float32.
+    """
+    model = model.cpu().float().eval()
+    for module in model.modules():
+        if type(module) is whisper.model.Linear:
+            module.__class__ = torch.nn.Linear
+    quantized = torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    return QuantizedWhisper(quantized)
+
+
+class TorchInt8Backend(ASRBackend):
+    """openai-whisper with dynamically int8-quantized linear layers (CPU)."""
+
+    name = "torch-int8"
+
+    def load(self, model_name: str) -> Any:
+        return quantize_whisper(whisper.load_model(model_name, device="cpu"))
+
+
+class FasterWhisperModel:
+    """Adapter giving a faster-whisper (CTranslate2) model Whisper's interface."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, audio, **options) -> dict:
+        if isinstance(audio, np.ndarray):
+            audio = audio.astype(np.float32, copy=False)
+        segments, _ = self.model.transcribe(audio, **options)
+        return {
+            "segments": [
+                {"start": segment.start, "end": segment.end, "text": segment.text}
+                for segment in segments
+            ]
+        }
+
+
+class FasterWhisperBackend(ASRBackend):
+    """CTranslate2 runtime (faster-whisper) with int8 weights, if installed."""
+
+    name = "faster-whisper"
+
+    def is_available(self) -> bool:
+        return importlib.util.find_spec("faster_whisper") is not None
+
+    def load(self, model_name: str) -> Any:
+        from faster_whisper import WhisperModel
+
+        return FasterWhisperModel(
+            WhisperModel(
+                model_name,
+                device="cpu",
+                compute_type=settings.ASR_COMPUTE_TYPE,
+                cpu_threads=settings.ASR_TORCH_THREADS,
+            )
+        )
+
+
+ASR_BACKENDS: Dict[str, ASRBackend] = {
+    backend.name: backend
+    for backend in (TorchBackend(), TorchInt8Backend(), FasterWhisperBackend())
+}
+
+
+def get_asr_backend(name: Optional[str] = None) -> ASRBackend:
+    """Return the backend `name` (defaults to `settings.ASR_BACKEND`)."""
+    name = name or settings.ASR_BACKEND
+    backend = ASR_BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(
+            f"Unsupported ASR backend: {name}. "
+            f"Available backends: {', '.join(ASR_BACKENDS)}"
+        )
+    if not backend.is_available():
+        raise ValueError(f"ASR backend {name} is not installed")
+    return backend
@@ -0,0 +1,275 @@
+"""Micro-batching of short clips into single Whisper forward passes."""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config import settings
+from services.asr_backends import QuantizedWhisper
+from services.audio_service import SAMPLE_RATE
+from services.engine import torch, whisper
+from services.metrics import metrics
+
+# Clips up to one Whisper window (whisper.audio.CHUNK_LENGTH) are batched,
+# longer audio is transcribed alone
+MAX_CLIP_SECONDS = 30
+# Seconds per timestamp token
+TIME_PRECISION = 0.02
+# Queued to stop the collecting thread
+_STOP = object()
+
+BATCH_SIZE = metrics.histogram(
+    "asr_batch_size",
+    "Clips transcribed per batched Whisper pass.",
+    buckets=(1, 2, 4, 8, 16, 32),
+)
+BATCH_SECONDS = metrics.histogram(
+    "asr_batch_duration_seconds",
+    "Time of batched Whisper passes.",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+BATCH_WAIT_SECONDS = metrics.histogram(
+    "asr_batch_wait_seconds",
+    "Time clips waited for their batch to start.",
+)
+BATCH_AUDIO_SECONDS = metrics.counter(
+    "asr_batch_audio_seconds_total",
+    "Seconds of audio transcribed in batches (padding excluded).",
+)
+
+# Whisper's result format: {"segments": [{"start", "end", "text"}, ...]}
+WhisperResult = dict
+RunBatch = Callable[[Optional[str], List[np.ndarray]], List[WhisperResult]]
+
+
+def whisper_module(model) -> Optional["whisper.Whisper"]:
+    """The torch Whisper model behind a backend's model, if it has one."""
+    if isinstance(model, QuantizedWhisper):
+        model = model.model
+    return model if isinstance(model, whisper.Whisper) else None
+
+
+def token_segments(
+    tokens: Sequence[int], tokenizer, duration: float
+) -> List[Dict[str, object]]:
+    """Split decoded tokens into segments at their timestamp tokens."""
+    segments, text_tokens, start = [], [], None
+    for token in tokens:
+        if token < tokenizer.timestamp_begin:
+            text_tokens.append(token)
+            continue
+        seconds = min(duration, (token - tokenizer.timestamp_begin) * TIME_PRECISION)
+        if start is not None and text_tokens:
+            segments.append(
+                {"start": start, "end": seconds, "text": tokenizer.decode(text_tokens)}
+            )
+            text_tokens, start = [], None
+        else:
+            start = seconds
+    if text_tokens:
+        # Text left open by the last timestamp runs to the end of the clip
+        segments.append(
+            {
+                "start": start or 0.0,
+                "end": duration,
+                "text": tokenizer.decode(text_tokens),
+            }
+        )
+    return segments
+
+
+def decode_batch(
+    model, clips: List[np.ndarray], language: Optional[str] = None
+) -> List[WhisperResult]:
+    """
+    Transcribe clips of at most one Whisper window in one batched pass.
+
+    Every clip is padded to the 30 s window, so the encoder and each decoder
+    step run once for the whole batch. Decoding is greedy, without the
+    temperature fallback of Whisper's transcribe.
+    """
+    module = whisper_module(model)
+    if module is None:
+        # Engines without a batched decoder transcribe clip by clip
+        return [model.transcribe(clip, language=language) for clip in clips]
+
+    mels = torch.stack(
+        [
+            whisper.pad_or_trim(
+                whisper.log_mel_spectrogram(clip, module.dims.n_mels),
+                whisper.audio.N_FRAMES,
+            )
+            for clip in clips
+        ]
+    ).to(module.device)
+    options = whisper.DecodingOptions(
+        language=language, fp16=module.device.type != "cpu"
+    )
+    results = whisper.decode(module, mels, options)
+    tokenizer = whisper.tokenizer.get_tokenizer(
+        module.is_multilingual, num_languages=module.num_languages
+    )
+    return [
+        {"segments": token_segments(result.tokens, tokenizer, len(clip) / SAMPLE_RATE)}
+        for clip, result in zip(clips, results)
+    ]
+
+
+@dataclass
+class ClipRequest:
+    """A clip waiting for its batch."""
+
+    audio: np.ndarray
+    model_name: Optional[str]
+    future: Future = field(default_factory=Future)
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class ASRBatcher:
+    """
+    Collect short clips transcribed concurrently and run them as batches.
+
+    A batch of clips for the same model starts as soon as `max_batch_size`
+    clips are waiting, or `max_wait_seconds` after the oldest one arrived.
+    Callers block until their clip's batch is done, so batches only form
+    from jobs running at the same time: the batch size is capped by
+    `max_callers` (JOB_WORKERS of the thread executor, 1 in a worker
+    process), and once that many clips wait no other one can arrive, so
+    they start without waiting.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: Optional[int] = None,
+        max_wait_seconds: Optional[float] = None,
+        run_batch: Optional[RunBatch] = None,
+        max_callers: Optional[int] = None,
+    ):
+        if max_batch_size is None:
+            max_batch_size = settings.ASR_BATCH_SIZE
+        if max_wait_seconds is None:
+            max_wait_seconds = settings.ASR_BATCH_MAX_WAIT_MS / 1000
+        if max_callers is None:
+            max_callers = (
+                settings.JOB_WORKERS if settings.JOB_EXECUTOR == "thread" else 1
+            )
+        self.max_callers = max(1, max_callers)
+        self.max_batch_size = min(max_batch_size, self.max_callers)
+        self.max_wait_seconds = max_wait_seconds
+        self.run_batch = run_batch or self._run_whisper_batch
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batch_count = 0
+        self.clip_count = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_batch_size > 1
+
+    def accepts(self, audio) -> bool:
+        """Whether `audio` is decoded and short enough to be batched."""
+        return (
+            self.enabled
+            and isinstance(audio, np.ndarray)
+            and len(audio) <= MAX_CLIP_SECONDS * SAMPLE_RATE
+        )
+
+    def transcribe(
+        self, audio: np.ndarray, model_name: Optional[str] = None
+    ) -> WhisperResult:
+        """Transcribe a clip as part of the next batch (blocks until done)."""
+        request = ClipRequest(audio, model_name)
+        self._ensure_worker()
+        self._queue.put(request)
+        return request.future.result()
+
+    def shutdown(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_batch_size": self.max_batch_size,
+            "max_callers": self.max_callers,
+            "batches": self.batch_count,
+            "clips": self.clip_count,
+        }
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._collect, name="asr-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def _collect(self):
+        pending: Dict[Optional[str], List[ClipRequest]] = {}
+        while True:
+            timeout = None
+            if pending:
+                oldest = min(requests[0].enqueued for requests in pending.values())
+                timeout = max(0.0, oldest + self.max_wait_seconds - time.monotonic())
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                request = None
+
+            if request is _STOP:
+                for requests in pending.values():
+                    self._run(requests)
+                return
+            if request is not None:
+                pending.setdefault(request.model_name, []).append(request)
+
+            now = time.monotonic()
+            # Every caller is waiting: nothing else can join these batches
+            all_waiting = sum(map(len, pending.values())) >= self.max_callers
+            for model_name, requests in list(pending.items()):
+                full = len(requests) >= self.max_batch_size
+                expired = now >= requests[0].enqueued + self.max_wait_seconds
+                if full or all_waiting or expired:
+                    del pending[model_name]
+                    self._run(requests)
+
+    def _run(self, requests: List[ClipRequest]):
+        started = time.monotonic()
+        for request in requests:
+            BATCH_WAIT_SECONDS.observe(started - request.enqueued)
+        BATCH_SIZE.observe(len(requests))
+        BATCH_AUDIO_SECONDS.inc(sum(len(r.audio) for r in requests) / SAMPLE_RATE)
+        self.batch_count += 1
+        self.clip_count += len(requests)
+
+        try:
+            results = self.run_batch(
+                requests[0].model_name, [request.audio for request in requests]
+            )
+        except Exception as e:
+            for request in requests:
+                request.future.set_exception(e)
+        else:
+            for request, result in zip(requests, results):
+                request.future.set_result(result)
+        finally:
+            BATCH_SECONDS.observe(time.monotonic() - started)
+
+    @staticmethod
+    def _run_whisper_batch(model_name: Optional[str], clips: List[np.ndarray]):
+        # Imported here: the transcription service imports this module
+        from services.transcription_service import get_whisper_model
+
+        return decode_batch(get_whisper_model(model_name), clips)
+
+
+asr_batcher = ASRBatcher()
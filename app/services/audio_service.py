@@ -0,0 +1,196 @@
+"""Decode media files once into a PCM buffer shared by all pipeline stages."""
+
+import os
+import queue
+import tempfile
+import threading
+
+import ffmpeg
+import numpy as np
+
+from config import settings
+
+# Whisper and pyannote both work on 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+
+def _decode_to_file(file_path: str, pcm_path: str) -> None:
+    """Decode any audio/video file into raw 16 kHz mono float32 samples."""
+    (
+        ffmpeg.input(file_path, threads=0)
+        .output(pcm_path, format="f32le", acodec="pcm_f32le", ac=1, ar=SAMPLE_RATE)
+        .overwrite_output()
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+
+
+def decode_audio(file_path: str) -> np.ndarray:
+    """
+    Decode a media file into a 16 kHz mono float32 array.
+
+    Long media is memory-mapped from a temporary file instead of being read
+    into the heap; the temporary file is unlinked right away, the mapping
+    stays valid until the array is released.
+
+    Args:
+        file_path: Path to the audio/video file
+
+    Returns:
+        1-D float32 array of samples at SAMPLE_RATE
+    """
+    fd, pcm_path = tempfile.mkstemp(suffix=".f32")
+    os.close(fd)
+
+    try:
+        _decode_to_file(file_path, pcm_path)
+        size = os.path.getsize(pcm_path)
+        if size == 0:
+            return np.zeros(0, dtype=np.float32)
+        if size >= settings.AUDIO_MMAP_THRESHOLD_MB * 1024 * 1024:
+            # Copy-on-write keeps the buffer writable for torch.from_numpy
+            return np.memmap(pcm_path, dtype=np.float32, mode="c")
+        return np.fromfile(pcm_path, dtype=np.float32)
+    except ffmpeg.Error as e:
+        stderr = e.stderr.decode(errors="ignore") if e.stderr else str(e)
+        raise RuntimeError(f"Failed to decode audio: {stderr}") from e
+    finally:
+        os.unlink(pcm_path)
+
+
+def transcode_opus(file_path: str, output_path: str, bitrate_kbps: int) -> None:
+    """Transcode the audio of a media file to mono Opus in a WebM container."""
+    try:
+        (
+            ffmpeg.input(file_path, threads=0)
+            .output(
+                output_path,
+                format="webm",
+                acodec="libopus",
+                audio_bitrate=f"{bitrate_kbps}k",
+                ac=1,
+                vn=None,
+            )
+            .overwrite_output()
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as e:
+        stderr = e.stderr.decode(errors="ignore") if e.stderr else str(e)
+        raise RuntimeError(f"Failed to transcode audio: {stderr}") from e
+
+
+def audio_duration(audio: np.ndarray) -> float:
+    """Duration (in seconds) of a decoded audio buffer."""
+    return round(len(audio) / SAMPLE_RATE, 2)
+
+
+def pcm_to_float(data: bytes, encoding: str) -> np.ndarray:
+    """Convert raw little-endian PCM ("pcm_s16le" or "pcm_f32le") to float32."""
+    if encoding == "pcm_s16le":
+        usable = len(data) - len(data) % 2
+        return np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+    if encoding == "pcm_f32le":
+        usable = len(data) - len(data) % 4
+        return np.frombuffer(data[:usable], dtype="<f4").astype(np.float32)
+    raise ValueError(f"Unsupported PCM encoding: {encoding}")
+
+
+def resample(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Linearly resample mono audio to SAMPLE_RATE."""
+    if sample_rate == SAMPLE_RATE or len(samples) == 0:
+        return samples
+    count = int(round(len(samples) * SAMPLE_RATE / sample_rate))
+    positions = np.arange(count) * (sample_rate / SAMPLE_RATE)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+class StreamDecoder:
+    """
+    Decode a compressed stream (e.g. Opus in WebM/Ogg) with ffmpeg as it arrives.
+
+    Bytes written to ffmpeg's stdin come back as 16 kHz mono samples read
+    by a background thread, so `write` never waits for the decoder. Another
+    thread drains ffmpeg's errors, which would otherwise fill the pipe and
+    block it; the last of them are part of the error when decoding fails.
+    """
+
+    READ_BYTES = 8192
+    # Bytes of ffmpeg's error output kept for error messages
+    STDERR_BYTES = 4096
+
+    def __init__(self):
+        self._process = (
+            ffmpeg.input("pipe:", threads=0)
+            .output("pipe:", format="s16le", acodec="pcm_s16le", ac=1, ar=SAMPLE_RATE)
+            .global_args("-nostdin", "-loglevel", "error")
+            .run_async(pipe_stdin=True, pipe_stdout=True, pipe_stderr=True)
+        )
+        self._decoded: "queue.Queue[bytes]" = queue.Queue()
+        self._stderr = b""
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+        self._stderr_reader = threading.Thread(target=self._read_stderr, daemon=True)
+        self._stderr_reader.start()
+        self._remainder = b""
+
+    def write(self, data: bytes) -> np.ndarray:
+        """Feed encoded bytes, return the samples decoded so far."""
+        try:
+            self._process.stdin.write(data)
+            self._process.stdin.flush()
+        except (BrokenPipeError, ValueError) as e:
+            # ffmpeg exited (e.g. on invalid input)
+            self._process.wait()
+            self._stderr_reader.join()
+            raise RuntimeError(f"Failed to decode audio stream: {self.errors}") from e
+        return self._drain()
+
+    def close(self) -> np.ndarray:
+        """Finish the stream and return the remaining samples."""
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self._reader.join()
+        self._stderr_reader.join()
+        self._process.wait()
+        return self._drain()
+
+    def abort(self):
+        """Stop ffmpeg without decoding the rest of the stream."""
+        self._process.kill()
+        self._process.wait()
+        for pipe in (self._process.stdin, self._process.stdout, self._process.stderr):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+    @property
+    def errors(self) -> str:
+        return self._stderr.decode(errors="ignore").strip()
+
+    def _read(self):
+        while True:
+            chunk = self._process.stdout.read1(self.READ_BYTES)
+            if not chunk:
+                return
+            self._decoded.put(chunk)
+
+    def _read_stderr(self):
+        while True:
+            chunk = self._process.stderr.read1(self.READ_BYTES)
+            if not chunk:
+                return
+            self._stderr = (self._stderr + chunk)[-self.STDERR_BYTES :]
+
+    def _drain(self) -> np.ndarray:
+        chunks = [self._remainder]
+        while True:
+            try:
+                chunks.append(self._decoded.get_nowait())
+            except queue.Empty:
+                break
+        data = b"".join(chunks)
+        usable = len(data) - len(data) % 2
+        self._remainder = data[usable:]
+        return pcm_to_float(data[:usable], "pcm_s16le")
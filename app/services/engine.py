@@ -0,0 +1,94 @@
+"""
+The machine learning stack (torch, Whisper, pyannote), imported on first use.
+
+Importing these packages takes seconds and hundreds of MB, while the web
+tier only needs them in processes that actually transcribe. Modules use the
+stand-ins below instead of importing the packages themselves, so importing
+the application stays cheap until a model is used. In API-only mode
+(`settings.API_ONLY`) the web process refuses to load them at all and
+transcriptions run in worker processes.
+"""
+
+import importlib
+import os
+import sys
+import threading
+import types
+from typing import Optional
+
+ML_MODULES = ("torch", "whisper", "pyannote.audio")
+
+_lock = threading.Lock()
+# Process that must not load the stack (forked workers have another pid)
+_disabled_pid: Optional[int] = None
+
+
+class EngineUnavailableError(RuntimeError):
+    """The machine learning stack is not loaded in this (API-only) process."""
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stands in for a module until one of its attributes is first used.
+
+    Attributes set on the stand-in (e.g. by `unittest.mock.patch`) shadow
+    the module's own, for every user of the stand-in.
+    """
+
+    def __getattr__(self, name: str):
+        return getattr(import_module(self.__name__), name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__name__ in sys.modules else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def import_module(name: str) -> types.ModuleType:
+    """Import a module of the stack, unless this process is API-only."""
+    module = sys.modules.get(name)
+    if module is not None and not _initializing(module):
+        return module
+    if _disabled_pid == os.getpid():
+        raise EngineUnavailableError(
+            f"{name} is not loaded in API-only mode, transcriptions run in workers"
+        )
+    with _lock:
+        # Waits for an import still running in another thread to finish
+        return importlib.import_module(name)
+
+
+def _initializing(module: types.ModuleType) -> bool:
+    """Whether the module is in sys.modules but still being imported."""
+    return getattr(getattr(module, "__spec__", None), "_initializing", False)
+
+
+def disable() -> None:
+    """Refuse to load the stack in the current process (API-only mode)."""
+    global _disabled_pid
+    _disabled_pid = os.getpid()
+
+
+def enable() -> None:
+    global _disabled_pid
+    _disabled_pid = None
+
+
+def is_available() -> bool:
+    """Whether models can be loaded in this process."""
+    return _disabled_pid != os.getpid()
+
+
+def is_loaded() -> bool:
+    """Whether any package of the stack has been imported in this process."""
+    return any(name in sys.modules for name in ML_MODULES)
+
+
+def load() -> None:
+    """Import the whole stack now (e.g. before preloading models)."""
+    for name in ML_MODULES:
+        import_module(name)
+
+
+torch = LazyModule("torch")
+whisper = LazyModule("whisper")
+pyannote_audio = LazyModule("pyannote.audio")
@@ -1,11 +1,16 @@
 """File validation and processing service."""
 
-from fastapi import UploadFile, HTTPException, status
-import ffmpeg
+import hashlib
+from typing import BinaryIO, Optional
 
+from fastapi import UploadFile, HTTPException, status
 
 from config import settings
 
+# ISO BMFF major brands that identify audio-only or QuickTime files
+MP4_AUDIO_BRANDS = (b"M4A ", b"M4B ")
+QUICKTIME_BRANDS = (b"qt  ",)
+
 
 class FileService:
     """Handle file validation and processing."""
@@ -24,13 +29,67 @@ class FileService:
                 detail=f"Unsupported file type: {content_type}. Supported types: {', '.join(all_supported)}",
             )
 
+        if file.size is not None and file.size > settings.MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File exceeds the maximum size of {settings.MAX_FILE_SIZE} bytes",
+            )
+
         return True
 
     @staticmethod
-    def get_file_duration(file_path: str) -> float:
-        """Get duration of audio/video file (mock implementation)."""
-        duration = float(ffmpeg.probe(file_path)["format"]["duration"])
-        return round(duration, 2)
+    def sniff_content_type(head: bytes) -> Optional[str]:
+        """Detect the container format from the first bytes of a file."""
+        if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+            return "audio/wav"
+        if head[:4] == b"RIFF" and head[8:12] == b"AVI ":
+            return "video/x-msvideo"
+        if head[:4] == b"OggS":
+            return "audio/ogg"
+        if head[:4] == b"fLaC":
+            return "audio/flac"
+        if head[4:8] == b"ftyp":
+            brand = head[8:12]
+            if brand in MP4_AUDIO_BRANDS:
+                return "audio/mp4"
+            if brand in QUICKTIME_BRANDS:
+                return "video/quicktime"
+            return "video/mp4"
+        if head[:4] == b"\x1a\x45\xdf\xa3":
+            # Matroska and WebM share the EBML header, the DocType tells them apart
+            return "video/webm" if b"webm" in head else "video/x-matroska"
+        if head[:3] == b"ID3":
+            return "audio/mpeg"
+        if len(head) >= 2 and head[0] == 0xFF:
+            # ADTS (AAC) frames have layer bits 00, MPEG audio frames do not
+            if head[1] & 0xF6 == 0xF0:
+                return "audio/aac"
+            if head[1] & 0xE0 == 0xE0:
+                return "audio/mpeg"
+        return None
+
+    def validate_head(self, head: bytes) -> str:
+        """Return the sniffed content type, rejecting unsupported formats."""
+        content_type = self.sniff_content_type(head)
+        all_supported = (
+            settings.SUPPORTED_AUDIO_FORMATS + settings.SUPPORTED_VIDEO_FORMATS
+        )
+
+        if content_type not in all_supported:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unrecognized file format. Supported types: {', '.join(all_supported)}",
+            )
+
+        return content_type
+
+    @staticmethod
+    def compute_sha256(file_obj: BinaryIO) -> str:
+        """SHA-256 of a file object's content; the position is rewound after."""
+        file_obj.seek(0)
+        digest = hashlib.file_digest(file_obj, "sha256").hexdigest()
+        file_obj.seek(0)
+        return digest
 
 
 file_service = FileService()
@@ -0,0 +1,145 @@
+"""Background job executors for long-running transcriptions."""
+
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from config import settings
+
+
+class JobExecutor(ABC):
+    """
+    Run jobs outside of the request/response cycle.
+
+    Jobs are plain module-level callables with picklable arguments, so the
+    same interface can be backed by an in-process pool or by an external
+    (e.g. Redis-compatible) queue.
+    """
+
+    @abstractmethod
+    def submit(self, job_id: str, fn: Callable, *args, **kwargs) -> Future:
+        """Schedule `fn(*args, **kwargs)`. Raise 429 when the queue is full."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and concurrency information."""
+
+    def ensure_capacity(self) -> None:
+        """Raise 429 early when a new job would be rejected."""
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs and release workers."""
+
+
+class InlineJobExecutor(JobExecutor):
+    """Run jobs synchronously in the caller (tests, debugging)."""
+
+    def submit(self, job_id: str, fn: Callable, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        return {"executor": "inline", "running": 0, "queued": 0}
+
+
+class PoolJobExecutor(JobExecutor):
+    """
+    Run jobs on a thread or process pool with bounded concurrency.
+
+    At most `max_workers` jobs run at once and at most `max_queue_depth`
+    further jobs wait for a worker; anything beyond that is rejected with
+    HTTP 429 so clients can back off.
+    """
+
+    def __init__(
+        self,
+        pool_class: Callable[..., Executor] = ThreadPoolExecutor,
+        max_workers: int = 1,
+        max_queue_depth: int = 0,
+    ):
+        self.pool_class = pool_class
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self._pool: Optional[Executor] = None
+        self._jobs: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of running and queued jobs."""
+        return self.max_workers + self.max_queue_depth
+
+    def ensure_capacity(self) -> None:
+        with self._lock:
+            self._check_capacity()
+
+    def submit(self, job_id: str, fn: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            self._check_capacity()
+            if self._pool is None:
+                self._pool = self.pool_class(max_workers=self.max_workers)
+            future = self._pool.submit(fn, *args, **kwargs)
+            self._jobs[job_id] = future
+
+        future.add_done_callback(lambda _: self._forget(job_id))
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            running = sum(1 for future in self._jobs.values() if future.running())
+            depth = len(self._jobs)
+
+        return {
+            "executor": self.pool_class.__name__,
+            "running": running,
+            "queued": depth - running,
+            "max_workers": self.max_workers,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+
+        # Cancelled futures run their done callbacks, which take the lock.
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _check_capacity(self) -> None:
+        """Raise 429 if no more jobs fit. Caller must hold the lock."""
+        if len(self._jobs) >= self.capacity:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Transcription queue is full, please retry later",
+                headers={"Retry-After": str(settings.JOB_RETRY_AFTER_SECONDS)},
+            )
+
+    def _forget(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+
+def create_job_executor() -> JobExecutor:
+    """Build the job executor selected by `settings.JOB_EXECUTOR`."""
+    if settings.JOB_EXECUTOR == "inline":
+        return InlineJobExecutor()
+
+    pool_classes = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+    if settings.JOB_EXECUTOR not in pool_classes:
+        raise ValueError(f"Unsupported job executor: {settings.JOB_EXECUTOR}")
+
+    return PoolJobExecutor(
+        pool_class=pool_classes[settings.JOB_EXECUTOR],
+        max_workers=settings.JOB_WORKERS,
+        max_queue_depth=settings.JOB_QUEUE_DEPTH,
+    )
+
+
+job_executor = create_job_executor()
@@ -0,0 +1,591 @@
+"""Real-time transcription of live audio streams."""
+
+import logging
+import threading
+import uuid
+import wave
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException, status
+
+from config import settings
+from models.segments import SegmentTable
+from models.transcription import (
+    SpeakerTurn,
+    Transcription,
+    TranscriptionEvent,
+    TranscriptionEventType,
+    TranscriptionSegment,
+    TranscriptionStatus,
+)
+from services import engine
+from services.audio_service import (
+    SAMPLE_RATE,
+    StreamDecoder,
+    pcm_to_float,
+    resample,
+)
+from services.progress import progress_broker
+from services.speaker_assignment import assign_speakers
+from services.transcription_service import (
+    WindowSegments,
+    diarize_with_embeddings,
+    get_whisper_model,
+    transcribe_window,
+)
+from storage.data_storage import storage
+from storage.file_storage import file_storage
+
+logger = logging.getLogger(__name__)
+
+# transcribe_fn(samples, prompt) -> window-relative (start, end, text)
+TranscribeFn = Callable[[np.ndarray, str], WindowSegments]
+# diarize_fn(samples) -> (turns, embedding per speaker label)
+DiarizeFn = Callable[[np.ndarray], Tuple[List[SpeakerTurn], Dict[str, np.ndarray]]]
+
+# Characters of final text handed to Whisper as context for the next pass
+PROMPT_CHARS = 200
+# Cosine similarity from which a speaker embedding matches a known speaker
+SPEAKER_SIMILARITY = 0.6
+
+
+class LiveEncoding(str, Enum):
+    """Audio formats accepted by live sessions."""
+
+    PCM_S16LE = "pcm_s16le"
+    PCM_F32LE = "pcm_f32le"
+    # Opus in a WebM or Ogg container, as recorded by browsers' MediaRecorder
+    OPUS = "opus"
+
+
+class SpeakerTracker:
+    """
+    Incremental diarization with speaker labels kept stable across runs.
+
+    Only the latest `window_seconds` of audio are re-diarized, every
+    `interval_seconds`. Speakers found by a run are matched to the known
+    ones by how long they overlap the turns the run replaces and, for
+    speakers coming back after a while, by their embeddings, so a speaker
+    keeps one label for the whole session.
+    """
+
+    def __init__(
+        self,
+        diarize_fn: DiarizeFn,
+        window_seconds: Optional[float] = None,
+        interval_seconds: Optional[float] = None,
+    ):
+        self.diarize_fn = diarize_fn
+        self.window_seconds = window_seconds or settings.LIVE_DIARIZATION_WINDOW_SECONDS
+        self.interval_seconds = (
+            interval_seconds or settings.LIVE_DIARIZATION_INTERVAL_SECONDS
+        )
+        self.turns: List[SpeakerTurn] = []
+        self.diarized_until = 0.0
+        self._audio: List[np.ndarray] = []
+        self._audio_start = 0.0
+        self._audio_samples = 0
+        self._centroids: Dict[str, Optional[np.ndarray]] = {}
+
+    @property
+    def end(self) -> float:
+        return self._audio_start + self._audio_samples / SAMPLE_RATE
+
+    def add(self, samples: np.ndarray):
+        """Append audio, keeping only the latest `window_seconds`."""
+        self._audio.append(samples)
+        self._audio_samples += len(samples)
+        window_samples = int(self.window_seconds * SAMPLE_RATE)
+        while self._audio_samples - len(self._audio[0]) >= window_samples:
+            dropped = self._audio.pop(0)
+            self._audio_samples -= len(dropped)
+            self._audio_start += len(dropped) / SAMPLE_RATE
+
+    def due(self) -> bool:
+        return self.end - self.diarized_until >= self.interval_seconds
+
+    def update(self) -> Optional[float]:
+        """
+        Re-diarize the recent audio.
+
+        Returns the session time from which the speaker turns changed, or
+        None when there is no new audio.
+        """
+        if not self._audio_samples or self.end <= self.diarized_until:
+            return None
+
+        start = self._audio_start
+        turns, embeddings = self.diarize_fn(np.concatenate(self._audio))
+        found = [
+            SpeakerTurn(
+                start=start + turn.start, end=start + turn.end, speaker=turn.speaker
+            )
+            for turn in turns
+        ]
+        labels = self._match_labels(found, embeddings, start)
+
+        kept = []
+        for turn in self.turns:
+            if turn.end <= start:
+                kept.append(turn)
+            elif turn.start < start:
+                kept.append(
+                    SpeakerTurn(start=turn.start, end=start, speaker=turn.speaker)
+                )
+        self.turns = kept + [
+            SpeakerTurn(start=turn.start, end=turn.end, speaker=labels[turn.speaker])
+            for turn in found
+        ]
+        self.diarized_until = self.end
+        return start
+
+    def _match_labels(
+        self,
+        found: List[SpeakerTurn],
+        embeddings: Dict[str, np.ndarray],
+        start: float,
+    ) -> Dict[str, str]:
+        """Map the labels of a run to session labels, greedily."""
+        replaced = [turn for turn in self.turns if turn.end > start]
+        overlaps: Dict[Tuple[str, str], float] = {}
+        for new in found:
+            for old in replaced:
+                seconds = min(new.end, old.end) - max(new.start, old.start, start)
+                if seconds > 0:
+                    key = (new.speaker, old.speaker)
+                    overlaps[key] = overlaps.get(key, 0.0) + seconds
+
+        labels: Dict[str, str] = {}
+        for (new, old), _ in sorted(overlaps.items(), key=lambda item: -item[1]):
+            if new not in labels and old not in labels.values():
+                labels[new] = old
+
+        similarities = []
+        for new, embedding in embeddings.items():
+            for old, centroid in self._centroids.items():
+                similarities.append((_cosine(embedding, centroid), new, old))
+        for similarity, new, old in sorted(similarities, reverse=True):
+            if similarity < SPEAKER_SIMILARITY:
+                break
+            if new not in labels and old not in labels.values():
+                labels[new] = old
+
+        for turn in found:
+            if turn.speaker not in labels:
+                labels[turn.speaker] = f"SPEAKER_{len(self._centroids):02d}"
+                self._centroids.setdefault(labels[turn.speaker], None)
+        for new, embedding in embeddings.items():
+            if new in labels:
+                centroid = self._centroids.get(labels[new])
+                self._centroids[labels[new]] = (
+                    embedding if centroid is None else (centroid + embedding) / 2
+                )
+        return labels
+
+
+def _cosine(a: np.ndarray, b: Optional[np.ndarray]) -> float:
+    if b is None:
+        return -1.0
+    norm = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(np.dot(a, b)) / norm if norm else -1.0
+
+
+class LiveTranscriber:
+    """
+    Rolling-window Whisper transcription of a live audio stream.
+
+    Audio accumulates in a buffer that is re-transcribed whenever
+    `step_seconds` of new audio arrived. Segments ending `finalize_seconds`
+    before the end of the buffer are final: they are emitted once and cut
+    off the buffer. The rest of the hypothesis is provisional and replaced
+    by the next pass. When the buffer reaches `window_seconds`, everything
+    but its last segment is finalized.
+    """
+
+    def __init__(
+        self,
+        transcription_id: str,
+        transcribe_fn: TranscribeFn,
+        speakers: Optional[SpeakerTracker] = None,
+        window_seconds: Optional[float] = None,
+        step_seconds: Optional[float] = None,
+        finalize_seconds: Optional[float] = None,
+    ):
+        self.transcription_id = transcription_id
+        self.transcribe_fn = transcribe_fn
+        self.speakers = speakers
+        self.window_seconds = window_seconds or settings.LIVE_WINDOW_SECONDS
+        self.step_seconds = step_seconds or settings.LIVE_STEP_SECONDS
+        self.finalize_seconds = (
+            settings.LIVE_FINALIZE_SECONDS
+            if finalize_seconds is None
+            else finalize_seconds
+        )
+        self.segments: List[TranscriptionSegment] = []
+        self.samples_received = 0
+        self._incoming: List[np.ndarray] = []
+        self._incoming_lock = threading.Lock()
+        self._process_lock = threading.Lock()
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = 0.0
+        self._new_samples = 0
+
+    @property
+    def duration(self) -> float:
+        return self.samples_received / SAMPLE_RATE
+
+    def add(self, samples: np.ndarray):
+        """Queue audio for the next pass (cheap, safe while a pass runs)."""
+        with self._incoming_lock:
+            self._incoming.append(samples)
+            self.samples_received += len(samples)
+
+    def due(self) -> bool:
+        """Whether enough new audio arrived for another pass."""
+        with self._incoming_lock:
+            queued = sum(map(len, self._incoming))
+        return self._new_samples + queued >= self.step_seconds * SAMPLE_RATE
+
+    def process(self, final: bool = False) -> List[TranscriptionEvent]:
+        """Run a pass over the buffer; with `final`, finalize everything."""
+        with self._process_lock:
+            with self._incoming_lock:
+                incoming, self._incoming = self._incoming, []
+            if incoming:
+                new = np.concatenate(incoming)
+                self._buffer = np.concatenate((self._buffer, new))
+                self._new_samples += len(new)
+                if self.speakers is not None:
+                    self.speakers.add(new)
+
+            if final:
+                if self.speakers is not None:
+                    self.speakers.update()
+                events = self._transcribe(final=True) if len(self._buffer) else []
+                # Every segment gets its speaker from the complete timeline
+                return events + self._relabel(0, unknown_speaker_label="UNKNOWN")
+
+            events = self._transcribe(final=False) if self._new_samples else []
+            if self.speakers is not None and self.speakers.due():
+                events += self._update_speakers()
+            return events
+
+    def _transcribe(self, final: bool) -> List[TranscriptionEvent]:
+        self._new_samples = 0
+        buffer_seconds = len(self._buffer) / SAMPLE_RATE
+        prompt = " ".join(segment.text for segment in self.segments)[-PROMPT_CHARS:]
+        hypothesis = [
+            (start, min(end, buffer_seconds), text.strip())
+            for start, end, text in self.transcribe_fn(self._buffer, prompt)
+            if text.strip()
+        ]
+
+        if final:
+            count = len(hypothesis)
+        else:
+            horizon = buffer_seconds - self.finalize_seconds
+            count = 0
+            while count < len(hypothesis) and hypothesis[count][1] <= horizon:
+                count += 1
+            if buffer_seconds >= self.window_seconds and count == 0:
+                # Full buffer: keep only the last segment provisional
+                count = max(1, len(hypothesis) - 1) if hypothesis else 0
+
+        if final:
+            cut = buffer_seconds
+        elif count:
+            cut = hypothesis[count - 1][1]
+        elif buffer_seconds >= self.window_seconds:
+            # Nothing said in a whole window, keep just the tail
+            cut = buffer_seconds - self.finalize_seconds
+        else:
+            cut = 0.0
+
+        finalized = [
+            TranscriptionSegment(
+                id=f"seg-{len(self.segments) + index}",
+                start_time=round(self._buffer_start + start, 2),
+                end_time=round(self._buffer_start + end, 2),
+                text=text,
+            )
+            for index, (start, end, text) in enumerate(hypothesis[:count])
+        ]
+        if finalized and self.speakers is not None and self.speakers.turns:
+            finalized = assign_speakers(
+                finalized, self.speakers.turns, unknown_speaker_label=""
+            )
+        self.segments += finalized
+
+        rest = hypothesis[count:]
+        partial = None
+        if rest:
+            partial = TranscriptionSegment(
+                id=f"seg-{len(self.segments)}",
+                start_time=round(self._buffer_start + rest[0][0], 2),
+                end_time=round(self._buffer_start + rest[-1][1], 2),
+                text=" ".join(text for _, _, text in rest),
+            )
+
+        cut_samples = min(len(self._buffer), int(round(cut * SAMPLE_RATE)))
+        self._buffer = self._buffer[cut_samples:]
+        self._buffer_start += cut_samples / SAMPLE_RATE
+
+        events = [self._event(TranscriptionEventType.SEGMENT, s) for s in finalized]
+        if not final:
+            # Also sent without a segment, to clear a stale provisional one
+            events.append(self._event(TranscriptionEventType.PARTIAL, partial))
+        return events
+
+    def _update_speakers(self) -> List[TranscriptionEvent]:
+        """Re-diarize and relabel the final segments whose turns changed."""
+        changed_from = self.speakers.update()
+        if changed_from is None:
+            return []
+        first = next(
+            (
+                index
+                for index, segment in enumerate(self.segments)
+                if segment.end_time > changed_from
+            ),
+            len(self.segments),
+        )
+        return self._relabel(first, unknown_speaker_label="")
+
+    def _relabel(
+        self, first: int, unknown_speaker_label: str
+    ) -> List[TranscriptionEvent]:
+        """Re-assign speakers from segment `first` on, emitting changed segments."""
+        if first >= len(self.segments):
+            return []
+        if self.speakers is None or not self.speakers.turns:
+            relabeled = [
+                segment.model_copy(
+                    update={"speaker": segment.speaker or unknown_speaker_label}
+                )
+                for segment in self.segments[first:]
+            ]
+        else:
+            relabeled = assign_speakers(
+                self.segments[first:],
+                self.speakers.turns,
+                unknown_speaker_label=unknown_speaker_label,
+            )
+
+        events = []
+        for index, segment in enumerate(relabeled, start=first):
+            if segment.speaker != self.segments[index].speaker:
+                events.append(self._event(TranscriptionEventType.SEGMENT, segment))
+            self.segments[index] = segment
+        return events
+
+    def _event(
+        self,
+        event_type: TranscriptionEventType,
+        segment: Optional[TranscriptionSegment],
+    ) -> TranscriptionEvent:
+        return TranscriptionEvent(
+            type=event_type, transcription_id=self.transcription_id, segment=segment
+        )
+
+
+class LiveSession:
+    """
+    One live transcription: decoding, recording and persistence.
+
+    The session is stored as PROCESSING when it starts and with its final
+    segments once it ends. Decoded audio is recorded as a 16 kHz WAV file
+    in the upload directory, under the transcription id like uploads.
+    Every event is also published to the progress broker, so other
+    clients can follow the session through `GET /{id}/events`.
+    """
+
+    def __init__(
+        self,
+        transcriber: LiveTranscriber,
+        language: Optional[str] = "en",
+        encoding: LiveEncoding = LiveEncoding.PCM_S16LE,
+        sample_rate: int = SAMPLE_RATE,
+    ):
+        self.transcriber = transcriber
+        self.id = transcriber.transcription_id
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.decoder = StreamDecoder() if encoding == LiveEncoding.OPUS else None
+        started = datetime.now(timezone.utc)
+        self.transcription = Transcription(
+            id=self.id,
+            status=TranscriptionStatus.PROCESSING,
+            file_name=f"live-{started:%Y%m%d-%H%M%S}.wav",
+            file_type="audio/wav",
+            language=language,
+            created_at=started,
+        )
+        self.recording_path = file_storage.get_file_path(
+            self.id, self.transcription.file_name
+        )
+        self._recording = wave.open(self.recording_path, "wb")
+        self._recording.setnchannels(1)
+        self._recording.setsampwidth(2)
+        self._recording.setframerate(SAMPLE_RATE)
+        storage.save(self.transcription.model_copy())
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether the session reached `LIVE_MAX_SECONDS` of audio."""
+        return self.transcriber.duration >= settings.LIVE_MAX_SECONDS
+
+    def status_event(self) -> TranscriptionEvent:
+        return TranscriptionEvent(
+            type=TranscriptionEventType.STATUS,
+            transcription_id=self.id,
+            status=self.transcription.status,
+        )
+
+    def add(self, data: bytes):
+        """Decode a binary message and queue its audio."""
+        if self.decoder is not None:
+            samples = self.decoder.write(data)
+        else:
+            samples = resample(
+                pcm_to_float(data, self.encoding.value), self.sample_rate
+            )
+        self._append(samples)
+
+    def due(self) -> bool:
+        return self.transcriber.due()
+
+    def process(self) -> List[TranscriptionEvent]:
+        return self._publish(self.transcriber.process())
+
+    def finish(self, failed: bool = False) -> List[TranscriptionEvent]:
+        """
+        Finalize the transcript, store it and return the last events.
+
+        A `failed` session (decoding or a pass raised) is stored as FAILED
+        with the segments finalized so far.
+        """
+        events = []
+        try:
+            if failed:
+                if self.decoder is not None:
+                    self.decoder.abort()
+            else:
+                if self.decoder is not None:
+                    self._append(self.decoder.close())
+                events = self.transcriber.process(final=True)
+            self.transcription.segments = SegmentTable.from_segments(
+                self.transcriber.segments
+            )
+            self.transcription.status = (
+                TranscriptionStatus.FAILED if failed else TranscriptionStatus.COMPLETED
+            )
+        except Exception as e:
+            logger.exception("Live transcription %s failed: %s", self.id, e)
+            events = []
+            self.transcription.status = TranscriptionStatus.FAILED
+        finally:
+            self._recording.close()
+
+        self.transcription.duration = round(self.transcriber.duration, 2)
+        storage.save(self.transcription)
+        self._publish(events)
+        return events + [progress_broker.finish(self.id, self.transcription.status)]
+
+    def _append(self, samples: np.ndarray):
+        if len(samples):
+            pcm = np.clip(samples * 32768.0, -32768, 32767).astype("<i2")
+            self._recording.writeframes(pcm.tobytes())
+            self.transcriber.add(samples)
+
+    @staticmethod
+    def _publish(events: List[TranscriptionEvent]) -> List[TranscriptionEvent]:
+        for event in events:
+            progress_broker.publish(event)
+        return events
+
+
+class LiveSessionRegistry:
+    """Track running live sessions, bounded by `LIVE_MAX_SESSIONS`."""
+
+    def __init__(self, max_sessions: Optional[int] = None):
+        self.max_sessions = (
+            settings.LIVE_MAX_SESSIONS if max_sessions is None else max_sessions
+        )
+        self._sessions: Dict[str, LiveSession] = {}
+        self._lock = threading.Lock()
+
+    def start(
+        self,
+        language: Optional[str] = "en",
+        encoding: LiveEncoding = LiveEncoding.PCM_S16LE,
+        sample_rate: int = SAMPLE_RATE,
+        model_name: Optional[str] = None,
+        transcribe_fn: Optional[TranscribeFn] = None,
+        diarize_fn: Optional[DiarizeFn] = None,
+    ) -> LiveSession:
+        """
+        Open a session. Raise 429 when too many are running, 400 for an
+        unsupported model and 503 when models are not loaded (API-only).
+        """
+        if transcribe_fn is None and not engine.is_available():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Live transcription is not available in API-only mode",
+            )
+        if transcribe_fn is None:
+            try:
+                get_whisper_model(model_name)  # warm (and validate) it up-front
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+                )
+            transcribe_fn = whisper_transcribe_fn(model_name, language)
+        if diarize_fn is None and settings.LIVE_DIARIZATION:
+            diarize_fn = diarize_with_embeddings
+
+        transcription_id = str(uuid.uuid4())
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many live sessions, please retry later",
+                )
+            transcriber = LiveTranscriber(
+                transcription_id,
+                transcribe_fn,
+                speakers=SpeakerTracker(diarize_fn) if diarize_fn else None,
+            )
+            session = LiveSession(transcriber, language, encoding, sample_rate)
+            self._sessions[transcription_id] = session
+        return session
+
+    def end(
+        self, session: LiveSession, failed: bool = False
+    ) -> List[TranscriptionEvent]:
+        try:
+            return session.finish(failed)
+        finally:
+            with self._lock:
+                self._sessions.pop(session.id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"sessions": len(self._sessions), "max_sessions": self.max_sessions}
+
+
+def whisper_transcribe_fn(model_name: Optional[str], language: Optional[str]):
+    """Transcribe live buffers with the warm Whisper model of `model_name`."""
+
+    def transcribe(samples: np.ndarray, prompt: str) -> WindowSegments:
+        options = {"initial_prompt": prompt or None}
+        if language:
+            options["language"] = language
+        return transcribe_window(samples, model_name, **options)
+
+    return transcribe
+
+
+live_sessions = LiveSessionRegistry()
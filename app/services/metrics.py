@@ -0,0 +1,363 @@
+"""Prometheus-style metrics of the API and the transcription pipeline."""
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request and storage latencies (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Pipeline stages of multi-minute recordings run much longer
+STAGE_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+# Processing seconds per second of audio
+REALTIME_FACTOR_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+# Saves written together by one storage commit
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+# fsync is sub-millisecond on page cache hits, much longer on busy disks
+FSYNC_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Metric:
+    """A named family of samples, one per combination of label values."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        return lines + list(self._samples())
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """A value that only goes up (requests served, bytes received...)."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    """
+    A value that goes up and down.
+
+    With a `callback` the value is read when the metrics are collected
+    instead of being set, for state other components already keep.
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self) -> Iterator[str]:
+        if self.callback is not None:
+            values = self.callback()
+        else:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in sorted(values.items()):
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, plus their sum and count."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: bucket counts (last one is +Inf), sum
+        self._values: Dict[LabelValues, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels), ([], 0.0))
+            return sum(counts)
+
+    def sum(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), ([], 0.0))[1]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(
+                (key, list(counts), total)
+                for key, (counts, total) in self._values.items()
+            )
+        names = self.labelnames + ("le",)
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """The metrics exposed by `GET /metrics`."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=(), callback=None):
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[Metric]:
+        with self._lock:
+            return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        """Reset every recorded value (metrics stay registered)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+metrics = MetricsRegistry()
+
+
+class Timer:
+    """Wall time of a `timed` block; `seconds` is set once the block exits."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds: Optional[float] = None
+
+
+@contextmanager
+def timed(histogram: Optional[Histogram] = None, **labels) -> Iterator[Timer]:
+    """
+    Time a block and record its duration in `histogram`.
+
+    The duration is recorded even if the block raises, so failing stages
+    and storage operations show up in the latencies as well.
+    """
+    timer = Timer()
+    try:
+        yield timer
+    finally:
+        timer.seconds = time.perf_counter() - timer.started
+        if histogram is not None:
+            histogram.observe(timer.seconds, **labels)
+
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests by route template.",
+    ("method", "route", "status"),
+)
+STAGE_SECONDS = metrics.histogram(
+    "transcription_stage_duration_seconds",
+    "Wall time of transcription pipeline stages.",
+    ("stage",),
+    buckets=STAGE_BUCKETS,
+)
+REALTIME_FACTOR = metrics.histogram(
+    "transcription_realtime_factor",
+    "Processing seconds per second of audio of completed transcriptions.",
+    buckets=REALTIME_FACTOR_BUCKETS,
+)
+AUDIO_SECONDS = metrics.counter(
+    "transcription_audio_seconds_total",
+    "Seconds of audio processed.",
+)
+VAD_AUDIO_SECONDS = metrics.counter(
+    "vad_audio_seconds_total",
+    "Seconds of audio kept as speech or skipped as silence by the VAD pre-pass.",
+    ("kind",),
+)
+VAD_SKIPPED_RATIO = metrics.histogram(
+    "vad_skipped_ratio",
+    "Share of each recording skipped as silence by the VAD pre-pass.",
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0),
+)
+TRANSCRIPTIONS = metrics.counter(
+    "transcriptions_total",
+    "Transcriptions processed by final status.",
+    ("status",),
+)
+MODEL_LOADS = metrics.counter(
+    "model_loads_total",
+    "Models loaded into the model registry.",
+    ("model",),
+)
+MODEL_LOAD_SECONDS = metrics.histogram(
+    "model_load_duration_seconds",
+    "Time spent loading models.",
+    ("model",),
+    buckets=STAGE_BUCKETS,
+)
+STORAGE_SECONDS = metrics.histogram(
+    "storage_operation_duration_seconds",
+    "Latency of transcription storage operations.",
+    ("backend", "operation"),
+)
+STORAGE_CACHE_LOOKUPS = metrics.counter(
+    "storage_cache_lookups_total",
+    "Lookups in the JSON storage read cache by kind and result (hit|miss).",
+    ("kind", "result"),
+)
+STORAGE_COMMIT_BATCH_SIZE = metrics.histogram(
+    "storage_commit_batch_size",
+    "Saves coalesced into one commit of the JSON storage backend.",
+    buckets=BATCH_SIZE_BUCKETS,
+)
+STORAGE_FSYNC_SECONDS = metrics.histogram(
+    "storage_fsync_duration_seconds",
+    "Latency of fsync calls of the JSON storage backend by file (data|index|dir).",
+    ("file",),
+    buckets=FSYNC_BUCKETS,
+)
+UPLOAD_BYTES = metrics.counter(
+    "upload_bytes_total",
+    "Bytes of media received by upload source.",
+    ("source",),
+)
@@ -0,0 +1,194 @@
+"""Process-wide registry of loaded ML models."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+from services.metrics import MODEL_LOAD_SECONDS, MODEL_LOADS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadedModel:
+    """A model kept warm in the registry together with its bookkeeping."""
+
+    model: Any
+    load_seconds: float
+    resident_bytes: int
+    evictable: bool = True
+    last_used: float = 0.0
+
+
+def estimate_model_size(model: Any) -> int:
+    """
+    Estimate the resident size (in bytes) of a model's weights.
+
+    Works for torch modules (parameters + buffers) and for wrappers such as
+    pyannote pipelines which hold torch modules as attributes.
+    """
+    if hasattr(model, "parameters") and hasattr(model, "buffers"):
+        tensors = list(model.parameters()) + list(model.buffers())
+        # Dynamically quantized layers keep their int8 weights packed (in a
+        # leaf module, the layer itself only delegates to it)
+        for module in getattr(model, "modules", lambda: [])():
+            if hasattr(module, "_weight_bias") and not any(module.children()):
+                tensors.extend(t for t in module._weight_bias() if t is not None)
+        return sum(
+            t.numel() * t.element_size()
+            for t in tensors
+            if hasattr(t, "numel") and hasattr(t, "element_size")
+        )
+
+    total = 0
+    for attribute in getattr(model, "__dict__", {}).values():
+        if hasattr(attribute, "parameters") and hasattr(attribute, "buffers"):
+            total += estimate_model_size(attribute)
+        elif isinstance(attribute, dict):
+            total += sum(
+                estimate_model_size(value)
+                for value in attribute.values()
+                if hasattr(value, "parameters")
+            )
+    return total
+
+
+class ModelRegistry:
+    """
+    Lazily load models on first use and keep them warm across requests.
+
+    Models are kept in LRU order; when the total resident size exceeds the
+    memory budget, the least recently used evictable models are dropped.
+    """
+
+    def __init__(self, memory_budget_bytes: Optional[int] = None):
+        if memory_budget_bytes is None:
+            memory_budget_bytes = settings.MODEL_MEMORY_BUDGET_MB * 1024 * 1024
+        self.memory_budget_bytes = memory_budget_bytes
+        self._models: "OrderedDict[str, LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self.load_count = 0
+
+    def get(self, key: str, loader: Callable[[], Any], evictable: bool = True):
+        """Return the model stored under `key`, loading it on first use."""
+        with self._lock:
+            entry = self._touch(key)
+            if entry is not None:
+                return entry.model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Load outside of the registry lock so other models stay available,
+        # while concurrent callers of the same key wait for a single load.
+        with load_lock:
+            with self._lock:
+                entry = self._touch(key)
+                if entry is not None:
+                    return entry.model
+
+            logger.info("Loading model %s", key)
+            started = time.perf_counter()
+            model = loader()
+            load_seconds = time.perf_counter() - started
+
+            self._store(
+                key,
+                LoadedModel(
+                    model=model,
+                    load_seconds=round(load_seconds, 3),
+                    resident_bytes=estimate_model_size(model),
+                    evictable=evictable,
+                ),
+            )
+            self.load_count += 1
+            MODEL_LOADS.inc(model=key)
+            MODEL_LOAD_SECONDS.observe(load_seconds, model=key)
+            return model
+
+    def register(self, key: str, model: Any, evictable: bool = True) -> None:
+        """Inject an already constructed model (e.g. a test double)."""
+        self._store(
+            key,
+            LoadedModel(
+                model=model,
+                load_seconds=0.0,
+                resident_bytes=estimate_model_size(model),
+                evictable=evictable,
+            ),
+        )
+
+    def evict(self, key: str) -> bool:
+        """Drop a model from the registry. Returns True if it was loaded."""
+        with self._lock:
+            return self._models.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Drop all models."""
+        with self._lock:
+            self._models.clear()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._models
+
+    @property
+    def resident_bytes(self) -> int:
+        """Total estimated size of all loaded models."""
+        with self._lock:
+            return sum(entry.resident_bytes for entry in self._models.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary of loaded models for health/diagnostics endpoints."""
+        with self._lock:
+            models = {
+                key: {
+                    "load_seconds": entry.load_seconds,
+                    "resident_mb": round(entry.resident_bytes / 1024 / 1024, 1),
+                    "evictable": entry.evictable,
+                }
+                for key, entry in self._models.items()
+            }
+            resident = sum(entry.resident_bytes for entry in self._models.values())
+
+        return {
+            "loaded": models,
+            "load_count": self.load_count,
+            "resident_mb": round(resident / 1024 / 1024, 1),
+            "memory_budget_mb": round(self.memory_budget_bytes / 1024 / 1024, 1),
+        }
+
+    def _touch(self, key: str) -> Optional[LoadedModel]:
+        """Mark a model as most recently used. Caller must hold the lock."""
+        entry = self._models.get(key)
+        if entry is not None:
+            self._models.move_to_end(key)
+            entry.last_used = time.time()
+        return entry
+
+    def _store(self, key: str, entry: LoadedModel) -> None:
+        """Insert a model and evict LRU models over the memory budget."""
+        entry.last_used = time.time()
+        with self._lock:
+            self._models[key] = entry
+            self._models.move_to_end(key)
+            self._evict_over_budget(keep=key)
+
+    def _evict_over_budget(self, keep: str) -> None:
+        """Evict least recently used models. Caller must hold the lock."""
+        total = sum(e.resident_bytes for e in self._models.values())
+        for key in list(self._models):
+            if total <= self.memory_budget_bytes:
+                break
+            entry = self._models[key]
+            if key == keep or not entry.evictable:
+                continue
+            logger.info("Evicting model %s", key)
+            total -= entry.resident_bytes
+            del self._models[key]
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,173 @@
+"""Live progress events of in-flight transcriptions."""
+
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from models.transcription import (
+    TranscriptionEvent,
+    TranscriptionEventType,
+    TranscriptionSegment,
+    TranscriptionStatus,
+)
+
+# Share of the overall progress each pipeline stage accounts for
+STAGE_WEIGHTS = {"decode": 0.05, "asr": 0.6, "diarization": 0.3, "merge": 0.05}
+
+TERMINAL_STATUSES = (TranscriptionStatus.COMPLETED, TranscriptionStatus.FAILED)
+
+
+@dataclass
+class Subscription:
+    """Events of one transcription delivered to one client."""
+
+    transcription_id: str
+    queue: "asyncio.Queue[TranscriptionEvent]"
+    loop: asyncio.AbstractEventLoop
+
+
+class ProgressBroker:
+    """
+    Fan out progress events of running jobs to any number of subscribers.
+
+    Jobs publish from worker threads, subscribers read asyncio queues that
+    are fed through their event loop. The events of a job still running
+    are kept, so a client connecting late first receives what it missed.
+    """
+
+    def __init__(self):
+        self._history: Dict[str, List[TranscriptionEvent]] = {}
+        self._subscriptions: Dict[str, List[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, transcription_id: str) -> Subscription:
+        """Subscribe to a transcription (must be called in the event loop)."""
+        subscription = Subscription(
+            transcription_id, asyncio.Queue(), asyncio.get_running_loop()
+        )
+        with self._lock:
+            for event in self._history.get(transcription_id, []):
+                subscription.queue.put_nowait(event)
+            self._subscriptions.setdefault(transcription_id, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.transcription_id, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.transcription_id, None)
+
+    def publish(self, event: TranscriptionEvent):
+        """Deliver an event to the current subscribers and keep it for later ones."""
+        with self._lock:
+            self._history.setdefault(event.transcription_id, []).append(event)
+            subscriptions = list(self._subscriptions.get(event.transcription_id, []))
+        self._deliver(subscriptions, event)
+
+    def finish(
+        self, transcription_id: str, status: TranscriptionStatus
+    ) -> TranscriptionEvent:
+        """Publish the final status of a job and forget its events."""
+        event = TranscriptionEvent(
+            type=TranscriptionEventType.STATUS,
+            transcription_id=transcription_id,
+            status=status,
+            progress=100.0 if status == TranscriptionStatus.COMPLETED else None,
+        )
+        with self._lock:
+            self._history.pop(transcription_id, None)
+            subscriptions = list(self._subscriptions.get(transcription_id, []))
+        self._deliver(subscriptions, event)
+        return event
+
+    def clear(self):
+        """Forget every job and subscriber."""
+        with self._lock:
+            self._history.clear()
+            self._subscriptions.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "jobs": len(self._history),
+                "subscribers": sum(map(len, self._subscriptions.values())),
+            }
+
+    @staticmethod
+    def _deliver(subscriptions: List[Subscription], event: TranscriptionEvent):
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.queue.put_nowait, event
+                )
+            except RuntimeError:
+                # The subscriber's event loop is closed, it will not read again
+                pass
+
+
+progress_broker = ProgressBroker()
+
+
+class JobProgress:
+    """
+    Progress reporter handed to one transcription job.
+
+    Only the transcription id is kept (the broker is looked up on use), so
+    reporters can be pickled into process workers. There they publish to
+    the worker's own broker, and clients fall back to the stored status.
+    """
+
+    def __init__(self, transcription_id: str):
+        self.transcription_id = transcription_id
+        self._fractions: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        return (JobProgress, (self.transcription_id,))
+
+    @property
+    def percent(self) -> float:
+        with self._lock:
+            done = sum(
+                STAGE_WEIGHTS.get(stage, 0.0) * fraction
+                for stage, fraction in self._fractions.items()
+            )
+        return round(100.0 * done / sum(STAGE_WEIGHTS.values()), 1)
+
+    def status(self, status: TranscriptionStatus):
+        self._publish(TranscriptionEventType.STATUS, status=status)
+
+    def stage_started(self, stage: str):
+        self._publish(TranscriptionEventType.STAGE, stage=stage)
+
+    def stage_finished(self, stage: str):
+        self.advance(stage, 1.0)
+
+    def advance(self, stage: str, fraction: float):
+        """Report that `fraction` (0-1) of a stage is done."""
+        with self._lock:
+            fraction = min(1.0, max(fraction, self._fractions.get(stage, 0.0)))
+            self._fractions[stage] = fraction
+        self._publish(TranscriptionEventType.PROGRESS, stage=stage)
+
+    def segments(self, segments: Sequence[TranscriptionSegment]):
+        """Publish segments as soon as ASR has produced them."""
+        for segment in segments:
+            self._publish(TranscriptionEventType.SEGMENT, segment=segment)
+
+    def _publish(self, event_type: TranscriptionEventType, **fields):
+        progress_broker.publish(
+            TranscriptionEvent(
+                type=event_type,
+                transcription_id=self.transcription_id,
+                progress=self.percent,
+                **fields,
+            )
+        )
+
+
+def is_terminal(status: Optional[TranscriptionStatus]) -> bool:
+    return status in TERMINAL_STATUSES
@@ -0,0 +1,167 @@
+"""Content-addressed cache of finished transcription results."""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+from models.segments import SegmentTable
+from models.transcription import Transcription, TranscriptionStatus
+
+# Other settings that change the segments a file is transcribed into
+PIPELINE_SETTINGS = (
+    "ASR_BACKEND",
+    "ASR_COMPUTE_TYPE",
+    "ASR_CHUNK_SECONDS",
+    "ASR_CHUNK_OVERLAP_SECONDS",
+    "VAD_ENABLED",
+    "VAD_MIN_SILENCE_SECONDS",
+    "VAD_PADDING_SECONDS",
+    "SPEAKER_SPLIT_SEGMENTS",
+    "SPEAKER_MIN_SPLIT_SECONDS",
+)
+
+# (content hash, whisper model, language, diarization model, pipeline settings)
+CacheKey = Tuple[str, str, str, str, Tuple[Any, ...]]
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    """Pipeline output shared by every transcription of the same content."""
+
+    segments: SegmentTable
+    duration: Optional[float]
+    stage_timings: Dict[str, float] = field(default_factory=dict)
+    # Transcription the result was computed for, whose artifacts it shares
+    source_id: Optional[str] = None
+
+    @classmethod
+    def from_transcription(cls, transcription: Transcription) -> "CachedResult":
+        return cls(
+            segments=SegmentTable.from_segments(transcription.segments),
+            duration=transcription.duration,
+            stage_timings=transcription.stage_timings,
+            source_id=transcription.id,
+        )
+
+    def apply(self, transcription: Transcription) -> Transcription:
+        """Complete `transcription` with the cached segments."""
+        return transcription.model_copy(
+            update={
+                "status": TranscriptionStatus.COMPLETED,
+                "segments": self.segments,
+                "duration": self.duration,
+                "stage_timings": self.stage_timings,
+            }
+        )
+
+
+class ResultCache:
+    """
+    LRU cache of transcription results keyed by content hash and settings.
+
+    Besides finished results it tracks jobs still in flight, so identical
+    uploads arriving while the first one is processed can wait for that
+    job instead of running the pipeline again.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        if max_entries is None:
+            max_entries = settings.RESULT_CACHE_SIZE
+        self.max_entries = max_entries
+        self._results: "OrderedDict[CacheKey, CachedResult]" = OrderedDict()
+        self._inflight: Dict[CacheKey, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(content_hash: str, language: Optional[str]) -> CacheKey:
+        """Key for a file transcribed with the current model settings."""
+        return (
+            content_hash,
+            settings.WHISPER_MODEL,
+            language or "",
+            settings.DIARIZATION_MODEL,
+            tuple(getattr(settings, name) for name in PIPELINE_SETTINGS),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: CacheKey) -> Optional[CachedResult]:
+        """Return a cached result, counting the lookup as hit or miss."""
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: CacheKey, result: CachedResult):
+        """Store a result, evicting the least recently used ones over the limit."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+                self.evictions += 1
+
+    def join(self, key: CacheKey) -> Optional[Future]:
+        """Return the in-flight job computing `key`, if there is one."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            return future
+
+    def track(self, key: CacheKey, future: Future):
+        """Register the job computing `key`; its result is cached when done."""
+        with self._lock:
+            self._inflight[key] = future
+        future.add_done_callback(lambda f: self._complete(key, f))
+
+    def _complete(self, key: CacheKey, future: Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        if result.status == TranscriptionStatus.COMPLETED:
+            self.put(key, CachedResult.from_transcription(result))
+
+    def clear(self):
+        """Drop every cached result and reset the counters."""
+        with self._lock:
+            self._results.clear()
+            self._inflight.clear()
+            self.hits = self.misses = self.coalesced = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Cache size and hit/miss counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._results),
+                "max_entries": self.max_entries,
+                "inflight": len(self._inflight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
+
+
+result_cache = ResultCache()
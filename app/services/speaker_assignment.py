@@ -0,0 +1,421 @@
+"""Vectorized assignment of diarization speakers to transcription segments."""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from models.segments import SegmentTable
+from models.transcription import SpeakerTurn, TranscriptionSegment
+
+
+class SpeakerTimeline:
+    """
+    Speaker turns as per-speaker arrays of disjoint, sorted intervals.
+
+    Each speaker also keeps the cumulative speaking time before every turn,
+    so the time a speaker talks within any interval is two binary searches
+    away (`coverage(end) - coverage(start)`), for any number of intervals
+    at once.
+    """
+
+    def __init__(
+        self,
+        turn_starts: np.ndarray,
+        turn_ends: np.ndarray,
+        turn_speakers: Sequence[str],
+    ):
+        turn_starts = np.asarray(turn_starts, dtype=np.float64)
+        turn_ends = np.asarray(turn_ends, dtype=np.float64)
+        order = np.lexsort((turn_ends, turn_starts))
+        # Speakers are numbered by their first turn, so ties go to whoever
+        # spoke first (like the cursor implementation)
+        self.speakers: List[str] = list(
+            dict.fromkeys(turn_speakers[i] for i in order.tolist())
+        )
+        numbers = {speaker: index for index, speaker in enumerate(self.speakers)}
+        codes = np.array(
+            [numbers[speaker] for speaker in turn_speakers], dtype=np.int64
+        )
+
+        self.starts: List[np.ndarray] = []
+        self.ends: List[np.ndarray] = []
+        self.cumulative: List[np.ndarray] = []
+        for index in range(len(self.speakers)):
+            starts, ends = merge_intervals(
+                turn_starts[codes == index], turn_ends[codes == index]
+            )
+            self.starts.append(starts)
+            self.ends.append(ends)
+            self.cumulative.append(np.concatenate(([0.0], np.cumsum(ends - starts))))
+
+    @classmethod
+    def from_turns(cls, speaker_turns: Sequence[SpeakerTurn]) -> "SpeakerTimeline":
+        return cls(
+            np.array([turn.start for turn in speaker_turns], dtype=np.float64),
+            np.array([turn.end for turn in speaker_turns], dtype=np.float64),
+            [turn.speaker for turn in speaker_turns],
+        )
+
+    def coverage(self, speaker_index: int, times: np.ndarray) -> np.ndarray:
+        """Total speaking time of a speaker from 0 up to each of `times`."""
+        return _coverage(
+            self.starts[speaker_index],
+            self.ends[speaker_index],
+            self.cumulative[speaker_index],
+            times,
+        )
+
+    def overlap_matrix(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """Seconds each speaker (column) talks within each interval (row)."""
+        totals = np.zeros((len(starts), len(self.speakers)))
+        for index in range(len(self.speakers)):
+            totals[:, index] = self.coverage(index, ends) - self.coverage(index, starts)
+        return totals
+
+    def simultaneous_speech(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Disjoint, sorted intervals where two or more speakers talk at once."""
+        if len(self.speakers) < 2:
+            return np.zeros(0), np.zeros(0)
+
+        times = np.concatenate(self.starts + self.ends)
+        deltas = np.concatenate(
+            [np.ones(sum(map(len, self.starts))), -np.ones(sum(map(len, self.ends)))]
+        )
+        # At equal times ends go first, so touching turns are not "simultaneous"
+        order = np.lexsort((deltas, times))
+        times, active = times[order], np.cumsum(deltas[order])
+
+        is_region = (active[:-1] >= 2) & (times[1:] > times[:-1])
+        return merge_intervals(times[:-1][is_region], times[1:][is_region])
+
+
+def merge_intervals(
+    starts: np.ndarray, ends: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Union of intervals as disjoint, sorted (starts, ends) arrays."""
+    if len(starts) == 0:
+        return np.zeros(0), np.zeros(0)
+
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    running_end = np.maximum.accumulate(ends)
+    # A new interval begins wherever it starts after everything before it ended
+    begins = np.concatenate(([True], starts[1:] > running_end[:-1]))
+    group_ends = np.concatenate((np.flatnonzero(begins)[1:] - 1, [len(starts) - 1]))
+    return starts[begins], running_end[group_ends]
+
+
+def _coverage(
+    starts: np.ndarray, ends: np.ndarray, cumulative: np.ndarray, times: np.ndarray
+) -> np.ndarray:
+    """Length of the (disjoint, sorted) intervals lying before each time."""
+    if len(starts) == 0:
+        return np.zeros(len(times))
+    index = np.searchsorted(starts, times, side="right") - 1
+    clamped = np.maximum(index, 0)
+    inside = np.clip(times - starts[clamped], 0.0, ends[clamped] - starts[clamped])
+    return np.where(index >= 0, cumulative[clamped] + inside, 0.0)
+
+
+def _interval_coverage(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    interval_starts: np.ndarray,
+    interval_ends: np.ndarray,
+) -> np.ndarray:
+    """Seconds of the disjoint (starts, ends) intervals inside each interval."""
+    cumulative = np.concatenate(([0.0], np.cumsum(ends - starts)))
+    return _coverage(starts, ends, cumulative, interval_ends) - _coverage(
+        starts, ends, cumulative, interval_starts
+    )
+
+
+@dataclass
+class SpeakerAssignment:
+    """Per-segment results of `assign_speaker_arrays`."""
+
+    # Index into `SpeakerTimeline.speakers`, -1 when no speaker qualifies
+    speaker_index: np.ndarray
+    overlap_seconds: np.ndarray
+    simultaneous_seconds: np.ndarray
+    # Speakers talking at least `min_split_seconds` within the segment
+    speaker_count: np.ndarray
+
+
+def assign_speaker_arrays(
+    segment_starts: np.ndarray,
+    segment_ends: np.ndarray,
+    timeline: SpeakerTimeline,
+    min_overlap_seconds: float = 0.10,
+    min_split_seconds: float = 1.0,
+) -> SpeakerAssignment:
+    """Batched speaker assignment on segment start/end arrays."""
+    segment_starts = np.asarray(segment_starts, dtype=np.float64)
+    segment_ends = np.asarray(segment_ends, dtype=np.float64)
+    simultaneous = _interval_coverage(
+        *timeline.simultaneous_speech(), segment_starts, segment_ends
+    )
+
+    if not timeline.speakers:
+        empty = np.zeros(len(segment_starts))
+        return SpeakerAssignment(
+            np.full(len(segment_starts), -1), empty, simultaneous, empty.astype(int)
+        )
+
+    totals = timeline.overlap_matrix(segment_starts, segment_ends)
+    best = np.argmax(totals, axis=1)
+    best_overlap = totals[np.arange(len(totals)), best]
+    return SpeakerAssignment(
+        speaker_index=np.where(best_overlap >= min_overlap_seconds, best, -1),
+        overlap_seconds=best_overlap,
+        simultaneous_seconds=simultaneous,
+        speaker_count=(totals >= min_split_seconds).sum(axis=1),
+    )
+
+
+def assign_speakers(
+    transcription_segments: Union[SegmentTable, Sequence[TranscriptionSegment]],
+    speaker_turns: Sequence[SpeakerTurn],
+    min_overlap_seconds: float = 0.10,
+    unknown_speaker_label: str = "UNKNOWN",
+    split_segments: bool = False,
+    min_split_seconds: float = 1.0,
+) -> SegmentTable:
+    """
+    Assign each segment the speaker talking the longest within it.
+
+    Overlap is totalled per speaker over all of their turns. Segments with
+    at least `min_overlap_seconds` of two or more speakers talking at once
+    are flagged as simultaneous speech. With `split_segments`, a segment in
+    which the speaker changes is split at the turn boundaries (pieces of at
+    least `min_split_seconds`), its words shared out by piece duration.
+
+    Segments that are not split keep their times, texts and ids; only the
+    speaker columns of the returned table are new.
+    """
+    if isinstance(transcription_segments, SegmentTable):
+        segments = transcription_segments
+        starts, ends = segments.start_times, segments.end_times
+    else:
+        # Times of the models themselves, at full precision
+        starts = np.array([segment.start_time for segment in transcription_segments])
+        ends = np.array([segment.end_time for segment in transcription_segments])
+        segments = SegmentTable.from_segments(transcription_segments)
+    if not len(segments):
+        return SegmentTable()
+
+    timeline = SpeakerTimeline.from_turns(speaker_turns)
+    assignment = assign_speaker_arrays(
+        starts,
+        ends,
+        timeline,
+        min_overlap_seconds=min_overlap_seconds,
+        min_split_seconds=min_split_seconds,
+    )
+    labels = timeline.speakers + [unknown_speaker_label]  # index -1 is unknown
+    speaker_codes = np.where(
+        assignment.speaker_index >= 0, assignment.speaker_index, len(labels) - 1
+    )
+    is_simultaneous = assignment.simultaneous_seconds >= min_overlap_seconds
+
+    pieces_by_segment = {}
+    if split_segments:
+        pieces_by_segment = _split_segments(
+            starts,
+            ends,
+            segments.texts,
+            np.flatnonzero(assignment.speaker_count > 1).tolist(),
+            timeline,
+            min_split_seconds,
+        )
+    if not pieces_by_segment:
+        return segments.with_speakers(
+            speaker_codes, labels, assignment.overlap_seconds, is_simultaneous
+        )
+
+    # Some segments are split: the table is rebuilt, with ids renumbered
+    pieces = [piece for pieces in pieces_by_segment.values() for piece in pieces]
+    piece_stats = iter(_piece_stats(pieces, timeline, min_overlap_seconds))
+    columns: Dict[str, list] = {
+        "starts": [],
+        "ends": [],
+        "texts": [],
+        "speakers": [],
+        "overlaps": [],
+        "simultaneous": [],
+    }
+    for index, row in enumerate(
+        zip(
+            segments.start_times.tolist(),
+            segments.end_times.tolist(),
+            segments.texts,
+            speaker_codes.tolist(),
+            assignment.overlap_seconds.tolist(),
+            is_simultaneous.tolist(),
+        )
+    ):
+        if index in pieces_by_segment:
+            rows = [
+                (
+                    round(start, 2),
+                    round(end, 2),
+                    text,
+                    piece_speaker,
+                    *next(piece_stats),
+                )
+                for start, end, piece_speaker, text in pieces_by_segment[index]
+            ]
+        else:
+            rows = [row]
+        for start, end, text, speaker_code, overlap, simultaneous in rows:
+            columns["starts"].append(start)
+            columns["ends"].append(end)
+            columns["texts"].append(text)
+            columns["speakers"].append(labels[speaker_code])
+            columns["overlaps"].append(overlap)
+            columns["simultaneous"].append(simultaneous)
+    return SegmentTable(**columns)
+
+
+# (start, end, speaker index, text)
+Piece = Tuple[float, float, int, str]
+
+
+def _split_segments(
+    segment_starts: np.ndarray,
+    segment_ends: np.ndarray,
+    texts: List[str],
+    candidates: List[int],
+    timeline: SpeakerTimeline,
+    min_split_seconds: float,
+) -> Dict[int, List[Piece]]:
+    """
+    Split the `candidates` segments at speaker changes.
+
+    Segments for which no split leaves pieces of `min_split_seconds` that
+    each get at least one word are left out of the result.
+    """
+    if not candidates:
+        return {}
+
+    starts, ends = segment_starts[candidates], segment_ends[candidates]
+
+    # Turn edges inside each segment. Turns of one speaker are disjoint and
+    # sorted, so both of their edge arrays are sorted too.
+    boundaries = [{start, end} for start, end in zip(starts.tolist(), ends.tolist())]
+    for speaker_starts, speaker_ends in zip(timeline.starts, timeline.ends):
+        for edges in (speaker_starts, speaker_ends):
+            first = np.searchsorted(edges, starts, side="right").tolist()
+            last = np.searchsorted(edges, ends, side="left").tolist()
+            for edge_set, a, b in zip(boundaries, first, last):
+                if b > a:
+                    edge_set.update(edges[a:b].tolist())
+    boundaries = [sorted(edge_set) for edge_set in boundaries]
+
+    # Speaker totals of every elementary piece of every segment, at once
+    piece_starts = np.array([t for edge in boundaries for t in edge[:-1]])
+    piece_ends = np.array([t for edge in boundaries for t in edge[1:]])
+    totals = timeline.overlap_matrix(piece_starts, piece_ends).tolist()
+
+    pieces_by_segment: Dict[int, List[Piece]] = {}
+    offset = 0
+    for segment_index, edges in zip(candidates, boundaries):
+        count = len(edges) - 1
+        pieces = _split_segment(
+            texts[segment_index],
+            edges,
+            totals[offset : offset + count],
+            min_split_seconds,
+        )
+        offset += count
+        if pieces:
+            pieces_by_segment[segment_index] = pieces
+    return pieces_by_segment
+
+
+def _split_segment(
+    text: str,
+    edges: List[float],
+    totals: List[List[float]],
+    min_split_seconds: float,
+) -> Optional[List[Piece]]:
+    """Split one segment given its elementary pieces and their speaker totals."""
+    # Each elementary piece is spoken by the speaker already talking if they
+    # still are (fewer switches), otherwise by whoever talks the most
+    pieces: List[List] = []
+    for piece_start, piece_end, piece_totals in zip(edges, edges[1:], totals):
+        previous = pieces[-1][2] if pieces else None
+        loudest = max(piece_totals)
+        if previous is not None and piece_totals[previous] > 0:
+            speaker = previous
+        elif loudest > 0:
+            speaker = piece_totals.index(loudest)
+        else:
+            speaker = previous  # silence stays with the current speaker
+        if pieces and (speaker == previous or speaker is None):
+            pieces[-1][1] = piece_end
+        else:
+            pieces.append([piece_start, piece_end, speaker])
+
+    # Leading silence belongs to the first speaker
+    if len(pieces) > 1 and pieces[0][2] is None:
+        pieces[1][0] = pieces[0][0]
+        del pieces[0]
+
+    # Fold pieces that are too short into the preceding (or following) piece
+    index = 0
+    while len(pieces) > 1 and index < len(pieces):
+        piece_start, piece_end, speaker = pieces[index]
+        if piece_end - piece_start >= min_split_seconds:
+            index += 1
+            continue
+        if index > 0:
+            pieces[index - 1][1] = piece_end
+        else:
+            pieces[1][0] = piece_start
+        del pieces[index]
+        # Neighbours of the same speaker become one piece
+        for i in range(len(pieces) - 1, 0, -1):
+            if pieces[i][2] == pieces[i - 1][2]:
+                pieces[i - 1][1] = pieces[i][1]
+                del pieces[i]
+        index = 0
+
+    if len(pieces) < 2 or any(piece[2] is None for piece in pieces):
+        return None
+
+    start, end = edges[0], edges[-1]
+    words = text.split()
+    cuts = [0]
+    for _, piece_end, _ in pieces:
+        cuts.append(round(len(words) * (piece_end - start) / (end - start)))
+    if any(b <= a for a, b in zip(cuts, cuts[1:])):
+        return None
+
+    return [
+        (piece_start, piece_end, speaker, " ".join(words[first:last]))
+        for (piece_start, piece_end, speaker), first, last in zip(
+            pieces, cuts, cuts[1:]
+        )
+    ]
+
+
+def _piece_stats(
+    pieces: List[Piece], timeline: SpeakerTimeline, min_overlap_seconds: float
+) -> List[Tuple[float, bool]]:
+    """(overlap of the piece's speaker, simultaneous speech flag) per piece."""
+    if not pieces:
+        return []
+
+    starts = np.array([piece[0] for piece in pieces])
+    ends = np.array([piece[1] for piece in pieces])
+    speakers = np.array([piece[2] for piece in pieces])
+    totals = timeline.overlap_matrix(starts, ends)
+    simultaneous = _interval_coverage(*timeline.simultaneous_speech(), starts, ends)
+    return list(
+        zip(
+            totals[np.arange(len(pieces)), speakers].tolist(),
+            (simultaneous >= min_overlap_seconds).tolist(),
+        )
+    )
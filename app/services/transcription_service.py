@@ -1,20 +1,53 @@
 """Mock transcription service."""
 
-from typing import List
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+import multiprocessing
+import os
+import threading
+import time
 import uuid
 
-from pyannote.audio import Pipeline
-import torch
-import whisper
+import numpy as np
 
 from config import settings
+from services.asr_backends import get_asr_backend
+from services.asr_batching import asr_batcher
+from services.audio_service import SAMPLE_RATE, audio_duration, decode_audio
+from services.engine import pyannote_audio, torch
+from services.metrics import (
+    AUDIO_SECONDS,
+    REALTIME_FACTOR,
+    STAGE_SECONDS,
+    TRANSCRIPTIONS,
+    VAD_AUDIO_SECONDS,
+    VAD_SKIPPED_RATIO,
+    timed,
+)
+from services.model_registry import model_registry
+from services.progress import JobProgress
+from services.speaker_assignment import assign_speakers
+from services.vad import (
+    AudioWindow,
+    SpeechTimeline,
+    pack_speech,
+    plan_windows,
+    speech_spans,
+    window_samples,
+)
+from storage.artifact_storage import PipelineArtifacts, artifact_storage
 from models.transcription import (
+    RemergeRequest,
     SpeakerTurn,
     Transcription,
     TranscriptionSegment,
     TranscriptionStatus,
 )
 
+logger = logging.getLogger(__name__)
+
 
 def interval_overlap(
     segment_start: float,
@@ -30,18 +63,75 @@ def interval_overlap(
     )
 
 
-def transcribe_with_whisper(file_path: str) -> List[TranscriptionSegment]:
+def get_whisper_model(model_name: Optional[str] = None):
+    """
+    Return a warm Whisper model, loading it on first use.
+
+    The model is loaded by the inference engine of `settings.ASR_BACKEND`;
+    every engine's models share Whisper's `transcribe` interface.
+    """
+    model_name = model_name or settings.WHISPER_MODEL
+    if model_name not in settings.WHISPER_MODELS:
+        raise ValueError(
+            f"Unsupported Whisper model: {model_name}. "
+            f"Available models: {', '.join(settings.WHISPER_MODELS)}"
+        )
+    backend = get_asr_backend()
+    key = f"whisper:{model_name}"
+    if backend.name != "torch":
+        key = f"{key}:{backend.name}"
+    return model_registry.get(key, lambda: backend.load(model_name))
+
+
+def get_diarization_pipeline():
+    """Return a warm pyannote diarization pipeline, loading it on first use."""
+
+    def _load_pipeline():
+        pipeline = pyannote_audio.Pipeline.from_pretrained(
+            settings.DIARIZATION_MODEL,
+            token=settings.HUGGING_FACE_TOKEN,
+        )
+        pipeline.to(torch.device("cuda" if torch.cuda.is_available() else "cpu"))
+        return pipeline
+
+    # The diarization pipeline is shared by every request, never evict it
+    # in favour of a Whisper size.
+    return model_registry.get(
+        f"pyannote:{settings.DIARIZATION_MODEL}", _load_pipeline, evictable=False
+    )
+
+
+def preload_models() -> None:
+    """Load the default models up-front (e.g. at application startup)."""
+    get_whisper_model()
+    get_diarization_pipeline()
+
+
+def transcribe_with_whisper(
+    audio: Union[str, np.ndarray],
+    model_name: Optional[str] = None,
+    progress: Optional[JobProgress] = None,
+) -> List[TranscriptionSegment]:
     """
     Transcribe audio file using OpenAI Whisper model.
 
     Args:
-        file_path: Path to the audio file
+        audio: Path to the audio file or decoded 16 kHz mono samples
+        model_name: Whisper model size, defaults to `settings.WHISPER_MODEL`
+        progress: Receives the segments as soon as they are final: window by
+            window in the chunked mode, all at once otherwise
 
     Returns:
         List of TranscriptionSegment objects with timestamps and text
     """
-    model = whisper.load_model("turbo")
-    result = model.transcribe(file_path)
+    if isinstance(audio, np.ndarray) and _should_chunk(audio):
+        return transcribe_chunked(audio, model_name, progress=progress)
+
+    if asr_batcher.accepts(audio):
+        # Short clips share a Whisper pass with concurrently running jobs
+        result = asr_batcher.transcribe(audio, model_name)
+    else:
+        result = get_whisper_model(model_name).transcribe(audio)
 
     # Convert Whisper segments to TranscriptionSegment objects
     segments = []
@@ -56,27 +146,266 @@ def transcribe_with_whisper(file_path: str) -> List[TranscriptionSegment]:
             )
         )
 
+    if progress is not None:
+        progress.segments(segments)
     return segments
 
 
-def diarize_with_pyannote(file_path: str) -> List[SpeakerTurn]:
+# (start, end, text) relative to the start of a window
+WindowSegments = List[Tuple[float, float, str]]
+
+_chunk_pool: Optional[Executor] = None
+_chunk_pool_lock = threading.Lock()
+
+
+def _should_chunk(audio: np.ndarray) -> bool:
+    """Whether audio is long enough for the chunked ASR mode."""
+    chunk_seconds = settings.ASR_CHUNK_SECONDS
+    return chunk_seconds > 0 and len(audio) > chunk_seconds * SAMPLE_RATE
+
+
+def _init_chunk_worker(torch_threads: int) -> None:
+    torch.set_num_threads(torch_threads)
+
+
+def get_chunk_pool() -> Executor:
+    """Return the pool transcribing windows of long recordings."""
+    global _chunk_pool
+    with _chunk_pool_lock:
+        if _chunk_pool is None:
+            workers = settings.ASR_CHUNK_WORKERS
+            if settings.ASR_CHUNK_EXECUTOR == "process":
+                # Each worker process keeps its own warm Whisper model and
+                # gets an equal share of the cores. Spawned (not forked)
+                # workers, as forking a process with torch threads can hang.
+                _chunk_pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_chunk_worker,
+                    initargs=(
+                        settings.ASR_TORCH_THREADS
+                        or max(1, (os.cpu_count() or 1) // workers),
+                    ),
+                )
+            else:
+                _chunk_pool = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="asr-chunk"
+                )
+        return _chunk_pool
+
+
+def shutdown_chunk_pool() -> None:
+    """Stop the chunk workers (e.g. at application shutdown)."""
+    global _chunk_pool
+    with _chunk_pool_lock:
+        pool, _chunk_pool = _chunk_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def transcribe_window(
+    samples: np.ndarray, model_name: Optional[str] = None, **options
+) -> WindowSegments:
+    """
+    Transcribe one window of audio (chunk pool workers, live sessions).
+
+    `options` (e.g. `language`, `initial_prompt`) go to Whisper's transcribe.
+    """
+    result = get_whisper_model(model_name).transcribe(samples, **options)
+    return [
+        (float(segment["start"]), float(segment["end"]), segment["text"].strip())
+        for segment in result["segments"]
+    ]
+
+
+def _is_duplicate(previous: Tuple[float, float, str], start: float, end: float):
+    """Whether a segment repeats `previous`, as happens around hard cuts."""
+    overlap = interval_overlap(previous[0], previous[1], start, end)
+    shortest = min(previous[1] - previous[0], end - start)
+    return shortest > 0 and overlap > shortest / 2
+
+
+class WindowStitcher:
+    """
+    Merge per-window results into one timeline with global ids.
+
+    Windows are added in order. Segments are shifted by their window's
+    offset. A window only keeps the segments whose midpoint lies in its keep
+    range, so a segment seen by two overlapping windows is taken once. When
+    both copies survive around a cut, the longer (unclipped) one wins, so
+    only the last stitched segment can still change when a window is added.
+    """
+
+    def __init__(self, window_count: int):
+        self.window_count = window_count
+        self.added = 0
+        self.stitched: List[Tuple[float, float, str]] = []
+
+    def add(self, window: AudioWindow, segments: WindowSegments) -> None:
+        is_last = self.added == self.window_count - 1
+        self.added += 1
+        stitched = self.stitched
+        for start, end, text in segments:
+            start = window.start + start
+            end = min(window.start + end, window.end)
+            midpoint = (start + end) / 2
+            if midpoint < window.keep_start:
+                continue
+            if midpoint >= window.keep_end and not is_last:
+                continue
+            if stitched and _is_duplicate(stitched[-1], start, end):
+                # Keep the more complete copy, the other was clipped by a cut
+                previous_start, previous_end, _ = stitched[-1]
+                if end - start > previous_end - previous_start:
+                    stitched[-1] = (start, end, text)
+                continue
+            stitched.append((start, end, text))
+
+    def final_count(self, next_start: Optional[float], first: int = 0) -> int:
+        """
+        Number of leading segments no later window can change.
+
+        Segments reaching into the window starting at `next_start` may still
+        be replaced by its copy of them; None means every window was added.
+        """
+        if next_start is None:
+            return len(self.stitched)
+        final = first
+        while (
+            final < len(self.stitched)
+            and round(self.stitched[final][1], 2) <= next_start
+        ):
+            final += 1
+        return final
+
+    def segments(
+        self, first: int = 0, stop: Optional[int] = None
+    ) -> List[TranscriptionSegment]:
+        """The stitched segments `first` to `stop` as TranscriptionSegments."""
+        stop = len(self.stitched) if stop is None else stop
+        return [
+            TranscriptionSegment(
+                id=f"seg-{index}",
+                start_time=round(start, 2),
+                end_time=round(end, 2),
+                text=text,
+                speaker="",  # Will be assigned by diarization
+            )
+            for index, (start, end, text) in enumerate(
+                self.stitched[first:stop], start=first
+            )
+        ]
+
+
+def stitch_windows(
+    windows: Sequence[AudioWindow], window_segments: Sequence[WindowSegments]
+) -> List[TranscriptionSegment]:
+    """Merge per-window results into one timeline (see `WindowStitcher`)."""
+    stitcher = WindowStitcher(len(windows))
+    for window, segments in zip(windows, window_segments):
+        stitcher.add(window, segments)
+    return stitcher.segments()
+
+
+def transcribe_chunked(
+    audio: np.ndarray,
+    model_name: Optional[str] = None,
+    pool: Optional[Executor] = None,
+    window_fn: Callable[..., WindowSegments] = transcribe_window,
+    progress: Optional[JobProgress] = None,
+) -> List[TranscriptionSegment]:
+    """
+    Transcribe a long recording as silence-bounded windows in parallel.
+
+    Args:
+        audio: Decoded 16 kHz mono samples
+        model_name: Whisper model size, defaults to `settings.WHISPER_MODEL`
+        pool: Executor running `window_fn`, defaults to the chunk pool
+        window_fn: Transcribes one window's samples (picklable for processes)
+        progress: Receives ASR progress and segments as windows finish
+
+    Returns:
+        List of TranscriptionSegment objects on the recording's timeline
+    """
+    windows = plan_windows(
+        audio, settings.ASR_CHUNK_SECONDS, settings.ASR_CHUNK_OVERLAP_SECONDS
+    )
+    logger.info(
+        "Transcribing %d windows of up to %ss",
+        len(windows),
+        settings.ASR_CHUNK_SECONDS,
+    )
+
+    pool = pool or get_chunk_pool()
+    # Windows are views, a process pool only copies the ones being pickled
+    futures = [
+        pool.submit(window_fn, window_samples(audio, window), model_name)
+        for window in windows
+    ]
+    if progress is None:
+        return stitch_windows(windows, [future.result() for future in futures])
+
+    # Each window is stitched once, and only its newly final segments sent
+    stitcher = WindowStitcher(len(windows))
+    published = 0
+    for index, future in enumerate(futures):
+        stitcher.add(windows[index], future.result())
+        progress.advance("asr", (index + 1) / len(windows))
+
+        next_start = windows[index + 1].start if index + 1 < len(windows) else None
+        final = stitcher.final_count(next_start, first=published)
+        progress.segments(stitcher.segments(published, final))
+        published = final
+    return stitcher.segments()
+
+
+def diarize_with_pyannote(
+    audio: Union[str, np.ndarray], progress: Optional[JobProgress] = None
+) -> List[SpeakerTurn]:
     """
     Perform speaker diarization using pyannote.audio.
 
     Args:
-        file_path: Path to the audio file
+        audio: Path to the audio file or decoded 16 kHz mono samples
+        progress: Receives the progress of the pipeline's steps
 
     Returns:
         List of SpeakerTurn objects containing speaker turns with timestamps
     """
-    pipeline = Pipeline.from_pretrained(
-        "pyannote/speaker-diarization-community-1",
-        token=settings.HUGGING_FACE_TOKEN,
-    )
-    pipeline.to(torch.device("cuda" if torch.cuda.is_available() else "cpu"))
-    output = pipeline(file_path)
+    return _speaker_turns(_run_diarization(audio, progress))
+
 
-    # Convert pyannote Annotation to list of SpeakerTurn objects
+def diarize_with_embeddings(
+    audio: np.ndarray,
+) -> Tuple[List[SpeakerTurn], Dict[str, np.ndarray]]:
+    """Diarize audio and return each speaker's embedding as well."""
+    output = _run_diarization(audio)
+    embeddings = getattr(output, "speaker_embeddings", None)
+    if embeddings is None:
+        return _speaker_turns(output), {}
+    labels = output.speaker_diarization.labels()
+    return _speaker_turns(output), {
+        label: np.asarray(embeddings[index]) for index, label in enumerate(labels)
+    }
+
+
+def _run_diarization(
+    audio: Union[str, np.ndarray], progress: Optional[JobProgress] = None
+):
+    pipeline = get_diarization_pipeline()
+    if isinstance(audio, np.ndarray):
+        # Zero-copy view of the shared buffer in pyannote's (channel, time) layout
+        audio = {
+            "waveform": torch.from_numpy(audio).unsqueeze(0),
+            "sample_rate": SAMPLE_RATE,
+        }
+    if progress is None:
+        return pipeline(audio)
+    return pipeline(audio, hook=partial(_diarization_hook, progress))
+
+
+def _speaker_turns(output) -> List[SpeakerTurn]:
+    """Convert pyannote Annotation to list of SpeakerTurn objects."""
     speaker_turns = []
     for segment, track, speaker in output.speaker_diarization.itertracks(
         yield_label=True
@@ -88,15 +417,57 @@ def diarize_with_pyannote(file_path: str) -> List[SpeakerTurn]:
     return speaker_turns
 
 
+def _diarization_hook(
+    progress: JobProgress,
+    step_name,
+    step_artifact,
+    file=None,
+    total: Optional[int] = None,
+    completed: Optional[int] = None,
+):
+    """pyannote pipeline hook reporting the batches of the step in progress."""
+    if total and completed is not None:
+        progress.advance("diarization", 0.9 * completed / total)
+
+
 def assign_speaker_by_overlap(
     transcription_segments,
     speaker_turns,
     min_overlap_seconds: float = 0.10,
     unknown_speaker_label: str = "UNKNOWN",
+    split_segments: Optional[bool] = None,
 ):
     """
     Assign a speaker to each transcription segment based on maximum
     time overlap with diarization speaker turns.
+
+    Uses the vectorized engine in `services.speaker_assignment`; segments
+    spanning several speakers are split when `split_segments` (defaults to
+    `settings.SPEAKER_SPLIT_SEGMENTS`) is enabled. Returns a `SegmentTable`.
+    """
+    if split_segments is None:
+        split_segments = settings.SPEAKER_SPLIT_SEGMENTS
+    return assign_speakers(
+        transcription_segments,
+        speaker_turns,
+        min_overlap_seconds=min_overlap_seconds,
+        unknown_speaker_label=unknown_speaker_label,
+        split_segments=split_segments,
+        min_split_seconds=settings.SPEAKER_MIN_SPLIT_SECONDS,
+    )
+
+
+def assign_speaker_by_overlap_cursor(
+    transcription_segments,
+    speaker_turns,
+    min_overlap_seconds: float = 0.10,
+    unknown_speaker_label: str = "UNKNOWN",
+):
+    """
+    Assign a speaker to each transcription segment based on maximum
+    time overlap with a single diarization speaker turn.
+
+    Reference (cursor-based) implementation, kept for benchmarks.
     """
     speaker_turns = sorted(
         speaker_turns,
@@ -159,43 +530,338 @@ def assign_speaker_by_overlap(
     return annotated_segments
 
 
+def detect_speech(audio: np.ndarray) -> Tuple[np.ndarray, SpeechTimeline]:
+    """
+    Drop the silence of a recording before ASR and diarization.
+
+    Returns the speech spans packed back to back and the timeline mapping
+    them to the original recording; pauses shorter than
+    `settings.VAD_MIN_SILENCE_SECONDS` are kept.
+    """
+    spans = speech_spans(
+        audio,
+        min_silence_seconds=settings.VAD_MIN_SILENCE_SECONDS,
+        padding_seconds=settings.VAD_PADDING_SECONDS,
+    )
+    packed, timeline = pack_speech(audio, spans)
+
+    VAD_AUDIO_SECONDS.inc(timeline.speech_seconds, kind="speech")
+    VAD_AUDIO_SECONDS.inc(timeline.skipped_seconds, kind="skipped")
+    if timeline.duration:
+        VAD_SKIPPED_RATIO.observe(timeline.skipped_seconds / timeline.duration)
+    logger.debug(
+        "VAD: %.1fs of speech in %d spans, %.1fs skipped",
+        timeline.speech_seconds,
+        len(spans),
+        timeline.skipped_seconds,
+    )
+    return packed, timeline
+
+
+def remap_segments(
+    segments: Sequence[TranscriptionSegment], timeline: SpeechTimeline
+) -> List[TranscriptionSegment]:
+    """Move segments of the packed speech back onto the original timeline."""
+    remapped = []
+    for segment in segments:
+        pieces = timeline.split_to_original(segment.start_time, segment.end_time)
+        if pieces:
+            start, end = pieces[0][0], pieces[-1][1]
+        else:
+            start = end = timeline.to_original(segment.start_time)
+        remapped.append(
+            segment.model_copy(
+                update={"start_time": round(start, 2), "end_time": round(end, 2)}
+            )
+        )
+    return remapped
+
+
+def remap_speaker_turns(
+    speaker_turns: Sequence[SpeakerTurn], timeline: SpeechTimeline
+) -> List[SpeakerTurn]:
+    """
+    Move speaker turns of the packed speech back onto the original timeline.
+
+    Turns are split where silence was skipped, so no speaker is credited
+    with a pause.
+    """
+    return [
+        SpeakerTurn(start=start, end=end, speaker=turn.speaker)
+        for turn in speaker_turns
+        for start, end in timeline.split_to_original(turn.start, turn.end)
+    ]
+
+
+class _TimelineProgress:
+    """Progress reporter publishing ASR segments on the original timeline."""
+
+    def __init__(self, progress: JobProgress, timeline: SpeechTimeline):
+        self._progress = progress
+        self._timeline = timeline
+
+    def __getattr__(self, name):
+        return getattr(self._progress, name)
+
+    def segments(self, segments: Sequence[TranscriptionSegment]):
+        self._progress.segments(remap_segments(segments, self._timeline))
+
+
+def _torch_thread_budget(parallel: bool = True) -> Tuple[int, int]:
+    """
+    The torch threads of the ASR and diarization stages.
+
+    Stages running one after the other each get all the cores by default;
+    concurrent stages split them.
+    """
+    cpu_count = os.cpu_count() or 1
+    if not parallel:
+        return (
+            settings.ASR_TORCH_THREADS or cpu_count,
+            settings.DIARIZATION_TORCH_THREADS or cpu_count,
+        )
+    asr_threads = settings.ASR_TORCH_THREADS or max(1, (cpu_count + 1) // 2)
+    diarization_threads = settings.DIARIZATION_TORCH_THREADS or max(
+        1, cpu_count - asr_threads
+    )
+    return asr_threads, diarization_threads
+
+
+def _run_stage(
+    stage_timings: Dict[str, float],
+    stage: str,
+    fn: Callable,
+    *args,
+    torch_threads: Optional[int] = None,
+    progress: Optional[JobProgress] = None,
+):
+    """Run a pipeline stage and record its wall time in `stage_timings`."""
+    if torch_threads:
+        # The intra-op thread count is process-wide in torch, so when the
+        # stages run concurrently the one starting last sets it for both and
+        # the split is only a best effort. Sequential stages get exact budgets.
+        torch.set_num_threads(torch_threads)
+    if progress is not None:
+        progress.stage_started(stage)
+
+    try:
+        with timed(STAGE_SECONDS, stage=stage) as timer:
+            result = fn(*args)
+    finally:
+        stage_timings[stage] = round(timer.seconds, 3)
+    if progress is not None:
+        progress.stage_finished(stage)
+    return result
+
+
+def _with_progress(fn: Callable, progress: Optional[JobProgress]) -> Callable:
+    """Hand `progress` to a stage function that can report finer progress."""
+    return fn if progress is None else partial(fn, progress=progress)
+
+
+def run_asr_and_diarization(
+    audio: Union[str, np.ndarray],
+    stage_timings: Dict[str, float],
+    progress: Optional[JobProgress] = None,
+) -> Tuple[List[TranscriptionSegment], List[SpeakerTurn]]:
+    """
+    Run Whisper transcription and pyannote diarization on the same audio.
+
+    The stages are independent until speaker assignment, so in the
+    "parallel" pipeline mode they run concurrently on two threads (torch
+    releases the GIL) and the end-to-end latency approaches the slower of
+    the two instead of their sum.
+    """
+    transcribe = _with_progress(transcribe_with_whisper, progress)
+    diarize = _with_progress(diarize_with_pyannote, progress)
+
+    parallel = settings.PIPELINE_MODE != "sequential"
+    asr_threads, diarization_threads = _torch_thread_budget(parallel)
+
+    if not parallel:
+        # Whisper transcription (returns TranscriptionSegment objects)
+        segments = _run_stage(
+            stage_timings,
+            "asr",
+            transcribe,
+            audio,
+            torch_threads=asr_threads,
+            progress=progress,
+        )
+        # Diarization with pyannote-audio (community-1 speaker diarization)
+        speaker_turns = _run_stage(
+            stage_timings,
+            "diarization",
+            diarize,
+            audio,
+            torch_threads=diarization_threads,
+            progress=progress,
+        )
+        return segments, speaker_turns
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="pipeline") as pool:
+        asr = pool.submit(
+            _run_stage,
+            stage_timings,
+            "asr",
+            transcribe,
+            audio,
+            torch_threads=asr_threads,
+            progress=progress,
+        )
+        diarization = pool.submit(
+            _run_stage,
+            stage_timings,
+            "diarization",
+            diarize,
+            audio,
+            torch_threads=diarization_threads,
+            progress=progress,
+        )
+        return asr.result(), diarization.result()
+
+
 def process_transcription(
     file_path: str,
     file_name: str,
     file_type: str,
-    duration: float,
+    duration: Optional[float] = None,
     language: str = "en",
     source_url: str = None,
+    transcription_id: Optional[str] = None,
+    progress: Optional[JobProgress] = None,
 ) -> Transcription:
-    """Process transcription synchronously and return complete transcription."""
-    transcription_id = str(uuid.uuid4())
+    """
+    Process transcription synchronously and return complete transcription.
+
+    The media file is decoded once and the same buffer is shared by every
+    stage; `duration` is derived from it unless already known. With
+    `settings.VAD_ENABLED`, ASR and diarization only get its speech. Stage
+    transitions, progress and ASR segments are reported to `progress`.
+    """
+    transcription_id = transcription_id or str(uuid.uuid4())
+    started = time.perf_counter()
 
     transcription = Transcription(
         id=transcription_id,
         status=TranscriptionStatus.PROCESSING,
         file_name=file_name,
         file_type=file_type,
-        duration=round(duration, 2),
+        duration=round(duration, 2) if duration is not None else None,
         language=language,
         segments=[],
     )
 
-    # Whisper transcription (returns TranscriptionSegment objects)
-    segments = transcribe_with_whisper(file_path)
-
-    # Diarization with pyannote-audio (community-1 open-source speaker diarization)
-    speaker_diarization = diarize_with_pyannote(file_path)
+    audio = _run_stage(
+        transcription.stage_timings,
+        "decode",
+        decode_audio,
+        file_path,
+        progress=progress,
+    )
+    if transcription.duration is None:
+        transcription.duration = audio_duration(audio)
+
+    if settings.VAD_ENABLED:
+        speech, timeline = _run_stage(
+            transcription.stage_timings,
+            "vad",
+            detect_speech,
+            audio,
+            progress=progress,
+        )
+        if len(speech):
+            segments, speaker_diarization = run_asr_and_diarization(
+                speech,
+                transcription.stage_timings,
+                progress and _TimelineProgress(progress, timeline),
+            )
+            segments = remap_segments(segments, timeline)
+            speaker_diarization = remap_speaker_turns(speaker_diarization, timeline)
+        else:
+            # Nothing but silence, there is nothing to transcribe
+            segments, speaker_diarization = [], []
+    else:
+        segments, speaker_diarization = run_asr_and_diarization(
+            audio, transcription.stage_timings, progress
+        )
 
-    print("SEGMENTS: ", segments)
-    print("DIARIZATION: ", speaker_diarization)
+    logger.debug(
+        "ASR: %d segments, diarization: %d turns",
+        len(segments),
+        len(speaker_diarization),
+    )
+    if settings.ARTIFACTS_ENABLED:
+        _save_artifacts(transcription_id, segments, speaker_diarization)
 
     # Assign speakers to segments based on diarization
     try:
-        annotated_segments = assign_speaker_by_overlap(segments, speaker_diarization)
+        annotated_segments = _run_stage(
+            transcription.stage_timings,
+            "merge",
+            assign_speaker_by_overlap,
+            segments,
+            speaker_diarization,
+            progress=progress,
+        )
         transcription.segments = annotated_segments
         transcription.status = TranscriptionStatus.COMPLETED
     except Exception as e:
-        print(f"Speaker assignment failed: {e}", e)
+        logger.exception("Speaker assignment failed: %s", e)
         transcription.status = TranscriptionStatus.FAILED
 
+    _observe_transcription(transcription, time.perf_counter() - started)
     return transcription
+
+
+def _save_artifacts(
+    transcription_id: str,
+    segments: List[TranscriptionSegment],
+    speaker_turns: List[SpeakerTurn],
+):
+    """Keep the models' output so the merge can be re-run without them."""
+    try:
+        artifact_storage.save(transcription_id, segments, speaker_turns)
+    except Exception as e:
+        # The transcription itself does not depend on its artifacts
+        logger.warning("Saving artifacts of %s failed: %s", transcription_id, e)
+
+
+def remerge_transcription(
+    transcription: Transcription,
+    artifacts: PipelineArtifacts,
+    request: RemergeRequest,
+) -> Transcription:
+    """
+    Re-run only the merge stage on a transcription's stored artifacts.
+
+    Returns a completed copy of `transcription` with the new segments and
+    the new merge time.
+    """
+    stage_timings = dict(transcription.stage_timings)
+    merge = partial(
+        assign_speaker_by_overlap,
+        min_overlap_seconds=request.min_overlap_seconds,
+        unknown_speaker_label=request.unknown_speaker_label,
+        split_segments=request.split_segments,
+    )
+    segments = _run_stage(
+        stage_timings, "merge", merge, artifacts.segments, artifacts.speaker_turns
+    )
+    return transcription.model_copy(
+        update={
+            "segments": segments,
+            "status": TranscriptionStatus.COMPLETED,
+            "stage_timings": stage_timings,
+        }
+    )
+
+
+def _observe_transcription(transcription: Transcription, processing_seconds: float):
+    """Record the outcome and real-time factor of a processed transcription."""
+    TRANSCRIPTIONS.inc(status=transcription.status.value)
+    if transcription.status != TranscriptionStatus.COMPLETED:
+        return
+    if transcription.duration:
+        AUDIO_SECONDS.inc(transcription.duration)
+        REALTIME_FACTOR.observe(processing_seconds / transcription.duration)
@@ -1,49 +1,170 @@
 """URL download service for YouTube and media URLs."""
 
+import asyncio
+import logging
 import os
-from typing import Tuple
+import uuid
+from typing import Optional, Tuple
 
 import httpx
 from fastapi import HTTPException, status
 
+from config import settings
+from services.metrics import STAGE_SECONDS, UPLOAD_BYTES, timed
+
+logger = logging.getLogger(__name__)
+
+
+def _remove_if_exists(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
 
 class UrlService:
-    """Handle downloading from URLs."""
+    """
+    Handle downloading from URLs.
 
-    @staticmethod
-    async def download_from_url(url: str, output_dir: str) -> Tuple[str, str]:
+    Downloads are streamed to disk in chunks through one pooled client shared
+    by all requests. Interrupted transfers are resumed with HTTP Range
+    requests when the server supports them.
+    """
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        max_size: Optional[int] = None,
+        max_retries: Optional[int] = None,
+    ):
+        self._client = client
+        self.max_size = settings.MAX_FILE_SIZE if max_size is None else max_size
+        self.max_retries = (
+            settings.DOWNLOAD_RETRIES if max_retries is None else max_retries
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared client, created on first use inside the running event loop."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=httpx.Timeout(settings.DOWNLOAD_TIMEOUT_SECONDS),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the shared client and its pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def download_from_url(
+        self, url: str, output_dir: str, file_id: Optional[str] = None
+    ) -> Tuple[str, str]:
         """
-        Download media from URL.
+        Download media from URL into a file unique to `file_id`.
         Returns: (file_path, file_type)
         """
+        filename = url.split("/")[-1] or "downloaded_file"
+        if "?" in filename:
+            filename = filename.split("?")[0]
+        file_id = file_id or str(uuid.uuid4())
+        file_path = os.path.join(
+            output_dir, f"{file_id}_{os.path.basename(filename) or 'downloaded_file'}"
+        )
+
         try:
-            return await UrlService._download_direct(url, output_dir)
+            with timed(STAGE_SECONDS, stage="download"):
+                content_type = await self._download_direct(url, file_path)
+            UPLOAD_BYTES.inc(
+                await asyncio.to_thread(os.path.getsize, file_path), source="url"
+            )
         except Exception as e:
+            await asyncio.to_thread(_remove_if_exists, file_path)
+            if isinstance(e, HTTPException):
+                raise
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Failed to download from URL: {str(e)}",
             )
 
-    # TODO(fgorczynski): add unique session id (uuid) from parent
-    @staticmethod
-    async def _download_direct(url: str, output_dir: str) -> Tuple[str, str]:
-        """Download media from URL."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, follow_redirects=True)
-            response.raise_for_status()
+        return file_path, content_type
+
+    async def _download_direct(self, url: str, file_path: str) -> str:
+        """Stream `url` into `file_path`, resuming after dropped connections."""
+        received = 0
+        content_type = ""
+        retries = 0
+
+        # File I/O runs on worker threads, a slow disk must not stall the loop
+        f = await asyncio.to_thread(open, file_path, "wb")
+        try:
+            while True:
+                # Byte offsets must refer to the file itself, not a compressed body
+                headers = {"Accept-Encoding": "identity"}
+                if received:
+                    headers["Range"] = f"bytes={received}-"
+                try:
+                    async with self.client.stream(
+                        "GET", url, headers=headers, follow_redirects=True
+                    ) as response:
+                        response.raise_for_status()
 
-            content_type = response.headers.get("content-type", "")
+                        if received and not self._resumes_at(response, received):
+                            # The server ignored the range: start over
+                            await asyncio.to_thread(f.truncate, 0)
+                            await asyncio.to_thread(f.seek, 0)
+                            received = 0
+                        if not received:
+                            content_type = response.headers.get("content-type", "")
+                        self._check_size(received + self._remaining_size(response))
 
-            filename = url.split("/")[-1] or "downloaded_file"
-            if "?" in filename:
-                filename = filename.split("?")[0]
+                        # Chunks are written as they arrive (no re-buffering), so
+                        # everything received before a drop is kept for resuming
+                        async for chunk in response.aiter_bytes():
+                            received += len(chunk)
+                            self._check_size(received)
+                            await asyncio.to_thread(f.write, chunk)
+                    return content_type
+                except httpx.TransportError as e:
+                    if retries >= self.max_retries:
+                        raise
+                    retries += 1
+                    logger.warning(
+                        "Download of %s interrupted at %d bytes (%r), resuming (%d/%d)",
+                        url,
+                        received,
+                        e,
+                        retries,
+                        self.max_retries,
+                    )
+        finally:
+            await asyncio.to_thread(f.close)
 
-            file_path = os.path.join(output_dir, filename)
+    @staticmethod
+    def _resumes_at(response: httpx.Response, offset: int) -> bool:
+        """Whether a response continues the transfer at byte `offset`."""
+        content_range = response.headers.get("content-range", "")
+        return response.status_code == status.HTTP_206_PARTIAL_CONTENT and (
+            content_range.startswith(f"bytes {offset}-")
+        )
 
-            with open(file_path, "wb") as f:
-                f.write(response.content)
+    @staticmethod
+    def _remaining_size(response: httpx.Response) -> int:
+        """Bytes announced by Content-Length (0 when unknown)."""
+        try:
+            return int(response.headers.get("content-length", 0))
+        except ValueError:
+            return 0
 
-            return file_path, content_type
+    def _check_size(self, size: int):
+        if size > self.max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File exceeds the maximum size of {self.max_size} bytes",
+            )
 
 
 url_service = UrlService()
@@ -0,0 +1,233 @@
+"""Energy-based voice activity detection and silence-aware audio windowing."""
+
+import math
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+from services.audio_service import SAMPLE_RATE
+
+FRAME_SECONDS = 0.03
+# Frames quieter than this (dBFS) are always silence
+SILENCE_FLOOR_DB = -60.0
+# Frames this far below the loud end of the recording count as silence
+DYNAMIC_RANGE_DB = 35.0
+# Frames analysed at once, bounds the temporary memory on multi-hour audio
+BLOCK_FRAMES = 16384
+
+Span = Tuple[float, float]
+
+
+@dataclass(frozen=True)
+class AudioWindow:
+    """
+    A slice of the recording transcribed on its own (times in seconds).
+
+    `start`/`end` is the audio handed to the model. `keep_start`/`keep_end`
+    is the part this window is responsible for. Keep ranges of consecutive
+    windows tile the timeline without gaps; windows overlap only around
+    cuts that could not be placed in silence.
+    """
+
+    start: float
+    end: float
+    keep_start: float
+    keep_end: float
+
+
+def frame_energy_db(audio: np.ndarray, frame_seconds: float = FRAME_SECONDS):
+    """RMS level (dBFS) of consecutive frames of 16 kHz mono audio."""
+    frame_length = int(frame_seconds * SAMPLE_RATE)
+    frame_count = len(audio) // frame_length
+    energy = np.empty(frame_count, dtype=np.float32)
+
+    for first in range(0, frame_count, BLOCK_FRAMES):
+        last = min(first + BLOCK_FRAMES, frame_count)
+        frames = np.asarray(
+            audio[first * frame_length : last * frame_length], dtype=np.float32
+        ).reshape(last - first, frame_length)
+        energy[first:last] = np.einsum("ij,ij->i", frames, frames) / frame_length
+
+    return 10.0 * np.log10(energy + 1e-12)
+
+
+def speech_spans(
+    audio: np.ndarray,
+    min_silence_seconds: float = 0.3,
+    min_speech_seconds: float = 0.2,
+    padding_seconds: float = 0.1,
+) -> List[Span]:
+    """
+    Return the (start, end) times of speech in 16 kHz mono audio.
+
+    Pauses shorter than `min_silence_seconds` are bridged, bursts shorter
+    than `min_speech_seconds` are dropped and every span is padded so word
+    onsets and tails are not clipped.
+    """
+    energy = frame_energy_db(audio)
+    if len(energy) == 0:
+        return []
+
+    threshold = max(SILENCE_FLOOR_DB, np.percentile(energy, 95) - DYNAMIC_RANGE_DB)
+    is_speech = np.concatenate(([False], energy > threshold, [False]))
+    edges = np.flatnonzero(np.diff(is_speech.astype(np.int8)))
+    starts, ends = edges[::2] * FRAME_SECONDS, edges[1::2] * FRAME_SECONDS
+
+    spans: List[Span] = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if spans and start - spans[-1][1] < min_silence_seconds:
+            spans[-1] = (spans[-1][0], end)
+        else:
+            spans.append((start, end))
+
+    duration = len(audio) / SAMPLE_RATE
+    return [
+        (max(0.0, start - padding_seconds), min(duration, end + padding_seconds))
+        for start, end in spans
+        if end - start >= min_speech_seconds
+    ]
+
+
+def plan_windows(
+    audio: np.ndarray,
+    window_seconds: float,
+    overlap_seconds: float = 1.0,
+    min_silence_seconds: float = 0.3,
+) -> List[AudioWindow]:
+    """
+    Split audio into windows of at most `window_seconds`, cutting in silence.
+
+    Each cut is placed in the latest pause from the second half of the
+    window. Without such a pause the audio is cut hard and both neighbouring
+    windows extend `overlap_seconds / 2` past the cut, so a word spoken
+    across it is heard whole by at least one window.
+    """
+    duration = len(audio) / SAMPLE_RATE
+    if duration <= window_seconds:
+        return [AudioWindow(0.0, duration, 0.0, duration)]
+
+    spans = speech_spans(audio, min_silence_seconds=min_silence_seconds)
+    pause_midpoints = np.array(
+        [(end + start) / 2 for (_, end), (start, _) in zip(spans, spans[1:])]
+        + ([(spans[-1][1] + duration) / 2] if spans else [])
+    )
+
+    cuts: List[Tuple[float, bool]] = []
+    position = 0.0
+    while duration - position > window_seconds:
+        limit = position + window_seconds
+        candidates = pause_midpoints[
+            (pause_midpoints > position + window_seconds / 2)
+            & (pause_midpoints <= limit)
+        ]
+        if len(candidates):
+            cuts.append((round(float(candidates[-1]), 3), False))
+        else:
+            cuts.append((limit, True))
+        position = cuts[-1][0]
+
+    windows = []
+    boundaries = [(0.0, False)] + cuts + [(duration, False)]
+    half_overlap = overlap_seconds / 2
+    for (keep_start, hard_start), (keep_end, hard_end) in zip(
+        boundaries, boundaries[1:]
+    ):
+        windows.append(
+            AudioWindow(
+                start=max(0.0, keep_start - half_overlap) if hard_start else keep_start,
+                end=min(duration, keep_end + half_overlap) if hard_end else keep_end,
+                keep_start=keep_start,
+                keep_end=keep_end,
+            )
+        )
+    return windows
+
+
+def window_samples(audio: np.ndarray, window: AudioWindow) -> np.ndarray:
+    """The samples of `audio` covered by `window`."""
+    return audio[
+        int(math.floor(window.start * SAMPLE_RATE)) : int(
+            math.ceil(window.end * SAMPLE_RATE)
+        )
+    ]
+
+
+@dataclass(frozen=True)
+class SpeechTimeline:
+    """
+    Maps the speech-only audio of a recording back to its original timeline.
+
+    `spans` are the (start, end) times of the speech kept from the original
+    recording, `offsets` where each of them starts in the packed audio.
+    """
+
+    spans: np.ndarray
+    offsets: np.ndarray
+    duration: float
+
+    @property
+    def speech_seconds(self) -> float:
+        return float((self.spans[:, 1] - self.spans[:, 0]).sum())
+
+    @property
+    def skipped_seconds(self) -> float:
+        return max(0.0, self.duration - self.speech_seconds)
+
+    def to_original(self, seconds: float) -> float:
+        """The original time of a time in the packed audio."""
+        if not len(self.spans):
+            return seconds
+        index = max(0, int(np.searchsorted(self.offsets, seconds, "right")) - 1)
+        start, end = self.spans[index]
+        return float(min(end, start + seconds - self.offsets[index]))
+
+    def split_to_original(self, start: float, end: float) -> List[Span]:
+        """
+        The original intervals covered by a packed interval.
+
+        An interval reaching across the joint of two spans is split there,
+        so no interval covers audio that was skipped.
+        """
+        if not len(self.spans):
+            return [(start, end)]
+        first = max(0, int(np.searchsorted(self.offsets, start, "right")) - 1)
+        last = max(0, int(np.searchsorted(self.offsets, end, "left")) - 1)
+        intervals = []
+        for index in range(first, last + 1):
+            span_start, span_end = self.spans[index]
+            offset = self.offsets[index]
+            piece_start = span_start + max(0.0, start - offset)
+            piece_end = min(span_end, span_start + end - offset)
+            if piece_end > piece_start:
+                intervals.append((float(piece_start), float(piece_end)))
+        return intervals
+
+
+def pack_speech(
+    audio: np.ndarray, spans: List[Span]
+) -> Tuple[np.ndarray, SpeechTimeline]:
+    """
+    Concatenate the speech spans of 16 kHz mono audio, dropping the silence.
+
+    Spans are cut at whole samples, so the timeline maps the packed audio
+    back exactly.
+    """
+    bounds: List[Tuple[int, int]] = []
+    for start, end in spans:
+        first = int(math.floor(start * SAMPLE_RATE))
+        if bounds:
+            # Padded spans may touch, never copy samples twice
+            first = max(first, bounds[-1][1])
+        last = min(len(audio), int(math.ceil(end * SAMPLE_RATE)))
+        if last > first:
+            bounds.append((first, last))
+
+    lengths = np.array([end - start for start, end in bounds], dtype=np.int64)
+    packed = np.concatenate([audio[start:end] for start, end in bounds] or [audio[:0]])
+    timeline = SpeechTimeline(
+        spans=np.array(bounds, dtype=np.float64).reshape(-1, 2) / SAMPLE_RATE,
+        offsets=np.concatenate(([0], np.cumsum(lengths)))[:-1] / SAMPLE_RATE,
+        duration=len(audio) / SAMPLE_RATE,
+    )
+    return packed, timeline
@@ -0,0 +1,175 @@
+"""Columnar storage of the intermediate results of the pipeline's models."""
+
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from config import settings
+from models.segments import SegmentTable, TranscriptionSegment
+from models.transcription import SpeakerTurn
+from services.metrics import STORAGE_SECONDS, timed
+
+# Bumped whenever the arrays stored per transcription change
+ARTIFACT_VERSION = 1
+
+
+@dataclass
+class PipelineArtifacts:
+    """The raw ASR segments and speaker turns of one transcription."""
+
+    segments: SegmentTable
+    speaker_turns: List[SpeakerTurn]
+
+
+def _pack_strings(values: Sequence[str]):
+    """One UTF-8 blob and the end offset of every string in it."""
+    encoded = [value.encode("utf-8") for value in values]
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    ends = np.cumsum([len(value) for value in encoded], dtype=np.int64)
+    return blob, ends
+
+
+def _unpack_strings(blob: np.ndarray, ends: np.ndarray) -> List[str]:
+    data = blob.tobytes()
+    starts = np.concatenate(([0], ends[:-1]))
+    return [
+        data[start:end].decode("utf-8")
+        for start, end in zip(starts.tolist(), ends.tolist())
+    ]
+
+
+class ArtifactStorage:
+    """
+    Keep the ASR and diarization output of every transcription on disk.
+
+    Each transcription gets one compressed `.npz` file of columns (times as
+    float64 arrays, texts as one UTF-8 blob with offsets, speakers as codes
+    into a label table), so the merge stage can be re-run without the
+    models. Nothing is pickled.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.path.join(settings.DATA_DIR, "artifacts")
+
+    def get_path(self, transcription_id: str) -> str:
+        if os.path.basename(transcription_id) != transcription_id:
+            raise ValueError(f"Invalid transcription id: {transcription_id}")
+        return os.path.join(self.root, f"{transcription_id}.npz")
+
+    def exists(self, transcription_id: str) -> bool:
+        return os.path.exists(self.get_path(transcription_id))
+
+    @timed(STORAGE_SECONDS, backend="artifacts", operation="save")
+    def save(
+        self,
+        transcription_id: str,
+        segments: Union[SegmentTable, Sequence[TranscriptionSegment]],
+        speaker_turns: Sequence[SpeakerTurn],
+    ) -> str:
+        """Write the artifacts of a transcription (replacing older ones)."""
+        path = self.get_path(transcription_id)
+        os.makedirs(self.root, exist_ok=True)
+
+        segments = SegmentTable.from_segments(segments)
+        text_blob, text_ends = _pack_strings(segments.texts)
+        labels, speaker_codes = np.unique(
+            np.array([turn.speaker for turn in speaker_turns], dtype=str),
+            return_inverse=True,
+        )
+        label_blob, label_ends = _pack_strings(labels.tolist())
+        columns = {
+            "version": np.array(ARTIFACT_VERSION),
+            "segment_start": segments.start_times,
+            "segment_end": segments.end_times,
+            "segment_text": text_blob,
+            "segment_text_end": text_ends,
+            "turn_start": np.array([t.start for t in speaker_turns], np.float64),
+            "turn_end": np.array([t.end for t in speaker_turns], np.float64),
+            "turn_speaker": speaker_codes.astype(np.int32),
+            "speaker_label": label_blob,
+            "speaker_label_end": label_ends,
+        }
+
+        # Written next to the target and renamed, readers never see half a file
+        fd, temp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **columns)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return path
+
+    @timed(STORAGE_SECONDS, backend="artifacts", operation="get")
+    def get(self, transcription_id: str) -> Optional[PipelineArtifacts]:
+        """Load the artifacts of a transcription, None if there are none."""
+        path = self.get_path(transcription_id)
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path, allow_pickle=False) as columns:
+            if int(columns["version"]) != ARTIFACT_VERSION:
+                return None
+            texts = _unpack_strings(
+                columns["segment_text"], columns["segment_text_end"]
+            )
+            labels = _unpack_strings(
+                columns["speaker_label"], columns["speaker_label_end"]
+            )
+            segments = SegmentTable(
+                starts=columns["segment_start"],
+                ends=columns["segment_end"],
+                texts=texts,
+            )
+            speaker_turns = [
+                SpeakerTurn(start=start, end=end, speaker=labels[code])
+                for start, end, code in zip(
+                    columns["turn_start"].tolist(),
+                    columns["turn_end"].tolist(),
+                    columns["turn_speaker"].tolist(),
+                )
+            ]
+        return PipelineArtifacts(segments, speaker_turns)
+
+    def copy(self, source_id: str, target_id: str) -> bool:
+        """
+        Give `target_id` the artifacts of `source_id`, False if it has none.
+
+        Artifacts are never modified in place (saving replaces the file), so
+        a hard link is enough; filesystems without links get a copy.
+        """
+        source = self.get_path(source_id)
+        if not os.path.exists(source):
+            return False
+
+        fd, temp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        try:
+            os.unlink(temp_path)
+            try:
+                os.link(source, temp_path)
+            except OSError:
+                shutil.copyfile(source, temp_path)
+            os.replace(temp_path, self.get_path(target_id))
+        except FileNotFoundError:
+            # The source was deleted meanwhile
+            return False
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        return True
+
+    def delete(self, transcription_id: str) -> bool:
+        try:
+            os.unlink(self.get_path(transcription_id))
+        except FileNotFoundError:
+            return False
+        return True
+
+
+artifact_storage = ArtifactStorage()
@@ -0,0 +1,144 @@
+"""Storage backend interface for transcription data."""
+
+import base64
+import json
+import operator
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from models.transcription import (
+    SortField,
+    SortOrder,
+    Transcription,
+    TranscriptionItem,
+    TranscriptionQuery,
+)
+from storage import serialization
+
+SortValue = Union[str, float]
+SummaryPage = Tuple[List[TranscriptionItem], Optional[str]]
+
+
+class StorageBackend(ABC):
+    """Interface implemented by every transcription storage backend."""
+
+    @abstractmethod
+    def save(self, transcription: Transcription) -> Transcription:
+        """Insert or replace a transcription."""
+
+    @abstractmethod
+    def get(self, transcription_id: str) -> Optional[Transcription]:
+        """Retrieve a transcription by ID."""
+
+    def get_json(self, transcription_id: str) -> Optional[bytes]:
+        """A transcription as the JSON body of an API response."""
+        transcription = self.get(transcription_id)
+        if transcription is None:
+            return None
+        return serialization.transcription_json(transcription)
+
+    @abstractmethod
+    def list_all(self) -> List[Transcription]:
+        """List all transcriptions."""
+
+    @abstractmethod
+    def list_summaries(self, query: TranscriptionQuery) -> SummaryPage:
+        """
+        Return one page of summaries matching `query` and the cursor of the
+        next page (None on the last page). Never loads segment data.
+        """
+
+    @abstractmethod
+    def iter_summaries(self, query: TranscriptionQuery) -> Iterator[TranscriptionItem]:
+        """Stream every summary matching `query`, ignoring cursor and limit."""
+
+    def stats(self) -> dict:
+        """Backend state for monitoring (e.g. cache counters)."""
+        return {}
+
+
+def to_timestamp(value: Optional[datetime]) -> float:
+    """Epoch seconds of a datetime; naive datetimes are treated as UTC."""
+    if value is None:
+        return 0.0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def sort_value(item: TranscriptionItem, sort_by: SortField) -> SortValue:
+    """Value of the sort column for an item (missing durations sort first)."""
+    if sort_by == SortField.FILE_NAME:
+        return item.file_name
+    if sort_by == SortField.DURATION:
+        return item.duration if item.duration is not None else -1.0
+    return to_timestamp(item.created_at)
+
+
+def encode_cursor(item: TranscriptionItem, sort_by: SortField) -> str:
+    """Opaque cursor pointing right after `item` in the given sort order."""
+    payload = json.dumps([sort_by.value, sort_value(item, sort_by), item.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_by: SortField) -> Tuple[SortValue, str]:
+    """Decode a cursor produced by `encode_cursor` for the same sort field."""
+    try:
+        cursor_sort_by, value, transcription_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if cursor_sort_by != sort_by.value:
+        raise ValueError("Cursor does not match the requested sort order")
+    return value, transcription_id
+
+
+def matches(item: TranscriptionItem, query: TranscriptionQuery) -> bool:
+    """Whether an item passes the query filters."""
+    if query.status is not None and item.status != query.status:
+        return False
+    if query.language is not None and item.language != query.language:
+        return False
+    created_at = to_timestamp(item.created_at)
+    if query.created_after and created_at < to_timestamp(query.created_after):
+        return False
+    if query.created_before and created_at >= to_timestamp(query.created_before):
+        return False
+    return True
+
+
+def filter_and_sort(
+    items: Iterable[TranscriptionItem], query: TranscriptionQuery
+) -> List[TranscriptionItem]:
+    """Filter and sort summaries in memory (for backends without an engine)."""
+    descending = query.order == SortOrder.DESC
+    return sorted(
+        (item for item in items if matches(item, query)),
+        key=lambda item: (sort_value(item, query.sort_by), item.id),
+        reverse=descending,
+    )
+
+
+def paginate(
+    items: Iterable[TranscriptionItem], query: TranscriptionQuery
+) -> SummaryPage:
+    """Apply filters, sorting and keyset pagination to summaries in memory."""
+    ordered = filter_and_sort(items, query)
+
+    if query.cursor:
+        after = decode_cursor(query.cursor, query.sort_by)
+        is_after = operator.lt if query.order == SortOrder.DESC else operator.gt
+        ordered = [
+            item
+            for item in ordered
+            if is_after((sort_value(item, query.sort_by), item.id), after)
+        ]
+
+    page = ordered[: query.limit]
+    next_cursor = None
+    if len(ordered) > query.limit:
+        next_cursor = encode_cursor(page[-1], query.sort_by)
+    return page, next_cursor
@@ -3,26 +3,79 @@
 import fcntl
 import json
 import os
-from contextlib import contextmanager
-from typing import Dict, List, Optional
+import re
+import stat
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from models.transcription import Transcription
+from models.transcription import Transcription, TranscriptionItem, TranscriptionQuery
+from storage import serialization
+from storage.base import StorageBackend, SummaryPage, filter_and_sort, paginate
+from storage.record_cache import RecordCache
+from storage.sqlite_storage import SQLiteStorage
+from services.metrics import (
+    STORAGE_COMMIT_BATCH_SIZE,
+    STORAGE_FSYNC_SECONDS,
+    STORAGE_SECONDS,
+    timed,
+)
 from config import settings
 
+# (inode, modification time, size) of a storage file
+FileStamp = Tuple[int, int, int]
 
-class DataStorage:
+# The generation is the first key of a file, so it is read without parsing it
+GENERATION_HEAD = re.compile(
+    rb'\{\s*"' + re.escape(serialization.GENERATION_KEY.encode()) + rb'":\s*(\d+)'
+)
+
+DATA_KEY = ("data", "")
+INDEX_KEY = ("index", "")
+
+
+@dataclass
+class PendingCommit:
+    """Saves waiting to be written to disk together."""
+
+    # Stored record and summary by transcription id (a later save replaces both)
+    records: Dict[str, Tuple[Dict, Dict]] = field(default_factory=dict)
+    done: threading.Event = field(default_factory=threading.Event)
+    error: Optional[BaseException] = None
+
+
+class DataStorage(StorageBackend):
     """Simple JSON file-based storage for transcriptions."""
 
     def __init__(self):
         self.data_file = os.path.join(settings.DATA_DIR, "transcriptions.json")
+        # Summaries only (no segments), so listings never parse full transcripts
+        self.index_file = os.path.join(settings.DATA_DIR, "transcriptions.index.json")
+        # Held by the writers of every process while they replace the files
+        self.lock_file = os.path.join(settings.DATA_DIR, "transcriptions.json.lock")
+        # Parsed files and response bodies, checked against the files on disk
+        self._cache = RecordCache()
+        # Group commit: saves join the pending commit until its first saver
+        # gets to write it
+        self._pending: Optional[PendingCommit] = None
+        self._pending_lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self.commits = 0
+        self.committed_saves = 0
         self._ensure_data_file()
 
     def _ensure_data_file(self):
-        """Ensure data directory and file exist."""
+        """Ensure data directory and file exist, removing unfinished writes."""
         os.makedirs(settings.DATA_DIR, exist_ok=True)
-        if not os.path.exists(self.data_file):
-            with open(self.data_file, "w") as f:
-                json.dump({}, f)
+        with self._write_lock():
+            for name in os.listdir(settings.DATA_DIR):
+                if name.startswith("transcriptions.") and name.endswith(".tmp"):
+                    os.unlink(os.path.join(settings.DATA_DIR, name))
+            if not os.path.exists(self.data_file):
+                self._write_file(self.data_file, {}, "data")
 
     @contextmanager
     def _lock_file(self, file_handle, mode):
@@ -33,36 +86,322 @@ class DataStorage:
         finally:
             fcntl.flock(file_handle, fcntl.LOCK_UN)
 
-    def _load_data(self) -> Dict:
-        """Load all data from JSON file with read lock."""
-        with open(self.data_file, "r") as f:
-            with self._lock_file(f, fcntl.LOCK_SH):
-                return json.load(f)
-
-    def _save_data(self, data: Dict):
-        """Save all data to JSON file with write lock."""
-        with open(self.data_file, "w") as f:
+    @contextmanager
+    def _write_lock(self):
+        """
+        Exclusive lock of the writers of every process.
+
+        It is taken on a file of its own: the data and index files are
+        replaced by every write, so a lock on them would not outlive it.
+        Readers take no lock, they see either the old or the new file.
+        """
+        with open(self.lock_file, "a") as f:
             with self._lock_file(f, fcntl.LOCK_EX):
-                json.dump(data, f, indent=2, default=str)
+                yield
+
+    def _write_file(
+        self,
+        path: str,
+        value: Dict,
+        name: str,
+        generation: Optional[int] = None,
+        **dump_options,
+    ) -> FileStamp:
+        """
+        Replace `path` with `value` as JSON, returning the stamp of the new file.
+
+        The JSON is written to a temporary file in the same directory, which
+        is fsynced and renamed over `path`. A crash leaves either version of
+        the file, never a partly written one. Call with the write lock held.
+        A `generation` is written as the first key of the file.
+        """
+        if generation is not None:
+            value = {serialization.GENERATION_KEY: generation, **value}
+        directory = os.path.dirname(path)
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o644
+        fd, temp_path = tempfile.mkstemp(
+            prefix=f"{os.path.basename(path)}.", suffix=".tmp", dir=directory
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                os.fchmod(f.fileno(), mode)
+                json.dump(value, f, default=str, **dump_options)
+                f.flush()
+                with timed(STORAGE_FSYNC_SECONDS, file=name):
+                    os.fsync(f.fileno())
+                stamp = _stamp(os.fstat(f.fileno()))
+            os.replace(temp_path, path)
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.unlink(temp_path)
+            raise
+        _fsync_directory(directory)
+        return stamp
+
+    def _read_file(self, path: str) -> Tuple[Dict, FileStamp, int]:
+        """A storage file without its generation, its stamp and its generation."""
+        with open(path, "rb") as f:
+            value = serialization.loads(f.read())
+            stamp = _stamp(os.fstat(f.fileno()))
+        return value, stamp, value.pop(serialization.GENERATION_KEY, 0)
+
+    def _data_generation(self) -> int:
+        """Number of the current version of the data file (0 before any save)."""
+        return _read_generation(self.data_file) or 0
+
+    def _load_data(self) -> Dict:
+        """Load all data from the JSON file."""
+        return self._load_stamped_data()[0]
+
+    def _load_stamped_data(self) -> Tuple[Dict, FileStamp]:
+        """Load all data and the stamp of the file version it was read from."""
+        data, stamp, generation = self._read_file(self.data_file)
+        # Records written before they were stamped (or by `_save_data`) take
+        # the generation of the file; changing them writes a new generation
+        for record in data.values():
+            record.setdefault(serialization.GENERATION_KEY, generation)
+        return data, stamp
+
+    def _save_data(self, data: Dict) -> FileStamp:
+        """Replace all data under the write lock, returning the new stamp."""
+        self._cache.discard(DATA_KEY)
+        with self._write_lock():
+            return self._write_data(data, self._data_generation() + 1)
+
+    def _write_data(self, data: Dict, generation: int) -> FileStamp:
+        """
+        Replace all data; call with the write lock held.
+
+        Every version of the data file gets the next generation, which the
+        index written for it is stamped with.
+        """
+        return self._write_file(
+            self.data_file, data, "data", generation=generation, indent=2
+        )
+
+    def _write_index(self, index: Dict, generation: int):
+        """Replace the index built from the data file of `generation`."""
+        self._write_file(self.index_file, index, "index", generation=generation)
+
+    def _index_is_stale(self) -> bool:
+        """
+        Whether the index is missing or was not written for the current data.
+
+        Commits replace the data file before the index, so a crash between
+        the two (or a data file saved before the index existed) leaves an
+        index stamped with another generation of the data.
+        """
+        index_generation = _read_generation(self.index_file)
+        return index_generation is None or index_generation != (self._data_generation())
+
+    def _records(self) -> Dict:
+        """
+        All records, parsed again only when the data file has changed.
+
+        The dict is shared with other readers and must not be modified.
+        """
+        stamp = _stamp(os.stat(self.data_file))
+        data = self._cache.get(DATA_KEY, stamp)
+        if data is None:
+            data, stamp = self._load_stamped_data()
+            self._cache.put(DATA_KEY, stamp, data, size=stamp[2])
+        return data
+
+    def _load_index(self) -> Dict:
+        """Load the summary index, building it from the data file if stale."""
+        return self._load_stamped_index()[0]
 
+    def _load_stamped_index(self) -> Tuple[Dict, FileStamp]:
+        if self._index_is_stale():
+            self._rebuild_index()
+        return self._read_file(self.index_file)[:2]
+
+    def _save_index(self, index: Dict):
+        """Replace the summary index of the current data under the write lock."""
+        self._cache.discard(INDEX_KEY)
+        with self._write_lock():
+            self._write_index(index, self._data_generation())
+
+    def _rebuild_index(self):
+        """Build the summary index from the data file, unless it is up to date."""
+        with self._write_lock():
+            # Another writer may have brought it up to date in the meantime
+            if self._index_is_stale():
+                self._cache.discard(INDEX_KEY)
+                data = self._load_data()
+                self._write_index(_summaries(data), self._data_generation())
+
+    @timed(STORAGE_SECONDS, backend="json", operation="save")
     def save(self, transcription: Transcription) -> Transcription:
-        """Save a transcription."""
-        data = self._load_data()
-        data[transcription.id] = transcription.model_dump(mode="json")
-        self._save_data(data)
+        """
+        Save a transcription, returning once it is on disk.
+
+        Saves made while another commit is being written (or within
+        `settings.STORAGE_COMMIT_WINDOW_MS`) are written together by the
+        first of them, with a single rewrite of the data and index files.
+        """
+        record = serialization.to_record(transcription)
+        item = transcription.to_item().model_dump(mode="json")
+        with self._pending_lock:
+            commit = self._pending
+            leader = commit is None
+            if leader:
+                commit = self._pending = PendingCommit()
+            commit.records[transcription.id] = (record, item)
+
+        if leader:
+            self._commit(commit)
+        else:
+            commit.done.wait()
+        if commit.error is not None:
+            raise commit.error
         return transcription
 
+    def _commit(self, commit: PendingCommit):
+        """Write a pending commit once the one in progress is done."""
+        with self._commit_lock:
+            window = settings.STORAGE_COMMIT_WINDOW_MS
+            if window > 0:
+                time.sleep(window / 1000)
+            with self._pending_lock:
+                # Saves from now on start the next commit
+                self._pending = None
+            try:
+                self._write_commit(commit.records)
+            except BaseException as e:
+                commit.error = e
+            finally:
+                commit.done.set()
+
+    def _write_commit(self, records: Dict[str, Tuple[Dict, Dict]]):
+        with self._write_lock():
+            # A copy: readers may still hold the cached dict
+            data = dict(self._records())
+            if self._index_is_stale():
+                index = _summaries(data)
+            else:
+                index = self._read_file(self.index_file)[0]
+            generation = self._data_generation() + 1
+            for transcription_id, (record, item) in records.items():
+                record[serialization.GENERATION_KEY] = generation
+                data[transcription_id] = record
+                index[transcription_id] = item
+
+            stamp = self._write_data(data, generation)
+            self._cache.put(DATA_KEY, stamp, data, size=stamp[2])
+            self._write_index(index, generation)
+
+        self.commits += 1
+        self.committed_saves += len(records)
+        STORAGE_COMMIT_BATCH_SIZE.observe(len(records))
+
+    @timed(STORAGE_SECONDS, backend="json", operation="get")
     def get(self, transcription_id: str) -> Optional[Transcription]:
         """Retrieve a transcription by ID."""
-        data = self._load_data()
-        if transcription_id in data:
-            return Transcription(**data[transcription_id])
-        return None
+        record = self._records().get(transcription_id)
+        if record is None:
+            return None
+        return serialization.from_record(record)
+
+    @timed(STORAGE_SECONDS, backend="json", operation="get_json")
+    def get_json(self, transcription_id: str) -> Optional[bytes]:
+        """
+        A transcription as the JSON body of an API response.
 
+        Bodies are cached by the generation their record was written in, so
+        they outlive re-reads of the data file for as long as the record is
+        unchanged; records of the current schema are encoded without
+        building a model.
+        """
+        record = self._records().get(transcription_id)
+        if record is None:
+            return None
+        key = ("json", transcription_id)
+        generation = record[serialization.GENERATION_KEY]
+        body = self._cache.get(key, generation)
+        if body is None:
+            body = serialization.record_json(record)
+            self._cache.put(key, generation, body, size=len(body))
+        return body
+
+    @timed(STORAGE_SECONDS, backend="json", operation="list_all")
     def list_all(self) -> List[Transcription]:
         """List all transcriptions."""
-        data = self._load_data()
-        return [Transcription(**t) for t in data.values()]
+        return [serialization.from_record(r) for r in self._records().values()]
+
+    def list_summaries(self, query: TranscriptionQuery) -> SummaryPage:
+        """Return one page of summaries from the index."""
+        return paginate(self._index_items(), query)
+
+    def iter_summaries(self, query: TranscriptionQuery) -> Iterator[TranscriptionItem]:
+        """Stream all summaries matching the query filters."""
+        yield from filter_and_sort(self._index_items(), query)
+
+    @timed(STORAGE_SECONDS, backend="json", operation="list_summaries")
+    def _index_items(self) -> List[TranscriptionItem]:
+        """Summaries of the index, built again only when the index has changed."""
+        if not self._index_is_stale():
+            items = self._cache.get(INDEX_KEY, _stamp(os.stat(self.index_file)))
+            if items is not None:
+                return items
+        index, stamp = self._load_stamped_index()
+        items = [TranscriptionItem(**item) for item in index.values()]
+        self._cache.put(INDEX_KEY, stamp, items, size=stamp[2])
+        return items
+
+    def stats(self) -> dict:
+        return {
+            "backend": "json",
+            "cache": self._cache.stats(),
+            "commits": self.commits,
+            "committed_saves": self.committed_saves,
+        }
+
+
+def _stamp(stat_result: os.stat_result) -> FileStamp:
+    return stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size
+
+
+def _read_generation(path: str) -> Optional[int]:
+    """Generation of a storage file, None if it is missing or has none."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(64)
+    except FileNotFoundError:
+        return None
+    match = GENERATION_HEAD.match(head)
+    return int(match.group(1)) if match else None
+
+
+def _summaries(data: Dict) -> Dict:
+    """Summary index entries of stored records."""
+    fields = TranscriptionItem.model_fields
+    return {
+        transcription_id: {k: v for k, v in record.items() if k in fields}
+        for transcription_id, record in data.items()
+    }
+
+
+def _fsync_directory(path: str):
+    """Make a rename in `path` survive a crash."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        with timed(STORAGE_FSYNC_SECONDS, file="dir"):
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def create_storage() -> StorageBackend:
+    """Build the storage backend selected by `settings.STORAGE_BACKEND`."""
+    if settings.STORAGE_BACKEND == "sqlite":
+        return SQLiteStorage()
+    if settings.STORAGE_BACKEND != "json":
+        raise ValueError(f"Unsupported storage backend: {settings.STORAGE_BACKEND}")
+    return DataStorage()
 
 
-storage = DataStorage()
+storage = create_storage()
@@ -1,9 +1,39 @@
 """File system storage for uploaded files."""
 
+import asyncio
+import hashlib
+import logging
 import os
 import shutil
-from typing import BinaryIO
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import AsyncIterable, BinaryIO, Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+
 from config import settings
+from services.metrics import STAGE_SECONDS, UPLOAD_BYTES, timed
+
+logger = logging.getLogger(__name__)
+
+# Enough leading bytes to recognize every supported container
+SNIFF_BYTES = 64
+
+
+@dataclass
+class StoredFile:
+    """An upload written to disk by `FileStorage.save_stream`."""
+
+    file_path: str
+    size: int
+    sha256: str
+    content_type: Optional[str] = None
+
+
+def _write_chunk(f: BinaryIO, digest, chunk: bytes):
+    digest.update(chunk)
+    f.write(chunk)
 
 
 class FileStorage:
@@ -11,6 +41,8 @@ class FileStorage:
 
     def __init__(self):
         self.upload_dir = settings.UPLOAD_DIR
+        self._rendition_locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
         self._ensure_upload_dir()
 
     def _ensure_upload_dir(self):
@@ -19,19 +51,133 @@ class FileStorage:
 
     def save_file(self, file_id: str, filename: str, file_obj: BinaryIO) -> str:
         """Save an uploaded file."""
-        print("Saving file:", file_id, filename)
-        safe_filename = f"{file_id}_{filename}"
-        file_path = os.path.join(self.upload_dir, safe_filename)
+        logger.debug("Saving file %s (%s)", file_id, filename)
+        file_path = self.get_file_path(file_id, filename)
 
-        with open(file_path, "wb") as f:
-            shutil.copyfileobj(file_obj, f)
+        with timed(STAGE_SECONDS, stage="save"):
+            with open(file_path, "wb") as f:
+                shutil.copyfileobj(file_obj, f)
+                UPLOAD_BYTES.inc(f.tell(), source="multipart")
 
         return file_path
 
+    async def save_stream(
+        self,
+        file_id: str,
+        filename: str,
+        chunks: AsyncIterable[bytes],
+        max_size: int,
+        validate_head: Optional[Callable[[bytes], str]] = None,
+    ) -> StoredFile:
+        """
+        Write body chunks straight to the upload location.
+
+        The SHA-256 is computed while writing. The upload is aborted with 413
+        as soon as it grows past `max_size`. `validate_head` receives the first
+        SNIFF_BYTES bytes and returns the content type (or raises to reject
+        the upload). The partial file is removed whenever the upload fails.
+        """
+        file_path = self.get_file_path(file_id, filename)
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        content_type = None
+
+        # Disk I/O (and hashing, which releases the GIL) runs on worker
+        # threads, so a slow disk does not stall the event loop
+        f = await asyncio.to_thread(open, file_path, "wb")
+        try:
+            try:
+                with timed(STAGE_SECONDS, stage="save"):
+                    async for chunk in chunks:
+                        if not chunk:
+                            continue
+                        size += len(chunk)
+                        if size > max_size:
+                            raise HTTPException(
+                                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                detail=f"File exceeds the maximum size of {max_size} bytes",
+                            )
+                        if validate_head and content_type is None:
+                            head += chunk[: SNIFF_BYTES - len(head)]
+                            if len(head) >= SNIFF_BYTES:
+                                content_type = validate_head(head)
+                        await asyncio.to_thread(_write_chunk, f, digest, chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+
+            if validate_head and content_type is None:
+                content_type = validate_head(head)
+        except BaseException:
+            await asyncio.to_thread(os.remove, file_path)
+            raise
+
+        UPLOAD_BYTES.inc(size, source="stream")
+        logger.debug("Saved file %s (%s): %d bytes", file_id, filename, size)
+        return StoredFile(file_path, size, digest.hexdigest(), content_type)
+
     def get_file_path(self, file_id: str, filename: str) -> str:
         """Get the full path for a file."""
-        safe_filename = f"{file_id}_{filename}"
+        # Client-supplied names must not escape the upload directory
+        safe_filename = f"{file_id}_{os.path.basename(filename)}"
         return os.path.join(self.upload_dir, safe_filename)
 
+    def find_file(self, file_id: str, filename: Optional[str] = None) -> Optional[str]:
+        """Path of the upload stored for `file_id`, None if there is none."""
+        if filename is not None:
+            file_path = self.get_file_path(file_id, filename)
+            if os.path.isfile(file_path):
+                return file_path
+        # URL downloads drop the query string from the stored name
+        prefix = f"{file_id}_"
+        with os.scandir(self.upload_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith(prefix) and entry.is_file():
+                    return entry.path
+        return None
+
+    def get_rendition(
+        self,
+        file_id: str,
+        source_path: str,
+        extension: str,
+        transcode: Callable[[str, str], None],
+    ) -> str:
+        """
+        Path of a converted copy of an upload, created on first use.
+
+        `transcode(source_path, output_path)` writes the copy. It is cached in
+        the `renditions` directory and rebuilt when the upload is newer;
+        concurrent requests for the same copy wait for one conversion.
+        """
+        rendition_dir = os.path.join(self.upload_dir, "renditions")
+        rendition_path = os.path.join(rendition_dir, f"{file_id}.{extension}")
+        with self._locks_lock:
+            lock = self._rendition_locks.setdefault(rendition_path, threading.Lock())
+
+        with lock:
+            if self._is_fresh(rendition_path, source_path):
+                return rendition_path
+            os.makedirs(rendition_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(
+                dir=rendition_dir, suffix=f".tmp.{extension}"
+            )
+            os.close(fd)
+            try:
+                with timed(STAGE_SECONDS, stage="transcode"):
+                    transcode(source_path, temp_path)
+                os.replace(temp_path, rendition_path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        return rendition_path
+
+    @staticmethod
+    def _is_fresh(rendition_path: str, source_path: str) -> bool:
+        try:
+            return os.path.getmtime(rendition_path) >= os.path.getmtime(source_path)
+        except FileNotFoundError:
+            return False
+
 
 file_storage = FileStorage()
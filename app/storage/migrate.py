@@ -0,0 +1,72 @@
+"""
+Import transcriptions from the JSON file storage into SQLite.
+
+Usage (from the app directory):
+
+    python -m storage.migrate [--json data/transcriptions.json] [--db data/transcriptions.db]
+"""
+
+import argparse
+import json
+import os
+from typing import Iterator
+
+from config import settings
+from models.transcription import Transcription
+from storage import serialization
+from storage.sqlite_storage import SQLiteStorage
+
+BATCH_SIZE = 500
+
+
+def _read_json(json_path: str) -> Iterator[Transcription]:
+    """Yield transcriptions stored in a DataStorage JSON file."""
+    with open(json_path, "r") as f:
+        data = json.load(f)
+    data.pop(serialization.GENERATION_KEY, None)
+
+    # Records written before `created_at` existed get the file's mtime
+    fallback_created_at = os.path.getmtime(json_path)
+    for record in data.values():
+        record.setdefault("created_at", fallback_created_at)
+        yield Transcription(**record)
+
+
+def migrate_json_to_sqlite(json_path: str, sqlite_storage: SQLiteStorage) -> int:
+    """
+    Copy every transcription from `json_path` into `sqlite_storage`.
+
+    Existing rows with the same id are replaced, so the migration can be
+    re-run safely. Returns the number of imported transcriptions.
+    """
+    imported = 0
+    batch = []
+    for transcription in _read_json(json_path):
+        batch.append(transcription)
+        if len(batch) >= BATCH_SIZE:
+            imported += sqlite_storage.save_many(batch)
+            batch = []
+    imported += sqlite_storage.save_many(batch)
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--json",
+        default=os.path.join(settings.DATA_DIR, "transcriptions.json"),
+        help="DataStorage JSON file to import",
+    )
+    parser.add_argument(
+        "--db",
+        default=os.path.join(settings.DATA_DIR, "transcriptions.db"),
+        help="SQLite database to import into",
+    )
+    args = parser.parse_args()
+
+    imported = migrate_json_to_sqlite(args.json, SQLiteStorage(args.db))
+    print(f"Imported {imported} transcriptions from {args.json} into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Bounded read cache of what the JSON storage backend loads from disk."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional, Tuple
+
+from config import settings
+from services.metrics import STORAGE_CACHE_LOOKUPS
+
+# (kind, id): kind is "data", "index" or "json", the id is empty for files
+CacheKey = Tuple[str, str]
+
+
+class CacheEntry(NamedTuple):
+    version: Any
+    value: Any
+    size: int
+
+
+class RecordCache:
+    """
+    LRU cache of values read from storage files, bounded by entries and bytes.
+
+    Every value is stored with the version of the source it was built from
+    (the stamp of a file, or the generation a record was written in) and is
+    only returned for that same version. Callers check the file on every lookup, so a
+    value never outlives a change on disk, whichever process made it.
+    Sizes are the bytes of JSON a value was read from or encodes to.
+    """
+
+    def __init__(
+        self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None
+    ):
+        if max_entries is None:
+            max_entries = settings.STORAGE_CACHE_ENTRIES
+        if max_bytes is None:
+            max_bytes = int(settings.STORAGE_CACHE_MB * 2**20)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: CacheKey, version: Any) -> Optional[Any]:
+        """Return the value cached for `version`, counting a hit or a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            hit = entry is not None and entry.version == version
+            if hit:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        STORAGE_CACHE_LOOKUPS.inc(kind=key[0], result="hit" if hit else "miss")
+        return entry.value if hit else None
+
+    def put(self, key: CacheKey, version: Any, value: Any, size: int):
+        """Store a value, evicting the least recently used ones over the limits."""
+        if not self.enabled or size > self.max_bytes:
+            self.discard(key)
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.size
+            self._entries[key] = CacheEntry(version, value, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.size
+                self.evictions += 1
+
+    def discard(self, key: CacheKey):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry.size
+
+    def clear(self):
+        """Drop every cached value and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Cache size and hit/miss counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,90 @@
+"""
+JSON encoding of stored transcriptions, with a trusted fast path.
+
+Records written by this service carry `schema_version`. Records of the
+current version are rebuilt without validation (`model_construct`), and can
+be encoded to JSON as they are, without building a model at all. Older or
+foreign records go through full validation.
+
+orjson is used when installed, otherwise the standard library.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+from models.segments import SegmentTable
+from models.transcription import Transcription, TranscriptionStatus
+
+# Bumped whenever the stored record of a transcription changes shape
+SCHEMA_VERSION = 1
+
+# Key of the write counter stored first in the JSON storage files, next to
+# the records (data file) or summaries (index) keyed by transcription id;
+# each record also carries the generation of the write that stored it
+GENERATION_KEY = "__generation__"
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON, as FastAPI's JSONResponse renders it."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(data) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def to_record(transcription: Transcription) -> Dict[str, Any]:
+    """JSON-compatible record of a transcription, stamped with the schema."""
+    record = transcription.model_dump(mode="json")
+    record["schema_version"] = SCHEMA_VERSION
+    return record
+
+
+def is_trusted(record: Dict[str, Any]) -> bool:
+    """Whether a record was written by this service in the current schema."""
+    return record.get("schema_version") == SCHEMA_VERSION
+
+
+def from_record(record: Dict[str, Any]) -> Transcription:
+    """Rebuild a transcription, validating only records of other schemas."""
+    if not is_trusted(record):
+        return Transcription.model_validate(record)
+    return Transcription.model_construct(
+        id=record["id"],
+        status=TranscriptionStatus(record["status"]),
+        file_name=record["file_name"],
+        file_type=record["file_type"],
+        duration=record["duration"],
+        language=record["language"],
+        segments=SegmentTable.from_records(record["segments"]),
+        created_at=datetime.fromisoformat(record["created_at"]),
+        stage_timings=record["stage_timings"],
+    )
+
+
+def record_json(record: Dict[str, Any]) -> bytes:
+    """API response body of a stored record."""
+    if not is_trusted(record):
+        return transcription_json(from_record(record))
+    return dumps(
+        {
+            key: value
+            for key, value in record.items()
+            if key not in ("schema_version", GENERATION_KEY)
+        }
+    )
+
+
+def transcription_json(transcription: Transcription) -> bytes:
+    """API response body of a transcription."""
+    return dumps(transcription.model_dump(mode="json"))
@@ -0,0 +1,303 @@
+"""SQLite-based storage for transcription data."""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from models.segments import SegmentTable
+from models.transcription import (
+    SortField,
+    SortOrder,
+    Transcription,
+    TranscriptionItem,
+    TranscriptionQuery,
+    TranscriptionStatus,
+)
+from storage.base import (
+    StorageBackend,
+    SummaryPage,
+    decode_cursor,
+    encode_cursor,
+    to_timestamp,
+)
+from services.metrics import STORAGE_SECONDS, timed
+from config import settings
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcriptions (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    duration REAL,
+    language TEXT,
+    created_at REAL NOT NULL,
+    stage_timings TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_transcriptions_status
+    ON transcriptions (status);
+CREATE INDEX IF NOT EXISTS idx_transcriptions_created_at
+    ON transcriptions (created_at);
+
+CREATE TABLE IF NOT EXISTS segments (
+    transcription_id TEXT NOT NULL
+        REFERENCES transcriptions (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    speaker TEXT,
+    overlap_seconds REAL,
+    simultaneous_speech INTEGER NOT NULL DEFAULT 0,
+    text TEXT NOT NULL,
+    PRIMARY KEY (transcription_id, position)
+) WITHOUT ROWID;
+"""
+
+TRANSCRIPTION_COLUMNS = (
+    "id, status, file_name, file_type, duration, language, created_at, stage_timings"
+)
+SEGMENT_COLUMNS = (
+    "id, start_time, end_time, speaker, overlap_seconds, simultaneous_speech, text"
+)
+SUMMARY_COLUMNS = "id, status, file_name, duration, language, created_at"
+
+# Must match storage.base.sort_value so cursors work across backends
+SORT_COLUMNS = {
+    SortField.CREATED_AT: "created_at",
+    SortField.FILE_NAME: "file_name",
+    SortField.DURATION: "COALESCE(duration, -1.0)",
+}
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    SQLite (WAL mode) storage for transcriptions.
+
+    One row per transcription and one row per segment, so lookups and saves
+    only touch the affected transcription instead of the whole history.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(settings.DATA_DIR, "transcriptions.db")
+        self._local = threading.local()
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        """Ensure data directory and tables exist."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        connection = self._connection()
+        connection.executescript(SCHEMA)
+
+        # Databases created before segments had a simultaneous speech flag
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(segments)")}
+        if "simultaneous_speech" not in columns:
+            connection.execute(
+                "ALTER TABLE segments "
+                "ADD COLUMN simultaneous_speech INTEGER NOT NULL DEFAULT 0"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return a connection owned by the current thread and process."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def save(self, transcription: Transcription) -> Transcription:
+        """Save a transcription."""
+        self.save_many([transcription])
+        return transcription
+
+    @timed(STORAGE_SECONDS, backend="sqlite", operation="save")
+    def save_many(self, transcriptions: Iterable[Transcription]) -> int:
+        """Save several transcriptions in a single transaction."""
+        count = 0
+        connection = self._connection()
+        with connection:
+            for transcription in transcriptions:
+                self._write(connection, transcription)
+                count += 1
+        return count
+
+    @timed(STORAGE_SECONDS, backend="sqlite", operation="get")
+    def get(self, transcription_id: str) -> Optional[Transcription]:
+        """Retrieve a transcription by ID."""
+        connection = self._connection()
+        row = connection.execute(
+            f"SELECT {TRANSCRIPTION_COLUMNS} FROM transcriptions WHERE id = ?",
+            (transcription_id,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        segments = connection.execute(
+            f"SELECT {SEGMENT_COLUMNS} FROM segments "
+            "WHERE transcription_id = ? ORDER BY position",
+            (transcription_id,),
+        ).fetchall()
+        return self._to_transcription(row, segments)
+
+    @timed(STORAGE_SECONDS, backend="sqlite", operation="list_all")
+    def list_all(self) -> List[Transcription]:
+        """List all transcriptions."""
+        connection = self._connection()
+        rows = connection.execute(
+            f"SELECT {TRANSCRIPTION_COLUMNS} FROM transcriptions ORDER BY created_at"
+        ).fetchall()
+
+        segments_by_id = {row[0]: [] for row in rows}
+        for transcription_id, *segment in connection.execute(
+            f"SELECT transcription_id, {SEGMENT_COLUMNS} FROM segments "
+            "ORDER BY transcription_id, position"
+        ):
+            if transcription_id in segments_by_id:
+                segments_by_id[transcription_id].append(segment)
+
+        return [self._to_transcription(row, segments_by_id[row[0]]) for row in rows]
+
+    @timed(STORAGE_SECONDS, backend="sqlite", operation="list_summaries")
+    def list_summaries(self, query: TranscriptionQuery) -> SummaryPage:
+        """Return one page of summaries using keyset pagination."""
+        sql, params = self._summary_sql(query, paginate=True)
+        rows = self._connection().execute(sql, params).fetchall()
+
+        page = [self._to_item(row) for row in rows[: query.limit]]
+        next_cursor = None
+        if len(rows) > query.limit:
+            next_cursor = encode_cursor(page[-1], query.sort_by)
+        return page, next_cursor
+
+    def iter_summaries(self, query: TranscriptionQuery) -> Iterator[TranscriptionItem]:
+        """Stream all summaries matching the query filters."""
+        sql, params = self._summary_sql(query, paginate=False)
+        # Streaming responses may resume the generator on different worker
+        # threads, so the stream gets its own connection.
+        connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        try:
+            cursor = connection.execute(sql, params)
+            while rows := cursor.fetchmany(500):
+                for row in rows:
+                    yield self._to_item(row)
+        finally:
+            connection.close()
+
+    def stats(self) -> dict:
+        return {"backend": "sqlite"}
+
+    @staticmethod
+    def _summary_sql(query: TranscriptionQuery, paginate: bool) -> Tuple[str, list]:
+        """Build the summary SELECT for a query (never touches segments)."""
+        conditions, params = [], []
+        if query.status is not None:
+            conditions.append("status = ?")
+            params.append(query.status.value)
+        if query.language is not None:
+            conditions.append("language = ?")
+            params.append(query.language)
+        if query.created_after is not None:
+            conditions.append("created_at >= ?")
+            params.append(to_timestamp(query.created_after))
+        if query.created_before is not None:
+            conditions.append("created_at < ?")
+            params.append(to_timestamp(query.created_before))
+
+        column = SORT_COLUMNS[query.sort_by]
+        descending = query.order == SortOrder.DESC
+        if paginate and query.cursor:
+            value, transcription_id = decode_cursor(query.cursor, query.sort_by)
+            conditions.append(f"({column}, id) {'<' if descending else '>'} (?, ?)")
+            params.extend([value, transcription_id])
+
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT {SUMMARY_COLUMNS} FROM transcriptions"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {column} {direction}, id {direction}"
+        if paginate:
+            sql += " LIMIT ?"
+            params.append(query.limit + 1)
+        return sql, params
+
+    @staticmethod
+    def _to_item(row) -> TranscriptionItem:
+        """Build a TranscriptionItem from a summary row."""
+        transcription_id, status, file_name, duration, language, created_at = row
+        return TranscriptionItem(
+            id=transcription_id,
+            status=status,
+            file_name=file_name,
+            duration=duration,
+            language=language,
+            created_at=datetime.fromtimestamp(created_at, tz=timezone.utc),
+        )
+
+    def _write(self, connection: sqlite3.Connection, transcription: Transcription):
+        """Upsert one transcription and replace its segments."""
+        connection.execute(
+            f"INSERT INTO transcriptions ({TRANSCRIPTION_COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET "
+            "status = excluded.status, file_name = excluded.file_name, "
+            "file_type = excluded.file_type, duration = excluded.duration, "
+            "language = excluded.language, created_at = excluded.created_at, "
+            "stage_timings = excluded.stage_timings",
+            (
+                transcription.id,
+                transcription.status.value,
+                transcription.file_name,
+                transcription.file_type,
+                transcription.duration,
+                transcription.language,
+                transcription.created_at.timestamp(),
+                json.dumps(transcription.stage_timings),
+            ),
+        )
+        connection.execute(
+            "DELETE FROM segments WHERE transcription_id = ?", (transcription.id,)
+        )
+        connection.executemany(
+            f"INSERT INTO segments (transcription_id, position, {SEGMENT_COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (transcription.id, position, *row)
+                for position, row in enumerate(
+                    SegmentTable.from_segments(transcription.segments).rows()
+                )
+            ],
+        )
+
+    @staticmethod
+    def _to_transcription(row, segments) -> Transcription:
+        """Build a Transcription from a transcriptions row and segment rows."""
+        (
+            transcription_id,
+            status,
+            file_name,
+            file_type,
+            duration,
+            language,
+            created_at,
+            stage_timings,
+        ) = row
+        # Rows were written from validated models, so they are not re-validated
+        return Transcription.model_construct(
+            id=transcription_id,
+            status=TranscriptionStatus(status),
+            file_name=file_name,
+            file_type=file_type,
+            duration=duration,
+            language=language,
+            created_at=datetime.fromtimestamp(created_at, tz=timezone.utc),
+            stage_timings=json.loads(stage_timings),
+            segments=SegmentTable.from_rows(segments),
+        )
@@ -0,0 +1,230 @@
+"""
+Compare the speed and accuracy of ASR backends and Whisper model sizes.
+
+Every combination of `--backends` and `--models` transcribes the same
+audio. Accuracy is the word error rate (WER) against `--reference` (a
+text file with the expected transcript) or, without one, against the
+output of the reference engine (torch, float32) for the same model size.
+
+Without locally cached Whisper weights (or with --random-weights), models
+are built from their architecture with random weights: only the speed of
+one encoder pass and a fixed-length decoder pass is compared then.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_asr_backends.py --audio meeting.wav --models tiny base
+    python benchmarks/bench_asr_backends.py --random-weights --models tiny small turbo
+"""
+
+import argparse
+import json
+import re
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+import torch
+import whisper
+from whisper.model import ModelDimensions
+
+from common import synthetic_speech, whisper_weights_available
+from services.asr_backends import ASR_BACKENDS, quantize_whisper
+from services.audio_service import SAMPLE_RATE, decode_audio
+from services.model_registry import estimate_model_size
+
+# Architectures of the Whisper sizes (from their checkpoints)
+DIMENSIONS = {
+    "tiny": (80, 384, 6, 4, 4, 51865),
+    "base": (80, 512, 8, 6, 6, 51865),
+    "small": (80, 768, 12, 12, 12, 51865),
+    "medium": (80, 1024, 16, 24, 24, 51865),
+    "turbo": (128, 1280, 20, 32, 4, 51866),
+}
+DECODED_TOKENS = 224
+
+
+def random_whisper(model_name: str) -> whisper.Whisper:
+    n_mels, state, heads, audio_layers, text_layers, vocab = DIMENSIONS[model_name]
+    model = whisper.Whisper(
+        ModelDimensions(
+            n_mels=n_mels,
+            n_audio_ctx=1500,
+            n_audio_state=state,
+            n_audio_head=heads,
+            n_audio_layer=audio_layers,
+            n_vocab=vocab,
+            n_text_ctx=448,
+            n_text_state=state,
+            n_text_head=heads,
+            n_text_layer=text_layers,
+        )
+    )
+    torch.nn.init.normal_(model.decoder.positional_embedding, std=0.02)
+    return model.eval()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level edit distance divided by the reference length."""
+    ref = re.findall(r"[\w']+", reference.lower())
+    hyp = re.findall(r"[\w']+", hypothesis.lower())
+    if not ref:
+        return float(bool(hyp))
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ref_word != hyp_word),
+                )
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def _forward_seconds(model, n_mels: int, repeat: int) -> float:
+    """Best time of one encoder pass and one decoder pass over a full window."""
+    mel = torch.randn(1, n_mels, 3000)
+    tokens = torch.randint(0, 50000, (1, DECODED_TOKENS))
+    timings = []
+    with torch.no_grad():
+        for _ in range(repeat):
+            started = time.perf_counter()
+            model.logits(tokens, model.embed_audio(mel))
+            timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def compare_random(backends: Sequence[str], models: Sequence[str], repeat: int):
+    rows = []
+    for model_name in models:
+        for backend in backends:
+            model = random_whisper(model_name)
+            if backend == "torch-int8":
+                model = quantize_whisper(model).model
+            elif backend != "torch":
+                rows.append({"backend": backend, "model": model_name, "skipped": True})
+                continue
+            seconds = _forward_seconds(model, DIMENSIONS[model_name][0], repeat)
+            rows.append(
+                {
+                    "backend": backend,
+                    "model": model_name,
+                    "window_seconds": round(seconds, 3),
+                    "resident_mb": round(estimate_model_size(model) / 2**20, 1),
+                }
+            )
+    return rows
+
+
+def _text(result: dict) -> str:
+    return " ".join(segment["text"].strip() for segment in result["segments"])
+
+
+def compare_models(
+    backends: Sequence[str],
+    models: Sequence[str],
+    audio: np.ndarray,
+    reference: Optional[str],
+    language: Optional[str],
+):
+    audio_seconds = len(audio) / SAMPLE_RATE
+    rows = []
+    for model_name in models:
+        references = {}
+        for backend_name in backends:
+            backend = ASR_BACKENDS[backend_name]
+            if not backend.is_available():
+                rows.append(
+                    {"backend": backend_name, "model": model_name, "skipped": True}
+                )
+                continue
+            model = backend.load(model_name)
+            started = time.perf_counter()
+            text = _text(model.transcribe(audio, language=language))
+            seconds = time.perf_counter() - started
+            if backend_name == "torch":
+                references[model_name] = text
+
+            expected = reference or references.get(model_name)
+            rows.append(
+                {
+                    "backend": backend_name,
+                    "model": model_name,
+                    "seconds": round(seconds, 3),
+                    "realtime_factor": round(seconds / audio_seconds, 4),
+                    "wer": (
+                        round(word_error_rate(expected, text), 4)
+                        if expected is not None
+                        else None
+                    ),
+                }
+            )
+    return rows
+
+
+def run(
+    backends: Sequence[str] = ("torch", "torch-int8"),
+    models: Sequence[str] = ("tiny",),
+    audio: Optional[str] = None,
+    reference: Optional[str] = None,
+    language: Optional[str] = "en",
+    threads: int = 0,
+    random_weights: bool = False,
+    repeat: int = 3,
+) -> dict:
+    if threads:
+        torch.set_num_threads(threads)
+    # The reference engine goes first, other engines are compared against it
+    backends = sorted(backends, key=lambda name: name != "torch")
+    random_weights = random_weights or not all(map(whisper_weights_available, models))
+
+    result = {
+        "benchmark": "asr_backends",
+        "threads": torch.get_num_threads(),
+        "random_weights": random_weights,
+    }
+    if random_weights:
+        result["rows"] = compare_random(backends, models, repeat)
+        return result
+
+    samples = decode_audio(audio) if audio else synthetic_speech(0.5)
+    result["audio_seconds"] = round(len(samples) / SAMPLE_RATE, 1)
+    result["rows"] = compare_models(backends, models, samples, reference, language)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backends", nargs="+", default=["torch", "torch-int8"])
+    parser.add_argument("--models", nargs="+", default=["tiny"])
+    parser.add_argument("--audio", help="media file to transcribe")
+    parser.add_argument("--reference", help="text file with the expected transcript")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--threads", type=int, default=0, help="torch threads")
+    parser.add_argument("--random-weights", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    reference: Optional[str] = None
+    if args.reference:
+        with open(args.reference) as f:
+            reference = f.read()
+
+    result = run(
+        args.backends,
+        args.models,
+        args.audio,
+        reference,
+        args.language,
+        args.threads,
+        args.random_weights,
+        args.repeat,
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compare batched and clip-by-clip Whisper decoding of short clips.
+
+The same clips are transcribed one at a time and in batches of
+`--batch-sizes`. Without locally cached weights the model has random
+weights, so decoding runs until the token limit: only the speed of the
+passes is meaningful then.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_asr_batching.py --model tiny --clips 16 --batch-sizes 4 8 16
+"""
+
+import argparse
+import json
+import time
+from typing import Sequence
+
+import torch
+import whisper
+
+from bench_asr_backends import random_whisper
+from common import synthetic_speech, whisper_weights_available
+from services.asr_batching import decode_batch
+from services.audio_service import SAMPLE_RATE
+
+
+def run(
+    model_name: str = "tiny",
+    clip_count: int = 8,
+    clip_seconds: float = 5.0,
+    batch_sizes: Sequence[int] = (1, 4, 8),
+    threads: int = 0,
+) -> dict:
+    if threads:
+        torch.set_num_threads(threads)
+    random_weights = not whisper_weights_available(model_name)
+    model = (
+        random_whisper(model_name)
+        if random_weights
+        else whisper.load_model(model_name, device="cpu")
+    )
+    samples = int(clip_seconds * SAMPLE_RATE)
+    clips = [
+        synthetic_speech(clip_seconds / 60, seed=index)[:samples]
+        for index in range(clip_count)
+    ]
+
+    result = {
+        "benchmark": "asr_batching",
+        "model": model_name,
+        "random_weights": random_weights,
+        "clips": clip_count,
+        "clip_seconds": clip_seconds,
+    }
+    for batch_size in batch_sizes:
+        started = time.perf_counter()
+        for offset in range(0, clip_count, batch_size):
+            decode_batch(model, clips[offset : offset + batch_size], language="en")
+        seconds = time.perf_counter() - started
+        result[f"batch_{batch_size}"] = {
+            "seconds": round(seconds, 3),
+            "clips_per_second": round(clip_count / seconds, 2),
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--clips", type=int, default=8)
+    parser.add_argument("--clip-seconds", type=float, default=5.0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--threads", type=int, default=0, help="torch threads")
+    args = parser.parse_args()
+
+    result = run(
+        args.model, args.clips, args.clip_seconds, args.batch_sizes, args.threads
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark the vectorized speaker assignment against the cursor implementation.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_assign_speakers.py [--segments 10000] [--turns 10000]
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from common import best_of
+from models.transcription import SpeakerTurn, TranscriptionSegment
+from services.speaker_assignment import (
+    SpeakerTimeline,
+    assign_speaker_arrays,
+    assign_speakers,
+)
+from services.transcription_service import assign_speaker_by_overlap_cursor
+
+
+def synthetic_meeting(segment_count: int, turn_count: int, speakers: int, seed: int):
+    """Whisper-like segments and overlapping pyannote-like turns."""
+    rng = np.random.default_rng(seed)
+    segment_edges = np.cumsum(rng.uniform(1.0, 8.0, segment_count + 1))
+    segments = [
+        TranscriptionSegment(
+            id=f"seg-{i}",
+            start_time=round(float(start), 2),
+            end_time=round(float(end), 2),
+            text="lorem ipsum dolor sit amet consectetur",
+        )
+        for i, (start, end) in enumerate(zip(segment_edges, segment_edges[1:]))
+    ]
+
+    total = segment_edges[-1]
+    turn_starts = np.sort(rng.uniform(0, total, turn_count))
+    turn_lengths = rng.uniform(0.5, 2.5 * total / turn_count, turn_count)
+    turns = [
+        SpeakerTurn(
+            start=float(start),
+            end=float(start + length),
+            speaker=f"SPEAKER_{rng.integers(speakers):02d}",
+        )
+        for start, length in zip(turn_starts, turn_lengths)
+    ]
+    return segments, turns
+
+
+def run(
+    segment_count: int = 10000,
+    turn_count: int = 10000,
+    speakers: int = 4,
+    repeat: int = 3,
+) -> dict:
+    segments, turns = synthetic_meeting(segment_count, turn_count, speakers, 0)
+
+    cursor = best_of(repeat, assign_speaker_by_overlap_cursor, segments, turns)
+    vectorized = best_of(repeat, assign_speakers, segments, turns)
+    split = best_of(repeat, assign_speakers, segments, turns, split_segments=True)
+
+    # The array engine alone, without building TranscriptionSegment models
+    segment_starts = np.array([segment.start_time for segment in segments])
+    segment_ends = np.array([segment.end_time for segment in segments])
+    timeline = SpeakerTimeline.from_turns(turns)
+    engine = best_of(
+        repeat, assign_speaker_arrays, segment_starts, segment_ends, timeline
+    )
+
+    return {
+        "benchmark": "assign_speakers",
+        "segments": segment_count,
+        "turns": turn_count,
+        "speakers": speakers,
+        "cursor_seconds": round(cursor, 4),
+        "vectorized_seconds": round(vectorized, 4),
+        "vectorized_split_seconds": round(split, 4),
+        "engine_only_seconds": round(engine, 4),
+        "speedup": round(cursor / vectorized, 2),
+        "engine_speedup": round(cursor / engine, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--segments", type=int, default=10000)
+    parser.add_argument("--turns", type=int, default=10000)
+    parser.add_argument("--speakers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        json.dumps(run(args.segments, args.turns, args.speakers, args.repeat), indent=2)
+    )
+
+
+if __name__ == "__main__":
+    main()
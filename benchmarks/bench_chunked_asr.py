@@ -0,0 +1,107 @@
+"""
+Compare single-call ASR with the chunked (windowed, parallel) ASR mode.
+
+By default a deterministic CPU-bound fake model is used, so the benchmark
+measures the windowing, process pool and stitching overhead and the
+parallel speed-up without downloading Whisper weights. Pass --whisper to
+transcribe a real file with a Whisper model instead.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_chunked_asr.py [--minutes 30] [--window 300] [--workers 4]
+    python benchmarks/bench_chunked_asr.py --whisper tiny --audio recording.wav
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from unittest.mock import patch
+
+import numpy as np
+
+from common import SEGMENT_SECONDS, burn, synthetic_speech, timed_call
+from config import settings
+from services.audio_service import SAMPLE_RATE, decode_audio
+from services.transcription_service import transcribe_chunked, transcribe_window
+
+
+def fake_transcribe_window(samples: np.ndarray, model_name=None):
+    """Deterministic stand-in for Whisper: cost grows with the audio length."""
+    seconds = len(samples) / SAMPLE_RATE
+    accumulator = burn(seconds)
+    return [
+        (start, min(start + SEGMENT_SECONDS, seconds), f"segment {accumulator}")
+        for start in np.arange(0.0, seconds, SEGMENT_SECONDS).tolist()
+    ]
+
+
+def run(
+    minutes: float = 30.0,
+    window: int = 300,
+    workers: int = os.cpu_count() or 2,
+    whisper: Optional[str] = None,
+    audio: Optional[str] = None,
+) -> dict:
+    if whisper:
+        samples = decode_audio(audio)
+        window_fn, model_name = transcribe_window, whisper
+        models = [whisper]
+    else:
+        samples = synthetic_speech(minutes)
+        window_fn, model_name = fake_transcribe_window, None
+        models = settings.WHISPER_MODELS
+    audio_seconds = len(samples) / SAMPLE_RATE
+
+    # Settings are restored for the benchmarks run after this one
+    with (
+        patch.object(settings, "ASR_CHUNK_SECONDS", window),
+        patch.object(settings, "WHISPER_MODELS", models),
+        ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool,
+    ):
+        single, single_seconds = timed_call(window_fn, samples, model_name)
+        # Warm the workers up (imports, model loading) outside of the timing
+        list(pool.map(window_fn, [samples[:SAMPLE_RATE]] * workers))
+        chunked, chunked_seconds = timed_call(
+            transcribe_chunked, samples, model_name, pool=pool, window_fn=window_fn
+        )
+
+    return {
+        "benchmark": "chunked_asr",
+        "model": whisper or "fake",
+        "audio_seconds": round(audio_seconds, 1),
+        "window_seconds": window,
+        "workers": workers,
+        "single_call": {
+            "seconds": round(single_seconds, 3),
+            "realtime_factor": round(audio_seconds / single_seconds, 1),
+            "segments": len(single),
+        },
+        "chunked": {
+            "seconds": round(chunked_seconds, 3),
+            "realtime_factor": round(audio_seconds / chunked_seconds, 1),
+            "segments": len(chunked),
+        },
+        "speedup": round(single_seconds / chunked_seconds, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--minutes", type=float, default=30.0)
+    parser.add_argument("--window", type=int, default=300, help="window seconds")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--whisper", help="real Whisper model size, e.g. tiny")
+    parser.add_argument("--audio", help="media file to transcribe with --whisper")
+    args = parser.parse_args()
+
+    result = run(args.minutes, args.window, args.workers, args.whisper, args.audio)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
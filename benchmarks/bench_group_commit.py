@@ -0,0 +1,83 @@
+"""
+Benchmark concurrent saves to the JSON storage backend.
+
+The backend is filled with `--records` transcriptions, then `--saves` new
+ones are saved from one thread (every save is its own commit) and from
+`--threads` threads at once (saves arriving during a commit are written
+together by the next one). Reports throughput, the number of commits and
+the mean fsync latency of the data file.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_group_commit.py [--records 300] [--saves 64] [--threads 8]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+
+from bench_storage import _fill, synthetic_transcription
+from services.metrics import STORAGE_COMMIT_BATCH_SIZE, STORAGE_FSYNC_SECONDS
+from storage.data_storage import DataStorage
+
+
+def bench_saves(storage: DataStorage, transcriptions, threads: int) -> dict:
+    STORAGE_COMMIT_BATCH_SIZE.clear()
+    STORAGE_FSYNC_SECONDS.clear()
+    commits = storage.commits
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(storage.save, transcriptions))
+    seconds = time.perf_counter() - started
+
+    commits = storage.commits - commits
+    fsyncs = STORAGE_FSYNC_SECONDS.count(file="data")
+    return {
+        "seconds": round(seconds, 3),
+        "saves_per_second": round(len(transcriptions) / seconds, 1),
+        "commits": commits,
+        "mean_batch_size": round(len(transcriptions) / commits, 1),
+        "fsync_mean_seconds": round(STORAGE_FSYNC_SECONDS.sum(file="data") / fsyncs, 5),
+    }
+
+
+def run(
+    record_count: int = 300, save_count: int = 64, threads: int = 8, segments: int = 50
+) -> dict:
+    rng = np.random.default_rng(0)
+    stored = [synthetic_transcription(segments, rng) for _ in range(record_count)]
+
+    result = {
+        "benchmark": "group_commit",
+        "records": record_count,
+        "saves": save_count,
+        "threads": threads,
+    }
+    for name, workers in (("sequential", 1), ("concurrent", threads)):
+        saves = [synthetic_transcription(segments, rng) for _ in range(save_count)]
+        with tempfile.TemporaryDirectory() as data_dir:
+            with patch("storage.data_storage.settings.DATA_DIR", data_dir):
+                storage = DataStorage()
+            _fill(storage, stored)
+            result[name] = bench_saves(storage, saves, workers)
+            assert len(storage._load_data()) == record_count + save_count
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=300)
+    parser.add_argument("--saves", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    print(json.dumps(run(args.records, args.saves, args.threads), indent=2))
+
+
+if __name__ == "__main__":
+    main()
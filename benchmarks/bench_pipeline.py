@@ -0,0 +1,109 @@
+"""
+Benchmark the transcription pipeline end-to-end (`process_transcription`).
+
+Synthetic speech of the given length runs through ASR, diarization and
+speaker assignment with deterministic fake models (`--models fake`), or
+with the real Whisper and pyannote models when they are available locally
+(`--models real`; requires cached Whisper weights and HUGGING_FACE_TOKEN).
+Pass --audio to decode a real recording (with ffmpeg) instead.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_pipeline.py [--minutes 5] [--models fake|real]
+    python benchmarks/bench_pipeline.py --models real --whisper tiny --audio a.wav
+"""
+
+import argparse
+import json
+from typing import Optional
+
+from common import (
+    register_fake_models,
+    synthetic_speech,
+    temporary_artifacts,
+    timed_call,
+    whisper_weights_available,
+)
+from config import settings
+from services import transcription_service
+
+
+def run(
+    minutes: float = 5.0,
+    models: str = "fake",
+    whisper: Optional[str] = None,
+    audio: Optional[str] = None,
+    pipeline_mode: Optional[str] = None,
+) -> dict:
+    if models == "real":
+        whisper = whisper or settings.WHISPER_MODEL
+        if not whisper_weights_available(whisper) or not settings.HUGGING_FACE_TOKEN:
+            return {
+                "benchmark": "pipeline",
+                "models": "real",
+                "skipped": "Whisper weights or HUGGING_FACE_TOKEN not available",
+            }
+        settings.WHISPER_MODEL = whisper
+        settings.WHISPER_MODELS = [whisper]
+        # Load outside of the timing, like a warm server
+        transcription_service.preload_models()
+    else:
+        register_fake_models()
+    if pipeline_mode:
+        settings.PIPELINE_MODE = pipeline_mode
+
+    decode_audio = transcription_service.decode_audio
+    if audio is None:
+        samples = synthetic_speech(minutes)
+        # The synthetic buffer replaces decoding a file (no ffmpeg needed)
+        transcription_service.decode_audio = lambda _: samples
+        audio = "synthetic.wav"
+
+    try:
+        with temporary_artifacts():
+            transcription, seconds = timed_call(
+                transcription_service.process_transcription,
+                file_path=audio,
+                file_name=audio,
+                file_type="audio/wav",
+            )
+    finally:
+        transcription_service.decode_audio = decode_audio
+
+    result = {
+        "benchmark": "pipeline",
+        "models": models,
+        "pipeline_mode": settings.PIPELINE_MODE,
+        "audio_seconds": transcription.duration,
+        "segments": len(transcription.segments),
+        "status": transcription.status.value,
+    }
+    result.update(
+        {
+            f"{stage}_seconds": value
+            for stage, value in transcription.stage_timings.items()
+        }
+    )
+    result["total_seconds"] = round(seconds, 3)
+    if transcription.duration:
+        result["realtime_factor"] = round(seconds / transcription.duration, 4)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--minutes", type=float, default=5.0)
+    parser.add_argument("--models", choices=["fake", "real"], default="fake")
+    parser.add_argument("--whisper", help="real Whisper model size, e.g. tiny")
+    parser.add_argument("--audio", help="media file to transcribe instead")
+    parser.add_argument("--pipeline-mode", choices=["parallel", "sequential"])
+    args = parser.parse_args()
+
+    result = run(
+        args.minutes, args.models, args.whisper, args.audio, args.pipeline_mode
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Compare segments held as a list of models with the columnar SegmentTable.
+
+A transcript of `--segments` segments (about 3 s each, 3 speakers) is
+measured both ways: resident memory (tracemalloc), serializing it to JSON,
+loading it back from parsed JSON, and speaker assignment on it.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_segments.py [--segments 20000] [--repeat 5]
+"""
+
+import argparse
+import json
+import tracemalloc
+from typing import List
+
+import numpy as np
+from pydantic import TypeAdapter
+
+from common import best_of
+from models.segments import SegmentTable, TranscriptionSegment
+from models.transcription import SpeakerTurn
+from services.speaker_assignment import assign_speakers
+
+SEGMENT_LIST = TypeAdapter(List[TranscriptionSegment])
+
+
+def synthetic_segments(count: int, seed: int = 0) -> List[TranscriptionSegment]:
+    rng = np.random.default_rng(seed)
+    edges = np.cumsum(rng.uniform(1.0, 5.0, count + 1)).round(2).tolist()
+    words = "lorem ipsum dolor sit amet consectetur adipiscing elit".split()
+    return [
+        TranscriptionSegment(
+            id=f"seg-{i}",
+            start_time=start,
+            end_time=end,
+            text=" ".join(rng.choice(words, size=int(rng.integers(4, 16)))),
+            speaker=f"SPEAKER_{i % 3:02d}",
+            overlap_seconds=round(end - start, 2),
+        )
+        for i, (start, end) in enumerate(zip(edges, edges[1:]))
+    ]
+
+
+def synthetic_turns(segments: List[TranscriptionSegment]) -> List[SpeakerTurn]:
+    return [
+        SpeakerTurn(start=s.start_time, end=s.end_time, speaker=s.speaker)
+        for s in segments[::2]
+    ]
+
+
+def _allocated_bytes(build) -> int:
+    """Bytes still allocated by what `build()` returns."""
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def run(segment_count: int = 20000, repeat: int = 5) -> dict:
+    segments = synthetic_segments(segment_count)
+    records = [segment.model_dump() for segment in segments]
+    table = SegmentTable.from_records(records)
+    turns = synthetic_turns(segments)
+
+    def dump_models():
+        return json.dumps(SEGMENT_LIST.dump_python(segments, mode="json"))
+
+    def dump_table():
+        return json.dumps(table.to_records())
+
+    assert json.loads(dump_models()) == json.loads(dump_table())
+    rows = {
+        "models": {
+            "memory_mb": _allocated_bytes(
+                lambda: SEGMENT_LIST.validate_python(records)
+            ),
+            "dump_seconds": best_of(repeat, dump_models),
+            "load_seconds": best_of(repeat, SEGMENT_LIST.validate_python, records),
+            "merge_seconds": best_of(repeat, assign_speakers, segments, turns),
+        },
+        "table": {
+            "memory_mb": _allocated_bytes(lambda: SegmentTable.from_records(records)),
+            "dump_seconds": best_of(repeat, dump_table),
+            "load_seconds": best_of(repeat, SegmentTable.from_records, records),
+            "merge_seconds": best_of(repeat, assign_speakers, table, turns),
+        },
+    }
+    for row in rows.values():
+        row["memory_mb"] = round(row["memory_mb"] / 2**20, 2)
+        for key in ("dump_seconds", "load_seconds", "merge_seconds"):
+            row[key] = round(row[key], 4)
+
+    return {
+        "benchmark": "segments",
+        "segments": segment_count,
+        **rows,
+        "memory_ratio": round(
+            rows["models"]["memory_mb"] / rows["table"]["memory_mb"], 1
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--segments", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.segments, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
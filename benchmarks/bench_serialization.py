@@ -0,0 +1,115 @@
+"""
+Benchmark GET /api/transcriptions/{id} for long transcripts.
+
+One transcription of `--segments` segments is stored in the JSON backend
+and requested in-process (httpx ASGI transport, no network):
+
+- validated: the previous handler, validating the stored record into a
+  model and letting FastAPI validate and serialize it as the response.
+- cold: the current handler with an empty read cache (the stored
+  record is encoded as it is, without building a model).
+- cached: the current handler returning the cached JSON bytes.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_serialization.py [--segments 10000] [--requests 20]
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from typing import Callable, Optional
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI
+
+from bench_segments import synthetic_segments
+from models.transcription import Transcription, TranscriptionStatus
+from routers import transcriptions
+from storage import serialization
+from storage.data_storage import DataStorage
+
+
+def _app(storage: DataStorage) -> FastAPI:
+    app = FastAPI()
+    app.include_router(transcriptions.router, prefix="/api/transcriptions")
+
+    @app.get("/validated/{transcription_id}", response_model=Transcription)
+    async def get_validated(transcription_id: str):
+        return Transcription(**storage._load_data()[transcription_id])
+
+    return app
+
+
+async def _latency(
+    app: FastAPI, path: str, requests: int, before: Optional[Callable] = None
+) -> dict:
+    timings = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for _ in range(requests):
+            if before is not None:
+                before()
+            started = time.perf_counter()
+            response = await client.get(path)
+            timings.append(time.perf_counter() - started)
+            response.raise_for_status()
+    timings.sort()
+    return {
+        "best_seconds": round(timings[0], 4),
+        "median_seconds": round(timings[len(timings) // 2], 4),
+        "body_bytes": len(response.content),
+    }
+
+
+def run(segment_count: int = 10000, requests: int = 20) -> dict:
+    transcription = Transcription(
+        id="bench",
+        status=TranscriptionStatus.COMPLETED,
+        file_name="meeting.wav",
+        file_type="audio/wav",
+        segments=synthetic_segments(segment_count),
+    )
+    with tempfile.TemporaryDirectory() as data_dir:
+        with patch("storage.data_storage.settings.DATA_DIR", data_dir):
+            storage = DataStorage()
+        storage.save(transcription)
+        app = _app(storage)
+
+        body = storage.get_json(transcription.id)
+        assert json.loads(body) == transcription.model_dump(mode="json")
+
+        with patch("routers.transcriptions.storage", storage):
+            paths = {
+                "validated": ("/validated/bench", None),
+                "cold": ("/api/transcriptions/bench", storage._cache.clear),
+                "cached": ("/api/transcriptions/bench", None),
+            }
+            rows = {
+                name: asyncio.run(_latency(app, path, requests, before))
+                for name, (path, before) in paths.items()
+            }
+
+    return {
+        "benchmark": "serialization",
+        "segments": segment_count,
+        "orjson": serialization.orjson is not None,
+        **rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--segments", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.segments, args.requests), indent=2))
+
+
+if __name__ == "__main__":
+    main()
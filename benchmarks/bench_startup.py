@@ -0,0 +1,76 @@
+"""
+Benchmark the cold start of the web tier (importing the application).
+
+Each run imports `main` in a fresh interpreter, which is what a new API
+worker pays before serving its first request. The packages of the machine
+learning stack imported on the way are listed too: there should be none,
+they are only loaded by processes that transcribe.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_startup.py [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import List
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+ML_PACKAGES = ("torch", "whisper", "pyannote")
+
+_REPORT_ML_PACKAGES = (
+    "import json, sys, main; "
+    "print(json.dumps(sorted({m.split('.')[0] for m in sys.modules} & %r)))"
+    % set(ML_PACKAGES)
+)
+
+
+def _best_start_seconds(code: str, repeat: int) -> float:
+    """Fastest of `repeat` fresh interpreters running `code`."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=APP_DIR,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def _ml_packages_imported() -> List[str]:
+    result = subprocess.run(
+        [sys.executable, "-c", _REPORT_ML_PACKAGES],
+        cwd=APP_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(repeat: int = 5) -> dict:
+    return {
+        "benchmark": "startup",
+        "interpreter_seconds": round(_best_start_seconds("pass", repeat), 3),
+        "import_seconds": round(_best_start_seconds("import main", repeat), 3),
+        "ml_packages_imported": _ml_packages_imported(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark the transcription storage backends at scale.
+
+Each backend is filled with `--records` completed transcriptions, then
+saving one more, getting one by id, listing a page of summaries and
+listing everything are timed (mean seconds per operation). The JSON
+backend is measured with its read cache and, as `json_uncached`, without
+it (every operation parsing the files again).
+
+Usage (from the repository root):
+
+    python benchmarks/bench_storage.py [--records 1000] [--segments 50]
+"""
+
+import argparse
+import json
+import tempfile
+import uuid
+from unittest.mock import patch
+
+import numpy as np
+
+from common import best_of
+from models.transcription import (
+    Transcription,
+    TranscriptionQuery,
+    TranscriptionSegment,
+    TranscriptionStatus,
+)
+from storage.data_storage import DataStorage
+from storage.record_cache import RecordCache
+from storage.sqlite_storage import SQLiteStorage
+
+
+def synthetic_transcription(segment_count: int, rng) -> Transcription:
+    edges = np.cumsum(rng.uniform(1.0, 8.0, segment_count + 1)).round(2).tolist()
+    return Transcription(
+        id=str(uuid.UUID(int=int(rng.integers(2**63)))),
+        status=TranscriptionStatus.COMPLETED,
+        file_name="meeting.wav",
+        file_type="audio/wav",
+        duration=edges[-1],
+        language="en",
+        segments=[
+            TranscriptionSegment(
+                id=f"seg-{i}",
+                start_time=start,
+                end_time=end,
+                text="lorem ipsum dolor sit amet consectetur adipiscing elit",
+                speaker=f"SPEAKER_{i % 3:02d}",
+            )
+            for i, (start, end) in enumerate(zip(edges, edges[1:]))
+        ],
+    )
+
+
+def _fill(storage, transcriptions):
+    if isinstance(storage, SQLiteStorage):
+        storage.save_many(transcriptions)
+        return
+    # Bulk write the JSON files directly, saving one by one is quadratic
+    storage._save_data({t.id: t.model_dump(mode="json") for t in transcriptions})
+    storage._save_index(
+        {t.id: t.to_item().model_dump(mode="json") for t in transcriptions}
+    )
+
+
+def bench_backend(storage, transcriptions, extra, repeat: int) -> dict:
+    _fill(storage, transcriptions)
+    ids = [t.id for t in transcriptions]
+    extras = iter(extra)
+    page_query = TranscriptionQuery(limit=100)
+
+    return {
+        "save_seconds": round(best_of(repeat, lambda: storage.save(next(extras))), 5),
+        "get_seconds": round(best_of(repeat, storage.get, ids[len(ids) // 2]), 5),
+        "list_summaries_seconds": round(
+            best_of(repeat, storage.list_summaries, page_query), 5
+        ),
+        "list_all_seconds": round(best_of(repeat, storage.list_all), 5),
+    }
+
+
+def run(record_count: int = 1000, segment_count: int = 50, repeat: int = 3) -> dict:
+    rng = np.random.default_rng(0)
+    transcriptions = [
+        synthetic_transcription(segment_count, rng) for _ in range(record_count)
+    ]
+    extra = [synthetic_transcription(segment_count, rng) for _ in range(repeat)]
+
+    result = {
+        "benchmark": "storage",
+        "records": record_count,
+        "segments_per_record": segment_count,
+    }
+    with tempfile.TemporaryDirectory() as data_dir:
+        with patch("storage.data_storage.settings.DATA_DIR", data_dir):
+            json_storage = DataStorage()
+        result["json"] = bench_backend(json_storage, transcriptions, extra, repeat)
+
+        json_storage._cache = RecordCache(max_entries=0)
+        extra = [synthetic_transcription(segment_count, rng) for _ in range(repeat)]
+        result["json_uncached"] = bench_backend(
+            json_storage, transcriptions, extra, repeat
+        )
+
+        sqlite_storage = SQLiteStorage(f"{data_dir}/transcriptions.db")
+        result["sqlite"] = bench_backend(sqlite_storage, transcriptions, extra, repeat)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--segments", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.records, args.segments, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark upload throughput and concurrency of the API.
+
+Uploads of `--size-mb` random bytes are sent in-process (httpx ASGI
+transport, no network) to the multipart and the raw body endpoints with
+increasing numbers of concurrent clients. Queued jobs run on a thread pool
+with free fake models, so the benchmark measures receiving, hashing,
+storing and enqueueing uploads rather than transcription. Transcriptions
+are kept in SQLite by default; `--storage json` uses the JSON backend,
+which rewrites its whole file for every commit of (grouped) saves.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_upload.py [--uploads 32] [--size-mb 4] [--concurrency 1 4 16]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence
+from unittest.mock import patch
+
+import httpx
+
+from common import register_fake_models, synthetic_speech, temporary_artifacts
+from main import app
+from services import transcription_service
+from services.job_queue import PoolJobExecutor
+from storage.data_storage import DataStorage
+from storage.sqlite_storage import SQLiteStorage
+
+WAV_HEAD = b"RIFF\x24\x08\x00\x00WAVEfmt " + b"\x00" * 60
+
+
+def _payloads(count: int, size: int):
+    # Distinct content, so the result cache never short-circuits an upload
+    return [WAV_HEAD + os.urandom(size - len(WAV_HEAD)) for _ in range(count)]
+
+
+async def _upload(client: httpx.AsyncClient, endpoint: str, payload: bytes):
+    if endpoint == "multipart":
+        response = await client.post(
+            "/api/transcriptions/upload",
+            files={"file": ("bench.wav", payload, "audio/wav")},
+        )
+    else:
+        response = await client.post(
+            "/api/transcriptions/upload-stream",
+            params={"filename": "bench.wav"},
+            content=payload,
+        )
+    response.raise_for_status()
+
+
+async def _upload_all(endpoint: str, payloads: Sequence[bytes], concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _limited(client, payload):
+        async with semaphore:
+            await _upload(client, endpoint, payload)
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(_limited(client, payload) for payload in payloads))
+        return time.perf_counter() - started
+
+
+def _wait_for_jobs(executor: PoolJobExecutor, timeout: float = 60.0):
+    """Let queued jobs finish before their storage and uploads go away."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = executor.stats()
+        if not stats["running"] and not stats["queued"]:
+            return
+        time.sleep(0.05)
+
+
+def run(
+    upload_count: int = 32,
+    size_mb: float = 4.0,
+    concurrency_levels: Sequence[int] = (1, 4, 16),
+    storage: str = "sqlite",
+) -> dict:
+    register_fake_models(work_per_second=0)
+    samples = synthetic_speech(0.1)
+    size = int(size_mb * 1024 * 1024)
+    executor = PoolJobExecutor(
+        ThreadPoolExecutor, max_workers=2, max_queue_depth=upload_count * 4
+    )
+
+    result = {
+        "benchmark": "upload",
+        "uploads": upload_count,
+        "size_mb": size_mb,
+        "storage": storage,
+    }
+    with (
+        tempfile.TemporaryDirectory() as directory,
+        temporary_artifacts(),
+        patch("storage.data_storage.settings.DATA_DIR", directory),
+        patch("routers.transcriptions.file_storage.upload_dir", directory),
+        patch(
+            "routers.transcriptions.storage",
+            (
+                DataStorage()
+                if storage == "json"
+                else SQLiteStorage(os.path.join(directory, "transcriptions.db"))
+            ),
+        ),
+        patch("routers.transcriptions.job_executor", executor),
+        patch.object(transcription_service, "decode_audio", lambda _: samples),
+    ):
+        for endpoint in ("multipart", "stream"):
+            for concurrency in concurrency_levels:
+                payloads = _payloads(upload_count, size)
+                seconds = asyncio.run(_upload_all(endpoint, payloads, concurrency))
+                result[f"{endpoint}_c{concurrency}"] = {
+                    "seconds": round(seconds, 3),
+                    "requests_per_second": round(upload_count / seconds, 1),
+                    "mb_per_second": round(upload_count * size_mb / seconds, 1),
+                }
+        _wait_for_jobs(executor)
+        executor.shutdown()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uploads", type=int, default=32)
+    parser.add_argument("--size-mb", type=float, default=4.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--storage", choices=["sqlite", "json"], default="sqlite")
+    args = parser.parse_args()
+
+    result = run(args.uploads, args.size_mb, args.concurrency, args.storage)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark the voice activity detection pre-pass on recordings with silence.
+
+The same synthetic recording, with `--silence-ratio` of it silent, runs
+through the pipeline with fake models with VAD off and on. The fake models
+cost time per second of audio, like the real ones, so the difference shows
+what skipping silence saves.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_vad.py [--minutes 10] [--silence-ratio 0.4]
+"""
+
+import argparse
+import json
+
+from common import (
+    register_fake_models,
+    synthetic_recording,
+    temporary_artifacts,
+    timed_call,
+)
+from config import settings
+from services import transcription_service
+from services.audio_service import SAMPLE_RATE
+
+
+def run(minutes: float = 10.0, silence_ratio: float = 0.4) -> dict:
+    register_fake_models()
+    samples = synthetic_recording(minutes, silence_ratio)
+
+    result = {
+        "benchmark": "vad",
+        "audio_seconds": round(len(samples) / SAMPLE_RATE, 1),
+        "silence_ratio": silence_ratio,
+    }
+    decode_audio, vad_enabled = (
+        transcription_service.decode_audio,
+        settings.VAD_ENABLED,
+    )
+    # The synthetic buffer replaces decoding a file (no ffmpeg needed)
+    transcription_service.decode_audio = lambda _: samples
+    try:
+        for name, enabled in (("without_vad", False), ("with_vad", True)):
+            settings.VAD_ENABLED = enabled
+            with temporary_artifacts():
+                transcription, seconds = timed_call(
+                    transcription_service.process_transcription,
+                    file_path="synthetic.wav",
+                    file_name="synthetic.wav",
+                    file_type="audio/wav",
+                )
+            result[name] = {
+                "segments": len(transcription.segments),
+                "total_seconds": round(seconds, 3),
+                **{
+                    f"{stage}_seconds": value
+                    for stage, value in transcription.stage_timings.items()
+                },
+            }
+    finally:
+        transcription_service.decode_audio = decode_audio
+        settings.VAD_ENABLED = vad_enabled
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--silence-ratio", type=float, default=0.4)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.minutes, args.silence_ratio), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Shared helpers of the benchmarks: synthetic inputs, fake models and timing.
+
+The fake models stand in for Whisper and pyannote with a deterministic,
+CPU-bound cost proportional to the audio length, so the pipeline can be
+benchmarked reproducibly without model weights or a GPU.
+"""
+
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from config import settings  # noqa: E402
+from services.audio_service import SAMPLE_RATE  # noqa: E402
+from services.model_registry import model_registry  # noqa: E402
+from storage.artifact_storage import artifact_storage  # noqa: E402
+
+# Fake model cost: busy-loop iterations per second of audio
+WORK_PER_SECOND = 20000
+SEGMENT_SECONDS = 5.0
+
+
+def synthetic_speech(minutes: float, seed: int = 0) -> np.ndarray:
+    """Noise bursts of 4-12 s separated by 0.3-1.5 s pauses."""
+    rng = np.random.default_rng(seed)
+    parts, total = [], 0
+    while total < minutes * 60 * SAMPLE_RATE:
+        speech = rng.normal(0, 0.1, int(rng.uniform(4, 12) * SAMPLE_RATE))
+        pause = np.zeros(int(rng.uniform(0.3, 1.5) * SAMPLE_RATE))
+        parts += [speech, pause]
+        total += len(speech) + len(pause)
+    return np.concatenate(parts).astype(np.float32)
+
+
+def synthetic_recording(
+    minutes: float, silence_ratio: float, seed: int = 0
+) -> np.ndarray:
+    """Synthetic speech interrupted by long silences making up `silence_ratio`."""
+    rng = np.random.default_rng(seed)
+    speech = synthetic_speech(minutes * (1 - silence_ratio), seed)
+    # Long pauses (breaks, hold music muted) between stretches of 20-60 s
+    cuts = []
+    position = 0
+    while True:
+        position += int(rng.uniform(20, 60) * SAMPLE_RATE)
+        if position >= len(speech):
+            break
+        cuts.append(position)
+    pieces = np.split(speech, cuts)
+    pause = int(minutes * 60 * silence_ratio * SAMPLE_RATE / max(1, len(pieces)))
+    parts = []
+    for piece in pieces:
+        parts += [piece, np.zeros(pause, dtype=np.float32)]
+    return np.concatenate(parts)
+
+
+def burn(seconds_of_audio: float, work_per_second: int = WORK_PER_SECOND) -> int:
+    """Deterministic CPU work proportional to the audio length."""
+    accumulator = 0
+    for i in range(int(seconds_of_audio * work_per_second)):
+        accumulator = (accumulator * 31 + i) % 1000003
+    return accumulator
+
+
+class FakeWhisperModel:
+    """Whisper stand-in returning one segment every SEGMENT_SECONDS."""
+
+    def __init__(self, work_per_second: int = WORK_PER_SECOND):
+        self.work_per_second = work_per_second
+
+    def transcribe(self, audio: np.ndarray, **options) -> dict:
+        seconds = len(audio) / SAMPLE_RATE
+        accumulator = burn(seconds, self.work_per_second)
+        return {
+            "segments": [
+                {
+                    "start": start,
+                    "end": min(start + SEGMENT_SECONDS, seconds),
+                    "text": f" segment {accumulator}",
+                }
+                for start in np.arange(0.0, seconds, SEGMENT_SECONDS).tolist()
+            ]
+        }
+
+
+@dataclass
+class _Segment:
+    start: float
+    end: float
+
+
+class _Annotation:
+    def __init__(self, turns):
+        self.turns = turns
+
+    def itertracks(self, yield_label: bool = False) -> Iterator[tuple]:
+        for index, (start, end, speaker) in enumerate(self.turns):
+            yield _Segment(start, end), index, speaker
+
+
+@dataclass
+class _DiarizeOutput:
+    speaker_diarization: _Annotation
+    speaker_embeddings: Optional[np.ndarray] = None
+
+
+class FakeDiarizationPipeline:
+    """pyannote stand-in alternating speakers every 2-10 s."""
+
+    def __init__(self, work_per_second: int = WORK_PER_SECOND, speakers: int = 3):
+        self.work_per_second = work_per_second
+        self.speakers = speakers
+
+    def __call__(self, audio, hook: Optional[Callable] = None) -> _DiarizeOutput:
+        samples = audio["waveform"] if isinstance(audio, dict) else audio
+        seconds = samples.shape[-1] / SAMPLE_RATE
+        burn(seconds, self.work_per_second)
+
+        rng = np.random.default_rng(0)
+        turns, position = [], 0.0
+        while position < seconds:
+            end = min(seconds, position + float(rng.uniform(2.0, 10.0)))
+            turns.append((position, end, f"SPEAKER_{rng.integers(self.speakers):02d}"))
+            position = end
+        return _DiarizeOutput(_Annotation(turns))
+
+
+def register_fake_models(work_per_second: int = WORK_PER_SECOND):
+    """Make the pipeline use the fake models instead of loading real ones."""
+    model_registry.register(
+        f"whisper:{settings.WHISPER_MODEL}", FakeWhisperModel(work_per_second)
+    )
+    model_registry.register(
+        f"pyannote:{settings.DIARIZATION_MODEL}",
+        FakeDiarizationPipeline(work_per_second),
+        evictable=False,
+    )
+
+
+@contextlib.contextmanager
+def temporary_artifacts() -> Iterator[str]:
+    """Keep the artifacts of benchmarked transcriptions out of DATA_DIR."""
+    with tempfile.TemporaryDirectory() as directory:
+        with patch.object(artifact_storage, "root", directory):
+            yield directory
+
+
+def whisper_weights_available(model_name: str) -> bool:
+    """Whether Whisper weights are in the local cache (nothing is downloaded)."""
+    cache = os.path.join(
+        os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "whisper"
+    )
+    return os.path.isdir(cache) and any(
+        name.startswith(model_name) and name.endswith(".pt")
+        for name in os.listdir(cache)
+    )
+
+
+def best_of(repeat: int, fn, *args, **kwargs) -> float:
+    """Fastest of `repeat` runs, the least noisy estimate on a shared machine."""
+    timings: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args, **kwargs)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def timed_call(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
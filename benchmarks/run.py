@@ -0,0 +1,211 @@
+"""
+Run the benchmark suite and compare the results against a stored baseline.
+
+Every benchmark runs with fixed seeds and fake models, so results only
+depend on the code and the machine. Timings (`*seconds`) that grew and
+throughputs (`*_per_second`) that dropped by more than `--tolerance`
+against the baseline are reported as regressions and make the run fail.
+
+Usage (from the repository root):
+
+    python benchmarks/run.py [--only storage upload] [--size quick|full]
+    python benchmarks/run.py --output results.json --baseline benchmarks/baseline.json
+    python benchmarks/run.py --update-baseline
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Tuple
+
+import bench_asr_backends
+import bench_asr_batching
+import bench_assign_speakers
+import bench_chunked_asr
+import bench_group_commit
+import bench_pipeline
+import bench_segments
+import bench_serialization
+import bench_startup
+import bench_storage
+import bench_upload
+import bench_vad
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Parameters per suite size; "quick" keeps the whole suite around two minutes
+SUITES = {
+    "quick": {
+        "asr_backends": lambda: bench_asr_backends.run(random_weights=True, repeat=1),
+        "asr_batching": lambda: bench_asr_batching.run("tiny", 2, 5.0, (1, 2)),
+        "assign_speakers": lambda: bench_assign_speakers.run(10000, 10000, repeat=5),
+        "chunked_asr": lambda: bench_chunked_asr.run(5.0, window=60, workers=2),
+        "group_commit": lambda: bench_group_commit.run(100, 16, threads=8),
+        "pipeline": lambda: bench_pipeline.run(minutes=5.0),
+        "segments": lambda: bench_segments.run(5000, repeat=3),
+        "serialization": lambda: bench_serialization.run(10000, requests=10),
+        "startup": lambda: bench_startup.run(repeat=3),
+        "storage": lambda: bench_storage.run(300, 50, repeat=5),
+        "upload": lambda: bench_upload.run(16, 4.0, (1, 4)),
+        "vad": lambda: bench_vad.run(2.0),
+    },
+    "full": {
+        "asr_backends": lambda: bench_asr_backends.run(
+            models=("tiny", "base"), random_weights=True
+        ),
+        "asr_batching": lambda: bench_asr_batching.run("tiny", 8, 5.0, (1, 4, 8)),
+        "assign_speakers": lambda: bench_assign_speakers.run(50000, 50000),
+        "chunked_asr": lambda: bench_chunked_asr.run(minutes=30.0),
+        "group_commit": lambda: bench_group_commit.run(2000, 128, threads=16),
+        "pipeline": lambda: bench_pipeline.run(minutes=30.0),
+        "segments": lambda: bench_segments.run(50000),
+        "serialization": lambda: bench_serialization.run(50000),
+        "startup": lambda: bench_startup.run(repeat=5),
+        "storage": lambda: bench_storage.run(2000, 100, repeat=5),
+        "upload": lambda: bench_upload.run(32, 4.0, (1, 4, 16)),
+        "vad": lambda: bench_vad.run(10.0),
+    },
+}
+
+Regression = Tuple[str, float, float, float]
+
+
+def flatten(result: dict, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """Numeric leaves of a nested result as ("a.b.c", value) pairs."""
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from flatten(value, f"{name}.")
+        elif isinstance(value, list):
+            # Rows of a table, in the order the benchmark produces them
+            yield from flatten(dict(enumerate(value)), f"{name}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, float(value)
+
+
+def _direction(name: str) -> int:
+    """1 when higher is better, -1 when lower is better, 0 when not compared."""
+    leaf = name.rsplit(".", 1)[-1]
+    if leaf.endswith("_per_second"):
+        return 1
+    if leaf == "seconds" or leaf.endswith("_seconds"):
+        return -1
+    return 0
+
+
+def compare(
+    results: Dict[str, dict],
+    baseline: Dict[str, dict],
+    tolerance: float,
+    min_delta_seconds: float,
+) -> List[Regression]:
+    """(metric, baseline, current, relative change) of every regression."""
+    regressions = []
+    for benchmark, result in results.items():
+        if benchmark not in baseline:
+            continue
+        previous = dict(flatten(baseline[benchmark]))
+        for name, value in flatten(result):
+            direction = _direction(name)
+            before = previous.get(name)
+            if not direction or not before:
+                continue
+            change = (value - before) / before
+            if direction < 0 and value - before <= min_delta_seconds:
+                continue
+            if -direction * change > tolerance:
+                regressions.append((f"{benchmark}.{name}", before, value, change))
+    return regressions
+
+
+def run_suite(size: str, only: List[str]) -> Dict[str, dict]:
+    results = {}
+    for name, benchmark in SUITES[size].items():
+        if only and name not in only:
+            continue
+        print(f"Running {name}...", file=sys.stderr)
+        # Application logging must not end up in the machine-readable output
+        with contextlib.redirect_stdout(sys.stderr):
+            results[name] = benchmark()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--only", nargs="+", default=[], help="benchmark names")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="relative change tolerated (shared machines are noisy, tighten on dedicated ones)",
+    )
+    parser.add_argument(
+        "--min-delta-seconds",
+        type=float,
+        default=0.002,
+        help="ignore slowdowns smaller than this (timer noise)",
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="store results as baseline"
+    )
+    args = parser.parse_args()
+
+    report = {
+        "size": args.size,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": run_suite(args.size, args.only),
+    }
+
+    if args.update_baseline:
+        args.output = args.baseline
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("size") != args.size:
+            print(
+                f"Baseline is for size {baseline.get('size')}, not compared",
+                file=sys.stderr,
+            )
+        else:
+            regressions = compare(
+                report["results"],
+                baseline["results"],
+                args.tolerance,
+                args.min_delta_seconds,
+            )
+            report["regressions"] = [
+                {"metric": name, "baseline": before, "current": value, "change": change}
+                for name, before, value, change in regressions
+            ]
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+    if report.get("regressions"):
+        for regression in report["regressions"]:
+            print(
+                "REGRESSION {metric}: {baseline} -> {current} ({change:+.0%})".format(
+                    **regression
+                ),
+                file=sys.stderr,
+            )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
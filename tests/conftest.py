@@ -5,10 +5,12 @@ import tempfile
 import json
 import os
 import sys
-from unittest.mock import Mock, MagicMock, AsyncMock
+from unittest.mock import MagicMock, AsyncMock, patch
 from fastapi.testclient import TestClient
 from io import BytesIO
 
+import numpy as np
+
 # Add app directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../app'))
 
@@ -18,7 +20,60 @@ from models.transcription import (
     TranscriptionSegment,
     TranscriptionStatus,
 )
+from services.job_queue import InlineJobExecutor
+from services.metrics import metrics
+from services.model_registry import model_registry
+from services.progress import progress_broker
+from services.result_cache import result_cache
 from services.transcription_service import SpeakerTurn
+from storage.artifact_storage import artifact_storage
+
+
+@pytest.fixture(autouse=True)
+def reset_model_registry():
+    """Make sure no model stays warm between tests."""
+    model_registry.clear()
+    yield
+    model_registry.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_result_cache():
+    """Make sure no cached result leaks between tests."""
+    result_cache.clear()
+    yield
+    result_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_progress_broker():
+    """Make sure no progress event leaks between tests."""
+    progress_broker.clear()
+    yield
+    progress_broker.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    """Make sure every test starts from empty metrics."""
+    metrics.clear()
+    yield
+    metrics.clear()
+
+
+@pytest.fixture(autouse=True)
+def inline_job_executor(monkeypatch):
+    """Run queued transcription jobs synchronously inside the request."""
+    executor = InlineJobExecutor()
+    monkeypatch.setattr("routers.transcriptions.job_executor", executor)
+    return executor
+
+
+@pytest.fixture(autouse=True)
+def isolated_artifact_storage(tmp_path, monkeypatch):
+    """Keep pipeline artifacts written by tests out of the data directory."""
+    monkeypatch.setattr(artifact_storage, "root", str(tmp_path / "artifacts"))
+    return artifact_storage
 
 
 @pytest.fixture
@@ -98,9 +153,11 @@ def mock_pyannote_pipeline():
 
 
 @pytest.fixture
-def mock_ffmpeg_probe():
-    """Mock ffmpeg.probe for duration checking."""
-    return {"format": {"duration": "10.5"}}
+def mock_decode_audio():
+    """Mock the shared audio decode stage with 10 seconds of silence."""
+    with patch("services.transcription_service.decode_audio") as mock_decode:
+        mock_decode.return_value = np.zeros(10 * 16000, dtype=np.float32)
+        yield mock_decode
 
 
 @pytest.fixture
@@ -1,30 +1,67 @@
 """Integration tests for transcription API endpoints."""
 
+import asyncio
+import json
+import numpy as np
 import pytest
 import sys
 import os
+import threading
+import time
+import warnings
 from unittest.mock import patch, AsyncMock
 from io import BytesIO
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../app'))
 
+from starlette.websockets import WebSocketDisconnect
+
 from models.transcription import Transcription, TranscriptionStatus
+from services.job_queue import PoolJobExecutor
+from services.progress import JobProgress, progress_broker
+from storage.serialization import transcription_json
+
+
+class TestHealthEndpoint:
+    """Test GET /api/health endpoint."""
+
+    def test_health_reports_models(self, test_client):
+        """Test that health exposes loaded model statistics."""
+        response = test_client.get("/api/health")
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["status"] == "healthy"
+        assert "loaded" in result["models"]
+        assert "memory_budget_mb" in result["models"]
+
+    def test_health_reports_engine(self, test_client):
+        """Test that health tells whether the ML stack may be loaded."""
+        result = test_client.get("/api/health").json()
+
+        assert result["engine"]["api_only"] is False
+        assert isinstance(result["engine"]["loaded"], bool)
+
+    def test_health_reports_storage(self, test_client):
+        """Test that health exposes the storage read cache counters."""
+        result = test_client.get("/api/health").json()
+
+        assert result["storage"]["backend"] == "json"
+        assert "hit_ratio" in result["storage"]["cache"]
 
 
 class TestUploadEndpoint:
     """Test POST /api/transcriptions/upload endpoint."""
 
     @patch('routers.transcriptions.process_transcription')
-    @patch('routers.transcriptions.file_service.get_file_duration')
     @patch('routers.transcriptions.file_storage.save_file')
     @patch('routers.transcriptions.storage.save')
     def test_upload_success(
-        self, mock_storage_save, mock_save_file, mock_get_duration,
+        self, mock_storage_save, mock_save_file,
         mock_process, test_client, sample_transcription
     ):
         """Test successful file upload and transcription."""
         mock_save_file.return_value = "/uploads/test_audio.mp3"
-        mock_get_duration.return_value = 10.5
         mock_process.return_value = sample_transcription
         mock_storage_save.return_value = sample_transcription
 
@@ -36,9 +73,89 @@ class TestUploadEndpoint:
 
         assert response.status_code == 200
         result = response.json()
-        assert result["id"] == sample_transcription.id
-        assert result["status"] == "completed"
-        assert result["file_name"] == "test_audio.mp3"
+        assert result["status"] == "pending"
+        assert result["file_name"] == "test.mp3"
+        # Duration is only known once the job has decoded the audio
+        assert result["duration"] is None
+
+        # The queued job reuses the id returned to the client
+        assert mock_process.call_args.kwargs["transcription_id"] == result["id"]
+
+        # PENDING, PROCESSING and the final result are stored
+        saved_statuses = [c.args[0].status for c in mock_storage_save.call_args_list]
+        assert saved_statuses == [
+            TranscriptionStatus.PENDING,
+            TranscriptionStatus.PROCESSING,
+            TranscriptionStatus.COMPLETED,
+        ]
+
+    @patch('routers.transcriptions.process_transcription')
+    @patch('routers.transcriptions.file_storage.save_file')
+    def test_upload_saves_off_event_loop(
+        self, mock_save_file, mock_process, test_client, sample_transcription
+    ):
+        """Test that blocking storage writes never run on the event loop."""
+        mock_save_file.return_value = "/uploads/test.mp3"
+        mock_process.return_value = sample_transcription
+        on_loop = []
+
+        def save(transcription):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return transcription
+
+        with patch('routers.transcriptions.storage.save', side_effect=save):
+            response = test_client.post(
+                "/api/transcriptions/upload",
+                files={"file": ("test.mp3", BytesIO(b"x" * 64), "audio/mpeg")},
+            )
+
+        assert response.status_code == 200
+        assert on_loop and not any(on_loop)
+
+    @patch('routers.transcriptions.process_transcription')
+    @patch('routers.transcriptions.file_storage.save_file')
+    @patch('routers.transcriptions.storage.save')
+    def test_upload_processing_failure_marks_failed(
+        self, mock_storage_save, mock_save_file,
+        mock_process, test_client
+    ):
+        """Test that a crashing job stores the transcription as FAILED."""
+        mock_save_file.return_value = "/uploads/test_audio.mp3"
+        mock_process.side_effect = RuntimeError("Whisper crashed")
+
+        files = {"file": ("test.mp3", BytesIO(b"fake audio"), "audio/mpeg")}
+
+        response = test_client.post("/api/transcriptions/upload", files=files)
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "pending"
+        final = mock_storage_save.call_args_list[-1].args[0]
+        assert final.status == TranscriptionStatus.FAILED
+        assert final.id == response.json()["id"]
+
+    @patch('routers.transcriptions.file_storage.save_file')
+    def test_upload_queue_full(self, mock_save_file, test_client, monkeypatch):
+        """Test backpressure when the job queue is full."""
+        executor = PoolJobExecutor(max_workers=1, max_queue_depth=0)
+        release = threading.Event()
+        executor.submit("busy-job", release.wait)
+        monkeypatch.setattr("routers.transcriptions.job_executor", executor)
+
+        files = {"file": ("test.mp3", BytesIO(b"fake audio"), "audio/mpeg")}
+
+        try:
+            response = test_client.post("/api/transcriptions/upload", files=files)
+        finally:
+            release.set()
+            executor.shutdown()
+
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+        mock_save_file.assert_not_called()
 
     @pytest.mark.parametrize(
         "content_type,status_code",
@@ -52,17 +169,15 @@ class TestUploadEndpoint:
         ids=["audio_mpeg", "audio_wav", "video_mp4", "pdf", "jpeg"]
     )
     @patch('routers.transcriptions.process_transcription')
-    @patch('routers.transcriptions.file_service.get_file_duration')
     @patch('routers.transcriptions.file_storage.save_file')
     @patch('routers.transcriptions.storage.save')
     def test_upload_content_type_validation(
-        self, mock_storage_save, mock_save_file, mock_get_duration,
+        self, mock_storage_save, mock_save_file,
         mock_process, test_client, sample_transcription, content_type, status_code
     ):
         """Test file upload with various content types."""
         if status_code == 200:
             mock_save_file.return_value = "/uploads/test_file"
-            mock_get_duration.return_value = 10.5
             mock_process.return_value = sample_transcription
             mock_storage_save.return_value = sample_transcription
 
@@ -79,16 +194,14 @@ class TestUploadEndpoint:
         ids=["english", "spanish", "french", "german", "chinese", "none"]
     )
     @patch('routers.transcriptions.process_transcription')
-    @patch('routers.transcriptions.file_service.get_file_duration')
     @patch('routers.transcriptions.file_storage.save_file')
     @patch('routers.transcriptions.storage.save')
     def test_upload_language_parameter(
-        self, mock_storage_save, mock_save_file, mock_get_duration,
+        self, mock_storage_save, mock_save_file,
         mock_process, test_client, sample_transcription, language
     ):
         """Test upload with different language parameters."""
         mock_save_file.return_value = "/uploads/test.mp3"
-        mock_get_duration.return_value = 10.5
         mock_process.return_value = sample_transcription
         mock_storage_save.return_value = sample_transcription
 
@@ -103,6 +216,17 @@ class TestUploadEndpoint:
         expected_lang = language if language else "en"
         assert call_kwargs["language"] == expected_lang
 
+    @patch('services.file_service.settings.MAX_FILE_SIZE', 5)
+    @patch('routers.transcriptions.file_storage.save_file')
+    def test_upload_too_large(self, mock_save_file, test_client):
+        """Test that MAX_FILE_SIZE is enforced for multipart uploads."""
+        files = {"file": ("test.mp3", BytesIO(b"fake audio"), "audio/mpeg")}
+
+        response = test_client.post("/api/transcriptions/upload", files=files)
+
+        assert response.status_code == 413
+        mock_save_file.assert_not_called()
+
     def test_upload_missing_file(self, test_client):
         """Test upload without file."""
         data = {"language": "en"}
@@ -112,20 +236,275 @@ class TestUploadEndpoint:
         assert response.status_code == 422  # Unprocessable Entity
 
 
+class TestUploadDeduplication:
+    """Test that identical uploads reuse a single pipeline run."""
+
+    @patch('routers.transcriptions.process_transcription')
+    @patch('routers.transcriptions.file_storage.save_file')
+    @patch('routers.transcriptions.storage.save')
+    def test_repeat_upload_served_from_cache(
+        self, mock_storage_save, mock_save_file, mock_process, test_client,
+        sample_transcription
+    ):
+        """Test that re-uploading the same file completes immediately."""
+        mock_save_file.return_value = "/uploads/test.mp3"
+        mock_process.return_value = sample_transcription
+
+        first = test_client.post(
+            "/api/transcriptions/upload",
+            files={"file": ("a.mp3", BytesIO(b"same audio"), "audio/mpeg")},
+        )
+        second = test_client.post(
+            "/api/transcriptions/upload",
+            files={"file": ("b.mp3", BytesIO(b"same audio"), "audio/mpeg")},
+        )
+
+        assert mock_process.call_count == 1
+        result = second.json()
+        assert result["id"] != first.json()["id"]
+        assert result["file_name"] == "b.mp3"
+        assert result["status"] == "completed"
+        assert len(result["segments"]) == len(sample_transcription.segments)
+
+        health = test_client.get("/api/health").json()
+        assert health["cache"]["hits"] == 1
+        assert health["cache"]["misses"] == 1
+
+    @patch('routers.transcriptions.process_transcription')
+    @patch('routers.transcriptions.file_storage.save_file')
+    @patch('routers.transcriptions.storage.save')
+    def test_cached_upload_shares_artifacts(
+        self, mock_storage_save, mock_save_file, mock_process, test_client,
+        sample_transcription, isolated_artifact_storage
+    ):
+        """Test that a result served from the cache can be re-merged too."""
+        mock_save_file.return_value = "/uploads/test.mp3"
+
+        def process(**kwargs):
+            isolated_artifact_storage.save(
+                kwargs["transcription_id"], sample_transcription.segments, []
+            )
+            return sample_transcription.model_copy(
+                update={"id": kwargs["transcription_id"]}
+            )
+
+        mock_process.side_effect = process
+
+        for name in ("a.mp3", "b.mp3"):
+            response = test_client.post(
+                "/api/transcriptions/upload",
+                files={"file": (name, BytesIO(b"same audio"), "audio/mpeg")},
+            )
+
+        assert mock_process.call_count == 1
+        assert isolated_artifact_storage.exists(response.json()["id"])
+
+    @pytest.mark.parametrize(
+        "second_file,second_language",
+        [(b"other audio", "en"), (b"same audio", "pl")],
+        ids=["other_content", "other_language"],
+    )
+    @patch('routers.transcriptions.process_transcription')
+    @patch('routers.transcriptions.file_storage.save_file')
+    @patch('routers.transcriptions.storage.save')
+    def test_different_upload_not_cached(
+        self, mock_storage_save, mock_save_file, mock_process, test_client,
+        sample_transcription, second_file, second_language
+    ):
+        """Test that other content or settings run the pipeline again."""
+        mock_save_file.return_value = "/uploads/test.mp3"
+        mock_process.return_value = sample_transcription
+
+        test_client.post(
+            "/api/transcriptions/upload",
+            files={"file": ("a.mp3", BytesIO(b"same audio"), "audio/mpeg")},
+            data={"language": "en"},
+        )
+        response = test_client.post(
+            "/api/transcriptions/upload",
+            files={"file": ("a.mp3", BytesIO(second_file), "audio/mpeg")},
+            data={"language": second_language},
+        )
+
+        assert response.json()["status"] == "pending"
+        assert mock_process.call_count == 2
+
+    @patch('routers.transcriptions.process_transcription')
+    @patch('routers.transcriptions.file_storage.save_file')
+    @patch('routers.transcriptions.storage.save')
+    def test_concurrent_duplicates_share_one_job(
+        self, mock_storage_save, mock_save_file, mock_process, test_client,
+        sample_transcription, monkeypatch
+    ):
+        """Test that duplicates of an in-flight upload wait for its job."""
+        mock_save_file.return_value = "/uploads/test.mp3"
+        release = threading.Event()
+
+        def slow_process(**kwargs):
+            release.wait(5)
+            return sample_transcription.model_copy(
+                update={"id": kwargs["transcription_id"]}
+            )
+
+        mock_process.side_effect = slow_process
+        executor = PoolJobExecutor(max_workers=1, max_queue_depth=4)
+        monkeypatch.setattr("routers.transcriptions.job_executor", executor)
+
+        try:
+            ids = [
+                test_client.post(
+                    "/api/transcriptions/upload",
+                    files={"file": ("a.mp3", BytesIO(b"same audio"), "audio/mpeg")},
+                ).json()["id"]
+                for _ in range(3)
+            ]
+            assert executor.stats()["running"] + executor.stats()["queued"] == 1
+        finally:
+            release.set()
+
+        def completed_ids():
+            return {
+                c.args[0].id
+                for c in mock_storage_save.call_args_list
+                if c.args[0].status == TranscriptionStatus.COMPLETED
+            }
+
+        deadline = time.monotonic() + 5
+        while completed_ids() != set(ids) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        executor.shutdown()
+
+        assert completed_ids() == set(ids)
+        assert mock_process.call_count == 1
+
+        health = test_client.get("/api/health").json()
+        assert health["cache"]["coalesced"] == 2
+        assert health["cache"]["entries"] == 1
+
+
+class TestUploadStreamEndpoint:
+    """Test POST /api/transcriptions/upload-stream endpoint."""
+
+    WAV_HEAD = b"RIFF\x24\x08\x00\x00WAVEfmt " + b"\x00" * 60
+
+    @pytest.fixture(autouse=True)
+    def upload_dir(self, temp_dir, monkeypatch):
+        monkeypatch.setattr("routers.transcriptions.file_storage.upload_dir", temp_dir)
+        return temp_dir
+
+    @patch('routers.transcriptions.process_transcription')
+    @patch('routers.transcriptions.storage.save')
+    def test_upload_stream_success(
+        self, mock_storage_save, mock_process, test_client, sample_transcription,
+        upload_dir
+    ):
+        """Test that the raw body is stored and the sniffed type is used."""
+        mock_process.return_value = sample_transcription
+
+        response = test_client.post(
+            "/api/transcriptions/upload-stream",
+            params={"filename": "meeting.wav", "language": "pl"},
+            content=self.WAV_HEAD + b"x" * 1000,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["status"] == "pending"
+        assert result["file_type"] == "audio/wav"
+        assert result["language"] == "pl"
+
+        file_path = mock_process.call_args.kwargs["file_path"]
+        assert file_path == os.path.join(upload_dir, f"{result['id']}_meeting.wav")
+        assert os.path.getsize(file_path) == len(self.WAV_HEAD) + 1000
+
+    @patch('routers.transcriptions.storage.save')
+    def test_upload_stream_unrecognized_format(
+        self, mock_storage_save, test_client, upload_dir
+    ):
+        """Test that the declared content type is not trusted."""
+        response = test_client.post(
+            "/api/transcriptions/upload-stream",
+            params={"filename": "fake.mp3"},
+            content=b"%PDF-1.7" + b"x" * 100,
+            headers={"Content-Type": "audio/mpeg"},
+        )
+
+        assert response.status_code == 400
+        assert os.listdir(upload_dir) == []
+        mock_storage_save.assert_not_called()
+
+    @patch('routers.transcriptions.settings.MAX_FILE_SIZE', 100)
+    @patch('routers.transcriptions.storage.save')
+    def test_upload_stream_too_large(self, mock_storage_save, test_client, upload_dir):
+        """Test that a declared Content-Length over the limit is refused."""
+        response = test_client.post(
+            "/api/transcriptions/upload-stream",
+            params={"filename": "big.wav"},
+            content=self.WAV_HEAD + b"x" * 100,
+        )
+
+        assert response.status_code == 413
+        assert os.listdir(upload_dir) == []
+        mock_storage_save.assert_not_called()
+
+    @patch('routers.transcriptions.storage.save')
+    def test_upload_stream_invalid_content_length(
+        self, mock_storage_save, test_client, upload_dir
+    ):
+        """Test that a non-numeric Content-Length is a client error."""
+        response = test_client.post(
+            "/api/transcriptions/upload-stream",
+            params={"filename": "audio.wav"},
+            content=self.WAV_HEAD,
+            headers={"Content-Length": "many"},
+        )
+
+        assert response.status_code == 400
+        assert os.listdir(upload_dir) == []
+        mock_storage_save.assert_not_called()
+
+    @patch('routers.transcriptions.settings.MAX_FILE_SIZE', 100)
+    @patch('routers.transcriptions.storage.save')
+    def test_upload_stream_too_large_chunked(
+        self, mock_storage_save, test_client, upload_dir
+    ):
+        """Test that bodies without Content-Length are limited while streaming."""
+
+        def body():
+            yield self.WAV_HEAD
+            yield b"x" * 100
+
+        response = test_client.post(
+            "/api/transcriptions/upload-stream",
+            params={"filename": "big.wav"},
+            content=body(),
+        )
+
+        assert response.status_code == 413
+        assert os.listdir(upload_dir) == []
+
+    def test_upload_stream_missing_filename(self, test_client):
+        """Test that the filename query parameter is required."""
+        response = test_client.post(
+            "/api/transcriptions/upload-stream", content=self.WAV_HEAD
+        )
+
+        assert response.status_code == 422
+
+
 class TestUploadFromUrlEndpoint:
     """Test POST /api/transcriptions/upload-url endpoint."""
 
     @patch('routers.transcriptions.process_transcription')
-    @patch('routers.transcriptions.file_service.get_file_duration')
     @patch('routers.transcriptions.url_service.download_from_url')
     @patch('routers.transcriptions.storage.save')
     def test_upload_url_success(
-        self, mock_storage_save, mock_download, mock_get_duration,
+        self, mock_storage_save, mock_download,
         mock_process, test_client, sample_transcription
     ):
         """Test successful upload from URL."""
         mock_download.return_value = ("/uploads/audio.mp3", "audio/mpeg")
-        mock_get_duration.return_value = 10.5
         mock_process.return_value = sample_transcription
         mock_storage_save.return_value = sample_transcription
 
@@ -138,8 +517,11 @@ class TestUploadFromUrlEndpoint:
 
         assert response.status_code == 200
         result = response.json()
-        assert result["id"] == sample_transcription.id
-        assert result["status"] == "completed"
+        assert result["status"] == "pending"
+        assert result["file_name"] == "audio.mp3"
+        call_kwargs = mock_process.call_args.kwargs
+        assert call_kwargs["transcription_id"] == result["id"]
+        assert call_kwargs["source_url"] == "https://example.com/audio.mp3"
 
     @pytest.mark.parametrize(
         "url,language",
@@ -151,16 +533,14 @@ class TestUploadFromUrlEndpoint:
         ids=["simple", "path", "query_params"]
     )
     @patch('routers.transcriptions.process_transcription')
-    @patch('routers.transcriptions.file_service.get_file_duration')
     @patch('routers.transcriptions.url_service.download_from_url')
     @patch('routers.transcriptions.storage.save')
     def test_upload_url_various_urls(
-        self, mock_storage_save, mock_download, mock_get_duration,
+        self, mock_storage_save, mock_download,
         mock_process, test_client, sample_transcription, url, language
     ):
         """Test URL upload with various URL formats."""
         mock_download.return_value = ("/uploads/file", "audio/mpeg")
-        mock_get_duration.return_value = 10.5
         mock_process.return_value = sample_transcription
         mock_storage_save.return_value = sample_transcription
 
@@ -194,18 +574,18 @@ class TestUploadFromUrlEndpoint:
 class TestListTranscriptionsEndpoint:
     """Test GET /api/transcriptions endpoint."""
 
-    @patch('routers.transcriptions.storage.list_all')
-    def test_list_empty(self, mock_list_all, test_client):
+    @patch('routers.transcriptions.storage.list_summaries')
+    def test_list_empty(self, mock_list_summaries, test_client):
         """Test listing when no transcriptions exist."""
-        mock_list_all.return_value = []
+        mock_list_summaries.return_value = ([], None)
 
         response = test_client.get("/api/transcriptions")
 
         assert response.status_code == 200
         assert response.json() == []
 
-    @patch('routers.transcriptions.storage.list_all')
-    def test_list_multiple(self, mock_list_all, test_client):
+    @patch('routers.transcriptions.storage.list_summaries')
+    def test_list_multiple(self, mock_list_summaries, test_client):
         """Test listing multiple transcriptions."""
         transcriptions = [
             Transcription(
@@ -218,11 +598,12 @@ class TestListTranscriptionsEndpoint:
             )
             for i in range(3)
         ]
-        mock_list_all.return_value = transcriptions
+        mock_list_summaries.return_value = ([t.to_item() for t in transcriptions], None)
 
         response = test_client.get("/api/transcriptions")
 
         assert response.status_code == 200
+        assert "X-Next-Cursor" not in response.headers
         result = response.json()
         assert len(result) == 3
 
@@ -234,7 +615,7 @@ class TestListTranscriptionsEndpoint:
             assert item["duration"] == 10.0 + i
             assert "segments" not in item
 
-    @patch('routers.transcriptions.storage.list_all')
+    @patch('routers.transcriptions.storage.list_summaries')
     @pytest.mark.parametrize(
         "status",
         [
@@ -245,7 +626,7 @@ class TestListTranscriptionsEndpoint:
         ],
         ids=["pending", "processing", "completed", "failed"]
     )
-    def test_list_various_statuses(self, mock_list_all, test_client, status):
+    def test_list_various_statuses(self, mock_list_summaries, test_client, status):
         """Test listing transcriptions with various statuses."""
         transcriptions = [
             Transcription(
@@ -257,7 +638,7 @@ class TestListTranscriptionsEndpoint:
                 segments=[]
             )
         ]
-        mock_list_all.return_value = transcriptions
+        mock_list_summaries.return_value = ([t.to_item() for t in transcriptions], None)
 
         response = test_client.get("/api/transcriptions")
 
@@ -265,14 +646,102 @@ class TestListTranscriptionsEndpoint:
         result = response.json()
         assert result[0]["status"] == status.value
 
+    @patch('routers.transcriptions.storage.list_summaries')
+    def test_list_query_parameters(self, mock_list_summaries, test_client):
+        """Test that filters, sorting and paging reach the storage layer."""
+        mock_list_summaries.return_value = ([], None)
+
+        response = test_client.get(
+            "/api/transcriptions",
+            params={
+                "status": "completed",
+                "language": "en",
+                "created_after": "2025-01-01T00:00:00Z",
+                "sort_by": "duration",
+                "order": "asc",
+                "cursor": "abc",
+                "limit": 10,
+            },
+        )
+
+        assert response.status_code == 200
+        query = mock_list_summaries.call_args.args[0]
+        assert query.status == TranscriptionStatus.COMPLETED
+        assert query.language == "en"
+        assert query.created_after.year == 2025
+        assert query.sort_by == "duration"
+        assert query.order == "asc"
+        assert query.cursor == "abc"
+        assert query.limit == 10
+
+    @patch('routers.transcriptions.storage.list_summaries')
+    def test_list_next_cursor_headers(self, mock_list_summaries, test_client):
+        """Test that the next page cursor is returned in headers."""
+        mock_list_summaries.return_value = ([], "next-page")
+
+        response = test_client.get("/api/transcriptions", params={"limit": 1})
+
+        assert response.headers["X-Next-Cursor"] == "next-page"
+        assert "cursor=next-page" in response.headers["Link"]
+        assert 'rel="next"' in response.headers["Link"]
+
+    @patch('routers.transcriptions.storage.list_summaries')
+    def test_list_invalid_cursor(self, mock_list_summaries, test_client):
+        """Test that a malformed cursor is rejected."""
+        mock_list_summaries.side_effect = ValueError("Invalid cursor")
+
+        response = test_client.get("/api/transcriptions", params={"cursor": "x"})
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize(
+        "params",
+        [{"limit": 0}, {"limit": 5000}, {"sort_by": "speaker"}, {"status": "done"}],
+        ids=["limit_zero", "limit_too_large", "unknown_sort", "unknown_status"],
+    )
+    def test_list_invalid_parameters(self, test_client, params):
+        """Test validation of listing parameters."""
+        response = test_client.get("/api/transcriptions", params=params)
+
+        assert response.status_code == 422
+
+
+class TestExportTranscriptionsEndpoint:
+    """Test GET /api/transcriptions/export endpoint."""
+
+    @patch('routers.transcriptions.storage.iter_summaries')
+    def test_export_ndjson(self, mock_iter_summaries, test_client):
+        """Test that summaries are streamed one JSON document per line."""
+        mock_iter_summaries.return_value = iter(
+            Transcription(
+                id=f"id-{i}",
+                status=TranscriptionStatus.COMPLETED,
+                file_name=f"file{i}.mp3",
+                file_type="audio/mpeg",
+            ).to_item()
+            for i in range(3)
+        )
+
+        response = test_client.get(
+            "/api/transcriptions/export", params={"status": "completed"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["id"] for line in lines] == ["id-0", "id-1", "id-2"]
+        assert all("segments" not in line for line in lines)
+        query = mock_iter_summaries.call_args.args[0]
+        assert query.status == TranscriptionStatus.COMPLETED
+
 
 class TestGetTranscriptionEndpoint:
     """Test GET /api/transcriptions/{id} endpoint."""
 
-    @patch('routers.transcriptions.storage.get')
-    def test_get_existing(self, mock_get, test_client, sample_transcription):
+    @patch('routers.transcriptions.storage.get_json')
+    def test_get_existing(self, mock_get_json, test_client, sample_transcription):
         """Test getting an existing transcription."""
-        mock_get.return_value = sample_transcription
+        mock_get_json.return_value = transcription_json(sample_transcription)
 
         response = test_client.get(f"/api/transcriptions/{sample_transcription.id}")
 
@@ -282,17 +751,17 @@ class TestGetTranscriptionEndpoint:
         assert result["file_name"] == sample_transcription.file_name
         assert len(result["segments"]) == len(sample_transcription.segments)
 
-    @patch('routers.transcriptions.storage.get')
-    def test_get_not_found(self, mock_get, test_client):
+    @patch('routers.transcriptions.storage.get_json')
+    def test_get_not_found(self, mock_get_json, test_client):
         """Test getting a non-existent transcription."""
-        mock_get.return_value = None
+        mock_get_json.return_value = None
 
         response = test_client.get("/api/transcriptions/non-existent-id")
 
         assert response.status_code == 404
         assert "not found" in response.json()["detail"].lower()
 
-    @patch('routers.transcriptions.storage.get')
+    @patch('routers.transcriptions.storage.get_json')
     @pytest.mark.parametrize(
         "transcription_id",
         [
@@ -302,12 +771,510 @@ class TestGetTranscriptionEndpoint:
         ],
         ids=["simple", "uuid", "underscore"]
     )
-    def test_get_various_id_formats(self, mock_get, test_client, sample_transcription, transcription_id):
+    def test_get_various_id_formats(self, mock_get_json, test_client, sample_transcription, transcription_id):
         """Test getting transcriptions with various ID formats."""
         sample_transcription.id = transcription_id
-        mock_get.return_value = sample_transcription
+        mock_get_json.return_value = transcription_json(sample_transcription)
 
         response = test_client.get(f"/api/transcriptions/{transcription_id}")
 
         assert response.status_code == 200
         assert response.json()["id"] == transcription_id
+
+
+def _sse_events(body):
+    """Parse (event, data) pairs out of a server-sent events body."""
+    events = []
+    for message in body.strip().split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in message.splitlines() if not line.startswith(":")
+        )
+        if fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestMediaEndpoint:
+    """Test GET /api/transcriptions/{id}/media endpoint."""
+
+    MEDIA = bytes(range(256)) * 64
+
+    @pytest.fixture
+    def media_file(self, temp_dir, monkeypatch, sample_transcription):
+        from routers.transcriptions import file_storage
+
+        monkeypatch.setattr(file_storage, 'upload_dir', temp_dir)
+        file_path = file_storage.get_file_path(
+            sample_transcription.id, sample_transcription.file_name
+        )
+        with open(file_path, 'wb') as f:
+            f.write(self.MEDIA)
+        return file_path
+
+    @patch('routers.transcriptions.storage.get')
+    def test_full_file(self, mock_get, test_client, sample_transcription, media_file):
+        """Test that the stored upload is served with caching headers."""
+        mock_get.return_value = sample_transcription
+
+        response = test_client.get(f"/api/transcriptions/{sample_transcription.id}/media")
+
+        assert response.status_code == 200
+        assert response.content == self.MEDIA
+        assert response.headers["content-type"] == "audio/mpeg"
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["etag"]
+        assert response.headers["last-modified"]
+        assert response.headers["content-disposition"].startswith("inline")
+
+    @patch('routers.transcriptions.storage.get')
+    def test_range(self, mock_get, test_client, sample_transcription, media_file):
+        """Test that a byte range is served on its own."""
+        mock_get.return_value = sample_transcription
+
+        response = test_client.get(
+            f"/api/transcriptions/{sample_transcription.id}/media",
+            headers={"Range": "bytes=1000-1999"},
+        )
+
+        assert response.status_code == 206
+        assert response.content == self.MEDIA[1000:2000]
+        assert response.headers["content-range"] == f"bytes 1000-1999/{len(self.MEDIA)}"
+
+    @patch('routers.transcriptions.storage.get')
+    def test_unsatisfiable_range(
+        self, mock_get, test_client, sample_transcription, media_file
+    ):
+        """Test that ranges past the end of the file are rejected."""
+        mock_get.return_value = sample_transcription
+
+        response = test_client.get(
+            f"/api/transcriptions/{sample_transcription.id}/media",
+            headers={"Range": f"bytes={len(self.MEDIA)}-"},
+        )
+
+        assert response.status_code == 416
+
+    @patch('routers.transcriptions.storage.get')
+    def test_not_modified(self, mock_get, test_client, sample_transcription, media_file):
+        """Test that cached copies are revalidated without a body."""
+        mock_get.return_value = sample_transcription
+        url = f"/api/transcriptions/{sample_transcription.id}/media"
+        first = test_client.get(url)
+
+        by_etag = test_client.get(url, headers={"If-None-Match": first.headers["etag"]})
+        by_date = test_client.get(
+            url, headers={"If-Modified-Since": first.headers["last-modified"]}
+        )
+        changed = test_client.get(url, headers={"If-None-Match": '"other"'})
+
+        assert by_etag.status_code == 304
+        assert by_etag.content == b""
+        assert by_etag.headers["etag"] == first.headers["etag"]
+        assert by_date.status_code == 304
+        assert changed.status_code == 200
+
+    @patch('routers.transcriptions.storage.get')
+    def test_head(self, mock_get, test_client, sample_transcription, media_file):
+        """Test that HEAD requests get the headers only."""
+        mock_get.return_value = sample_transcription
+
+        response = test_client.head(f"/api/transcriptions/{sample_transcription.id}/media")
+
+        assert response.status_code == 200
+        assert response.headers["content-length"] == str(len(self.MEDIA))
+        assert response.content == b""
+
+    def test_head_not_in_schema(self, test_client, monkeypatch):
+        """Test that HEAD does not add a second operation with the same id."""
+        monkeypatch.setattr(test_client.app, "openapi_schema", None)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            schema = test_client.get("/openapi.json").json()
+
+        media = schema["paths"]["/api/transcriptions/{transcription_id}/media"]
+        assert list(media) == ["get"]
+
+    @patch('routers.transcriptions.storage.get')
+    def test_missing_file(
+        self, mock_get, test_client, sample_transcription, temp_dir, monkeypatch
+    ):
+        """Test that transcriptions whose upload is gone return 404."""
+        from routers.transcriptions import file_storage
+
+        monkeypatch.setattr(file_storage, 'upload_dir', temp_dir)
+        mock_get.return_value = sample_transcription
+
+        response = test_client.get(f"/api/transcriptions/{sample_transcription.id}/media")
+
+        assert response.status_code == 404
+
+    @patch('routers.transcriptions.transcode_opus')
+    @patch('routers.transcriptions.storage.get')
+    def test_opus_rendition(
+        self, mock_get, mock_transcode, test_client, sample_transcription, media_file
+    ):
+        """Test that the Opus rendition is transcoded once and cached."""
+        mock_get.return_value = sample_transcription
+
+        def transcode(source_path, output_path, bitrate_kbps):
+            with open(output_path, 'wb') as f:
+                f.write(b"opus")
+
+        mock_transcode.side_effect = transcode
+        url = f"/api/transcriptions/{sample_transcription.id}/media?rendition=opus"
+
+        first = test_client.get(url)
+        second = test_client.get(url)
+
+        assert first.status_code == 200
+        assert first.content == b"opus"
+        assert first.headers["content-type"] == "audio/webm"
+        assert 'test_audio.webm' in first.headers["content-disposition"]
+        assert second.content == b"opus"
+        assert mock_transcode.call_count == 1
+        assert mock_transcode.call_args.args[0] == media_file
+
+    @patch('routers.transcriptions.transcode_opus')
+    @patch('routers.transcriptions.storage.get')
+    def test_opus_rendition_failure(
+        self, mock_get, mock_transcode, test_client, sample_transcription, media_file
+    ):
+        """Test that transcoding errors are reported."""
+        mock_get.return_value = sample_transcription
+        mock_transcode.side_effect = RuntimeError("Failed to transcode audio")
+
+        response = test_client.get(
+            f"/api/transcriptions/{sample_transcription.id}/media?rendition=opus"
+        )
+
+        assert response.status_code == 500
+
+
+class TestRemergeEndpoint:
+    """Test POST /api/transcriptions/{id}/remerge endpoint."""
+
+    @patch('routers.transcriptions.storage')
+    def test_remerge(
+        self,
+        mock_storage,
+        test_client,
+        sample_transcription,
+        sample_transcription_segments,
+        sample_speaker_turns,
+        isolated_artifact_storage,
+    ):
+        """Test that speakers are re-assigned from the stored artifacts."""
+        mock_storage.get.return_value = sample_transcription
+        isolated_artifact_storage.save(
+            sample_transcription.id,
+            sample_transcription_segments,
+            sample_speaker_turns,
+        )
+
+        response = test_client.post(
+            f"/api/transcriptions/{sample_transcription.id}/remerge",
+            json={"min_overlap_seconds": 100, "unknown_speaker_label": "NOBODY"},
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["status"] == "completed"
+        assert len(result["segments"]) == len(sample_transcription_segments)
+        assert {s["speaker"] for s in result["segments"]} == {"NOBODY"}
+        saved = mock_storage.save.call_args.args[0]
+        assert saved.segments[0].speaker == "NOBODY"
+
+    @patch('routers.transcriptions.storage')
+    def test_remerge_defaults(
+        self,
+        mock_storage,
+        test_client,
+        sample_transcription,
+        sample_transcription_segments,
+        sample_speaker_turns,
+        isolated_artifact_storage,
+    ):
+        """Test that a request without a body uses the default parameters."""
+        mock_storage.get.return_value = sample_transcription
+        isolated_artifact_storage.save(
+            sample_transcription.id,
+            sample_transcription_segments,
+            sample_speaker_turns,
+        )
+
+        response = test_client.post(
+            f"/api/transcriptions/{sample_transcription.id}/remerge"
+        )
+
+        assert response.status_code == 200
+        assert response.json()["segments"][0]["speaker"] == "SPEAKER_00"
+
+    @patch('routers.transcriptions.storage')
+    def test_remerge_without_artifacts(
+        self, mock_storage, test_client, sample_transcription
+    ):
+        """Test that transcriptions without stored results cannot be re-merged."""
+        mock_storage.get.return_value = sample_transcription
+
+        response = test_client.post(
+            f"/api/transcriptions/{sample_transcription.id}/remerge"
+        )
+
+        assert response.status_code == 404
+        mock_storage.save.assert_not_called()
+
+    @patch('routers.transcriptions.storage')
+    def test_remerge_while_processing(
+        self, mock_storage, test_client, sample_transcription
+    ):
+        """Test that transcriptions still being processed are rejected."""
+        mock_storage.get.return_value = sample_transcription.model_copy(
+            update={"status": TranscriptionStatus.PROCESSING}
+        )
+
+        response = test_client.post(
+            f"/api/transcriptions/{sample_transcription.id}/remerge"
+        )
+
+        assert response.status_code == 409
+
+    @patch('routers.transcriptions.storage')
+    def test_remerge_invalid_parameters(
+        self, mock_storage, test_client, sample_transcription
+    ):
+        """Test that negative overlaps are rejected."""
+        mock_storage.get.return_value = sample_transcription
+
+        response = test_client.post(
+            f"/api/transcriptions/{sample_transcription.id}/remerge",
+            json={"min_overlap_seconds": -1},
+        )
+
+        assert response.status_code == 422
+
+
+class TestTranscriptionEventsEndpoint:
+    """Test live progress events over SSE and WebSocket."""
+
+    @patch('routers.transcriptions.storage.get')
+    def test_events_not_found(self, mock_get, test_client):
+        """Test streaming events of a non-existent transcription."""
+        mock_get.return_value = None
+
+        response = test_client.get("/api/transcriptions/non-existent-id/events")
+
+        assert response.status_code == 404
+
+    @patch('routers.transcriptions.storage.get')
+    def test_events_of_finished_transcription(self, mock_get, test_client, sample_transcription):
+        """Test that a finished transcription streams its final status only."""
+        mock_get.return_value = sample_transcription
+
+        response = test_client.get(f"/api/transcriptions/{sample_transcription.id}/events")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert _sse_events(response.text) == [
+            ("status", {
+                "type": "status",
+                "transcription_id": sample_transcription.id,
+                "status": "completed",
+                "stage": None,
+                "progress": 100.0,
+                "segment": None,
+            })
+        ]
+
+    @patch('routers.transcriptions.settings.EVENTS_HEARTBEAT_SECONDS', 0.01)
+    @patch('routers.transcriptions.storage.get')
+    def test_events_replay_and_heartbeat(self, mock_get, test_client, sample_transcription):
+        """Test that missed events are replayed and the stored status re-checked."""
+        processing = sample_transcription.model_copy(
+            update={"status": TranscriptionStatus.PROCESSING}
+        )
+        # Route check, initial status, a heartbeat while processing, then done
+        mock_get.side_effect = [processing, processing, processing, sample_transcription]
+        progress = JobProgress(sample_transcription.id)
+        progress.stage_started("asr")
+        progress.segments(sample_transcription.segments[:1])
+
+        response = test_client.get(f"/api/transcriptions/{sample_transcription.id}/events")
+
+        events = _sse_events(response.text)
+        assert [name for name, _ in events] == ["status", "stage", "segment", "status"]
+        assert events[0][1]["status"] == "processing"
+        assert events[2][1]["segment"]["text"] == sample_transcription.segments[0].text
+        assert events[-1][1]["status"] == "completed"
+        assert ": keep-alive" in response.text
+
+    @patch('routers.transcriptions.storage.get')
+    def test_events_websocket(self, mock_get, test_client, sample_transcription):
+        """Test that events published while connected reach the WebSocket."""
+        mock_get.return_value = sample_transcription.model_copy(
+            update={"status": TranscriptionStatus.PROCESSING}
+        )
+        url = f"/api/transcriptions/{sample_transcription.id}/ws"
+
+        with test_client.websocket_connect(url) as websocket:
+            assert websocket.receive_json()["status"] == "processing"
+
+            JobProgress(sample_transcription.id).stage_started("diarization")
+            progress_broker.finish(sample_transcription.id, TranscriptionStatus.FAILED)
+
+            assert websocket.receive_json()["stage"] == "diarization"
+            assert websocket.receive_json()["status"] == "failed"
+
+    @patch('routers.transcriptions.storage.get')
+    def test_events_websocket_not_found(self, mock_get, test_client):
+        """Test that the WebSocket is closed for a non-existent transcription."""
+        mock_get.return_value = None
+
+        with test_client.websocket_connect("/api/transcriptions/missing/ws") as websocket:
+            with pytest.raises(WebSocketDisconnect) as error:
+                websocket.receive_json()
+
+        assert error.value.code == 1008
+
+
+class TestLiveTranscriptionEndpoint:
+    """Test WebSocket /api/transcriptions/live endpoint."""
+
+    @staticmethod
+    def _fake_transcribe(samples, prompt):
+        """One segment per whole second of the buffer."""
+        return [
+            (float(i), float(i + 1), f"word{i}") for i in range(len(samples) // 16000)
+        ]
+
+    @patch('services.live_transcription.settings.LIVE_DIARIZATION', False)
+    @patch('services.live_transcription.get_whisper_model')
+    @patch('services.live_transcription.whisper_transcribe_fn')
+    @patch('services.live_transcription.storage')
+    def test_live_session(
+        self, mock_storage, mock_transcribe_fn, mock_get_model, test_client, temp_dir
+    ):
+        """Test streaming PCM frames and receiving the final transcript."""
+        mock_transcribe_fn.return_value = self._fake_transcribe
+        frame = np.zeros(8000, dtype="<i2").tobytes()  # 0.5 s at 16 kHz
+
+        with patch('services.live_transcription.file_storage.upload_dir', temp_dir):
+            with test_client.websocket_connect(
+                "/api/transcriptions/live?encoding=pcm_s16le&language=en"
+            ) as websocket:
+                started = websocket.receive_json()
+                for _ in range(6):
+                    websocket.send_bytes(frame)
+                websocket.send_text(json.dumps({"type": "stop"}))
+
+                events = [websocket.receive_json()]
+                while events[-1]["type"] != "status":
+                    events.append(websocket.receive_json())
+
+        assert started["status"] == "processing"
+        assert events[-1]["status"] == "completed"
+        final = mock_storage.save.call_args_list[-1].args[0]
+        assert final.id == started["transcription_id"]
+        assert final.status == TranscriptionStatus.COMPLETED
+        assert [(s.start_time, s.end_time) for s in final.segments] == [
+            (0.0, 1.0), (1.0, 2.0), (2.0, 3.0)
+        ]
+        assert final.duration == 3.0
+        mock_transcribe_fn.assert_called_once_with(None, "en")
+
+    @patch('services.live_transcription.settings.LIVE_DIARIZATION', False)
+    @patch('services.live_transcription.get_whisper_model')
+    @patch('services.live_transcription.whisper_transcribe_fn')
+    @patch('services.live_transcription.storage')
+    def test_live_processing_failure(
+        self, mock_storage, mock_transcribe_fn, mock_get_model, test_client, temp_dir
+    ):
+        """Test that a failing pass ends the session with an internal error."""
+
+        def failing_transcribe(samples, prompt):
+            raise RuntimeError("model crashed")
+
+        mock_transcribe_fn.return_value = failing_transcribe
+        frame = np.zeros(8000, dtype="<i2").tobytes()
+
+        with patch('services.live_transcription.file_storage.upload_dir', temp_dir):
+            with test_client.websocket_connect("/api/transcriptions/live") as websocket:
+                websocket.receive_json()
+                for _ in range(6):
+                    websocket.send_bytes(frame)
+
+                event = websocket.receive_json()
+                with pytest.raises(WebSocketDisconnect) as error:
+                    websocket.receive_json()
+
+        assert (event["type"], event["status"]) == ("status", "failed")
+        assert error.value.code == 1011
+        final = mock_storage.save.call_args_list[-1].args[0]
+        assert final.status == TranscriptionStatus.FAILED
+
+    @patch('services.live_transcription.storage')
+    @patch('routers.transcriptions.live_sessions.max_sessions', 0)
+    def test_live_too_many_sessions(self, mock_storage, test_client):
+        """Test that sessions beyond the limit are closed with 'try again later'."""
+        with patch('services.live_transcription.get_whisper_model'):
+            with test_client.websocket_connect("/api/transcriptions/live") as websocket:
+                with pytest.raises(WebSocketDisconnect) as error:
+                    websocket.receive_json()
+
+        assert error.value.code == 1013
+
+    def test_live_unsupported_model(self, test_client):
+        """Test that an unknown Whisper model closes the session."""
+        with test_client.websocket_connect("/api/transcriptions/live?model=huge") as websocket:
+            with pytest.raises(WebSocketDisconnect) as error:
+                websocket.receive_json()
+
+        assert error.value.code == 1008
+
+
+class TestMetricsEndpoint:
+    """Test GET /metrics endpoint."""
+
+    def test_metrics_exposition(self, test_client):
+        """Test that request latencies are exposed per route template."""
+        test_client.get("/api/transcriptions/missing-id")
+
+        response = test_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert "# TYPE http_request_duration_seconds histogram" in text
+        assert (
+            'http_request_duration_seconds_count{method="GET",'
+            'route="/api/transcriptions/{transcription_id}",status="404"} 1'
+        ) in text
+        assert 'job_queue_depth{state="queued"} 0' in text
+
+    def test_metrics_route_with_literal_path_value(self, test_client):
+        """Test that a parameter equal to a literal segment keeps the template."""
+        test_client.get("/api/transcriptions/api")
+
+        text = test_client.get("/metrics").text
+        assert (
+            'http_request_duration_seconds_count{method="GET",'
+            'route="/api/transcriptions/{transcription_id}",status="404"} 1'
+        ) in text
+
+    @patch('routers.transcriptions.process_transcription')
+    @patch('routers.transcriptions.storage.save')
+    def test_metrics_count_uploaded_bytes(
+        self, mock_storage_save, mock_process, test_client, sample_transcription,
+        temp_dir, monkeypatch
+    ):
+        """Test that bytes received through uploads are counted by source."""
+        monkeypatch.setattr("routers.transcriptions.file_storage.upload_dir", temp_dir)
+        mock_process.return_value = sample_transcription
+
+        test_client.post(
+            "/api/transcriptions/upload",
+            files={"file": ("test.mp3", BytesIO(b"x" * 2048), "audio/mpeg")},
+        )
+
+        text = test_client.get("/metrics").text
+        assert 'upload_bytes_total{source="multipart"} 2048' in text
+        assert 'transcription_stage_duration_seconds_count{stage="save"} 1' in text
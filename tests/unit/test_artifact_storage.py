@@ -0,0 +1,102 @@
+"""Tests for the columnar pipeline artifact storage."""
+
+import os
+
+import numpy as np
+import pytest
+
+from models.transcription import SpeakerTurn, TranscriptionSegment
+from storage.artifact_storage import ArtifactStorage
+
+
+@pytest.fixture
+def artifacts(temp_dir):
+    return ArtifactStorage(os.path.join(temp_dir, "artifacts"))
+
+
+def _segments():
+    return [
+        TranscriptionSegment(
+            id="seg-0", start_time=0.0, end_time=2.5, text="Hello world", speaker=""
+        ),
+        TranscriptionSegment(
+            id="seg-1", start_time=2.5, end_time=5.25, text="Zażółć gęślą", speaker=""
+        ),
+        TranscriptionSegment(
+            id="seg-2", start_time=5.25, end_time=6.0, text="", speaker=""
+        ),
+    ]
+
+
+def _turns():
+    return [
+        SpeakerTurn(start=0.0, end=2.4, speaker="SPEAKER_01"),
+        SpeakerTurn(start=2.4, end=6.0, speaker="SPEAKER_00"),
+        SpeakerTurn(start=4.0, end=5.0, speaker="SPEAKER_01"),
+    ]
+
+
+class TestArtifactStorage:
+    """Test saving and loading ASR segments and speaker turns."""
+
+    def test_round_trip(self, artifacts):
+        """Test that segments and turns come back unchanged."""
+        artifacts.save("abc", _segments(), _turns())
+
+        loaded = artifacts.get("abc")
+
+        assert loaded.segments == _segments()
+        assert loaded.speaker_turns == _turns()
+
+    def test_nothing_is_pickled(self, artifacts):
+        """Test that every column is a plain numeric array."""
+        path = artifacts.save("abc", _segments(), _turns())
+
+        with np.load(path, allow_pickle=False) as columns:
+            assert all(columns[name].dtype != object for name in columns.files)
+
+    def test_empty_results(self, artifacts):
+        """Test that transcriptions without speech are stored too."""
+        artifacts.save("abc", [], [])
+
+        loaded = artifacts.get("abc")
+
+        assert loaded.segments == []
+        assert loaded.speaker_turns == []
+
+    def test_missing(self, artifacts):
+        """Test that transcriptions without artifacts return None."""
+        assert artifacts.get("missing") is None
+        assert not artifacts.delete("missing")
+
+    def test_replaced_and_deleted(self, artifacts):
+        """Test that saving again replaces the artifacts and delete removes them."""
+        artifacts.save("abc", _segments(), _turns())
+        artifacts.save("abc", _segments()[:1], [])
+
+        assert len(artifacts.get("abc").segments) == 1
+        assert os.listdir(artifacts.root) == ["abc.npz"]
+        assert artifacts.delete("abc")
+        assert not artifacts.exists("abc")
+
+    def test_rejects_paths(self, artifacts):
+        """Test that ids cannot point outside the artifact directory."""
+        with pytest.raises(ValueError):
+            artifacts.get("../transcriptions")
+
+    def test_copy(self, artifacts):
+        """Test that a copy loads the same and outlives its source."""
+        artifacts.save("abc", _segments(), _turns())
+
+        assert artifacts.copy("abc", "def")
+        artifacts.delete("abc")
+
+        loaded = artifacts.get("def")
+        assert loaded.segments == _segments()
+        assert loaded.speaker_turns == _turns()
+        assert os.listdir(artifacts.root) == ["def.npz"]
+
+    def test_copy_missing(self, artifacts):
+        """Test that copying from a transcription without artifacts does nothing."""
+        assert not artifacts.copy("missing", "def")
+        assert not artifacts.exists("def")
@@ -0,0 +1,146 @@
+"""Tests for the Whisper inference engines."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+import torch
+import whisper
+from whisper.model import ModelDimensions
+
+from services.asr_backends import (
+    FasterWhisperModel,
+    QuantizedWhisper,
+    get_asr_backend,
+    quantize_whisper,
+)
+from services.model_registry import estimate_model_size, model_registry
+from services.transcription_service import get_whisper_model
+
+
+def tiny_whisper() -> whisper.Whisper:
+    """A randomly initialized Whisper small enough for unit tests."""
+    torch.manual_seed(0)
+    dims = ModelDimensions(
+        n_mels=80, n_audio_ctx=1500, n_audio_state=64, n_audio_head=2,
+        n_audio_layer=1, n_vocab=51865, n_text_ctx=448, n_text_state=64,
+        n_text_head=2, n_text_layer=1,
+    )
+    model = whisper.Whisper(dims).eval()
+    # Left uninitialized by Whisper, checkpoints always provide it
+    torch.nn.init.normal_(model.decoder.positional_embedding, std=0.02)
+    return model
+
+
+class TestGetAsrBackend:
+    """Test backend selection."""
+
+    def test_default_backend(self):
+        """Test that the reference torch engine is used by default."""
+        assert get_asr_backend().name == "torch"
+
+    def test_unknown_backend(self):
+        """Test that unknown backends are rejected."""
+        with pytest.raises(ValueError, match="Unsupported ASR backend"):
+            get_asr_backend("onnx")
+
+    def test_unavailable_backend(self):
+        """Test that backends whose package is missing are rejected."""
+        with patch("services.asr_backends.importlib.util.find_spec", return_value=None):
+            with pytest.raises(ValueError, match="not installed"):
+                get_asr_backend("faster-whisper")
+
+
+class TestQuantizeWhisper:
+    """Test the int8 CPU engine."""
+
+    def test_linear_layers_are_quantized(self):
+        """Test that every linear layer gets int8 weights."""
+        quantized = quantize_whisper(tiny_whisper())
+
+        modules = list(quantized.model.modules())
+        assert not any(isinstance(module, torch.nn.Linear) for module in modules)
+        assert any(
+            isinstance(module, torch.ao.nn.quantized.dynamic.Linear)
+            for module in modules
+        )
+
+    def test_quantized_logits_stay_close(self):
+        """Test that quantization barely changes the model's predictions."""
+        model = tiny_whisper()
+        mel = torch.randn(1, 80, 3000)
+        tokens = torch.tensor([[50258, 50259, 50359]])
+        with torch.no_grad():
+            expected = model(mel, tokens)
+            actual = quantize_whisper(model).model(mel, tokens)
+
+        error = (actual - expected).norm() / expected.norm()
+        assert error < 0.05
+
+    def test_resident_size_counts_int8_weights(self):
+        """Test that the registry's size estimate sees the packed int8 weights."""
+        model = tiny_whisper()
+        float_bytes = estimate_model_size(model)
+        linear_weights = sum(
+            module.weight.numel() for module in model.modules()
+            if isinstance(module, torch.nn.Linear)
+        )
+
+        quantized_bytes = estimate_model_size(quantize_whisper(model))
+
+        # 4 bytes per float32 weight, 1 byte per int8 weight
+        assert quantized_bytes == pytest.approx(
+            float_bytes - 3 * linear_weights, rel=0.01
+        )
+
+    def test_transcribe_runs_in_float32(self):
+        """Test that quantized models are never asked for fp16 decoding."""
+        model = MagicMock()
+        model.transcribe.return_value = {"segments": []}
+
+        QuantizedWhisper(model).transcribe("audio.wav", language="en")
+        QuantizedWhisper(model).transcribe("audio.wav", fp16=True)
+
+        assert [c.kwargs["fp16"] for c in model.transcribe.call_args_list] == [
+            False,
+            False,
+        ]
+        assert model.transcribe.call_args_list[0].kwargs["language"] == "en"
+
+
+class TestFasterWhisperModel:
+    """Test the CTranslate2 adapter."""
+
+    def test_segments_are_converted(self):
+        """Test that faster-whisper segments come back in Whisper's format."""
+        model = MagicMock()
+        model.transcribe.return_value = (
+            iter([SimpleNamespace(start=0.0, end=1.5, text=" Hello")]),
+            SimpleNamespace(language="en"),
+        )
+
+        result = FasterWhisperModel(model).transcribe(
+            np.zeros(16000, dtype=np.float64), language="en"
+        )
+
+        assert result == {"segments": [{"start": 0.0, "end": 1.5, "text": " Hello"}]}
+        audio = model.transcribe.call_args.args[0]
+        assert audio.dtype == np.float32
+
+
+class TestGetWhisperModel:
+    """Test loading models through the configured backend."""
+
+    @patch("services.transcription_service.settings.ASR_BACKEND", "torch-int8")
+    @patch("services.asr_backends.whisper.load_model")
+    def test_quantized_backend(self, mock_load_model):
+        """Test that the int8 engine's models are kept under their own key."""
+        mock_load_model.return_value = tiny_whisper()
+
+        model = get_whisper_model("turbo")
+
+        assert isinstance(model, QuantizedWhisper)
+        mock_load_model.assert_called_once_with("turbo", device="cpu")
+        assert "whisper:turbo:torch-int8" in model_registry
+        assert "whisper:turbo" not in model_registry
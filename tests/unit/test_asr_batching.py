@@ -0,0 +1,232 @@
+"""Tests for micro-batching short clips into one Whisper pass."""
+
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from services.asr_batching import ASRBatcher, decode_batch, token_segments
+from services.audio_service import SAMPLE_RATE
+from services.transcription_service import transcribe_with_whisper
+from tests.unit.test_asr_backends import tiny_whisper
+
+
+def clip(seconds: float = 1.0) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+class RecordingBatch:
+    """A fake batched pass recording the size of every batch."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, model_name, clips):
+        self.batches.append(len(clips))
+        return [{"segments": [{"start": 0.0, "end": 1.0, "text": model_name}]}] * len(
+            clips
+        )
+
+
+def transcribe_concurrently(batcher, count, model_name="tiny"):
+    results = [None] * count
+
+    def worker(index):
+        results[index] = batcher.transcribe(clip(), model_name)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestASRBatcher:
+    """Test how clips are grouped into batches."""
+
+    def test_concurrent_clips_are_batched(self):
+        """Test that concurrent clips share batches of at most max size."""
+        run_batch = RecordingBatch()
+        batcher = ASRBatcher(
+            max_batch_size=4, max_wait_seconds=0.5, run_batch=run_batch, max_callers=8
+        )
+
+        results = transcribe_concurrently(batcher, 8)
+        batcher.shutdown()
+
+        assert sum(run_batch.batches) == 8
+        assert max(run_batch.batches) == 4
+        assert len(run_batch.batches) < 8
+        assert all(result["segments"][0]["text"] == "tiny" for result in results)
+        assert batcher.stats()["clips"] == 8
+
+    def test_single_clip_flushed_after_max_wait(self):
+        """Test that a lone clip does not wait longer than max wait."""
+        run_batch = RecordingBatch()
+        batcher = ASRBatcher(
+            max_batch_size=8, max_wait_seconds=0.05, run_batch=run_batch
+        )
+
+        started = time.monotonic()
+        batcher.transcribe(clip(), "tiny")
+        elapsed = time.monotonic() - started
+        batcher.shutdown()
+
+        assert run_batch.batches == [1]
+        assert elapsed < 1.0
+
+    def test_models_are_batched_separately(self):
+        """Test that clips for different models never share a batch."""
+        seen = []
+
+        def run_batch(model_name, clips):
+            seen.append((model_name, len(clips)))
+            return [{"segments": []}] * len(clips)
+
+        batcher = ASRBatcher(
+            max_batch_size=4, max_wait_seconds=0.2, run_batch=run_batch, max_callers=4
+        )
+        threads = [
+            threading.Thread(target=batcher.transcribe, args=(clip(), name))
+            for name in ("tiny", "base", "tiny", "base")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batcher.shutdown()
+
+        assert sum(size for name, size in seen if name == "tiny") == 2
+        assert sum(size for name, size in seen if name == "base") == 2
+
+    def test_batch_size_capped_by_callers(self):
+        """Test that batches are never larger than the callers that can fill them."""
+        assert ASRBatcher(max_batch_size=8, max_callers=2).max_batch_size == 2
+        assert not ASRBatcher(max_batch_size=8, max_callers=1).enabled
+
+    def test_no_wait_when_every_caller_waits(self):
+        """Test that batches start at once when no other clip can arrive."""
+        run_batch = RecordingBatch()
+        batcher = ASRBatcher(
+            max_batch_size=4, max_wait_seconds=5.0, run_batch=run_batch, max_callers=2
+        )
+        threads = [
+            threading.Thread(target=batcher.transcribe, args=(clip(), name))
+            for name in ("tiny", "base")
+        ]
+
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+        batcher.shutdown()
+
+        assert sorted(run_batch.batches) == [1, 1]
+        assert elapsed < 1.0
+
+    def test_errors_reach_every_caller(self):
+        """Test that a failing batch raises in the callers waiting on it."""
+
+        def run_batch(model_name, clips):
+            raise RuntimeError("decoder failed")
+
+        batcher = ASRBatcher(
+            max_batch_size=2, max_wait_seconds=0.01, run_batch=run_batch
+        )
+
+        with pytest.raises(RuntimeError, match="decoder failed"):
+            batcher.transcribe(clip(), "tiny")
+        batcher.shutdown()
+
+    def test_accepts_only_short_decoded_clips(self):
+        """Test that paths and clips longer than one window are not batched."""
+        batcher = ASRBatcher(max_batch_size=4, max_wait_seconds=0.01)
+
+        assert batcher.accepts(clip(30))
+        assert not batcher.accepts(clip(31))
+        assert not batcher.accepts("audio.wav")
+
+    def test_disabled_by_default(self):
+        """Test that a batch size of 1 turns batching off."""
+        batcher = ASRBatcher(max_batch_size=1)
+
+        assert not batcher.enabled
+        assert not batcher.accepts(clip())
+
+
+class TestTokenSegments:
+    """Test splitting decoded tokens at timestamp tokens."""
+
+    tokenizer = SimpleNamespace(
+        timestamp_begin=1000,
+        decode=lambda tokens: " " + " ".join(f"w{token}" for token in tokens),
+    )
+
+    def test_segments_between_timestamps(self):
+        """Test that text between timestamp pairs becomes one segment."""
+        tokens = [1000, 1, 2, 1050, 1050, 3, 1100]
+
+        segments = token_segments(tokens, self.tokenizer, duration=5.0)
+
+        assert segments == [
+            {"start": 0.0, "end": 1.0, "text": " w1 w2"},
+            {"start": 1.0, "end": 2.0, "text": " w3"},
+        ]
+
+    def test_open_segment_runs_to_clip_end(self):
+        """Test that text without a closing timestamp ends with the clip."""
+        segments = token_segments([1000, 1, 2], self.tokenizer, duration=3.5)
+
+        assert segments == [{"start": 0.0, "end": 3.5, "text": " w1 w2"}]
+
+    def test_timestamps_clamped_to_duration(self):
+        """Test that timestamps in the padding are clamped to the clip."""
+        segments = token_segments([1000, 1, 1500], self.tokenizer, duration=4.0)
+
+        assert segments[0]["end"] == 4.0
+
+
+class TestDecodeBatch:
+    """Test the batched Whisper pass."""
+
+    def test_one_result_per_clip(self):
+        """Test that a batch of clips returns a result for every clip."""
+        results = decode_batch(tiny_whisper(), [clip(1), clip(2)], language="en")
+
+        assert len(results) == 2
+        for result, seconds in zip(results, (1, 2)):
+            assert all(
+                0 <= segment["start"] <= segment["end"] <= seconds
+                for segment in result["segments"]
+            )
+
+    def test_engines_without_batching_transcribe_each_clip(self):
+        """Test the clip-by-clip fallback for non-torch engines."""
+        model = SimpleNamespace(transcribe=lambda audio, language: {"segments": []})
+
+        assert decode_batch(model, [clip(), clip()]) == [
+            {"segments": []},
+            {"segments": []},
+        ]
+
+
+class TestTranscribeWithWhisper:
+    """Test that the ASR stage uses the batcher for short clips."""
+
+    def test_short_clip_goes_through_batcher(self):
+        """Test that batched results are converted into segments."""
+        batcher = ASRBatcher(max_batch_size=4, max_wait_seconds=0.01)
+        batcher.run_batch = RecordingBatch()
+
+        with patch("services.transcription_service.asr_batcher", batcher):
+            segments = transcribe_with_whisper(clip(), "tiny")
+        batcher.shutdown()
+
+        assert [segment.text for segment in segments] == ["tiny"]
+        assert batcher.run_batch.batches == [1]
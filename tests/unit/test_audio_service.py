@@ -0,0 +1,191 @@
+"""Tests for the shared audio decode stage."""
+
+import os
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+import ffmpeg
+import numpy as np
+import pytest
+
+from services.audio_service import (
+    SAMPLE_RATE,
+    StreamDecoder,
+    audio_duration,
+    decode_audio,
+    pcm_to_float,
+    resample,
+)
+
+
+def _fake_decoder(samples: np.ndarray):
+    """Build a `_decode_to_file` replacement writing the given samples."""
+
+    def _decode(file_path, pcm_path):
+        samples.astype(np.float32).tofile(pcm_path)
+
+    return _decode
+
+
+class TestDecodeAudio:
+    """Test decoding media into a 16 kHz mono float32 buffer."""
+
+    @patch("services.audio_service._decode_to_file")
+    def test_decode_small_file_in_memory(self, mock_decode):
+        """Test that short audio is read into a regular array."""
+        samples = np.linspace(-1, 1, SAMPLE_RATE)
+        mock_decode.side_effect = _fake_decoder(samples)
+
+        audio = decode_audio("/fake/path/audio.mp3")
+
+        assert audio.dtype == np.float32
+        assert not isinstance(audio, np.memmap)
+        np.testing.assert_allclose(audio, samples.astype(np.float32))
+
+    @patch("services.audio_service.settings")
+    @patch("services.audio_service._decode_to_file")
+    def test_decode_long_file_memory_mapped(self, mock_decode, mock_settings):
+        """Test that long audio is memory-mapped and still usable."""
+        mock_settings.AUDIO_MMAP_THRESHOLD_MB = 0
+        samples = np.ones(SAMPLE_RATE * 2)
+        mock_decode.side_effect = _fake_decoder(samples)
+
+        audio = decode_audio("/fake/path/video.mp4")
+
+        assert isinstance(audio, np.memmap)
+        assert len(audio) == SAMPLE_RATE * 2
+        assert audio.flags.writeable
+        assert float(audio.sum()) == SAMPLE_RATE * 2
+
+    @patch("services.audio_service._decode_to_file")
+    def test_decode_removes_temp_file(self, mock_decode):
+        """Test that the temporary PCM file does not outlive the decode."""
+        paths = []
+
+        def _decode(file_path, pcm_path):
+            paths.append(pcm_path)
+            np.zeros(10, dtype=np.float32).tofile(pcm_path)
+
+        mock_decode.side_effect = _decode
+
+        decode_audio("/fake/path/audio.mp3")
+
+        assert not os.path.exists(paths[0])
+
+    @patch("services.audio_service._decode_to_file")
+    def test_decode_empty_output(self, mock_decode):
+        """Test decoding a file without audio samples."""
+        mock_decode.side_effect = _fake_decoder(np.zeros(0))
+
+        audio = decode_audio("/fake/path/audio.mp3")
+
+        assert len(audio) == 0
+
+    @patch("services.audio_service._decode_to_file")
+    def test_decode_ffmpeg_error(self, mock_decode):
+        """Test that ffmpeg failures surface as RuntimeError."""
+        mock_decode.side_effect = ffmpeg.Error("ffmpeg", b"", b"Invalid data")
+
+        with pytest.raises(RuntimeError, match="Invalid data"):
+            decode_audio("/fake/path/broken.mp3")
+
+
+class TestAudioDuration:
+    """Test duration derived from the decoded buffer."""
+
+    @pytest.mark.parametrize(
+        "num_samples,expected",
+        [
+            (0, 0.0),
+            (SAMPLE_RATE, 1.0),
+            (SAMPLE_RATE * 10 + 8000, 10.5),
+            (12345, 0.77),
+        ],
+        ids=["empty", "one_second", "fractional", "rounded"],
+    )
+    def test_audio_duration(self, num_samples, expected):
+        """Test duration calculation from the number of samples."""
+        audio = np.zeros(num_samples, dtype=np.float32)
+
+        assert audio_duration(audio) == expected
+
+
+class TestLiveAudio:
+    """Test conversion of raw live audio frames."""
+
+    @pytest.mark.parametrize(
+        "encoding,data",
+        [
+            ("pcm_s16le", np.array([0, 16384, -32768], dtype="<i2").tobytes()),
+            ("pcm_f32le", np.array([0.0, 0.5, -1.0], dtype="<f4").tobytes()),
+        ],
+        ids=["s16", "f32"],
+    )
+    def test_pcm_to_float(self, encoding, data):
+        """Test that PCM frames become float32 samples in [-1, 1]."""
+        samples = pcm_to_float(data + b"\x00", encoding)  # odd trailing byte
+
+        assert samples.dtype == np.float32
+        np.testing.assert_allclose(samples, [0.0, 0.5, -1.0])
+
+    def test_pcm_unsupported_encoding(self):
+        """Test that unknown encodings are rejected."""
+        with pytest.raises(ValueError, match="Unsupported"):
+            pcm_to_float(b"", "mulaw")
+
+    def test_resample_to_16k(self):
+        """Test that audio at another rate is resampled to 16 kHz."""
+        samples = np.sin(np.linspace(0, 2 * np.pi, 48000)).astype(np.float32)
+
+        resampled = resample(samples, 48000)
+
+        assert len(resampled) == SAMPLE_RATE
+        assert resampled.dtype == np.float32
+        assert resample(samples, SAMPLE_RATE) is samples
+
+
+def _fake_ffmpeg(script: str):
+    """Patch the ffmpeg pipeline of StreamDecoder to run a Python script."""
+    fake = MagicMock()
+    fake.output.return_value.global_args.return_value.run_async.side_effect = (
+        lambda **kwargs: subprocess.Popen(
+            [sys.executable, "-c", script],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    )
+    return patch("services.audio_service.ffmpeg.input", return_value=fake)
+
+
+class TestStreamDecoder:
+    """Test the pipes of the streaming ffmpeg decoder."""
+
+    def test_chatty_errors_do_not_block(self):
+        """Test that error output beyond the pipe buffer is drained."""
+        script = (
+            "import sys\n"
+            "sys.stderr.write('warning\\n' * 100000)\n"
+            "sys.stdout.buffer.write(sys.stdin.buffer.read())\n"
+        )
+        with _fake_ffmpeg(script):
+            decoder = StreamDecoder()
+            samples = decoder.write(b"\x00\x00" * 100000)
+            samples = np.concatenate([samples, decoder.close()])
+
+        assert len(samples) == 100000
+        assert decoder.errors.endswith("warning")
+        assert len(decoder.errors) <= StreamDecoder.STDERR_BYTES
+
+    def test_write_after_exit_reports_errors(self):
+        """Test that a dead decoder raises with ffmpeg's error output."""
+        script = "import sys; sys.stderr.write('Invalid data found'); sys.exit(1)"
+        with _fake_ffmpeg(script):
+            decoder = StreamDecoder()
+            decoder._process.wait()
+
+            with pytest.raises(RuntimeError, match="Invalid data found"):
+                for _ in range(10):
+                    decoder.write(b"x" * 65536)
+            decoder.abort()
@@ -3,12 +3,19 @@
 import pytest
 import json
 import os
+import threading
+import time
 from unittest.mock import patch
 import fcntl
 
 
+from services.metrics import STORAGE_COMMIT_BATCH_SIZE
 from storage.data_storage import DataStorage
-from models.transcription import Transcription, TranscriptionStatus
+from models.transcription import (
+    Transcription,
+    TranscriptionQuery,
+    TranscriptionStatus,
+)
 
 
 class TestDataStorage:
@@ -106,7 +113,7 @@ class TestDataStorage:
     @pytest.mark.parametrize(
         "lock_mode,expected_flag",
         [
-            ("read", fcntl.LOCK_SH),
+            ("read", None),
             ("write", fcntl.LOCK_EX),
         ],
         ids=["read_lock", "write_lock"],
@@ -120,14 +127,14 @@ class TestDataStorage:
         with patch("fcntl.flock") as mock_flock:
             if lock_mode == "read":
                 storage._load_data()
-                # First call is LOCK_SH, second is LOCK_UN
-                assert mock_flock.call_count == 2
-                assert mock_flock.call_args_list[0][0][1] == fcntl.LOCK_SH
+                # Files are replaced atomically, readers never wait for writers
+                mock_flock.assert_not_called()
             else:
                 storage._save_data({})
-                # First call is LOCK_EX, second is LOCK_UN
+                # First call is LOCK_EX, second is LOCK_UN, both on the lock file
                 assert mock_flock.call_count == 2
                 assert mock_flock.call_args_list[0][0][1] == fcntl.LOCK_EX
+                assert mock_flock.call_args_list[0][0][0].name == storage.lock_file
 
     def test_save_overwrites_existing(self, temp_dir, sample_transcription):
         """Test that saving with same ID overwrites existing data."""
@@ -173,3 +180,290 @@ class TestDataStorage:
 
         # Verify enum is serialized as string
         assert raw_data["test-id"]["status"] == "completed"
+
+    def test_save_updates_summary_index(self, temp_dir, sample_transcription):
+        """Test that saves keep the segment-free summary index in sync."""
+        with patch("storage.data_storage.settings") as mock_settings:
+            mock_settings.DATA_DIR = temp_dir
+            storage = DataStorage()
+
+        storage.save(sample_transcription)
+
+        with open(storage.index_file, "r") as f:
+            index = json.load(f)
+        assert index[sample_transcription.id]["file_name"] == "test_audio.mp3"
+        assert "segments" not in index[sample_transcription.id]
+
+    def test_summary_index_rebuilt_for_legacy_data(self, temp_dir, sample_transcription):
+        """Test that data saved before the index existed is still listed."""
+        with patch("storage.data_storage.settings") as mock_settings:
+            mock_settings.DATA_DIR = temp_dir
+            storage = DataStorage()
+
+        storage._save_data(
+            {sample_transcription.id: sample_transcription.model_dump(mode="json")}
+        )
+
+        items, cursor = storage.list_summaries(TranscriptionQuery())
+
+        assert [item.id for item in items] == [sample_transcription.id]
+        assert cursor is None
+        assert os.path.exists(storage.index_file)
+
+
+class TestResponseBodies:
+    """Test the pre-encoded JSON bodies served by GET /{id}."""
+
+    def _storage(self, temp_dir):
+        with patch("storage.data_storage.settings") as mock_settings:
+            mock_settings.DATA_DIR = temp_dir
+            return DataStorage()
+
+    def test_body_matches_model(self, temp_dir, sample_transcription):
+        """Test that the body is the transcription's JSON without the schema stamp."""
+        storage = self._storage(temp_dir)
+        storage.save(sample_transcription)
+
+        body = json.loads(storage.get_json(sample_transcription.id))
+
+        assert body == sample_transcription.model_dump(mode="json")
+
+    def test_missing(self, temp_dir):
+        """Test that unknown ids have no body."""
+        assert self._storage(temp_dir).get_json("missing") is None
+
+    def test_cached_until_file_changes(self, temp_dir, sample_transcription):
+        """Test that bodies are reused until the data file is rewritten."""
+        storage = self._storage(temp_dir)
+        storage.save(sample_transcription)
+        first = storage.get_json(sample_transcription.id)
+
+        with patch.object(storage, "_load_stamped_data") as mock_load:
+            assert storage.get_json(sample_transcription.id) is first
+            mock_load.assert_not_called()
+
+        storage.save(
+            sample_transcription.model_copy(
+                update={"status": TranscriptionStatus.FAILED}
+            )
+        )
+        assert json.loads(storage.get_json(sample_transcription.id))["status"] == (
+            "failed"
+        )
+
+    def test_legacy_records_are_validated(self, temp_dir, sample_transcription):
+        """Test that records without a schema version still load."""
+        storage = self._storage(temp_dir)
+        storage._save_data(
+            {sample_transcription.id: sample_transcription.model_dump(mode="json")}
+        )
+
+        assert storage.get(sample_transcription.id) == sample_transcription
+        assert json.loads(storage.get_json(sample_transcription.id)) == (
+            sample_transcription.model_dump(mode="json")
+        )
+
+
+class TestReadCache:
+    """Test that parsed files are reused only while they are unchanged on disk."""
+
+    def _storage(self, temp_dir):
+        with patch("storage.data_storage.settings") as mock_settings:
+            mock_settings.DATA_DIR = temp_dir
+            return DataStorage()
+
+    def test_get_reuses_parsed_file(self, temp_dir, sample_transcription):
+        """Test that reads do not parse the data file again."""
+        storage = self._storage(temp_dir)
+        storage.save(sample_transcription)
+
+        with patch.object(storage, "_load_stamped_data") as mock_load:
+            assert storage.get(sample_transcription.id) == sample_transcription
+            assert len(storage.list_all()) == 1
+            mock_load.assert_not_called()
+        assert storage.stats()["cache"]["hits"] >= 2
+
+    def test_sees_writes_of_other_workers(self, temp_dir, sample_transcription):
+        """Test that a write through another instance invalidates the cache."""
+        reader, writer = self._storage(temp_dir), self._storage(temp_dir)
+        reader.save(sample_transcription)
+        assert reader.get(sample_transcription.id).status == (
+            TranscriptionStatus.COMPLETED
+        )
+
+        writer.save(
+            sample_transcription.model_copy(
+                update={"status": TranscriptionStatus.FAILED, "language": "pl"}
+            )
+        )
+
+        assert reader.get(sample_transcription.id).status == TranscriptionStatus.FAILED
+        assert json.loads(reader.get_json(sample_transcription.id))["language"] == "pl"
+        items, _ = reader.list_summaries(TranscriptionQuery())
+        assert items[0].status == TranscriptionStatus.FAILED
+
+    def test_bodies_survive_other_saves(self, temp_dir, sample_transcription):
+        """Test that saving one transcription keeps the bodies of the others."""
+        storage = self._storage(temp_dir)
+        storage.save(sample_transcription)
+        first = storage.get_json(sample_transcription.id)
+
+        storage.save(sample_transcription.model_copy(update={"id": "other-id"}))
+
+        assert storage.get_json(sample_transcription.id) is first
+
+    def test_bodies_survive_saves_of_other_workers(
+        self, temp_dir, sample_transcription
+    ):
+        """Test that a record parsed again keeps its body."""
+        reader, writer = self._storage(temp_dir), self._storage(temp_dir)
+        reader.save(sample_transcription)
+        first = reader.get_json(sample_transcription.id)
+
+        writer.save(sample_transcription.model_copy(update={"id": "other-id"}))
+
+        assert reader.get_json(sample_transcription.id) is first
+        assert reader.get_json("other-id") is not None
+        # Versioned by a number, not by comparing whole records
+        entry = reader._cache._entries[("json", sample_transcription.id)]
+        assert entry.version == 1
+
+    def test_summaries_cached_until_index_changes(
+        self, temp_dir, sample_transcription
+    ):
+        """Test that listings reuse the summaries until the next save."""
+        storage = self._storage(temp_dir)
+        storage.save(sample_transcription)
+        first = storage._index_items()
+
+        assert storage._index_items() is first
+
+        storage.save(sample_transcription.model_copy(update={"id": "other-id"}))
+        assert len(storage._index_items()) == 2
+
+
+class TestGroupCommit:
+    """Test coalesced saves and atomic file replacement."""
+
+    def _storage(self, temp_dir):
+        with patch("storage.data_storage.settings") as mock_settings:
+            mock_settings.DATA_DIR = temp_dir
+            return DataStorage()
+
+    def _transcription(self, sample_transcription, i):
+        return sample_transcription.model_copy(update={"id": f"id-{i}"})
+
+    def test_saves_during_a_commit_share_the_next_one(
+        self, temp_dir, sample_transcription
+    ):
+        """Test that saves waiting for a commit are written together."""
+        storage = self._storage(temp_dir)
+        saves = [
+            threading.Thread(
+                target=storage.save, args=(self._transcription(sample_transcription, i),)
+            )
+            for i in range(3)
+        ]
+
+        with storage._commit_lock:  # a commit in progress
+            for thread in saves:
+                thread.start()
+            while storage._pending is None or len(storage._pending.records) < 3:
+                time.sleep(0.001)
+        for thread in saves:
+            thread.join()
+
+        assert storage.commits == 1
+        assert storage.committed_saves == 3
+        assert len(storage._load_data()) == 3
+        assert len(storage._load_index()) == 3
+        assert STORAGE_COMMIT_BATCH_SIZE.sum() == 3
+
+    def test_failed_commit_raises_in_every_save(self, temp_dir, sample_transcription):
+        """Test that no save reports success for a commit that was not written."""
+        storage = self._storage(temp_dir)
+        errors = []
+
+        def save(i):
+            try:
+                storage.save(self._transcription(sample_transcription, i))
+            except OSError as e:
+                errors.append(e)
+
+        saves = [threading.Thread(target=save, args=(i,)) for i in range(2)]
+        with patch("storage.data_storage.os.fsync", side_effect=OSError("disk full")):
+            with storage._commit_lock:
+                for thread in saves:
+                    thread.start()
+                while storage._pending is None or len(storage._pending.records) < 2:
+                    time.sleep(0.001)
+            for thread in saves:
+                thread.join()
+
+        assert len(errors) == 2
+        assert storage._load_data() == {}
+
+    def test_crash_keeps_previous_version(self, temp_dir, sample_transcription):
+        """Test that a failed write leaves the old file and no temporary file."""
+        storage = self._storage(temp_dir)
+        storage.save(sample_transcription)
+
+        with patch("storage.data_storage.json.dump", side_effect=RuntimeError):
+            with pytest.raises(RuntimeError):
+                storage.save(self._transcription(sample_transcription, 1))
+
+        assert list(storage._load_data()) == [sample_transcription.id]
+        assert not [name for name in os.listdir(temp_dir) if name.endswith(".tmp")]
+
+    def test_crash_between_files_rebuilds_index(
+        self, temp_dir, sample_transcription
+    ):
+        """Test that records committed to the data file alone are still listed."""
+        storage = self._storage(temp_dir)
+        storage.save(sample_transcription)
+
+        with patch.object(storage, "_write_index", side_effect=RuntimeError):
+            with pytest.raises(RuntimeError):
+                storage.save(self._transcription(sample_transcription, 1))
+
+        restarted = self._storage(temp_dir)
+        items, _ = restarted.list_summaries(TranscriptionQuery())
+        assert sorted(item.id for item in items) == sorted(
+            [sample_transcription.id, "id-1"]
+        )
+        assert not restarted._index_is_stale()
+
+    def test_index_stamp_ignores_timestamps(self, temp_dir, sample_transcription):
+        """Test that a stale index is found on filesystems with coarse mtimes."""
+        storage = self._storage(temp_dir)
+        storage.save(sample_transcription)
+
+        with patch.object(storage, "_write_index", side_effect=RuntimeError):
+            with pytest.raises(RuntimeError):
+                storage.save(self._transcription(sample_transcription, 1))
+        # Both files were written within the same timestamp tick
+        for path in (storage.data_file, storage.index_file):
+            os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+
+        assert storage._index_is_stale()
+        items, _ = storage.list_summaries(TranscriptionQuery())
+        assert len(items) == 2
+
+    def test_files_are_replaced(self, temp_dir, sample_transcription):
+        """Test that readers holding the old file keep reading a whole version."""
+        storage = self._storage(temp_dir)
+        with open(storage.data_file, "rb") as old:
+            storage.save(sample_transcription)
+
+            assert json.loads(old.read()) == {}
+        assert os.stat(storage.data_file).st_mode & 0o777 == 0o644
+
+    def test_leftover_temporary_files_are_removed(self, temp_dir):
+        """Test that writes interrupted by a crash are cleaned up on start."""
+        leftover = os.path.join(temp_dir, "transcriptions.json.abc123.tmp")
+        with open(leftover, "w") as f:
+            f.write("{")
+
+        self._storage(temp_dir)
+
+        assert not os.path.exists(leftover)
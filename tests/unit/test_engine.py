@@ -0,0 +1,126 @@
+"""Tests for lazy loading of the machine learning stack."""
+
+import os
+import subprocess
+import sys
+import threading
+import types
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from services import engine
+from services.engine import EngineUnavailableError, LazyModule
+from services.live_transcription import LiveSessionRegistry
+
+APP_DIR = os.path.join(os.path.dirname(__file__), "../../app")
+
+
+@pytest.fixture
+def unloaded_module(monkeypatch):
+    """A small standard library module that is not imported yet."""
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    return "colorsys"
+
+
+@pytest.fixture
+def api_only():
+    engine.disable()
+    yield
+    engine.enable()
+
+
+class TestLazyModule:
+    """Test the stand-ins for the heavy packages."""
+
+    def test_imported_on_first_use(self, unloaded_module):
+        """Test that the module is imported when an attribute is used."""
+        module = LazyModule(unloaded_module)
+        assert unloaded_module not in sys.modules
+
+        assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert unloaded_module in sys.modules
+
+    def test_patched_attributes_are_shared(self, unloaded_module):
+        """Test that patching a stand-in affects every module using it."""
+        module = LazyModule(unloaded_module)
+
+        with patch.object(module, "rgb_to_hsv", return_value="patched"):
+            assert module.rgb_to_hsv(1.0, 0.0, 0.0) == "patched"
+        assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+
+
+    def test_concurrent_first_use(self, tmp_path, monkeypatch):
+        """Test that no thread gets a module another one is still importing."""
+        (tmp_path / "slow_module.py").write_text(
+            "import time\ntime.sleep(0.2)\n\ndef ready():\n    return True\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.delitem(sys.modules, "slow_module", raising=False)
+        module = LazyModule("slow_module")
+        results, errors = [], []
+
+        def use():
+            try:
+                results.append(module.ready())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=use) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert results == [True] * 4
+
+
+class TestApiOnlyMode:
+    """Test that API-only processes never load the stack."""
+
+    def test_loading_refused(self, unloaded_module, api_only):
+        """Test that modules cannot be imported through the engine."""
+        with pytest.raises(EngineUnavailableError):
+            LazyModule(unloaded_module).rgb_to_hsv
+        assert not engine.is_available()
+
+    def test_loaded_modules_still_usable(self, api_only):
+        """Test that modules imported before are returned as they are."""
+        assert engine.import_module("os") is os
+
+    def test_worker_processes_can_load(self, unloaded_module, monkeypatch):
+        """Test that forked workers (another pid) may load the stack."""
+        monkeypatch.setattr(engine, "_disabled_pid", os.getpid() + 1)
+
+        assert engine.is_available()
+        assert isinstance(engine.import_module(unloaded_module), types.ModuleType)
+
+    def test_live_sessions_rejected(self, api_only):
+        """Test that live transcription (in-process models) is refused."""
+        with pytest.raises(HTTPException) as error:
+            LiveSessionRegistry(max_sessions=1).start()
+        assert error.value.status_code == 503
+
+
+class TestImportTime:
+    """Guard the cold start of the web tier."""
+
+    def test_app_import_skips_ml_stack(self):
+        """Test that importing the application imports no ML package."""
+        code = (
+            "import sys, main; "
+            "print(','.join(m for m in sys.modules "
+            "if m.split('.')[0] in ('torch', 'whisper', 'pyannote')))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=APP_DIR,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip().splitlines()[-1:] in ([], [""])
@@ -1,10 +1,15 @@
 """Tests for file storage functions."""
 
+import hashlib
+import io
 import pytest
 import os
+import threading
 from io import BytesIO
 from unittest.mock import patch
 
+from fastapi import HTTPException
+
 from storage.file_storage import FileStorage
 
 
@@ -111,3 +116,192 @@ class TestFileStorage:
         with open(file_path, "rb") as f:
             saved_content = f.read()
         assert saved_content == content2
+
+    def test_get_file_path_strips_directories(self, temp_dir):
+        """Test that client-supplied names cannot escape the upload dir."""
+        with patch("storage.file_storage.settings") as mock_settings:
+            mock_settings.UPLOAD_DIR = temp_dir
+            storage = FileStorage()
+
+        file_path = storage.get_file_path("id", "../../etc/passwd")
+
+        assert file_path == os.path.join(temp_dir, "id_passwd")
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+class TestFileStorageSaveStream:
+    """Test streaming uploads straight to the upload directory."""
+
+    @pytest.fixture
+    def storage(self, temp_dir):
+        with patch("storage.file_storage.settings") as mock_settings:
+            mock_settings.UPLOAD_DIR = temp_dir
+            return FileStorage()
+
+    async def test_save_stream(self, storage):
+        """Test that chunks are written, counted and hashed."""
+        chunks = [b"RIFF", b"\x00" * 4, b"WAVE", b"x" * 100]
+
+        stored = await storage.save_stream("id", "a.wav", _chunks(*chunks), 1000)
+
+        content = b"".join(chunks)
+        with open(stored.file_path, "rb") as f:
+            assert f.read() == content
+        assert stored.size == len(content)
+        assert stored.sha256 == hashlib.sha256(content).hexdigest()
+        assert stored.content_type is None
+
+    async def test_save_stream_writes_off_event_loop(self, storage):
+        """Test that the file is opened, written and closed on worker threads."""
+        loop_thread = threading.get_ident()
+        threads = []
+
+        class RecordingFile(io.BytesIO):
+            def write(self, data):
+                threads.append(threading.get_ident())
+                return super().write(data)
+
+            def close(self):
+                if not self.closed:
+                    threads.append(threading.get_ident())
+                super().close()
+
+        def fake_open(path, mode):
+            threads.append(threading.get_ident())
+            return RecordingFile()
+
+        with patch("storage.file_storage.open", fake_open, create=True):
+            await storage.save_stream("id", "a.wav", _chunks(b"a", b"b"), 1000)
+
+        assert len(threads) == 4
+        assert loop_thread not in threads
+
+    async def test_save_stream_sniffs_head(self, storage):
+        """Test that the head is collected across chunks before validation."""
+        heads = []
+
+        def validate_head(head):
+            heads.append(head)
+            return "audio/wav"
+
+        stored = await storage.save_stream(
+            "id", "a.wav", _chunks(b"a" * 40, b"b" * 40, b"c" * 40), 1000, validate_head
+        )
+
+        assert heads == [b"a" * 40 + b"b" * 24]
+        assert stored.content_type == "audio/wav"
+
+    async def test_save_stream_short_file_validated_at_end(self, storage):
+        """Test that files shorter than the sniff window are still validated."""
+        heads = []
+
+        await storage.save_stream(
+            "id", "a.wav", _chunks(b"tiny"), 1000, lambda head: heads.append(head)
+        )
+
+        assert heads == [b"tiny"]
+
+    async def test_save_stream_too_large(self, storage):
+        """Test that oversized uploads abort early and leave no file behind."""
+        consumed = []
+
+        async def chunks():
+            for i in range(10):
+                consumed.append(i)
+                yield b"x" * 100
+
+        with pytest.raises(HTTPException) as exc_info:
+            await storage.save_stream("id", "a.wav", chunks(), 250)
+
+        assert exc_info.value.status_code == 413
+        assert consumed == [0, 1, 2]
+        assert not os.path.exists(storage.get_file_path("id", "a.wav"))
+
+    async def test_save_stream_rejected_head_removes_file(self, storage):
+        """Test that a failed format check removes the partial file."""
+
+        def validate_head(head):
+            raise HTTPException(status_code=400, detail="Unrecognized file format")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await storage.save_stream(
+                "id", "a.wav", _chunks(b"x" * 100), 1000, validate_head
+            )
+
+        assert exc_info.value.status_code == 400
+        assert os.listdir(storage.upload_dir) == []
+
+
+class TestFileStorageMedia:
+    """Test finding uploads and caching their renditions."""
+
+    @pytest.fixture
+    def storage(self, temp_dir):
+        with patch("storage.file_storage.settings") as mock_settings:
+            mock_settings.UPLOAD_DIR = temp_dir
+            return FileStorage()
+
+    def test_find_file_by_name(self, storage):
+        """Test that uploads are found by their id and file name."""
+        storage.save_file("abc", "talk.mp3", BytesIO(b"audio"))
+
+        assert storage.find_file("abc", "talk.mp3") == storage.get_file_path(
+            "abc", "talk.mp3"
+        )
+
+    def test_find_file_by_id_prefix(self, storage):
+        """Test that uploads stored under another name are found by their id."""
+        storage.save_file("abc", "talk.mp3", BytesIO(b"audio"))
+
+        assert storage.find_file("abc", "talk.mp3?download=1") == (
+            storage.get_file_path("abc", "talk.mp3")
+        )
+        assert storage.find_file("abd", "talk.mp3") is None
+
+    def test_rendition_is_cached(self, storage):
+        """Test that a rendition is transcoded once and then reused."""
+        source = storage.save_file("abc", "talk.mp3", BytesIO(b"audio"))
+        calls = []
+
+        def transcode(source_path, output_path):
+            calls.append(source_path)
+            with open(output_path, "wb") as f:
+                f.write(b"opus")
+
+        first = storage.get_rendition("abc", source, "webm", transcode)
+        second = storage.get_rendition("abc", source, "webm", transcode)
+
+        assert first == second
+        assert calls == [source]
+        with open(first, "rb") as f:
+            assert f.read() == b"opus"
+
+    def test_rendition_rebuilt_for_newer_upload(self, storage):
+        """Test that a rendition older than its upload is transcoded again."""
+        source = storage.save_file("abc", "talk.mp3", BytesIO(b"audio"))
+        calls = []
+
+        def transcode(source_path, output_path):
+            calls.append(source_path)
+            open(output_path, "wb").close()
+
+        rendition = storage.get_rendition("abc", source, "webm", transcode)
+        os.utime(rendition, (0, 0))
+        storage.get_rendition("abc", source, "webm", transcode)
+
+        assert len(calls) == 2
+
+    def test_failed_rendition_leaves_nothing(self, storage):
+        """Test that a failed transcode leaves no partial file behind."""
+        source = storage.save_file("abc", "talk.mp3", BytesIO(b"audio"))
+
+        def transcode(source_path, output_path):
+            raise RuntimeError("Failed to transcode audio")
+
+        with pytest.raises(RuntimeError):
+            storage.get_rendition("abc", source, "webm", transcode)
+        assert os.listdir(os.path.join(storage.upload_dir, "renditions")) == []
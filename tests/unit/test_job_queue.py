@@ -0,0 +1,94 @@
+"""Tests for background job executors."""
+
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from services.job_queue import InlineJobExecutor, PoolJobExecutor
+
+
+class TestInlineJobExecutor:
+    """Test the synchronous executor."""
+
+    def test_runs_job_immediately(self):
+        """Test that the job result is available right away."""
+        future = InlineJobExecutor().submit("job-1", lambda x: x * 2, 21)
+
+        assert future.done()
+        assert future.result() == 42
+
+    def test_captures_job_exception(self):
+        """Test that job errors end up on the future, not the caller."""
+
+        def _fail():
+            raise RuntimeError("boom")
+
+        future = InlineJobExecutor().submit("job-1", _fail)
+
+        with pytest.raises(RuntimeError, match="boom"):
+            future.result()
+
+
+class TestPoolJobExecutor:
+    """Test bounded concurrency and backpressure."""
+
+    def test_runs_job_in_background(self):
+        """Test that submitted jobs run on the pool."""
+        executor = PoolJobExecutor(max_workers=1, max_queue_depth=1)
+
+        future = executor.submit("job-1", lambda: threading.current_thread().name)
+
+        assert future.result(timeout=5) != threading.current_thread().name
+        executor.shutdown()
+
+    def test_rejects_when_full(self):
+        """Test that jobs beyond workers + queue depth get HTTP 429."""
+        executor = PoolJobExecutor(max_workers=1, max_queue_depth=1)
+        release = threading.Event()
+        executor.submit("job-1", release.wait)
+        executor.submit("job-2", release.wait)
+
+        with pytest.raises(HTTPException) as exc_info:
+            executor.submit("job-3", release.wait)
+
+        assert exc_info.value.status_code == 429
+        with pytest.raises(HTTPException):
+            executor.ensure_capacity()
+
+        release.set()
+        executor.shutdown()
+
+    def test_frees_slot_when_job_finishes(self):
+        """Test that finished jobs no longer count towards the queue depth."""
+        executor = PoolJobExecutor(max_workers=1, max_queue_depth=0)
+
+        executor.submit("job-1", lambda: None).result(timeout=5)
+
+        executor.ensure_capacity()
+        assert executor.submit("job-2", lambda: "ok").result(timeout=5) == "ok"
+        executor.shutdown()
+
+    def test_stats(self):
+        """Test running/queued counters."""
+        executor = PoolJobExecutor(max_workers=1, max_queue_depth=2)
+        started = threading.Event()
+        release = threading.Event()
+
+        def _job():
+            started.set()
+            release.wait()
+
+        executor.submit("job-1", _job)
+        executor.submit("job-2", release.wait)
+        started.wait(timeout=5)
+
+        stats = executor.stats()
+
+        assert stats["running"] == 1
+        assert stats["queued"] == 1
+        assert stats["max_workers"] == 1
+        assert stats["max_queue_depth"] == 2
+
+        release.set()
+        executor.shutdown()
@@ -0,0 +1,256 @@
+"""Tests for live (streaming) transcription."""
+
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from models.transcription import (
+    SpeakerTurn,
+    TranscriptionEventType,
+    TranscriptionStatus,
+)
+from services.audio_service import SAMPLE_RATE
+from services.live_transcription import (
+    LiveSessionRegistry,
+    LiveTranscriber,
+    SpeakerTracker,
+)
+
+
+def speech(first_second: int, last_second: int) -> np.ndarray:
+    """Audio whose every second encodes its session time, e.g. 0.003 at 3 s."""
+    return np.repeat(
+        np.arange(first_second, last_second, dtype=np.float32) / 1000, SAMPLE_RATE
+    )
+
+
+def fake_transcribe(samples, prompt):
+    """One segment per whole second, named after the second it was spoken in."""
+    return [
+        (float(i), float(i + 1), f"word{round(samples[i * SAMPLE_RATE] * 1000)}")
+        for i in range(len(samples) // SAMPLE_RATE)
+    ]
+
+
+def feed(transcriber, audio, chunk_seconds=0.5):
+    """Stream audio in chunks, running a pass whenever one is due."""
+    events = []
+    chunk = int(chunk_seconds * SAMPLE_RATE)
+    for first in range(0, len(audio), chunk):
+        transcriber.add(audio[first : first + chunk])
+        if transcriber.due():
+            events += transcriber.process()
+    return events
+
+
+def final_segments(events):
+    return [e.segment for e in events if e.type == TranscriptionEventType.SEGMENT]
+
+
+class TestLiveTranscriber:
+    """Test rolling-window transcription with provisional and final segments."""
+
+    def test_segments_are_finalized_once_in_order(self):
+        """Test that every word is final exactly once, on the session timeline."""
+        transcriber = LiveTranscriber(
+            "live-1",
+            fake_transcribe,
+            window_seconds=10,
+            step_seconds=1,
+            finalize_seconds=2,
+        )
+
+        events = feed(transcriber, speech(0, 8))
+        streamed = final_segments(events)
+        events += transcriber.process(final=True)
+
+        assert 0 < len(streamed) < 8
+        assert [s.id for s in streamed] == [f"seg-{i}" for i in range(len(streamed))]
+        # The last pass finalizes the rest and labels every segment
+        latest = {s.id: s for s in final_segments(events)}
+        assert list(latest.values()) == transcriber.segments
+        assert [s.text for s in transcriber.segments] == [f"word{i}" for i in range(8)]
+        assert [(s.start_time, s.end_time) for s in transcriber.segments] == [
+            (float(i), float(i + 1)) for i in range(8)
+        ]
+        assert [s.speaker for s in transcriber.segments] == ["UNKNOWN"] * 8
+
+    def test_provisional_segments(self):
+        """Test that recent words are sent as a partial segment first."""
+        transcriber = LiveTranscriber(
+            "live-1",
+            fake_transcribe,
+            window_seconds=10,
+            step_seconds=1,
+            finalize_seconds=2,
+        )
+
+        events = feed(transcriber, speech(0, 3))
+
+        partials = [
+            e.segment for e in events if e.type == TranscriptionEventType.PARTIAL
+        ]
+        assert partials[-1].text == "word1 word2"
+        assert partials[-1].id == "seg-1"
+        assert [s.text for s in final_segments(events)] == ["word0"]
+
+    def test_full_window_forces_finalization(self):
+        """Test that the buffer never grows past the window."""
+        transcriber = LiveTranscriber(
+            "live-1",
+            fake_transcribe,
+            window_seconds=4,
+            step_seconds=1,
+            finalize_seconds=100,
+        )
+
+        events = feed(transcriber, speech(0, 12))
+
+        assert [s.text for s in final_segments(events)][:4] == [
+            "word0",
+            "word1",
+            "word2",
+            "word3",
+        ]
+        assert len(transcriber._buffer) <= 4 * SAMPLE_RATE
+
+    def test_silence_is_dropped(self):
+        """Test that a window without speech does not keep growing."""
+        transcriber = LiveTranscriber(
+            "live-1",
+            lambda samples, prompt: [],
+            window_seconds=4,
+            step_seconds=1,
+            finalize_seconds=1,
+        )
+
+        events = feed(transcriber, np.zeros(20 * SAMPLE_RATE, dtype=np.float32))
+
+        assert final_segments(events) == []
+        assert len(transcriber._buffer) <= 4 * SAMPLE_RATE
+
+    def test_prompt_carries_final_text(self):
+        """Test that final text is handed to the next pass as context."""
+        prompts = []
+
+        def transcribe(samples, prompt):
+            prompts.append(prompt)
+            return fake_transcribe(samples, prompt)
+
+        transcriber = LiveTranscriber(
+            "live-1",
+            transcribe,
+            window_seconds=10,
+            step_seconds=1,
+            finalize_seconds=1,
+        )
+        feed(transcriber, speech(0, 4))
+
+        assert prompts[0] == ""
+        assert prompts[-1].startswith("word0 word1")
+
+    def test_online_speaker_assignment(self):
+        """Test that final segments get speakers from incremental diarization."""
+        # Speaker changes every 4 seconds; each run names speakers arbitrarily
+        # but their embeddings stay close
+        runs = []
+        voices = [np.array([1.0, 0.1]), np.array([0.1, 1.0])]
+
+        def diarize(samples):
+            runs.append(len(samples))
+            offset = int(round(samples[0] * 1000))
+            names = ["x", "y"] if len(runs) % 2 else ["y", "x"]
+            turns = [
+                SpeakerTurn(
+                    start=float(second - offset),
+                    end=float(second - offset + 1),
+                    speaker=names[(second // 4) % 2],
+                )
+                for second in range(offset, offset + len(samples) // SAMPLE_RATE)
+            ]
+            speaking = {turn.speaker for turn in turns}
+            return turns, {
+                name: voice for name, voice in zip(names, voices) if name in speaking
+            }
+
+        tracker = SpeakerTracker(diarize, window_seconds=6, interval_seconds=2)
+        transcriber = LiveTranscriber(
+            "live-1",
+            fake_transcribe,
+            speakers=tracker,
+            window_seconds=10,
+            step_seconds=1,
+            finalize_seconds=1,
+        )
+
+        feed(transcriber, speech(0, 16))
+        transcriber.process(final=True)
+
+        assert len(runs) > 2
+        speakers = [s.speaker for s in transcriber.segments]
+        assert (
+            speakers
+            == ["SPEAKER_00"] * 4
+            + ["SPEAKER_01"] * 4
+            + ["SPEAKER_00"] * 4
+            + ["SPEAKER_01"] * 4
+        )
+
+
+class TestSpeakerTracker:
+    """Test incremental diarization with stable labels."""
+
+    def test_keeps_only_recent_audio(self):
+        """Test that only the latest window of audio is diarized."""
+        lengths = []
+        tracker = SpeakerTracker(
+            lambda samples: lengths.append(len(samples)) or ([], {}),
+            window_seconds=3,
+            interval_seconds=1,
+        )
+
+        for second in range(10):
+            tracker.add(speech(second, second + 1))
+
+        assert tracker.due()
+        assert tracker.update() == 7.0
+        assert lengths == [3 * SAMPLE_RATE]
+        assert not tracker.due()
+
+
+class TestLiveSessionRegistry:
+    """Test opening, bounding and persisting live sessions."""
+
+    @patch("services.live_transcription.settings.LIVE_DIARIZATION", False)
+    @patch("services.live_transcription.storage")
+    def test_session_is_persisted(self, mock_storage, temp_dir):
+        """Test that a session is stored when it starts and when it ends."""
+        registry = LiveSessionRegistry(max_sessions=1)
+        with patch("services.live_transcription.file_storage.upload_dir", temp_dir):
+            session = registry.start(transcribe_fn=fake_transcribe)
+            session.add((speech(0, 3) * 32768).astype("<i2").tobytes())
+            events = registry.end(session)
+
+        saved = [c.args[0] for c in mock_storage.save.call_args_list]
+        assert [t.status for t in saved] == [
+            TranscriptionStatus.PROCESSING,
+            TranscriptionStatus.COMPLETED,
+        ]
+        assert [s.text for s in saved[-1].segments] == ["word0", "word1", "word2"]
+        assert saved[-1].duration == 3.0
+        assert events[-1].status == TranscriptionStatus.COMPLETED
+        assert os.path.getsize(session.recording_path) == 44 + 3 * SAMPLE_RATE * 2
+        assert registry.stats()["sessions"] == 0
+
+    @patch("services.live_transcription.storage")
+    def test_too_many_sessions(self, mock_storage):
+        """Test that sessions beyond the limit are rejected with 429."""
+        registry = LiveSessionRegistry(max_sessions=0)
+
+        with pytest.raises(Exception) as error:
+            registry.start(transcribe_fn=fake_transcribe)
+
+        assert error.value.status_code == 429
+        mock_storage.save.assert_not_called()
@@ -0,0 +1,163 @@
+"""Tests for the Prometheus-style metrics."""
+
+from unittest.mock import patch
+
+import pytest
+
+from services.metrics import (
+    MODEL_LOADS,
+    STAGE_SECONDS,
+    STORAGE_SECONDS,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    timed,
+)
+from services.model_registry import ModelRegistry
+from storage.data_storage import DataStorage
+
+
+class TestMetricTypes:
+    """Test counters, gauges and histograms."""
+
+    def test_counter_accumulates_per_label_values(self):
+        """Test that each label combination is counted separately."""
+        counter = Counter("uploads_total", "Uploads.", ("source",))
+
+        counter.inc(source="url")
+        counter.inc(2, source="url")
+        counter.inc(source="stream")
+
+        assert counter.value(source="url") == 3
+        assert counter.value(source="stream") == 1
+        with pytest.raises(ValueError):
+            counter.inc(-1, source="url")
+
+    def test_labels_must_match(self):
+        """Test that missing or unknown labels are rejected."""
+        counter = Counter("uploads_total", "Uploads.", ("source",))
+
+        with pytest.raises(ValueError):
+            counter.inc()
+        with pytest.raises(ValueError):
+            counter.inc(source="url", route="/")
+
+    def test_histogram_renders_cumulative_buckets(self):
+        """Test the bucket, sum and count samples of a histogram."""
+        histogram = Histogram("latency_seconds", "Latency.", ("route",), (0.1, 1.0))
+
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value, route="/a")
+
+        assert histogram.render() == [
+            "# HELP latency_seconds Latency.",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{route="/a",le="0.1"} 1',
+            'latency_seconds_bucket{route="/a",le="1"} 3',
+            'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+            'latency_seconds_sum{route="/a"} 4.25',
+            'latency_seconds_count{route="/a"} 4',
+        ]
+
+    def test_gauge_callback_is_read_on_render(self):
+        """Test that callback gauges report the current state."""
+        depth = {"queued": 1}
+        gauge = Gauge(
+            "queue_depth", "Depth.", ("state",),
+            callback=lambda: {("queued",): depth["queued"]},
+        )
+
+        depth["queued"] = 4
+
+        assert gauge.render()[-1] == 'queue_depth{state="queued"} 4'
+
+    def test_label_values_are_escaped(self):
+        """Test that quotes and newlines cannot break the exposition format."""
+        counter = Counter("odd_total", "Odd.", ("name",))
+
+        counter.inc(name='a"b\nc')
+
+        assert counter.render()[-1] == 'odd_total{name="a\\"b\\nc"} 1'
+
+
+class TestMetricsRegistry:
+    """Test registration and rendering of all metrics."""
+
+    def test_render_and_clear(self):
+        """Test that clearing resets values but keeps the metrics registered."""
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs.")
+        counter.inc()
+
+        assert "jobs_total 1\n" in registry.render()
+
+        registry.clear()
+        text = registry.render()
+        assert "# TYPE jobs_total counter" in text
+        assert "jobs_total 1" not in text
+
+    def test_duplicate_names_are_rejected(self):
+        """Test that a metric name can only be registered once."""
+        registry = MetricsRegistry()
+        registry.counter("jobs_total", "Jobs.")
+
+        with pytest.raises(ValueError):
+            registry.gauge("jobs_total", "Jobs.")
+
+
+class TestTimed:
+    """Test the timing context manager."""
+
+    def test_timed_records_duration(self):
+        """Test that the block duration is observed and exposed on the timer."""
+        with timed(STAGE_SECONDS, stage="asr") as timer:
+            pass
+
+        assert timer.seconds >= 0
+        assert STAGE_SECONDS.count(stage="asr") == 1
+        assert STAGE_SECONDS.sum(stage="asr") == pytest.approx(timer.seconds)
+
+    def test_timed_records_failures(self):
+        """Test that blocks raising an exception are observed as well."""
+        with pytest.raises(RuntimeError):
+            with timed(STAGE_SECONDS, stage="diarization"):
+                raise RuntimeError("boom")
+
+        assert STAGE_SECONDS.count(stage="diarization") == 1
+
+    def test_timed_as_decorator(self):
+        """Test that functions can be timed by decorating them."""
+
+        @timed(STORAGE_SECONDS, backend="test", operation="get")
+        def get():
+            return 42
+
+        assert get() == 42
+        assert get() == 42
+        assert STORAGE_SECONDS.count(backend="test", operation="get") == 2
+
+
+class TestInstrumentation:
+    """Test metrics recorded by the services."""
+
+    def test_model_loads_are_counted(self):
+        """Test that only actual loads (not cache hits) are counted."""
+        registry = ModelRegistry(memory_budget_bytes=1024)
+
+        registry.get("whisper:tiny", lambda: object())
+        registry.get("whisper:tiny", lambda: object())
+
+        assert MODEL_LOADS.value(model="whisper:tiny") == 1
+
+    def test_data_storage_operations_are_timed(self, temp_dir, sample_transcription):
+        """Test that JSON storage reads and writes are observed."""
+        with patch("storage.data_storage.settings") as mock_settings:
+            mock_settings.DATA_DIR = temp_dir
+            storage = DataStorage()
+
+        storage.save(sample_transcription)
+        storage.get(sample_transcription.id)
+
+        assert STORAGE_SECONDS.count(backend="json", operation="save") == 1
+        assert STORAGE_SECONDS.count(backend="json", operation="get") == 1
@@ -0,0 +1,121 @@
+"""Tests for the process-wide model registry."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.model_registry import ModelRegistry, estimate_model_size
+
+
+class FakeTensor:
+    """Minimal tensor double exposing the size API used by the registry."""
+
+    def __init__(self, numel: int, element_size: int = 4):
+        self._numel = numel
+        self._element_size = element_size
+
+    def numel(self):
+        return self._numel
+
+    def element_size(self):
+        return self._element_size
+
+
+class FakeModule:
+    """Minimal torch module double."""
+
+    def __init__(self, size_bytes: int):
+        self._params = [FakeTensor(size_bytes // 4)]
+
+    def parameters(self):
+        return iter(self._params)
+
+    def buffers(self):
+        return iter([])
+
+
+class TestModelRegistry:
+    """Test lazy loading, reuse and eviction."""
+
+    def test_loads_lazily_once(self):
+        """Test that the loader runs only on first use."""
+        registry = ModelRegistry(memory_budget_bytes=1024)
+        loader = MagicMock(return_value="model")
+
+        assert registry.get("whisper:turbo", loader) == "model"
+        assert registry.get("whisper:turbo", loader) == "model"
+
+        loader.assert_called_once()
+        assert registry.load_count == 1
+
+    def test_register_injects_model(self):
+        """Test that injected models are returned without loading."""
+        registry = ModelRegistry(memory_budget_bytes=1024)
+        loader = MagicMock()
+
+        registry.register("whisper:turbo", "injected")
+
+        assert registry.get("whisper:turbo", loader) == "injected"
+        loader.assert_not_called()
+
+    def test_lru_eviction_over_budget(self):
+        """Test that the least recently used model is evicted first."""
+        registry = ModelRegistry(memory_budget_bytes=250)
+
+        registry.get("whisper:tiny", lambda: FakeModule(100))
+        registry.get("whisper:base", lambda: FakeModule(100))
+        # Touch "tiny" so "base" becomes the least recently used.
+        registry.get("whisper:tiny", lambda: FakeModule(100))
+        registry.get("whisper:small", lambda: FakeModule(100))
+
+        assert "whisper:tiny" in registry
+        assert "whisper:small" in registry
+        assert "whisper:base" not in registry
+
+    def test_non_evictable_models_are_kept(self):
+        """Test that pinned models survive budget pressure."""
+        registry = ModelRegistry(memory_budget_bytes=150)
+
+        registry.get("pyannote", lambda: FakeModule(100), evictable=False)
+        registry.get("whisper:tiny", lambda: FakeModule(100))
+
+        assert "pyannote" in registry
+        assert "whisper:tiny" in registry
+
+    def test_stats(self):
+        """Test the stats exposed in the health endpoint."""
+        registry = ModelRegistry(memory_budget_bytes=4 * 1024 * 1024)
+        registry.get("whisper:turbo", lambda: FakeModule(2 * 1024 * 1024))
+
+        stats = registry.stats()
+
+        assert stats["load_count"] == 1
+        assert stats["resident_mb"] == 2.0
+        assert stats["memory_budget_mb"] == 4.0
+        assert stats["loaded"]["whisper:turbo"]["resident_mb"] == 2.0
+        assert stats["loaded"]["whisper:turbo"]["load_seconds"] >= 0.0
+
+
+class TestEstimateModelSize:
+    """Test model size estimation."""
+
+    @pytest.mark.parametrize(
+        "model,expected",
+        [
+            (FakeModule(400), 400),
+            (object(), 0),
+            (MagicMock(), 0),
+        ],
+        ids=["module", "plain_object", "mock"],
+    )
+    def test_estimate_model_size(self, model, expected):
+        """Test size estimation of various model types."""
+        assert estimate_model_size(model) == expected
+
+    def test_estimate_wrapped_modules(self):
+        """Test size estimation of pipelines wrapping torch modules."""
+        pipeline = type("Pipeline", (), {})()
+        pipeline.segmentation = FakeModule(100)
+        pipeline.models = {"embedding": FakeModule(200)}
+
+        assert estimate_model_size(pipeline) == 300
@@ -0,0 +1,142 @@
+"""Tests for live transcription progress events."""
+
+import asyncio
+import pickle
+import threading
+
+from models.transcription import (
+    TranscriptionEvent,
+    TranscriptionEventType,
+    TranscriptionSegment,
+    TranscriptionStatus,
+)
+from services.progress import JobProgress, ProgressBroker, progress_broker
+
+
+def _event(transcription_id="t-1", stage="asr"):
+    return TranscriptionEvent(
+        type=TranscriptionEventType.STAGE,
+        transcription_id=transcription_id,
+        stage=stage,
+    )
+
+
+async def _drain(subscription, count):
+    return [await asyncio.wait_for(subscription.queue.get(), 1.0) for _ in range(count)]
+
+
+class TestProgressBroker:
+    """Test fan-out of progress events to subscribers."""
+
+    async def test_publish_reaches_subscribers_of_the_job(self):
+        """Test that events go to every subscriber of their transcription only."""
+        broker = ProgressBroker()
+        first = broker.subscribe("t-1")
+        second = broker.subscribe("t-1")
+        other = broker.subscribe("t-2")
+
+        broker.publish(_event())
+
+        assert [e.stage for e in await _drain(first, 1)] == ["asr"]
+        assert [e.stage for e in await _drain(second, 1)] == ["asr"]
+        await asyncio.sleep(0)
+        assert other.queue.empty()
+
+    async def test_late_subscriber_receives_history(self):
+        """Test that events published before subscribing are replayed."""
+        broker = ProgressBroker()
+        broker.publish(_event(stage="decode"))
+        broker.publish(_event(stage="asr"))
+
+        subscription = broker.subscribe("t-1")
+
+        assert [e.stage for e in await _drain(subscription, 2)] == ["decode", "asr"]
+
+    async def test_publish_from_worker_thread(self):
+        """Test that events published by job threads reach the event loop."""
+        broker = ProgressBroker()
+        subscription = broker.subscribe("t-1")
+
+        thread = threading.Thread(target=broker.publish, args=(_event(),))
+        thread.start()
+        thread.join()
+
+        assert [e.stage for e in await _drain(subscription, 1)] == ["asr"]
+
+    async def test_finish_publishes_status_and_forgets_job(self):
+        """Test that the final status is delivered and the history dropped."""
+        broker = ProgressBroker()
+        broker.publish(_event())
+        subscription = broker.subscribe("t-1")
+
+        broker.finish("t-1", TranscriptionStatus.COMPLETED)
+
+        events = await _drain(subscription, 2)
+        assert events[-1].type == TranscriptionEventType.STATUS
+        assert events[-1].status == TranscriptionStatus.COMPLETED
+        assert events[-1].progress == 100.0
+        assert broker.stats() == {"jobs": 0, "subscribers": 1}
+
+    async def test_unsubscribe(self):
+        """Test that unsubscribed clients get no more events."""
+        broker = ProgressBroker()
+        subscription = broker.subscribe("t-1")
+
+        broker.unsubscribe(subscription)
+        broker.publish(_event())
+
+        await asyncio.sleep(0)
+        assert subscription.queue.empty()
+        assert broker.stats()["subscribers"] == 0
+
+
+class TestJobProgress:
+    """Test the per-job progress reporter."""
+
+    def test_percent_weights_stages(self):
+        """Test that overall progress is the weighted sum of stage progress."""
+        progress = JobProgress("t-1")
+
+        progress.stage_finished("decode")
+        progress.advance("asr", 0.5)
+
+        assert progress.percent == 35.0
+
+    def test_progress_never_goes_back(self):
+        """Test that a late, smaller fraction does not lower the progress."""
+        progress = JobProgress("t-1")
+        progress.advance("asr", 0.5)
+        progress.advance("asr", 0.25)
+
+        assert progress.percent == 30.0
+
+    async def test_events_are_published(self):
+        """Test that stage, progress and segment events reach subscribers."""
+        subscription = progress_broker.subscribe("t-1")
+        progress = JobProgress("t-1")
+        segment = TranscriptionSegment(
+            id="seg-0", start_time=0.0, end_time=1.0, text="Hi"
+        )
+
+        progress.stage_started("asr")
+        progress.segments([segment])
+        progress.stage_finished("asr")
+
+        events = await _drain(subscription, 3)
+        assert [e.type for e in events] == [
+            TranscriptionEventType.STAGE,
+            TranscriptionEventType.SEGMENT,
+            TranscriptionEventType.PROGRESS,
+        ]
+        assert events[1].segment == segment
+        assert events[2].progress == 60.0
+
+    def test_pickles_for_process_workers(self):
+        """Test that reporters can be sent to process pool workers."""
+        progress = JobProgress("t-1")
+        progress.advance("asr", 0.5)
+
+        restored = pickle.loads(pickle.dumps(progress))
+
+        assert restored.transcription_id == "t-1"
+        assert restored.percent == 0.0
@@ -0,0 +1,61 @@
+"""Tests for the read cache of the JSON storage backend."""
+
+from services.metrics import STORAGE_CACHE_LOOKUPS
+from storage.record_cache import RecordCache
+
+
+class TestRecordCache:
+    """Test versioned lookups, LRU bounds and hit/miss accounting."""
+
+    def test_hit_only_for_same_version(self):
+        """Test that a value is returned only for the version it was built from."""
+        cache = RecordCache(max_entries=4, max_bytes=1000)
+        cache.put(("data", ""), (1, 100, 10), {"a": 1}, size=10)
+
+        assert cache.get(("data", ""), (1, 100, 10)) == {"a": 1}
+        assert cache.get(("data", ""), (1, 200, 10)) is None
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+    def test_evicts_least_recently_used_over_entries(self):
+        """Test the entry bound."""
+        cache = RecordCache(max_entries=2, max_bytes=1000)
+        cache.put(("json", "a"), 1, b"a", size=1)
+        cache.put(("json", "b"), 1, b"b", size=1)
+        cache.get(("json", "a"), 1)
+        cache.put(("json", "c"), 1, b"c", size=1)
+
+        assert cache.get(("json", "b"), 1) is None
+        assert cache.get(("json", "a"), 1) == b"a"
+        assert cache.stats()["evictions"] == 1
+
+    def test_evicts_over_bytes(self):
+        """Test the byte bound, and that oversized values are not kept."""
+        cache = RecordCache(max_entries=10, max_bytes=100)
+        cache.put(("json", "a"), 1, b"a", size=60)
+        cache.put(("json", "b"), 1, b"b", size=60)
+
+        assert cache.get(("json", "a"), 1) is None
+        assert cache.stats()["bytes"] == 60
+
+        cache.put(("data", ""), 1, {}, size=101)
+        assert cache.get(("data", ""), 1) is None
+
+    def test_disabled(self):
+        """Test that a cache without entries stores nothing."""
+        cache = RecordCache(max_entries=0, max_bytes=100)
+        cache.put(("json", "a"), 1, b"a", size=1)
+
+        assert cache.get(("json", "a"), 1) is None
+        assert cache.stats()["entries"] == 0
+
+    def test_lookups_are_exported(self):
+        """Test the per-kind hit and miss counters."""
+        cache = RecordCache(max_entries=2, max_bytes=100)
+
+        cache.get(("index", ""), 1)
+        cache.put(("index", ""), 1, [], size=2)
+        cache.get(("index", ""), 1)
+
+        assert STORAGE_CACHE_LOOKUPS.value(kind="index", result="hit") == 1
+        assert STORAGE_CACHE_LOOKUPS.value(kind="index", result="miss") == 1
@@ -0,0 +1,148 @@
+"""Tests for the content-addressed result cache."""
+
+from concurrent.futures import Future
+from unittest.mock import patch
+
+import pytest
+
+from config import settings
+from models.transcription import (
+    Transcription,
+    TranscriptionSegment,
+    TranscriptionStatus,
+)
+from services.result_cache import PIPELINE_SETTINGS, CachedResult, ResultCache
+
+
+def _result(text: str = "Hello") -> CachedResult:
+    return CachedResult(
+        segments=[
+            TranscriptionSegment(id="seg-0", start_time=0.0, end_time=1.0, text=text)
+        ],
+        duration=1.0,
+    )
+
+
+def _transcription(status=TranscriptionStatus.PENDING) -> Transcription:
+    return Transcription(
+        id="new-id", status=status, file_name="a.mp3", file_type="audio/mpeg"
+    )
+
+
+class TestResultCache:
+    """Test LRU caching and hit/miss accounting."""
+
+    def test_get_miss_then_hit(self):
+        """Test that lookups are counted as misses and hits."""
+        cache = ResultCache(max_entries=2)
+        key = cache.make_key("abc", "en")
+
+        assert cache.get(key) is None
+        cache.put(key, _result())
+
+        assert cache.get(key) == _result()
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+    @pytest.mark.parametrize(
+        "other",
+        [
+            ("def", "en", None, None),
+            ("abc", "pl", None, None),
+            ("abc", "en", "large-v3", None),
+            ("abc", "en", None, "other/diarization"),
+        ],
+        ids=["content", "language", "whisper_model", "diarization_model"],
+    )
+    def test_key_covers_settings(self, other):
+        """Test that any change of content or settings is a different key."""
+        content_hash, language, whisper_model, diarization_model = other
+        with patch("services.result_cache.settings") as mock_settings:
+            mock_settings.WHISPER_MODEL = "turbo"
+            mock_settings.DIARIZATION_MODEL = "pyannote/diarization"
+            key = ResultCache.make_key("abc", "en")
+
+            mock_settings.WHISPER_MODEL = whisper_model or "turbo"
+            mock_settings.DIARIZATION_MODEL = (
+                diarization_model or "pyannote/diarization"
+            )
+            other_key = ResultCache.make_key(content_hash, language)
+
+        assert key != other_key
+
+    @pytest.mark.parametrize("name", PIPELINE_SETTINGS)
+    def test_key_covers_pipeline_settings(self, name, monkeypatch):
+        """Test that settings changing the segments are part of the key."""
+        key = ResultCache.make_key("abc", "en")
+
+        value = getattr(settings, name)
+        changed = not value if isinstance(value, bool) else value * 2 or 1
+        monkeypatch.setattr(settings, name, changed)
+
+        assert ResultCache.make_key("abc", "en") != key
+
+    def test_evicts_least_recently_used(self):
+        """Test that the cache stays within max_entries."""
+        cache = ResultCache(max_entries=2)
+        cache.put("a", _result("a"))
+        cache.put("b", _result("b"))
+        cache.get("a")
+
+        cache.put("c", _result("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["entries"] == 2
+        assert cache.stats()["evictions"] == 1
+
+    def test_disabled(self):
+        """Test that a zero-sized cache stores nothing."""
+        cache = ResultCache(max_entries=0)
+        cache.put("a", _result())
+
+        assert not cache.enabled
+        assert cache.get("a") is None
+
+    def test_track_caches_completed_result(self):
+        """Test that finished jobs populate the cache and leave the in-flight set."""
+        cache = ResultCache(max_entries=2)
+        future = Future()
+        cache.track("a", future)
+
+        assert cache.join("a") is future
+
+        future.set_result(_result().apply(_transcription()))
+
+        assert cache.join("a") is None
+        assert cache.get("a").segments[0].text == "Hello"
+        assert cache.stats()["coalesced"] == 1
+
+    @pytest.mark.parametrize("outcome", ["failed_status", "exception"])
+    def test_track_skips_failures(self, outcome):
+        """Test that failed jobs are never cached."""
+        cache = ResultCache(max_entries=2)
+        future = Future()
+        cache.track("a", future)
+
+        if outcome == "exception":
+            future.set_exception(RuntimeError("boom"))
+        else:
+            future.set_result(_transcription(TranscriptionStatus.FAILED))
+
+        assert cache.get("a") is None
+        assert cache.stats()["inflight"] == 0
+
+
+class TestCachedResult:
+    """Test building transcriptions from cached results."""
+
+    def test_apply_shares_segments(self):
+        """Test that a cache hit references the cached segments."""
+        cached = _result()
+
+        result = cached.apply(_transcription())
+
+        assert result.id == "new-id"
+        assert result.status == TranscriptionStatus.COMPLETED
+        assert result.duration == 1.0
+        assert result.segments is cached.segments
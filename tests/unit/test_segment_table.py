@@ -0,0 +1,185 @@
+"""Tests for the columnar segment container."""
+
+import pickle
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from models.segments import SegmentTable
+from models.transcription import (
+    SpeakerTurn,
+    Transcription,
+    TranscriptionSegment,
+    TranscriptionStatus,
+)
+from services.speaker_assignment import assign_speakers
+
+
+def _segments():
+    return [
+        TranscriptionSegment(
+            id="seg-0", start_time=0.0, end_time=2.5, text="Hello", speaker="A"
+        ),
+        TranscriptionSegment(
+            id="seg-1",
+            start_time=2.5,
+            end_time=5.25,
+            text="Zażółć gęślą",
+            speaker="B",
+            overlap_seconds=2.75,
+            simultaneous_speech=True,
+        ),
+        TranscriptionSegment(
+            id="seg-2", start_time=3600.37, end_time=3601.0, text="", speaker="A"
+        ),
+    ]
+
+
+class TestSegmentTable:
+    """Test storing segments as columns."""
+
+    def test_round_trip(self):
+        """Test that segments come back unchanged."""
+        table = SegmentTable.from_segments(_segments())
+
+        assert len(table) == 3
+        assert table.to_segments() == _segments()
+        assert table == _segments()
+
+    def test_columns(self):
+        """Test the float32 times, interned speakers and text blob."""
+        table = SegmentTable.from_segments(_segments())
+
+        assert table._starts.dtype == np.float32
+        assert table._speakers == ["A", "B"]
+        assert table._speaker_codes.tolist() == [0, 1, 0]
+        assert table._text == "HelloZażółć gęślą"
+        assert table.texts == ["Hello", "Zażółć gęślą", ""]
+
+    def test_times_keep_ten_milliseconds(self):
+        """Test that float32 storage does not shift times of long recordings."""
+        times = [round(t, 2) for t in np.arange(0, 36 * 3600, 97.31).tolist()]
+        table = SegmentTable(times, times, ["x"] * len(times))
+
+        assert table.start_times.tolist() == times
+
+    def test_indexing(self):
+        """Test single segments, negative indices and slices."""
+        table = SegmentTable.from_segments(_segments())
+
+        assert table[1] == _segments()[1]
+        assert table[-1] == _segments()[-1]
+        assert table[1:] == _segments()[1:]
+        with pytest.raises(IndexError):
+            table[3]
+
+    def test_custom_ids_are_kept(self):
+        """Test that ids other than seg-<position> survive."""
+        segments = [
+            s.model_copy(update={"id": f"live-{i}"}) for i, s in enumerate(_segments())
+        ]
+
+        table = SegmentTable.from_segments(segments)
+
+        assert table.ids == ["live-0", "live-1", "live-2"]
+        assert SegmentTable.from_segments(_segments())._ids is None
+
+    def test_missing_values(self):
+        """Test that unset speakers and overlaps stay None."""
+        segment = TranscriptionSegment(
+            id="seg-0",
+            start_time=0,
+            end_time=1,
+            text="x",
+            speaker=None,
+            overlap_seconds=None,
+        )
+
+        assert SegmentTable.from_segments([segment])[0] == segment
+
+    def test_records_match_model_dump(self):
+        """Test that records are what the models would serialize to."""
+        table = SegmentTable.from_segments(_segments())
+
+        assert table.to_records() == [s.model_dump() for s in _segments()]
+        assert SegmentTable.from_records(table.to_records()) == table
+
+    def test_rows_round_trip(self):
+        """Test the tuple rows used by the database backend."""
+        table = SegmentTable.from_segments(_segments())
+
+        assert SegmentTable.from_rows(table.rows()) == table
+        assert len(SegmentTable.from_rows([])) == 0
+
+    def test_negative_times_are_rejected(self):
+        """Test that the model's constraints still apply."""
+        with pytest.raises(ValueError):
+            SegmentTable([-1.0], [1.0], ["x"])
+
+    def test_pickle(self):
+        """Test that tables cross process boundaries."""
+        table = SegmentTable.from_segments(_segments())
+
+        assert pickle.loads(pickle.dumps(table)) == table
+
+
+class TestTranscriptionSegments:
+    """Test the table as the segments of a transcription."""
+
+    def _transcription(self, segments):
+        return Transcription(
+            id="abc",
+            status=TranscriptionStatus.COMPLETED,
+            file_name="a.mp3",
+            file_type="audio/mpeg",
+            segments=segments,
+        )
+
+    def test_validated_from_models_and_dicts(self):
+        """Test that lists of models and of dicts become tables."""
+        from_models = self._transcription(_segments())
+        from_dicts = self._transcription([s.model_dump() for s in _segments()])
+
+        assert isinstance(from_models.segments, SegmentTable)
+        assert from_models.segments == from_dicts.segments
+
+    def test_serialized_as_list(self):
+        """Test that the API and stored JSON format is unchanged."""
+        transcription = self._transcription(_segments())
+
+        dumped = transcription.model_dump(mode="json")
+
+        assert dumped["segments"] == [s.model_dump(mode="json") for s in _segments()]
+        assert (
+            Transcription.model_validate_json(transcription.model_dump_json())
+            == transcription
+        )
+
+    def test_invalid_segments(self):
+        """Test that malformed segment dicts fail validation."""
+        with pytest.raises(ValidationError):
+            self._transcription([{"id": "seg-0", "text": "no times"}])
+
+    def test_json_schema_lists_segments(self):
+        """Test that the OpenAPI schema still describes a list of segments."""
+        schema = Transcription.model_json_schema()
+
+        assert schema["properties"]["segments"]["type"] == "array"
+        assert schema["properties"]["segments"]["items"] == {
+            "$ref": "#/$defs/TranscriptionSegment"
+        }
+
+
+class TestAssignSpeakersTable:
+    """Test that speaker assignment keeps the columns it does not change."""
+
+    def test_shares_times_and_texts(self):
+        """Test that only the speaker columns are rebuilt."""
+        table = SegmentTable.from_segments(_segments())
+
+        result = assign_speakers(table, [SpeakerTurn(start=0, end=6, speaker="S")])
+
+        assert result._starts is table._starts
+        assert result._text is table._text
+        assert result.speakers == ["S", "S", "UNKNOWN"]
@@ -0,0 +1,67 @@
+"""Tests for the JSON encoding of stored transcriptions."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from storage import serialization
+from storage.serialization import (
+    SCHEMA_VERSION,
+    dumps,
+    from_record,
+    record_json,
+    to_record,
+)
+
+
+class TestRecords:
+    """Test trusted and validated records."""
+
+    def test_round_trip(self, sample_transcription):
+        """Test that records of the current schema rebuild the transcription."""
+        record = to_record(sample_transcription)
+
+        assert record["schema_version"] == SCHEMA_VERSION
+        assert from_record(record) == sample_transcription
+
+    def test_trusted_records_skip_validation(self, sample_transcription):
+        """Test that records written by the service are not re-validated."""
+        record = to_record(sample_transcription)
+
+        with patch("storage.serialization.Transcription.model_validate") as validate:
+            from_record(record)
+
+        validate.assert_not_called()
+
+    def test_other_schemas_are_validated(self, sample_transcription):
+        """Test that records of unknown versions go through validation."""
+        record = to_record(sample_transcription)
+        record["schema_version"] = SCHEMA_VERSION + 1
+        record["status"] = "unknown"
+
+        with pytest.raises(ValidationError):
+            from_record(record)
+
+    def test_record_json(self, sample_transcription):
+        """Test that response bodies leave out the schema stamp."""
+        body = record_json(to_record(sample_transcription))
+
+        assert json.loads(body) == sample_transcription.model_dump(mode="json")
+
+
+class TestDumps:
+    """Test the JSON encoders."""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_compact_utf8(self, use_orjson):
+        """Test that both encoders produce the same compact UTF-8 JSON."""
+        if use_orjson and serialization.orjson is None:
+            pytest.skip("orjson is not installed")
+        orjson = serialization.orjson if use_orjson else None
+
+        with patch("storage.serialization.orjson", orjson):
+            body = dumps({"text": "Zażółć", "values": [1, 2.5, None]})
+
+        assert body == '{"text":"Zażółć","values":[1,2.5,null]}'.encode()
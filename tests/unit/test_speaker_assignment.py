@@ -0,0 +1,213 @@
+"""Tests for the vectorized speaker assignment engine."""
+
+import numpy as np
+import pytest
+
+from models.transcription import SpeakerTurn, TranscriptionSegment
+from services.speaker_assignment import (
+    SpeakerTimeline,
+    assign_speakers,
+    merge_intervals,
+)
+from services.transcription_service import assign_speaker_by_overlap_cursor
+
+
+def _segment(index: int, start: float, end: float, text: str = "text"):
+    return TranscriptionSegment(
+        id=f"seg-{index}", start_time=start, end_time=end, text=text, speaker=""
+    )
+
+
+def _random_meeting(seed: int, segment_count: int, turn_count: int):
+    """Short segments and alternating-speaker turns (no speaker twice per segment)."""
+    rng = np.random.default_rng(seed)
+    turn_edges = np.cumsum(rng.uniform(5.0, 15.0, turn_count + 1))
+    turns = [
+        SpeakerTurn(start=start, end=end, speaker=f"SPEAKER_{i % 3:02d}")
+        for i, (start, end) in enumerate(zip(turn_edges, turn_edges[1:]))
+    ]
+    starts = np.sort(rng.uniform(0, turn_edges[-1] + 10, segment_count))
+    segments = [
+        _segment(i, float(start), float(start + rng.uniform(0.1, 2.0)))
+        for i, start in enumerate(starts)
+    ]
+    return segments, turns
+
+
+class TestMergeIntervals:
+    """Test interval union."""
+
+    def test_merge(self):
+        """Test that overlapping and touching intervals are merged."""
+        starts, ends = merge_intervals(
+            np.array([5.0, 0.0, 1.0, 3.0]), np.array([6.0, 2.0, 3.0, 4.0])
+        )
+
+        assert starts.tolist() == [0.0, 5.0]
+        assert ends.tolist() == [4.0, 6.0]
+
+    def test_merge_empty(self):
+        """Test merging no intervals."""
+        starts, ends = merge_intervals(np.zeros(0), np.zeros(0))
+
+        assert len(starts) == len(ends) == 0
+
+
+class TestSpeakerTimeline:
+    """Test per-speaker overlap totals."""
+
+    def test_overlap_matrix_totals_all_turns(self):
+        """Test that every turn of a speaker inside an interval is counted."""
+        timeline = SpeakerTimeline.from_turns(
+            [
+                SpeakerTurn(start=0.0, end=1.0, speaker="A"),
+                SpeakerTurn(start=1.0, end=2.5, speaker="B"),
+                SpeakerTurn(start=2.5, end=4.0, speaker="A"),
+            ]
+        )
+
+        totals = timeline.overlap_matrix(np.array([0.5, 5.0]), np.array([3.0, 6.0]))
+
+        assert timeline.speakers == ["A", "B"]
+        assert totals.tolist() == [[1.0, 1.5], [0.0, 0.0]]
+
+    def test_simultaneous_speech(self):
+        """Test regions where speakers talk over each other."""
+        timeline = SpeakerTimeline.from_turns(
+            [
+                SpeakerTurn(start=0.0, end=3.0, speaker="A"),
+                SpeakerTurn(start=2.0, end=5.0, speaker="B"),
+                SpeakerTurn(start=5.0, end=6.0, speaker="A"),
+                # Overlapping turns of the same speaker are not simultaneous
+                SpeakerTurn(start=5.5, end=7.0, speaker="A"),
+            ]
+        )
+
+        starts, ends = timeline.simultaneous_speech()
+
+        assert list(zip(starts.tolist(), ends.tolist())) == [(2.0, 3.0)]
+
+
+class TestAssignSpeakers:
+    """Test vectorized speaker assignment."""
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_matches_cursor_implementation(self, seed):
+        """Test parity with the cursor implementation on random meetings."""
+        segments, turns = _random_meeting(seed, segment_count=500, turn_count=200)
+
+        expected = assign_speaker_by_overlap_cursor(segments, turns)
+        result = assign_speakers(segments, turns)
+
+        assert [s.speaker for s in result] == [s.speaker for s in expected]
+        assert [s.overlap_seconds for s in result] == pytest.approx(
+            [s.overlap_seconds for s in expected]
+        )
+        assert [s.id for s in result] == [s.id for s in segments]
+
+    def test_totals_per_speaker(self):
+        """Test that short turns of one speaker add up against a longer turn."""
+        turns = [
+            SpeakerTurn(start=0.0, end=1.5, speaker="A"),
+            SpeakerTurn(start=1.5, end=3.5, speaker="B"),
+            SpeakerTurn(start=3.5, end=5.0, speaker="A"),
+        ]
+
+        result = assign_speakers([_segment(0, 0.0, 5.0)], turns)
+
+        assert result[0].speaker == "A"
+        assert result[0].overlap_seconds == pytest.approx(3.0)
+
+    def test_flags_simultaneous_speech(self):
+        """Test that segments with overlapping speakers are flagged."""
+        turns = [
+            SpeakerTurn(start=0.0, end=3.0, speaker="A"),
+            SpeakerTurn(start=2.0, end=5.0, speaker="B"),
+        ]
+        segments = [_segment(0, 0.0, 1.9), _segment(1, 1.9, 3.1), _segment(2, 3.1, 5.0)]
+
+        result = assign_speakers(segments, turns)
+
+        assert [s.simultaneous_speech for s in result] == [False, True, False]
+
+    def test_does_not_modify_input(self):
+        """Test that the input segments are left untouched."""
+        segments = [_segment(0, 0.0, 2.0)]
+
+        assign_speakers(segments, [SpeakerTurn(start=0.0, end=2.0, speaker="A")])
+
+        assert segments[0].speaker == ""
+
+
+class TestSplitSegments:
+    """Test splitting segments that span several speakers."""
+
+    TURNS = [
+        SpeakerTurn(start=0.0, end=3.0, speaker="A"),
+        SpeakerTurn(start=3.0, end=6.0, speaker="B"),
+    ]
+
+    def test_split_at_speaker_change(self):
+        """Test that a segment is split at the turn boundary."""
+        segments = [
+            _segment(0, 0.0, 6.0, "one two three four five six"),
+            _segment(1, 6.0, 7.0, "seven"),
+        ]
+
+        result = assign_speakers(segments, self.TURNS, split_segments=True)
+
+        assert [
+            (s.id, s.start_time, s.end_time, s.speaker, s.text) for s in result
+        ] == [
+            ("seg-0", 0.0, 3.0, "A", "one two three"),
+            ("seg-1", 3.0, 6.0, "B", "four five six"),
+            ("seg-2", 6.0, 7.0, "UNKNOWN", "seven"),
+        ]
+        assert result[0].overlap_seconds == pytest.approx(3.0)
+
+    def test_split_disabled(self):
+        """Test that segments are kept whole by default."""
+        segments = [_segment(0, 0.0, 6.0, "one two three four five six")]
+
+        result = assign_speakers(segments, self.TURNS)
+
+        assert len(result) == 1
+
+    @pytest.mark.parametrize(
+        "segment,min_split_seconds",
+        [
+            (_segment(0, 0.0, 3.5, "one two three four"), 1.0),
+            (_segment(0, 0.0, 6.0, "one two three four five six"), 3.5),
+            (_segment(0, 0.0, 6.0, "one"), 1.0),
+        ],
+        ids=["short_second_speaker", "high_threshold", "not_enough_words"],
+    )
+    def test_no_split(self, segment, min_split_seconds):
+        """Test that slivers and one-word segments are not split."""
+        result = assign_speakers(
+            [segment],
+            self.TURNS,
+            split_segments=True,
+            min_split_seconds=min_split_seconds,
+        )
+
+        assert len(result) == 1
+        assert result[0].text == segment.text
+
+    def test_short_interjection_folded(self):
+        """Test that a short interjection stays with the surrounding speaker."""
+        turns = [
+            SpeakerTurn(start=0.0, end=3.0, speaker="A"),
+            SpeakerTurn(start=3.0, end=3.4, speaker="B"),
+            SpeakerTurn(start=3.4, end=5.0, speaker="A"),
+            SpeakerTurn(start=5.0, end=8.0, speaker="B"),
+        ]
+        segments = [_segment(0, 0.0, 8.0, "a b c d e f g h")]
+
+        result = assign_speakers(segments, turns, split_segments=True)
+
+        assert [(s.start_time, s.end_time, s.speaker) for s in result] == [
+            (0.0, 5.0, "A"),
+            (5.0, 8.0, "B"),
+        ]
+        assert [s.text for s in result] == ["a b c d e", "f g h"]
@@ -0,0 +1,236 @@
+"""Tests for SQLite storage and the JSON migration."""
+
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from models.transcription import (
+    Transcription,
+    TranscriptionSegment,
+    TranscriptionStatus,
+)
+from storage.data_storage import DataStorage, create_storage
+from storage.migrate import migrate_json_to_sqlite
+from storage.sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture
+def sqlite_storage(temp_dir):
+    """SQLite storage backed by a temporary database."""
+    return SQLiteStorage(os.path.join(temp_dir, "transcriptions.db"))
+
+
+def _transcription(index: int, segments: int = 0) -> Transcription:
+    return Transcription(
+        id=f"id-{index}",
+        status=TranscriptionStatus.COMPLETED,
+        file_name=f"file{index}.mp3",
+        file_type="audio/mpeg",
+        duration=10.0 + index,
+        created_at=datetime(2025, 1, 1 + index, tzinfo=timezone.utc),
+        segments=[
+            TranscriptionSegment(
+                id=f"seg-{i}",
+                start_time=i,
+                end_time=i + 1,
+                speaker="SPEAKER_00",
+                overlap_seconds=1.0,
+                text=f"Segment {i}",
+            )
+            for i in range(segments)
+        ],
+    )
+
+
+class TestSQLiteStorage:
+    """Test SQLite storage with one row per transcription and segment."""
+
+    def test_init_creates_schema_in_wal_mode(self, sqlite_storage):
+        """Test that initialization creates tables and enables WAL."""
+        connection = sqlite3.connect(sqlite_storage.db_path)
+
+        tables = {
+            row[0]
+            for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+        journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+
+        assert {"transcriptions", "segments"} <= tables
+        assert journal_mode == "wal"
+
+    def test_indexes_exist(self, sqlite_storage):
+        """Test that status and created time lookups are indexed."""
+        connection = sqlite3.connect(sqlite_storage.db_path)
+
+        indexes = {
+            row[0]
+            for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+        }
+
+        assert "idx_transcriptions_status" in indexes
+        assert "idx_transcriptions_created_at" in indexes
+
+    def test_save_and_get_roundtrip(self, sqlite_storage, sample_transcription):
+        """Test that a saved transcription is returned unchanged."""
+        sample_transcription.stage_timings = {"asr": 1.5}
+        sqlite_storage.save(sample_transcription)
+
+        result = sqlite_storage.get(sample_transcription.id)
+
+        assert result == sample_transcription
+
+    def test_get_transcription_not_exists(self, sqlite_storage):
+        """Test retrieving a non-existent transcription."""
+        assert sqlite_storage.get("non-existent-id") is None
+
+    def test_segments_keep_order(self, sqlite_storage):
+        """Test that segments are stored separately and keep their order."""
+        sqlite_storage.save(_transcription(0, segments=25))
+
+        result = sqlite_storage.get("id-0")
+
+        assert [s.id for s in result.segments] == [f"seg-{i}" for i in range(25)]
+
+    def test_save_overwrites_existing(self, sqlite_storage):
+        """Test that saving with the same ID replaces row and segments."""
+        sqlite_storage.save(_transcription(0, segments=5))
+
+        updated = _transcription(0, segments=2)
+        updated.status = TranscriptionStatus.FAILED
+        sqlite_storage.save(updated)
+
+        result = sqlite_storage.get("id-0")
+        assert result.status == TranscriptionStatus.FAILED
+        assert len(result.segments) == 2
+        assert len(sqlite_storage.list_all()) == 1
+
+    def test_list_all_multiple(self, sqlite_storage):
+        """Test listing multiple transcriptions with their segments."""
+        for i in range(3):
+            sqlite_storage.save(_transcription(i, segments=i))
+
+        result = sqlite_storage.list_all()
+
+        assert [t.id for t in result] == ["id-0", "id-1", "id-2"]
+        assert [len(t.segments) for t in result] == [0, 1, 2]
+
+    def test_list_all_empty(self, sqlite_storage):
+        """Test listing when no transcriptions exist."""
+        assert sqlite_storage.list_all() == []
+
+    def test_upgrades_segments_table(self, temp_dir):
+        """Test that older databases gain the simultaneous speech column."""
+        db_path = os.path.join(temp_dir, "old.db")
+        connection = sqlite3.connect(db_path)
+        connection.execute(
+            "CREATE TABLE segments (transcription_id TEXT NOT NULL, "
+            "position INTEGER NOT NULL, id TEXT NOT NULL, start_time REAL NOT NULL, "
+            "end_time REAL NOT NULL, speaker TEXT, overlap_seconds REAL, "
+            "text TEXT NOT NULL, PRIMARY KEY (transcription_id, position))"
+        )
+        connection.close()
+
+        storage = SQLiteStorage(db_path)
+        transcription = _transcription(0, segments=1)
+        segment = transcription.segments[0].model_copy(
+            update={"simultaneous_speech": True}
+        )
+        storage.save(transcription.model_copy(update={"segments": [segment]}))
+
+        assert storage.get("id-0").segments[0].simultaneous_speech is True
+
+    def test_shared_across_instances(self, sqlite_storage):
+        """Test that separate connections see each other's writes."""
+        sqlite_storage.save(_transcription(0, segments=1))
+
+        other = SQLiteStorage(sqlite_storage.db_path)
+
+        assert other.get("id-0") is not None
+
+
+class TestCreateStorage:
+    """Test storage backend selection."""
+
+    @pytest.mark.parametrize(
+        "backend,expected_class",
+        [("json", DataStorage), ("sqlite", SQLiteStorage)],
+        ids=["json", "sqlite"],
+    )
+    def test_create_storage(self, temp_dir, backend, expected_class):
+        """Test that STORAGE_BACKEND picks the implementation."""
+        with patch("storage.data_storage.settings") as mock_settings, patch(
+            "storage.sqlite_storage.settings", mock_settings
+        ):
+            mock_settings.DATA_DIR = temp_dir
+            mock_settings.STORAGE_BACKEND = backend
+            assert isinstance(create_storage(), expected_class)
+
+    def test_create_storage_unknown_backend(self):
+        """Test that unknown backends are rejected."""
+        with patch("storage.data_storage.settings") as mock_settings:
+            mock_settings.STORAGE_BACKEND = "mongo"
+            with pytest.raises(ValueError, match="Unsupported storage backend"):
+                create_storage()
+
+
+class TestMigrateJsonToSqlite:
+    """Test importing the JSON file storage into SQLite."""
+
+    def test_migrate(self, temp_dir, sqlite_storage):
+        """Test that every record and segment is imported."""
+        json_path = os.path.join(temp_dir, "transcriptions.json")
+        records = {
+            f"id-{i}": _transcription(i, segments=3).model_dump(mode="json")
+            for i in range(3)
+        }
+        with open(json_path, "w") as f:
+            json.dump(records, f)
+
+        imported = migrate_json_to_sqlite(json_path, sqlite_storage)
+
+        assert imported == 3
+        assert len(sqlite_storage.get("id-1").segments) == 3
+        assert sqlite_storage.get("id-2").created_at == datetime(
+            2025, 1, 3, tzinfo=timezone.utc
+        )
+
+    def test_migrate_file_written_by_json_storage(self, temp_dir, sqlite_storage):
+        """Test that the generation stamp of the data file is not imported."""
+        with patch("storage.data_storage.settings") as mock_settings:
+            mock_settings.DATA_DIR = temp_dir
+            json_storage = DataStorage()
+        json_storage.save(_transcription(0))
+
+        imported = migrate_json_to_sqlite(json_storage.data_file, sqlite_storage)
+
+        assert imported == 1
+        assert sqlite_storage.get("id-0") is not None
+
+    def test_migrate_legacy_records_without_created_at(
+        self, temp_dir, sqlite_storage
+    ):
+        """Test records written before `created_at` existed."""
+        json_path = os.path.join(temp_dir, "transcriptions.json")
+        record = _transcription(0).model_dump(mode="json")
+        del record["created_at"]
+        del record["stage_timings"]
+        with open(json_path, "w") as f:
+            json.dump({"id-0": record}, f)
+
+        migrate_json_to_sqlite(json_path, sqlite_storage)
+        # Re-running the migration must not duplicate records
+        migrate_json_to_sqlite(json_path, sqlite_storage)
+
+        result = sqlite_storage.list_all()
+        assert len(result) == 1
+        assert result[0].created_at.timestamp() == pytest.approx(
+            os.path.getmtime(json_path)
+        )
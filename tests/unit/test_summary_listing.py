@@ -0,0 +1,175 @@
+"""Tests for summary listing, filtering and cursor pagination."""
+
+import os
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from models.transcription import (
+    SortField,
+    SortOrder,
+    Transcription,
+    TranscriptionQuery,
+    TranscriptionSegment,
+    TranscriptionStatus,
+)
+from storage.base import decode_cursor, encode_cursor
+from storage.data_storage import DataStorage
+from storage.sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def storage(request, temp_dir):
+    """Every storage backend, populated with 10 transcriptions."""
+    if request.param == "json":
+        with patch("storage.data_storage.settings") as mock_settings:
+            mock_settings.DATA_DIR = temp_dir
+            backend = DataStorage()
+    else:
+        backend = SQLiteStorage(os.path.join(temp_dir, "transcriptions.db"))
+
+    statuses = [TranscriptionStatus.COMPLETED, TranscriptionStatus.FAILED]
+    for i in range(10):
+        backend.save(
+            Transcription(
+                id=f"id-{i}",
+                status=statuses[i % 2],
+                file_name=f"file{9 - i}.mp3",
+                file_type="audio/mpeg",
+                duration=None if i == 0 else float(i * 10),
+                language="en" if i < 5 else "pl",
+                created_at=datetime(2025, 1, 1 + i, tzinfo=timezone.utc),
+                segments=[
+                    TranscriptionSegment(
+                        id="seg-0", start_time=0.0, end_time=1.0, text="Hi"
+                    )
+                ],
+            )
+        )
+    return backend
+
+
+def _all_pages(storage, query: TranscriptionQuery):
+    """Follow cursors until the last page, returning ids page by page."""
+    pages = []
+    while True:
+        items, cursor = storage.list_summaries(query)
+        pages.append([item.id for item in items])
+        if cursor is None:
+            return pages
+        query = query.model_copy(update={"cursor": cursor})
+
+
+class TestListSummaries:
+    """Test paginated summary listings on every backend."""
+
+    def test_default_newest_first(self, storage):
+        """Test default sorting by creation time, newest first."""
+        items, cursor = storage.list_summaries(TranscriptionQuery())
+
+        assert [item.id for item in items] == [f"id-{i}" for i in range(9, -1, -1)]
+        assert cursor is None
+
+    def test_cursor_pagination_visits_every_item_once(self, storage):
+        """Test that following cursors returns every record exactly once."""
+        pages = _all_pages(storage, TranscriptionQuery(limit=3))
+
+        assert [len(page) for page in pages] == [3, 3, 3, 1]
+        assert sorted(sum(pages, [])) == sorted(f"id-{i}" for i in range(10))
+
+    @pytest.mark.parametrize(
+        "sort_by,order,expected_first",
+        [
+            (SortField.CREATED_AT, SortOrder.ASC, "id-0"),
+            (SortField.FILE_NAME, SortOrder.ASC, "id-9"),
+            (SortField.FILE_NAME, SortOrder.DESC, "id-0"),
+            (SortField.DURATION, SortOrder.DESC, "id-9"),
+            (SortField.DURATION, SortOrder.ASC, "id-0"),
+        ],
+        ids=["created_asc", "name_asc", "name_desc", "duration_desc", "duration_asc"],
+    )
+    def test_sorting(self, storage, sort_by, order, expected_first):
+        """Test sorting by every supported field."""
+        pages = _all_pages(
+            storage, TranscriptionQuery(sort_by=sort_by, order=order, limit=4)
+        )
+
+        assert pages[0][0] == expected_first
+        assert len(sum(pages, [])) == 10
+
+    @pytest.mark.parametrize(
+        "filters,expected_ids",
+        [
+            (
+                {"status": TranscriptionStatus.FAILED},
+                ["id-9", "id-7", "id-5", "id-3", "id-1"],
+            ),
+            (
+                {"language": "en", "status": TranscriptionStatus.COMPLETED},
+                ["id-4", "id-2", "id-0"],
+            ),
+            (
+                {
+                    "created_after": datetime(2025, 1, 3, tzinfo=timezone.utc),
+                    "created_before": datetime(2025, 1, 5),
+                },
+                ["id-3", "id-2"],
+            ),
+            ({"language": "de"}, []),
+        ],
+        ids=["status", "language_and_status", "date_range", "no_match"],
+    )
+    def test_filters(self, storage, filters, expected_ids):
+        """Test filtering by status, language and creation date."""
+        items, _ = storage.list_summaries(TranscriptionQuery(**filters))
+
+        assert [item.id for item in items] == expected_ids
+
+    def test_summaries_have_no_segments(self, storage):
+        """Test that listings only carry summary fields."""
+        items, _ = storage.list_summaries(TranscriptionQuery(limit=1))
+
+        assert not hasattr(items[0], "segments")
+        assert items[0].language == "en" or items[0].language == "pl"
+
+    def test_cursor_for_other_sort_rejected(self, storage):
+        """Test that a cursor cannot be reused with another sort field."""
+        _, cursor = storage.list_summaries(TranscriptionQuery(limit=2))
+
+        with pytest.raises(ValueError):
+            storage.list_summaries(
+                TranscriptionQuery(cursor=cursor, sort_by=SortField.FILE_NAME)
+            )
+
+    def test_iter_summaries_ignores_paging(self, storage):
+        """Test that the export stream returns every matching record."""
+        items = list(
+            storage.iter_summaries(
+                TranscriptionQuery(status=TranscriptionStatus.COMPLETED, limit=1)
+            )
+        )
+
+        assert [item.id for item in items] == ["id-8", "id-6", "id-4", "id-2", "id-0"]
+
+
+class TestCursor:
+    """Test cursor encoding."""
+
+    def test_roundtrip(self):
+        """Test that a cursor decodes to the sort value and id."""
+        item = Transcription(
+            id="id-1", status="completed", file_name="a.mp3", file_type="audio/mpeg"
+        ).to_item()
+
+        cursor = encode_cursor(item, SortField.FILE_NAME)
+
+        assert decode_cursor(cursor, SortField.FILE_NAME) == ("a.mp3", "id-1")
+
+    @pytest.mark.parametrize(
+        "cursor", ["not-base64!", "bnVsbA==", "WzFd"], ids=["garbage", "null", "short"]
+    )
+    def test_invalid(self, cursor):
+        """Test that malformed cursors raise ValueError."""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, SortField.CREATED_AT)
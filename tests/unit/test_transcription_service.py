@@ -1,22 +1,39 @@
 """Tests for transcription service functions."""
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pytest
 from unittest.mock import patch, MagicMock
 
 
 from services.transcription_service import (
     transcribe_with_whisper,
+    diarize_with_pyannote,
     assign_speaker_by_overlap,
     process_transcription,
+    run_asr_and_diarization,
+    WindowStitcher,
+    stitch_windows,
+    transcribe_chunked,
+    remap_speaker_turns,
+    remerge_transcription,
     SpeakerTurn,
 )
-from models.transcription import TranscriptionSegment, TranscriptionStatus
+from services.vad import AudioWindow, pack_speech
+from models.transcription import (
+    RemergeRequest,
+    TranscriptionSegment,
+    TranscriptionStatus,
+)
+from storage.artifact_storage import PipelineArtifacts
 
 
 class TestTranscribeWithWhisper:
     """Test Whisper transcription functionality."""
 
-    @patch("services.transcription_service.whisper.load_model")
+    @patch("services.asr_backends.whisper.load_model")
     def test_transcribe_basic(self, mock_load_model, mock_whisper_model):
         """Test basic transcription with mock Whisper model."""
         mock_load_model.return_value = mock_whisper_model
@@ -38,7 +55,7 @@ class TestTranscribeWithWhisper:
         assert result[0].text == "Hello world"
         assert result[0].speaker == ""
 
-    @patch("services.transcription_service.whisper.load_model")
+    @patch("services.asr_backends.whisper.load_model")
     @pytest.mark.parametrize(
         "whisper_segments,expected_count,expected_texts",
         [
@@ -81,7 +98,7 @@ class TestTranscribeWithWhisper:
         for i, expected_text in enumerate(expected_texts):
             assert result[i].text == expected_text
 
-    @patch("services.transcription_service.whisper.load_model")
+    @patch("services.asr_backends.whisper.load_model")
     def test_transcribe_rounds_timestamps(self, mock_load_model):
         """Test that timestamps are rounded to 2 decimal places."""
         mock_model = MagicMock()
@@ -95,6 +112,197 @@ class TestTranscribeWithWhisper:
         assert result[0].start_time == 1.23
         assert result[0].end_time == 3.99
 
+    @patch("services.asr_backends.whisper.load_model")
+    def test_transcribe_publishes_segments(self, mock_load_model, mock_whisper_model):
+        """Test that the single-call path publishes its segments once ASR is done."""
+        mock_load_model.return_value = mock_whisper_model
+        progress = MagicMock()
+
+        result = transcribe_with_whisper("/fake/path/audio.mp3", progress=progress)
+
+        progress.segments.assert_called_once_with(result)
+
+    @patch("services.asr_backends.whisper.load_model")
+    def test_transcribe_reuses_loaded_model(self, mock_load_model, mock_whisper_model):
+        """Test that the Whisper model is loaded once and kept warm."""
+        mock_load_model.return_value = mock_whisper_model
+
+        transcribe_with_whisper("/fake/path/first.mp3")
+        transcribe_with_whisper("/fake/path/second.mp3")
+
+        mock_load_model.assert_called_once_with("turbo")
+        assert mock_whisper_model.transcribe.call_count == 2
+
+    def test_transcribe_unsupported_model(self):
+        """Test that only configured Whisper sizes can be requested."""
+        with pytest.raises(ValueError, match="Unsupported Whisper model"):
+            transcribe_with_whisper("/fake/path/audio.mp3", model_name="huge")
+
+
+class TestDiarizeWithPyannote:
+    """Test pyannote diarization input handling."""
+
+    @patch("services.transcription_service.get_diarization_pipeline")
+    def test_diarize_decoded_buffer(self, mock_get_pipeline, mock_pyannote_pipeline):
+        """Test that a decoded buffer is passed as an in-memory waveform."""
+        mock_pyannote_pipeline.return_value.speaker_diarization.itertracks.return_value = []
+        mock_get_pipeline.return_value = mock_pyannote_pipeline
+        audio = np.zeros(16000, dtype=np.float32)
+
+        diarize_with_pyannote(audio)
+
+        pipeline_input = mock_pyannote_pipeline.call_args.args[0]
+        assert pipeline_input["sample_rate"] == 16000
+        assert tuple(pipeline_input["waveform"].shape) == (1, 16000)
+        # The waveform shares memory with the decoded buffer
+        assert pipeline_input["waveform"].numpy().base is not None
+
+    @patch("services.transcription_service.get_diarization_pipeline")
+    def test_diarize_returns_speaker_turns(
+        self, mock_get_pipeline, mock_pyannote_pipeline
+    ):
+        """Test conversion of pyannote tracks into SpeakerTurn objects."""
+        annotation = mock_pyannote_pipeline.return_value
+        annotation.speaker_diarization.itertracks.return_value = (
+            annotation.itertracks.return_value
+        )
+        mock_get_pipeline.return_value = mock_pyannote_pipeline
+
+        result = diarize_with_pyannote("/fake/path/audio.mp3")
+
+        mock_pyannote_pipeline.assert_called_once_with("/fake/path/audio.mp3")
+        assert [turn.speaker for turn in result] == [
+            "SPEAKER_00",
+            "SPEAKER_01",
+            "SPEAKER_00",
+        ]
+
+
+class TestTranscribeChunked:
+    """Test the windowed long-audio ASR mode."""
+
+    def test_stitch_offsets_and_renumbers(self):
+        """Test that window-relative segments get global times and ids."""
+        windows = [AudioWindow(0.0, 20.0, 0.0, 20.0), AudioWindow(20.0, 35.0, 20.0, 35.0)]
+        window_segments = [
+            [(0.0, 5.0, "One"), (5.0, 19.5, "Two")],
+            [(0.5, 10.25, "Three")],
+        ]
+
+        result = stitch_windows(windows, window_segments)
+
+        assert [(s.id, s.start_time, s.end_time, s.text) for s in result] == [
+            ("seg-0", 0.0, 5.0, "One"),
+            ("seg-1", 5.0, 19.5, "Two"),
+            ("seg-2", 20.5, 30.25, "Three"),
+        ]
+
+    def test_stitch_overlap_keeps_each_segment_once(self):
+        """Test that segments seen by two overlapping windows are kept once."""
+        windows = [AudioWindow(0.0, 31.0, 0.0, 30.0), AudioWindow(29.0, 50.0, 30.0, 50.0)]
+        window_segments = [
+            # "across" is cut off by the end of the first window
+            [(0.0, 28.0, "Before"), (28.5, 31.0, "across")],
+            # the second window hears "across" whole, plus a partial "Before"
+            [(0.0, 0.4, "fore"), (0.0, 2.8, "across the cut"), (3.0, 10.0, "After")],
+        ]
+
+        result = stitch_windows(windows, window_segments)
+
+        assert [s.text for s in result] == ["Before", "across the cut", "After"]
+        assert [s.id for s in result] == ["seg-0", "seg-1", "seg-2"]
+
+    def test_stitcher_holds_back_segments_reaching_the_next_window(self):
+        """Test that only segments no later window can change are final."""
+        windows = [AudioWindow(0.0, 31.0, 0.0, 30.0), AudioWindow(29.0, 50.0, 30.0, 50.0)]
+        stitcher = WindowStitcher(len(windows))
+
+        stitcher.add(windows[0], [(0.0, 28.0, "Before"), (28.5, 31.0, "across")])
+        final = stitcher.final_count(windows[1].start)
+        assert [s.text for s in stitcher.segments(0, final)] == ["Before"]
+
+        stitcher.add(
+            windows[1],
+            [(0.0, 0.4, "fore"), (0.0, 2.8, "across the cut"), (3.0, 10.0, "After")],
+        )
+        assert stitcher.final_count(None, first=final) == 3
+        assert [(s.id, s.text) for s in stitcher.segments(final)] == [
+            ("seg-1", "across the cut"),
+            ("seg-2", "After"),
+        ]
+
+    def test_transcribe_chunked(self):
+        """Test that every window is transcribed and results are stitched."""
+        audio = np.random.default_rng(0).normal(0, 0.1, 75 * 16000).astype(np.float32)
+        calls = []
+
+        def window_fn(samples, model_name):
+            calls.append(len(samples))
+            return [(0.0, len(samples) / 16000, f"{len(calls)}")]
+
+        with patch("services.transcription_service.settings") as mock_settings:
+            mock_settings.ASR_CHUNK_SECONDS = 30
+            mock_settings.ASR_CHUNK_OVERLAP_SECONDS = 0.0
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                result = transcribe_chunked(audio, pool=pool, window_fn=window_fn)
+
+        assert sorted(calls) == [15 * 16000, 30 * 16000, 30 * 16000]
+        assert [(s.start_time, s.end_time) for s in result] == [
+            (0.0, 30.0),
+            (30.0, 60.0),
+            (60.0, 75.0),
+        ]
+
+    def test_transcribe_chunked_reports_progress(self):
+        """Test that segments are published window by window, each once."""
+        audio = np.random.default_rng(0).normal(0, 0.1, 75 * 16000).astype(np.float32)
+        progress = MagicMock()
+
+        def window_fn(samples, model_name):
+            seconds = len(samples) / 16000
+            return [(0.0, seconds / 2, "first half"), (seconds / 2, seconds, "second")]
+
+        with patch("services.transcription_service.settings") as mock_settings:
+            mock_settings.ASR_CHUNK_SECONDS = 30
+            mock_settings.ASR_CHUNK_OVERLAP_SECONDS = 0.0
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                result = transcribe_chunked(
+                    audio, pool=pool, window_fn=window_fn, progress=progress
+                )
+
+        published = [
+            segment for c in progress.segments.call_args_list for segment in c.args[0]
+        ]
+        assert published == result
+        assert [c.args for c in progress.advance.call_args_list] == [
+            ("asr", 1 / 3),
+            ("asr", 2 / 3),
+            ("asr", 1.0),
+        ]
+
+    @patch("services.transcription_service.transcribe_chunked")
+    @patch("services.asr_backends.whisper.load_model")
+    @pytest.mark.parametrize(
+        "chunk_seconds,seconds,chunked",
+        [(0, 120, False), (60, 30, False), (60, 120, True)],
+        ids=["disabled", "short_audio", "long_audio"],
+    )
+    def test_long_audio_is_chunked(
+        self, mock_load_model, mock_chunked, mock_whisper_model,
+        chunk_seconds, seconds, chunked
+    ):
+        """Test that only long decoded audio uses the chunked mode."""
+        mock_load_model.return_value = mock_whisper_model
+        audio = np.zeros(seconds * 16000, dtype=np.float32)
+
+        with patch(
+            "services.transcription_service.settings.ASR_CHUNK_SECONDS", chunk_seconds
+        ):
+            transcribe_with_whisper(audio)
+
+        assert mock_chunked.called == chunked
+        assert mock_whisper_model.transcribe.called != chunked
+
 
 class TestAssignSpeakerByOverlap:
     """Test speaker assignment logic."""
@@ -267,6 +475,7 @@ class TestAssignSpeakerByOverlap:
         assert result[0].speaker == "SPEAKER_00"
 
 
+@pytest.mark.usefixtures("mock_decode_audio")
 class TestProcessTranscription:
     """Test end-to-end transcription processing."""
 
@@ -354,3 +563,295 @@ class TestProcessTranscription:
         )
 
         assert result.duration == 10.46
+
+    @patch("services.transcription_service.diarize_with_pyannote")
+    @patch("services.transcription_service.transcribe_with_whisper")
+    def test_process_transcription_decodes_once(
+        self, mock_transcribe, mock_diarize, mock_decode_audio
+    ):
+        """Test that both stages share one decoded buffer and derive duration."""
+        mock_transcribe.return_value = []
+        mock_diarize.return_value = []
+
+        result = process_transcription("/path.mp3", "file.mp3", "audio/mpeg")
+
+        mock_decode_audio.assert_called_once_with("/path.mp3")
+        audio = mock_decode_audio.return_value
+        assert mock_transcribe.call_args.args[0] is audio
+        assert mock_diarize.call_args.args[0] is audio
+        assert result.duration == 10.0
+
+
+class TestRunAsrAndDiarization:
+    """Test sequential and parallel pipeline modes."""
+
+    @patch("services.transcription_service.diarize_with_pyannote")
+    @patch("services.transcription_service.transcribe_with_whisper")
+    def test_parallel_mode_runs_stages_concurrently(
+        self,
+        mock_transcribe,
+        mock_diarize,
+        sample_transcription_segments,
+        sample_speaker_turns,
+    ):
+        """Test that both stages are in flight at the same time."""
+        # Both stages have to reach the barrier, otherwise it times out.
+        barrier = threading.Barrier(2, timeout=5)
+
+        def _transcribe(file_path):
+            barrier.wait()
+            return sample_transcription_segments
+
+        def _diarize(file_path):
+            barrier.wait()
+            return sample_speaker_turns
+
+        mock_transcribe.side_effect = _transcribe
+        mock_diarize.side_effect = _diarize
+        stage_timings = {}
+
+        with patch("services.transcription_service.settings.PIPELINE_MODE", "parallel"):
+            segments, turns = run_asr_and_diarization("/fake/audio.mp3", stage_timings)
+
+        assert segments == sample_transcription_segments
+        assert turns == sample_speaker_turns
+        assert set(stage_timings) == {"asr", "diarization"}
+
+    @patch("services.transcription_service.diarize_with_pyannote")
+    @patch("services.transcription_service.transcribe_with_whisper")
+    def test_sequential_mode(self, mock_transcribe, mock_diarize):
+        """Test that the sequential mode still runs both stages."""
+        mock_transcribe.return_value = []
+        mock_diarize.return_value = []
+        stage_timings = {}
+
+        with patch(
+            "services.transcription_service.settings.PIPELINE_MODE", "sequential"
+        ):
+            run_asr_and_diarization("/fake/audio.mp3", stage_timings)
+
+        mock_transcribe.assert_called_once_with("/fake/audio.mp3")
+        mock_diarize.assert_called_once_with("/fake/audio.mp3")
+        assert set(stage_timings) == {"asr", "diarization"}
+
+    @patch("services.transcription_service.torch.set_num_threads")
+    @patch("services.transcription_service.diarize_with_pyannote")
+    @patch("services.transcription_service.transcribe_with_whisper")
+    def test_sequential_mode_applies_thread_budgets(
+        self, mock_transcribe, mock_diarize, mock_set_num_threads
+    ):
+        """Test that each sequential stage runs with its own torch threads."""
+        budgets = []
+        mock_transcribe.side_effect = lambda audio: budgets.append(
+            mock_set_num_threads.call_args.args[0]
+        )
+        mock_diarize.side_effect = lambda audio: budgets.append(
+            mock_set_num_threads.call_args.args[0]
+        )
+
+        with patch(
+            "services.transcription_service.settings.PIPELINE_MODE", "sequential"
+        ), patch(
+            "services.transcription_service.settings.ASR_TORCH_THREADS", 3
+        ), patch(
+            "services.transcription_service.settings.DIARIZATION_TORCH_THREADS", 5
+        ):
+            run_asr_and_diarization("/fake/audio.mp3", {})
+
+        assert budgets == [3, 5]
+
+    @patch("services.transcription_service.diarize_with_pyannote")
+    @patch("services.transcription_service.transcribe_with_whisper")
+    def test_stage_error_propagates(self, mock_transcribe, mock_diarize):
+        """Test that a failing stage fails the whole run."""
+        mock_transcribe.return_value = []
+        mock_diarize.side_effect = RuntimeError("pyannote failed")
+
+        with pytest.raises(RuntimeError, match="pyannote failed"):
+            run_asr_and_diarization("/fake/audio.mp3", {})
+
+    @pytest.mark.usefixtures("mock_decode_audio")
+    @patch("services.transcription_service.diarize_with_pyannote")
+    @patch("services.transcription_service.transcribe_with_whisper")
+    def test_process_transcription_reports_stage_timings(
+        self, mock_transcribe, mock_diarize
+    ):
+        """Test that per-stage wall times end up on the transcription."""
+        mock_transcribe.return_value = []
+        mock_diarize.return_value = []
+
+        result = process_transcription("/path.mp3", "file.mp3", "audio/mpeg", 10.0)
+
+        assert set(result.stage_timings) == {"decode", "asr", "diarization", "merge"}
+        assert all(seconds >= 0.0 for seconds in result.stage_timings.values())
+
+    @pytest.mark.usefixtures("mock_decode_audio")
+    @patch("services.transcription_service.diarize_with_pyannote")
+    @patch("services.transcription_service.transcribe_with_whisper")
+    def test_process_transcription_reports_progress(
+        self, mock_transcribe, mock_diarize
+    ):
+        """Test that stage transitions are reported in pipeline order."""
+        mock_transcribe.return_value = []
+        mock_diarize.return_value = []
+        progress = MagicMock()
+
+        with patch(
+            "services.transcription_service.settings.PIPELINE_MODE", "sequential"
+        ):
+            process_transcription(
+                "/path.mp3", "file.mp3", "audio/mpeg", 10.0, progress=progress
+            )
+
+        stages = [c.args[0] for c in progress.stage_started.call_args_list]
+        assert stages == ["decode", "asr", "diarization", "merge"]
+        assert [c.args[0] for c in progress.stage_finished.call_args_list] == stages
+        assert mock_transcribe.call_args.kwargs == {"progress": progress}
+        assert mock_diarize.call_args.kwargs == {"progress": progress}
+
+
+class TestVoiceActivityPrePass:
+    """Test transcribing only the speech found by the VAD pre-pass."""
+
+    @staticmethod
+    def _audio():
+        rng = np.random.default_rng(0)
+        speech = rng.normal(0, 0.1, 2 * 16000).astype(np.float32)
+        silence = np.zeros(3 * 16000, dtype=np.float32)
+        # Speech at 0-2 s and 5-7 s, 3 s of silence in between and after
+        return np.concatenate([speech, silence, speech, silence])
+
+    @patch("services.transcription_service.settings.VAD_PADDING_SECONDS", 0.0)
+    @patch("services.transcription_service.settings.VAD_ENABLED", True)
+    @patch("services.transcription_service.diarize_with_pyannote")
+    @patch("services.transcription_service.transcribe_with_whisper")
+    @patch("services.transcription_service.decode_audio")
+    def test_stages_get_speech_only(self, mock_decode, mock_transcribe, mock_diarize):
+        """Test that silence is skipped and results are mapped back."""
+        mock_decode.return_value = self._audio()
+        mock_transcribe.return_value = [
+            TranscriptionSegment(
+                id="seg-0", start_time=0.5, end_time=1.5, text="one", speaker=""
+            ),
+            TranscriptionSegment(
+                id="seg-1", start_time=2.5, end_time=3.5, text="two", speaker=""
+            ),
+        ]
+        mock_diarize.return_value = [
+            SpeakerTurn(start=0.0, end=4.0, speaker="SPEAKER_00"),
+        ]
+
+        result = process_transcription("/path.mp3", "file.mp3", "audio/mpeg")
+
+        speech = mock_transcribe.call_args.args[0]
+        assert len(speech) == pytest.approx(4 * 16000, abs=0.1 * 16000)
+        assert mock_diarize.call_args.args[0] is speech
+        assert result.duration == 10.0
+        assert [(s.start_time, s.end_time) for s in result.segments] == [
+            pytest.approx((0.5, 1.5), abs=0.05),
+            pytest.approx((5.5, 6.5), abs=0.05),
+        ]
+        assert all(s.speaker == "SPEAKER_00" for s in result.segments)
+        assert "vad" in result.stage_timings
+
+    @patch("services.transcription_service.settings.VAD_ENABLED", True)
+    @patch("services.transcription_service.diarize_with_pyannote")
+    @patch("services.transcription_service.transcribe_with_whisper")
+    @patch("services.transcription_service.decode_audio")
+    def test_silence_skips_models(self, mock_decode, mock_transcribe, mock_diarize):
+        """Test that silent recordings complete without running the models."""
+        mock_decode.return_value = np.zeros(3 * 16000, dtype=np.float32)
+
+        result = process_transcription("/path.mp3", "file.mp3", "audio/mpeg")
+
+        mock_transcribe.assert_not_called()
+        mock_diarize.assert_not_called()
+        assert result.status == TranscriptionStatus.COMPLETED
+        assert result.segments == []
+
+    def test_speaker_turns_split_at_skipped_silence(self):
+        """Test that no turn spans a skipped pause."""
+        _, timeline = pack_speech(self._audio(), [(0.0, 2.0), (5.0, 7.0)])
+
+        turns = remap_speaker_turns(
+            [SpeakerTurn(start=1.0, end=3.0, speaker="SPEAKER_00")], timeline
+        )
+
+        assert [(t.start, t.end) for t in turns] == [
+            pytest.approx((1.0, 2.0)),
+            pytest.approx((5.0, 6.0)),
+        ]
+
+
+class TestRemerge:
+    """Test re-running the merge stage on stored pipeline artifacts."""
+
+    @pytest.mark.usefixtures("mock_decode_audio")
+    @patch("services.transcription_service.diarize_with_pyannote")
+    @patch("services.transcription_service.transcribe_with_whisper")
+    @patch("services.transcription_service.assign_speaker_by_overlap")
+    def test_artifacts_survive_failed_merge(
+        self,
+        mock_assign,
+        mock_transcribe,
+        mock_diarize,
+        isolated_artifact_storage,
+        sample_transcription_segments,
+        sample_speaker_turns,
+    ):
+        """Test that the models' output is stored before the merge runs."""
+        mock_transcribe.return_value = sample_transcription_segments
+        mock_diarize.return_value = sample_speaker_turns
+        mock_assign.side_effect = Exception("Speaker assignment error")
+
+        result = process_transcription("/path.mp3", "file.mp3", "audio/mpeg", 10.0)
+
+        assert result.status == TranscriptionStatus.FAILED
+        artifacts = isolated_artifact_storage.get(result.id)
+        assert [s.text for s in artifacts.segments] == [
+            s.text for s in sample_transcription_segments
+        ]
+        assert artifacts.speaker_turns == sample_speaker_turns
+
+    @pytest.mark.usefixtures("mock_decode_audio")
+    @patch("services.transcription_service.settings.ARTIFACTS_ENABLED", False)
+    @patch("services.transcription_service.diarize_with_pyannote")
+    @patch("services.transcription_service.transcribe_with_whisper")
+    def test_artifacts_disabled(
+        self, mock_transcribe, mock_diarize, isolated_artifact_storage
+    ):
+        """Test that nothing is stored when artifacts are disabled."""
+        mock_transcribe.return_value = []
+        mock_diarize.return_value = []
+
+        result = process_transcription("/path.mp3", "file.mp3", "audio/mpeg", 10.0)
+
+        assert not isolated_artifact_storage.exists(result.id)
+
+    def test_remerge_with_new_parameters(self, sample_transcription):
+        """Test that only the merge runs again, with the requested parameters."""
+        artifacts = PipelineArtifacts(
+            segments=[
+                TranscriptionSegment(
+                    id="seg-0", start_time=0.0, end_time=2.0, text="Hi", speaker=""
+                )
+            ],
+            speaker_turns=[SpeakerTurn(start=1.8, end=3.0, speaker="SPEAKER_00")],
+        )
+        failed = sample_transcription.model_copy(
+            update={"status": TranscriptionStatus.FAILED, "stage_timings": {"asr": 9.0}}
+        )
+
+        default = remerge_transcription(failed, artifacts, RemergeRequest())
+        stricter = remerge_transcription(
+            failed,
+            artifacts,
+            RemergeRequest(min_overlap_seconds=0.5, unknown_speaker_label="?"),
+        )
+
+        assert default.status == TranscriptionStatus.COMPLETED
+        assert default.segments[0].speaker == "SPEAKER_00"
+        assert stricter.segments[0].speaker == "?"
+        assert default.stage_timings["asr"] == 9.0
+        assert "merge" in default.stage_timings
+        assert failed.status == TranscriptionStatus.FAILED
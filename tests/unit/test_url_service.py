@@ -1,31 +1,214 @@
 """Tests for URL service functions."""
 
+import os
+import threading
+from unittest.mock import patch
+
+import httpx
 import pytest
-from unittest.mock import patch, AsyncMock
+from fastapi import HTTPException
+
+from services.url_service import UrlService
+
+CONTENT = bytes(range(256)) * 40
+
+
+class InterruptedStream(httpx.AsyncByteStream):
+    """Response body that drops the connection after `limit` bytes."""
+
+    def __init__(self, data: bytes, limit: int):
+        self.data = data
+        self.limit = limit
+
+    async def __aiter__(self):
+        yield self.data[: self.limit]
+        raise httpx.ReadError("connection reset")
 
-from services.url_service import url_service
+
+def _service(handler, **kwargs) -> UrlService:
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), follow_redirects=True
+    )
+    return UrlService(client=client, **kwargs)
+
+
+def _range_start(request: httpx.Request) -> int:
+    range_header = request.headers.get("range")
+    return int(range_header[len("bytes=") : -1]) if range_header else 0
 
 
 class TestUrlServiceDownload:
     """Test URL download functionality."""
 
     @pytest.mark.asyncio
-    @patch("services.url_service.httpx.AsyncClient")
-    async def test_download_follows_redirects(self, mock_client_class, temp_dir):
+    async def test_download_follows_redirects(self, temp_dir):
         """Test that downloads follow redirects."""
-        mock_response = AsyncMock()
-        mock_response.headers.get.return_value = "audio/mpeg"
-        mock_response.content = b"data"
-        mock_response.raise_for_status = AsyncMock()
-
-        mock_client = AsyncMock()
-        mock_client.get.return_value = mock_response
-        mock_client.__aenter__.return_value = mock_client
-        mock_client.__aexit__.return_value = AsyncMock()
-        mock_client_class.return_value = mock_client
-
-        await url_service.download_from_url("https://example.com/audio.mp3", temp_dir)
-
-        # Verify follow_redirects=True was passed
-        call_kwargs = mock_client.get.call_args.kwargs
-        assert call_kwargs.get("follow_redirects") is True
+
+        def handler(request):
+            if request.url.path == "/old.mp3":
+                return httpx.Response(302, headers={"location": "/audio.mp3"})
+            return httpx.Response(
+                200, content=CONTENT, headers={"content-type": "audio/mpeg"}
+            )
+
+        file_path, content_type = await _service(handler).download_from_url(
+            "https://example.com/old.mp3", temp_dir
+        )
+
+        assert content_type == "audio/mpeg"
+        with open(file_path, "rb") as f:
+            assert f.read() == CONTENT
+
+    @pytest.mark.asyncio
+    async def test_download_writes_off_event_loop(self, temp_dir):
+        """Test that chunks are written to disk on worker threads."""
+        loop_thread = threading.get_ident()
+        write_threads = []
+        real_open = open
+
+        def recording_open(path, mode):
+            f = real_open(path, mode)
+            write = f.write
+
+            def recording_write(data):
+                write_threads.append(threading.get_ident())
+                return write(data)
+
+            f.write = recording_write
+            return f
+
+        def handler(request):
+            return httpx.Response(200, content=CONTENT)
+
+        with patch("services.url_service.open", recording_open, create=True):
+            file_path, _ = await _service(handler).download_from_url(
+                "https://example.com/audio.mp3", temp_dir
+            )
+
+        assert write_threads and loop_thread not in write_threads
+        with open(file_path, "rb") as f:
+            assert f.read() == CONTENT
+
+    @pytest.mark.asyncio
+    async def test_download_unique_file_per_job(self, temp_dir):
+        """Test that same-named URLs never share a file."""
+        service = _service(lambda request: httpx.Response(200, content=CONTENT))
+
+        first, _ = await service.download_from_url(
+            "https://a.example.com/audio.mp3?token=1", temp_dir, file_id="job-1"
+        )
+        second, _ = await service.download_from_url(
+            "https://b.example.com/audio.mp3", temp_dir, file_id="job-2"
+        )
+        third, _ = await service.download_from_url(
+            "https://b.example.com/audio.mp3", temp_dir
+        )
+
+        assert first == os.path.join(temp_dir, "job-1_audio.mp3")
+        assert second == os.path.join(temp_dir, "job-2_audio.mp3")
+        assert len({first, second, third}) == 3
+
+    @pytest.mark.asyncio
+    async def test_download_reuses_client(self, temp_dir):
+        """Test that connections come from one shared client."""
+        service = UrlService()
+
+        assert service.client is service.client
+        await service.aclose()
+
+    @pytest.mark.asyncio
+    async def test_download_resumes_with_range(self, temp_dir):
+        """Test that an interrupted transfer continues where it stopped."""
+        requests = []
+
+        def handler(request):
+            start = _range_start(request)
+            requests.append(start)
+            if start == 0:
+                return httpx.Response(
+                    200,
+                    headers={"content-length": str(len(CONTENT))},
+                    stream=InterruptedStream(CONTENT, 3000),
+                )
+            return httpx.Response(
+                206,
+                content=CONTENT[start:],
+                headers={
+                    "content-range": f"bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}"
+                },
+            )
+
+        file_path, _ = await _service(handler).download_from_url(
+            "https://example.com/audio.mp3", temp_dir
+        )
+
+        assert requests == [0, 3000]
+        with open(file_path, "rb") as f:
+            assert f.read() == CONTENT
+
+    @pytest.mark.asyncio
+    async def test_download_restarts_without_range_support(self, temp_dir):
+        """Test that servers ignoring Range get a fresh download."""
+        calls = []
+
+        def handler(request):
+            calls.append(_range_start(request))
+            if len(calls) == 1:
+                return httpx.Response(200, stream=InterruptedStream(CONTENT, 1000))
+            return httpx.Response(200, content=CONTENT)
+
+        file_path, _ = await _service(handler).download_from_url(
+            "https://example.com/audio.mp3", temp_dir
+        )
+
+        assert calls == [0, 1000]
+        with open(file_path, "rb") as f:
+            assert f.read() == CONTENT
+
+    @pytest.mark.asyncio
+    async def test_download_gives_up_after_retries(self, temp_dir):
+        """Test that persistent failures end in 400 without leftovers."""
+
+        def handler(request):
+            return httpx.Response(200, stream=InterruptedStream(CONTENT, 10))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await _service(handler, max_retries=2).download_from_url(
+                "https://example.com/audio.mp3", temp_dir
+            )
+
+        assert exc_info.value.status_code == 400
+        assert os.listdir(temp_dir) == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "headers", [{"content-length": "10240"}, {}], ids=["declared", "streamed"]
+    )
+    async def test_download_too_large(self, temp_dir, headers):
+        """Test that MAX_FILE_SIZE is enforced by header and byte count."""
+
+        async def body():
+            for _ in range(10):
+                yield b"x" * 1024
+
+        def handler(request):
+            return httpx.Response(200, headers=headers, content=body())
+
+        with pytest.raises(HTTPException) as exc_info:
+            await _service(handler, max_size=4096).download_from_url(
+                "https://example.com/audio.mp3", temp_dir
+            )
+
+        assert exc_info.value.status_code == 413
+        assert os.listdir(temp_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_download_http_error(self, temp_dir):
+        """Test that HTTP errors are reported as 400."""
+        service = _service(lambda request: httpx.Response(404))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.download_from_url("https://example.com/missing.mp3", temp_dir)
+
+        assert exc_info.value.status_code == 400
+        assert os.listdir(temp_dir) == []
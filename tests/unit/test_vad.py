@@ -0,0 +1,175 @@
+"""Tests for voice activity detection and audio windowing."""
+
+import numpy as np
+import pytest
+
+from services.audio_service import SAMPLE_RATE
+from services.vad import (
+    AudioWindow,
+    pack_speech,
+    plan_windows,
+    speech_spans,
+    window_samples,
+)
+
+
+def _speech(seconds: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, 0.1, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def _speech_with_pauses(
+    speech_seconds: float, pause_seconds: float, count: int
+) -> np.ndarray:
+    parts = []
+    for i in range(count):
+        parts += [_speech(speech_seconds, seed=i), _silence(pause_seconds)]
+    return np.concatenate(parts)
+
+
+class TestSpeechSpans:
+    """Test energy-based speech detection."""
+
+    def test_detects_speech_between_silence(self):
+        """Test that speech surrounded by silence is found with padding."""
+        audio = np.concatenate([_silence(1.0), _speech(2.0), _silence(1.0)])
+
+        spans = speech_spans(audio, padding_seconds=0.1)
+
+        assert len(spans) == 1
+        start, end = spans[0]
+        assert start == pytest.approx(0.9, abs=0.05)
+        assert end == pytest.approx(3.1, abs=0.05)
+
+    def test_bridges_short_pauses(self):
+        """Test that pauses shorter than min_silence_seconds are bridged."""
+        audio = np.concatenate([_speech(1.0), _silence(0.1), _speech(1.0, seed=1)])
+
+        assert len(speech_spans(audio, min_silence_seconds=0.3)) == 1
+        assert len(speech_spans(audio, min_silence_seconds=0.05)) == 2
+
+    @pytest.mark.parametrize(
+        "audio",
+        [np.zeros(0, dtype=np.float32), _silence(3.0)],
+        ids=["empty", "silence"],
+    )
+    def test_no_speech(self, audio):
+        """Test that silent or empty audio has no speech."""
+        assert speech_spans(audio) == []
+
+
+class TestPlanWindows:
+    """Test splitting long audio into windows."""
+
+    def test_short_audio_single_window(self):
+        """Test that audio shorter than a window is not split."""
+        audio = _speech(10.0)
+
+        assert plan_windows(audio, window_seconds=30) == [
+            AudioWindow(0.0, 10.0, 0.0, 10.0)
+        ]
+
+    def test_cuts_in_silence(self):
+        """Test that cuts land in pauses and windows do not overlap."""
+        audio = _speech_with_pauses(10.0, 0.5, count=12)
+
+        windows = plan_windows(audio, window_seconds=30)
+
+        assert len(windows) > 1
+        for window in windows:
+            assert window.end - window.start <= 30
+            assert (window.start, window.end) == (window.keep_start, window.keep_end)
+        for cut in (window.keep_end for window in windows[:-1]):
+            # every cut is inside one of the 0.5 s pauses
+            assert (cut % 10.5) >= 10.0
+
+    def test_hard_cut_overlaps(self):
+        """Test that audio without pauses is cut hard with overlapping edges."""
+        audio = _speech(65.0)
+
+        windows = plan_windows(audio, window_seconds=30, overlap_seconds=2.0)
+
+        assert windows == [
+            AudioWindow(0.0, 31.0, 0.0, 30.0),
+            AudioWindow(29.0, 61.0, 30.0, 60.0),
+            AudioWindow(59.0, 65.0, 60.0, 65.0),
+        ]
+
+    def test_keep_ranges_tile_timeline(self):
+        """Test that keep ranges cover the whole recording exactly once."""
+        audio = np.concatenate(
+            [_speech_with_pauses(7.0, 0.4, count=6), _speech(50.0, seed=9)]
+        )
+
+        windows = plan_windows(audio, window_seconds=20)
+
+        assert windows[0].keep_start == 0.0
+        assert windows[-1].keep_end == pytest.approx(len(audio) / SAMPLE_RATE)
+        for previous, current in zip(windows, windows[1:]):
+            assert previous.keep_end == current.keep_start
+
+    def test_window_samples(self):
+        """Test that a window maps to the matching slice of samples."""
+        audio = _speech(10.0)
+
+        samples = window_samples(audio, AudioWindow(2.0, 3.5, 2.0, 3.5))
+
+        assert len(samples) == int(1.5 * SAMPLE_RATE)
+        assert np.shares_memory(samples, audio)
+
+
+class TestPackSpeech:
+    """Test dropping silence and mapping packed times back."""
+
+    def test_packs_spans_back_to_back(self):
+        """Test that only the samples of the spans are kept."""
+        audio = np.arange(10 * SAMPLE_RATE, dtype=np.float32)
+
+        packed, timeline = pack_speech(audio, [(1.0, 2.0), (5.0, 7.0)])
+
+        assert len(packed) == 3 * SAMPLE_RATE
+        assert packed[0] == audio[SAMPLE_RATE]
+        assert packed[SAMPLE_RATE] == audio[5 * SAMPLE_RATE]
+        assert timeline.speech_seconds == pytest.approx(3.0)
+        assert timeline.skipped_seconds == pytest.approx(7.0)
+
+    def test_maps_times_to_original(self):
+        """Test that packed times are shifted by the silence skipped before."""
+        audio = _silence(10.0)
+        _, timeline = pack_speech(audio, [(1.0, 2.0), (5.0, 7.0)])
+
+        assert timeline.to_original(0.5) == pytest.approx(1.5)
+        assert timeline.to_original(1.5) == pytest.approx(5.5)
+        assert timeline.to_original(10.0) == pytest.approx(7.0)
+
+    def test_splits_intervals_across_skipped_silence(self):
+        """Test that an interval over a joint is split at the skipped pause."""
+        audio = _silence(10.0)
+        _, timeline = pack_speech(audio, [(1.0, 2.0), (5.0, 7.0)])
+
+        assert timeline.split_to_original(0.5, 1.5) == [
+            pytest.approx((1.5, 2.0)),
+            pytest.approx((5.0, 5.5)),
+        ]
+        assert timeline.split_to_original(0.2, 1.0) == [pytest.approx((1.2, 2.0))]
+
+    def test_overlapping_spans_are_copied_once(self):
+        """Test that padded spans overlapping each other share their samples."""
+        audio = _silence(5.0)
+
+        packed, timeline = pack_speech(audio, [(1.0, 2.5), (2.0, 3.0)])
+
+        assert len(packed) == 2 * SAMPLE_RATE
+        assert timeline.to_original(1.75) == pytest.approx(2.75)
+
+    def test_no_speech(self):
+        """Test that silence packs to nothing."""
+        packed, timeline = pack_speech(_silence(2.0), [])
+
+        assert len(packed) == 0
+        assert timeline.speech_seconds == 0.0
+        assert timeline.skipped_seconds == pytest.approx(2.0)
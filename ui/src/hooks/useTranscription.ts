@@ -1,6 +1,12 @@
-import { useQuery } from "@tanstack/react-query";
+import { useEffect, useState } from "react";
+import { useQuery, useQueryClient } from "@tanstack/react-query";
+import { API_BASE_URL } from "../services/api/client";
 import { transcriptionApi } from "../services/api/transcription";
-import type { Transcription } from "../types/transcription";
+import type {
+  Transcription,
+  TranscriptionEvent,
+  TranscriptionSegment,
+} from "../types/transcription";
 
 export const useTranscription = (id: string) => {
   return useQuery({
@@ -26,7 +32,7 @@ export const useTranscriptionPolling = (id: string) => {
     enabled: !!id,
     refetchInterval: (query) => {
       const data = query.state.data as Transcription | undefined;
-      if (data?.status === "processing") {
+      if (data?.status === "pending" || data?.status === "processing") {
         return 3000;
       }
       return false;
@@ -35,3 +41,49 @@ export const useTranscriptionPolling = (id: string) => {
     staleTime: 0,
   });
 };
+
+export interface TranscriptionProgress {
+  stage?: string;
+  progress: number;
+  segments: TranscriptionSegment[];
+}
+
+// Live stage, progress and ASR segments of an in-flight transcription
+export const useTranscriptionEvents = (id: string, enabled: boolean) => {
+  const queryClient = useQueryClient();
+  const [state, setState] = useState<TranscriptionProgress>({
+    progress: 0,
+    segments: [],
+  });
+
+  useEffect(() => {
+    if (!id || !enabled) {
+      return;
+    }
+    setState({ progress: 0, segments: [] });
+
+    const source = new EventSource(
+      `${API_BASE_URL}/api/transcriptions/${id}/events`,
+    );
+    const onEvent = (message: MessageEvent) => {
+      const event = JSON.parse(message.data) as TranscriptionEvent;
+      setState((previous) => ({
+        stage: event.stage ?? previous.stage,
+        progress: event.progress ?? previous.progress,
+        segments: event.segment
+          ? [...previous.segments, event.segment]
+          : previous.segments,
+      }));
+      if (event.status === "completed" || event.status === "failed") {
+        source.close();
+        queryClient.invalidateQueries({ queryKey: ["transcription", id] });
+      }
+    };
+    for (const type of ["status", "stage", "progress", "segment"]) {
+      source.addEventListener(type, onEvent);
+    }
+    return () => source.close();
+  }, [id, enabled, queryClient]);
+
+  return state;
+};
@@ -2,7 +2,11 @@ import { useNavigate, useParams } from "react-router-dom";
 import { Card } from "primereact/card";
 import { ProgressSpinner } from "primereact/progressspinner";
 import { Message } from "primereact/message";
-import { useTranscriptionPolling } from "../hooks/useTranscription";
+import { ProgressBar } from "primereact/progressbar";
+import {
+  useTranscriptionEvents,
+  useTranscriptionPolling,
+} from "../hooks/useTranscription";
 import { TranscriptionSegmentItem } from "../components/transcription";
 import { Button } from "primereact/button";
 import { formatTime } from "../utils";
@@ -40,6 +44,10 @@ export function ResultsPage() {
     isLoading,
     error,
   } = useTranscriptionPolling(transcriptionId || "");
+  const inFlight =
+    transcription?.status === "pending" ||
+    transcription?.status === "processing";
+  const live = useTranscriptionEvents(transcriptionId || "", inFlight);
 
   if (isLoading) {
     return (
@@ -64,21 +72,34 @@ export function ResultsPage() {
     );
   }
 
-  if (transcription?.status === "processing") {
+  if (inFlight) {
     return (
       <div style={{ padding: "2rem", maxWidth: "800px", margin: "0 auto" }}>
         <Card>
           <div style={{ textAlign: "center" }}>
             <h2>Processing Your Transcription</h2>
-            <ProgressSpinner />
+            {live.progress > 0 ? (
+              <ProgressBar value={Math.round(live.progress)} />
+            ) : (
+              <ProgressSpinner />
+            )}
             <p style={{ marginTop: "1rem", color: "#666" }}>
-              Your audio is being transcribed. This may take several minutes.
+              {live.stage
+                ? `Current stage: ${live.stage}`
+                : "Your audio is being transcribed. This may take several minutes."}
             </p>
             <p style={{ fontSize: "0.9rem", color: "#999" }}>
-              File: {transcription.fileName} (
-              {formatTime(transcription.duration ?? 0)})
+              File: {transcription?.fileName} (
+              {formatTime(transcription?.duration ?? 0)})
             </p>
           </div>
+          {live.segments.map((segment) => (
+            <TranscriptionSegmentItem
+              key={segment.id}
+              segment={segment}
+              backgroundColor={getSpeakerColor(segment.speaker)}
+            />
+          ))}
         </Card>
       </div>
     );
@@ -9,12 +9,11 @@ export const transcriptionApi = {
     file: File,
     onProgress?: (progress: number) => void,
   ): Promise<Transcription> => {
-    const formData = new FormData();
-    formData.append("file", file);
-
+    // Raw body upload: streamed to disk server-side, type sniffed from bytes
     // TODO(fgorczynski): export to URL constants
-    return apiClient.post("/api/transcriptions/upload", formData, {
-      headers: { "Content-Type": "multipart/form-data" },
+    return apiClient.post("/api/transcriptions/upload-stream", file, {
+      params: { filename: file.name },
+      headers: { "Content-Type": file.type || "application/octet-stream" },
       onUploadProgress: (progressEvent) => {
         if (onProgress && progressEvent.total) {
           const percent = (progressEvent.loaded * 100) / progressEvent.total;
@@ -5,6 +5,8 @@ export interface TranscriptionItem {
   status: Status;
   file_name: string;
   duration?: number;
+  language?: string;
+  created_at?: string;
 }
 
 export interface TranscriptionSegment {
@@ -13,6 +15,7 @@ export interface TranscriptionSegment {
   end_time: number;
   text: string;
   speaker?: string;
+  simultaneous_speech?: boolean;
 }
 
 export interface Transcription {
@@ -25,6 +28,22 @@ export interface Transcription {
   segments: TranscriptionSegment[];
 }
 
+export type TranscriptionEventType =
+  | "status"
+  | "stage"
+  | "progress"
+  | "segment"
+  | "partial";
+
+export interface TranscriptionEvent {
+  type: TranscriptionEventType;
+  transcription_id: string;
+  status?: Status | null;
+  stage?: string | null;
+  progress?: number | null;
+  segment?: TranscriptionSegment | null;
+}
+
 export interface TranscriptionUpdate {
   segments: TranscriptionSegment[];
 }